@@ -4,9 +4,8 @@
 # SPDX-License-Identifier: BSD 2-Clause License
 #
 
+import argparse
 import asyncio
-import glob
-import json
 import os
 import sys
 from datetime import datetime
@@ -14,13 +13,14 @@ from datetime import datetime
 import aiohttp
 from dotenv import load_dotenv
 from loguru import logger
-from runner import configure
+from runner import configure_with_args
 
 from pipecat.audio.vad.silero import SileroVADAnalyzer
 from pipecat.audio.vad.vad_analyzer import VADParams
 from pipecat.pipeline.pipeline import Pipeline
 from pipecat.pipeline.runner import PipelineRunner
 from pipecat.pipeline.task import PipelineParams, PipelineTask
+from pipecat.processors.aggregators.llm_context_store import SQLiteContextStore
 from pipecat.processors.aggregators.openai_llm_context import (
     OpenAILLMContext,
 )
@@ -34,8 +34,7 @@ load_dotenv(override=True)
 logger.remove(0)
 logger.add(sys.stderr, level="DEBUG")
 
-BASE_FILENAME = "/tmp/pipecat_conversation_"
-tts = None
+DATABASE = "/tmp/pipecat_conversations.db"
 
 
 async def fetch_weather_from_api(function_name, tool_call_id, args, llm, context, result_callback):
@@ -50,49 +49,6 @@ async def fetch_weather_from_api(function_name, tool_call_id, args, llm, context
     )
 
 
-async def get_saved_conversation_filenames(
-    function_name, tool_call_id, args, llm, context, result_callback
-):
-    # Construct the full pattern including the BASE_FILENAME
-    full_pattern = f"{BASE_FILENAME}*.json"
-
-    # Use glob to find all matching files
-    matching_files = glob.glob(full_pattern)
-    logger.debug(f"matching files: {matching_files}")
-
-    await result_callback({"filenames": matching_files})
-
-
-async def save_conversation(function_name, tool_call_id, args, llm, context, result_callback):
-    timestamp = datetime.now().strftime("%Y-%m-%d_%H:%M:%S")
-    filename = f"{BASE_FILENAME}{timestamp}.json"
-    logger.debug(f"writing conversation to {filename}\n{json.dumps(context.messages, indent=4)}")
-    try:
-        with open(filename, "w") as file:
-            messages = context.get_messages_for_persistent_storage()
-            # remove the last message, which is the instruction we just gave to save the conversation
-            messages.pop()
-            json.dump(messages, file, indent=2)
-        await result_callback({"success": True})
-    except Exception as e:
-        await result_callback({"success": False, "error": str(e)})
-
-
-async def load_conversation(function_name, tool_call_id, args, llm, context, result_callback):
-    global tts
-    filename = args["filename"]
-    logger.debug(f"loading conversation from {filename}")
-    try:
-        with open(filename, "r") as file:
-            context.set_messages(json.load(file))
-            logger.debug(
-                f"loaded conversation from {filename}\n{json.dumps(context.messages, indent=4)}"
-            )
-        await tts.say("Ok, I've loaded that conversation.")
-    except Exception as e:
-        await result_callback({"success": False, "error": str(e)})
-
-
 messages = [
     {
         "role": "system",
@@ -122,54 +78,21 @@ tools = [
             },
         },
     },
-    {
-        "type": "function",
-        "function": {
-            "name": "save_conversation",
-            "description": "Save the current conversatione. Use this function to persist the current conversation to external storage.",
-            "parameters": {
-                "type": "object",
-                "properties": {},
-                "required": [],
-            },
-        },
-    },
-    {
-        "type": "function",
-        "function": {
-            "name": "get_saved_conversation_filenames",
-            "description": "Get a list of saved conversation histories. Returns a list of filenames. Each filename includes a date and timestamp. Each file is conversation history that can be loaded into this session.",
-            "parameters": {
-                "type": "object",
-                "properties": {},
-                "required": [],
-            },
-        },
-    },
-    {
-        "type": "function",
-        "function": {
-            "name": "load_conversation",
-            "description": "Load a conversation history. Use this function to load a conversation history into the current session.",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "filename": {
-                        "type": "string",
-                        "description": "The filename of the conversation history to load.",
-                    }
-                },
-                "required": ["filename"],
-            },
-        },
-    },
 ]
 
 
 async def main():
-    global tts
+    parser = argparse.ArgumentParser(description="Persistent context bot")
+    parser.add_argument(
+        "-c",
+        "--conversation-id",
+        type=str,
+        required=False,
+        help="Conversation to continue (a new one is started if not given)",
+    )
+
     async with aiohttp.ClientSession() as session:
-        (room_url, token) = await configure(session)
+        (room_url, token, args) = await configure_with_args(session, parser)
 
         transport = DailyTransport(
             room_url,
@@ -193,12 +116,22 @@ async def main():
         # you can either register a single function for all function calls, or specific functions
         # llm.register_function(None, fetch_weather_from_api)
         llm.register_function("get_current_weather", fetch_weather_from_api)
-        llm.register_function("save_conversation", save_conversation)
-        llm.register_function("get_saved_conversation_filenames", get_saved_conversation_filenames)
-        llm.register_function("load_conversation", load_conversation)
+
+        # Conversations are saved as they happen: only the new messages are
+        # written at every turn.
+        store = SQLiteContextStore(DATABASE)
+        conversation_id = args.conversation_id or datetime.now().strftime("%Y-%m-%d_%H:%M:%S")
 
         context = OpenAILLMContext(messages, tools)
-        context_aggregator = llm.create_context_aggregator(context)
+        if await store.resume(conversation_id, context):
+            logger.debug(f"Continuing conversation {conversation_id}")
+        else:
+            logger.debug(f"Starting conversation {conversation_id}")
+            logger.debug(f"Saved conversations: {await store.conversation_ids()}")
+
+        context_aggregator = llm.create_context_aggregator(
+            context, context_store=store, conversation_id=conversation_id
+        )
 
         pipeline = Pipeline(
             [
@@ -231,6 +164,8 @@ async def main():
 
         await runner.run(task)
 
+        await store.close()
+
 
 if __name__ == "__main__":
     asyncio.run(main())
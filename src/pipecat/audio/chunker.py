@@ -0,0 +1,111 @@
+#
+# Copyright (c) 2024, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+from typing import Iterator, List
+
+
+class AudioChunker:
+    """Splits a stream of audio bytes into fixed-size chunks.
+
+    Incoming audio is appended to an internal buffer and chunks are read from a
+    moving offset, so emitting a chunk never copies the rest of the
+    buffer. Consumed bytes are discarded lazily, once they take up at least
+    half of the buffer, which keeps appends and reads amortized O(1).
+
+    >>> chunker = AudioChunker(4)
+    >>> chunker.push(b"0123")
+    [b'0123']
+    >>> chunker.extend(b"0123456789")
+    >>> list(chunker.chunks())
+    [b'0123', b'4567']
+    >>> len(chunker)
+    2
+    >>> chunker.flush()
+    b'89'
+    >>> len(chunker)
+    0
+    """
+
+    def __init__(self, chunk_size: int):
+        if chunk_size <= 0:
+            raise ValueError(f"Invalid chunk size: {chunk_size}")
+        self._chunk_size = chunk_size
+        self._buffer = bytearray()
+        self._offset = 0
+
+    @property
+    def chunk_size(self) -> int:
+        return self._chunk_size
+
+    def __len__(self) -> int:
+        return len(self._buffer) - self._offset
+
+    def extend(self, audio: bytes):
+        # Drop the consumed bytes before growing the buffer, but only if they
+        # are at least half of it. This way we move each byte at most once.
+        if self._offset and self._offset >= len(self._buffer) // 2:
+            del self._buffer[: self._offset]
+            self._offset = 0
+        self._buffer.extend(audio)
+
+    def push(self, audio: bytes) -> List[bytes]:
+        """Appends `audio` and returns all the complete chunks available.
+
+        This is `extend()` followed by `chunks()`, in a single call. It's meant
+        for the per-frame hot path, where most frames are a single chunk (or
+        less) and call overhead dominates. A chunk-sized frame that arrives
+        when nothing is pending is returned as is, without copying it.
+
+        """
+        size = self._chunk_size
+        buffer = self._buffer
+        offset = self._offset
+        if offset == len(buffer):
+            if len(audio) == size:
+                return [bytes(audio)]
+            if offset:
+                buffer.clear()
+                offset = 0
+        elif offset >= len(buffer) // 2:
+            del buffer[:offset]
+            offset = 0
+        buffer.extend(audio)
+        available = len(buffer) - offset
+        if available < size:
+            self._offset = offset
+            return []
+        end = offset + available - available % size
+        self._offset = end
+        if end - offset == size:
+            return [bytes(buffer[offset:end])]
+        return [bytes(buffer[i : i + size]) for i in range(offset, end, size)]
+
+    def read(self, size: int) -> bytes:
+        """Reads (and consumes) up to `size` bytes."""
+        start = self._offset
+        end = min(start + size, len(self._buffer))
+        self._offset = end
+        return bytes(self._buffer[start:end])
+
+    def chunks(self) -> Iterator[bytes]:
+        """Yields all the complete chunks currently available."""
+        while len(self._buffer) - self._offset >= self._chunk_size:
+            start = self._offset
+            self._offset += self._chunk_size
+            yield bytes(self._buffer[start : self._offset])
+
+    def flush(self) -> bytes:
+        """Returns the remaining (possibly incomplete) chunk and empties the
+        buffer.
+
+        """
+        chunk = self.read(len(self))
+        self.clear()
+        return chunk
+
+    def clear(self):
+        self._buffer.clear()
+        self._offset = 0
@@ -0,0 +1,228 @@
+#
+# Copyright (c) 2024, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+import heapq
+import itertools
+
+from typing import List, Tuple
+
+import numpy as np
+
+from loguru import logger
+from pydantic.main import BaseModel
+
+from pipecat.frames.frames import InputAudioRawFrame
+from pipecat.utils.time import nanoseconds_to_seconds
+
+# Timestamps closer than this are considered the same (in seconds).
+_TIMESTAMP_TOLERANCE = 0.001
+
+
+class JitterBufferParams(BaseModel):
+    min_delay_secs: float = 0.02
+    max_delay_secs: float = 0.2
+    # The target delay is `jitter_factor` times the current jitter estimate.
+    jitter_factor: float = 3.0
+    # Maximum amount of consecutive audio that will be synthesized to fill gaps.
+    max_concealment_secs: float = 0.06
+    # Maximum playout adjustment per frame. This keeps the output cadence
+    # steady while the delay adapts.
+    adaptation_step_secs: float = 0.002
+
+
+class AudioJitterBuffer:
+    """Reorders and paces incoming audio frames to a steady cadence.
+
+    Frames are ordered by their media timestamp. If a frame has a presentation
+    timestamp (`pts`) that is used (e.g. the Twilio serializer sets it from the
+    media stream timestamp), otherwise the frame is assumed to follow the last
+    received one. Each frame is released once its media timestamp plus the
+    current playout delay has been reached.
+
+    The playout delay follows the network jitter, which is estimated as in RFC
+    3550. Small gaps (i.e. missing frames followed by newer frames) are
+    concealed by repeating the last frame with decreasing gain, and frames that
+    arrive after their slot has been played are dropped.
+
+    This class doesn't do any I/O. Times are given by the caller (in seconds)
+    so the buffer can be driven by any clock.
+
+    """
+
+    def __init__(self, *, params: JitterBufferParams = JitterBufferParams()):
+        self.set_params(params)
+        self.reset()
+
+    @property
+    def jitter(self) -> float:
+        """Current interarrival jitter estimate (in seconds)."""
+        return self._jitter
+
+    @property
+    def delay(self) -> float:
+        """Current average time frames spend in the buffer (in seconds)."""
+        return max(0.0, self._delay)
+
+    @property
+    def target_delay(self) -> float:
+        delay = self._params.jitter_factor * self._jitter
+        return min(max(delay, self._params.min_delay_secs), self._params.max_delay_secs)
+
+    @property
+    def late_frames(self) -> int:
+        return self._late_frames
+
+    @property
+    def concealed_frames(self) -> int:
+        return self._concealed_frames
+
+    def set_params(self, params: JitterBufferParams):
+        logger.info(f"Setting jitter buffer params to: {params}")
+        self._params = params
+
+    def reset(self):
+        self._heap: List[Tuple[float, int, InputAudioRawFrame]] = []
+        self._counter = itertools.count()
+        # Media timestamp of the end of the newest frame received.
+        self._next_timestamp = 0.0
+        # Media timestamp of the next frame we should play.
+        self._playout_timestamp: float | None = None
+        # Media timestamp to wall time offset.
+        self._playout_offset: float | None = None
+        self._underrun = False
+        self._last_transit: float | None = None
+        self._jitter = 0.0
+        self._delay = 0.0
+        self._last_frame: InputAudioRawFrame | None = None
+        self._concealment_secs = 0.0
+        self._concealment_count = 0
+        self._late_frames = 0
+        self._concealed_frames = 0
+
+    def put(self, frame: InputAudioRawFrame, arrival_time: float) -> bool:
+        """Adds a frame to the buffer. Returns False if the frame arrived too
+        late to be played and was discarded.
+
+        """
+        if frame.pts:
+            timestamp = nanoseconds_to_seconds(frame.pts)
+        else:
+            timestamp = self._next_timestamp
+        duration = frame.num_frames / frame.sample_rate
+        self._next_timestamp = max(self._next_timestamp, timestamp + duration)
+
+        # Interarrival jitter (RFC 3550, section 6.4.1).
+        transit = arrival_time - timestamp
+        if self._last_transit is not None:
+            self._jitter += (abs(transit - self._last_transit) - self._jitter) / 16
+        self._last_transit = transit
+
+        # (Re)start playout. We do this for the first frame and after running
+        # out of frames, so we always have `target_delay` worth of margin.
+        if self._playout_offset is None or (self._underrun and not self._heap):
+            self._playout_offset = transit + self.target_delay
+            if self._playout_timestamp is None or timestamp > self._playout_timestamp:
+                self._playout_timestamp = timestamp
+            self._underrun = False
+            self._delay = self.target_delay
+
+        if timestamp + duration <= self._playout_timestamp + _TIMESTAMP_TOLERANCE:
+            self._late_frames += 1
+            return False
+
+        self._delay += (self._playout_offset + timestamp - arrival_time - self._delay) / 16
+
+        heapq.heappush(self._heap, (timestamp, next(self._counter), frame))
+
+        return True
+
+    def next_delay(self, now: float) -> float | None:
+        """Returns how long to wait (in seconds) until `pop()` can return a
+        frame, or None if the buffer is empty.
+
+        """
+        due_time = self._next_due_time(now)
+        if due_time is None:
+            return None
+        return max(0.0, due_time - now)
+
+    def pop(self, now: float) -> InputAudioRawFrame | None:
+        """Returns the next frame if it's time to play it."""
+        due_time = self._next_due_time(now)
+        if due_time is None or due_time > now:
+            return None
+
+        timestamp, _, frame = self._heap[0]
+
+        if timestamp > self._playout_timestamp + _TIMESTAMP_TOLERANCE:
+            if self._can_conceal():
+                return self._conceal()
+            # The gap is too big, skip it.
+            self._playout_timestamp = timestamp
+
+        heapq.heappop(self._heap)
+
+        duration = frame.num_frames / frame.sample_rate
+        self._playout_timestamp = max(self._playout_timestamp, timestamp + duration)
+        self._last_frame = frame
+        self._concealment_secs = 0.0
+        self._concealment_count = 0
+
+        self._adapt()
+
+        return frame
+
+    def _next_due_time(self, now: float) -> float | None:
+        if not self._heap:
+            # We have run out of frames. Playout will restart with the next one.
+            if (
+                self._playout_offset is not None
+                and now >= self._playout_offset + self._playout_timestamp
+            ):
+                self._underrun = True
+            return None
+
+        timestamp = self._heap[0][0]
+        if timestamp > self._playout_timestamp + _TIMESTAMP_TOLERANCE and self._can_conceal():
+            timestamp = self._playout_timestamp
+        return self._playout_offset + max(timestamp, self._playout_timestamp)
+
+    def _can_conceal(self) -> bool:
+        return (
+            self._last_frame is not None
+            and self._concealment_secs < self._params.max_concealment_secs
+        )
+
+    def _conceal(self) -> InputAudioRawFrame:
+        last_frame = self._last_frame
+        self._concealment_count += 1
+
+        # Repeat the last frame, halving the gain every time.
+        audio = np.frombuffer(last_frame.audio, dtype=np.int16)
+        audio = (audio * 0.5**self._concealment_count).astype(np.int16)
+        frame = InputAudioRawFrame(
+            audio=audio.tobytes(),
+            sample_rate=last_frame.sample_rate,
+            num_channels=last_frame.num_channels,
+        )
+
+        duration = frame.num_frames / frame.sample_rate
+        self._playout_timestamp += duration
+        self._concealment_secs += duration
+        self._concealed_frames += 1
+
+        return frame
+
+    def _adapt(self):
+        # Move playout, one small step at a time, towards the target delay.
+        step = self._params.adaptation_step_secs
+        target_delay = self.target_delay
+        if self._delay > target_delay + step:
+            self._playout_offset -= step
+            self._delay -= step
+        elif self._delay < target_delay - step:
+            self._playout_offset += step
+            self._delay += step
@@ -0,0 +1,47 @@
+#
+# Copyright (c) 2024, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+import audioop
+
+
+class AudioResampler:
+    """Converts a stream of 16-bit PCM audio between two sample rates.
+
+    Unlike `resample_audio()`, the filter state is kept between calls so
+    audio can be resampled chunk by chunk without discontinuities at chunk
+    boundaries.
+
+    """
+
+    def __init__(self, in_sample_rate: int, out_sample_rate: int, num_channels: int = 1):
+        self._in_sample_rate = in_sample_rate
+        self._out_sample_rate = out_sample_rate
+        self._num_channels = num_channels
+        self._state = None
+
+    @property
+    def in_sample_rate(self) -> int:
+        return self._in_sample_rate
+
+    @property
+    def out_sample_rate(self) -> int:
+        return self._out_sample_rate
+
+    def resample(self, audio: bytes) -> bytes:
+        if self._in_sample_rate == self._out_sample_rate:
+            return audio
+        (audio, self._state) = audioop.ratecv(
+            audio,
+            2,
+            self._num_channels,
+            self._in_sample_rate,
+            self._out_sample_rate,
+            self._state,
+        )
+        return audio
+
+    def reset(self):
+        self._state = None
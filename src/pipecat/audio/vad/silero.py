@@ -5,6 +5,7 @@
 #
 
 import time
+from typing import List, Type
 
 import numpy as np
 
@@ -12,6 +13,7 @@ from pipecat.audio.vad.vad_analyzer import VADAnalyzer, VADParams, VADState
 from pipecat.frames.frames import (
     AudioRawFrame,
     Frame,
+    InputAudioRawFrame,
     StartInterruptionFrame,
     StopInterruptionFrame,
     UserStartedSpeakingFrame,
@@ -188,6 +190,11 @@ class SileroVAD(FrameProcessor):
 
         self._processor_vad_state: VADState = VADState.QUIET
 
+    def accepted_audio_sample_rates(self, frame_type: Type[AudioRawFrame]) -> List[int] | None:
+        if issubclass(frame_type, InputAudioRawFrame):
+            return [self._vad_analyzer.sample_rate]
+        return None
+
     #
     # FrameProcessor
     #
@@ -48,6 +48,10 @@ class VADAnalyzer:
     def num_channels(self):
         return self._num_channels
 
+    @property
+    def params(self) -> VADParams:
+        return self._params
+
     @abstractmethod
     def num_frames_required(self) -> int:
         pass
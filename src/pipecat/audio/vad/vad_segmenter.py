@@ -0,0 +1,162 @@
+#
+# Copyright (c) 2024, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+from typing import List
+
+import numpy as np
+
+from pydantic.main import BaseModel
+
+from pipecat.audio.vad.vad_analyzer import VADAnalyzer, VADState
+
+
+class VADSegmenterParams(BaseModel):
+    # Audio kept before the VAD detects speech (on top of the VAD `start_secs`)
+    # so word onsets are not clipped.
+    pre_roll_secs: float = 0.3
+    # Segments longer than this are split.
+    max_segment_secs: float = 15.0
+    # When splitting, look for the quietest point in this many last seconds.
+    split_search_secs: float = 3.0
+    # Size of the windows used to find the quietest point.
+    split_window_secs: float = 0.02
+
+
+class VADSegmenter:
+    """Splits a stream of 16-bit PCM audio into speech segments using a
+    `VADAnalyzer`. Segments are returned as float32 samples (between -1.0 and
+    1.0) and include some audio from before the VAD detected speech, so the
+    beginning of the first word is not lost. Segments that grow longer than
+    `max_segment_secs` are split at the quietest point found towards their
+    end, instead of in the middle of a word.
+
+    The VAD analyzer is used exclusively by the segmenter, so it can't be
+    shared with, for example, a transport.
+
+    """
+
+    def __init__(
+        self, *, vad_analyzer: VADAnalyzer, params: VADSegmenterParams = VADSegmenterParams()
+    ):
+        self._vad_analyzer = vad_analyzer
+        self._params = params
+
+        rate = vad_analyzer.sample_rate
+        channels = vad_analyzer.num_channels
+
+        pre_roll_secs = vad_analyzer.params.start_secs + params.pre_roll_secs
+        self._pre_roll = np.zeros(int(pre_roll_secs * rate) * channels, dtype=np.float32)
+        self._pre_roll_pos = 0
+        self._pre_roll_len = 0
+
+        self._max_segment_samples = int(params.max_segment_secs * rate) * channels
+        self._split_search_samples = int(params.split_search_secs * rate) * channels
+        # Even number of frames, so we can split in the middle of a window.
+        self._split_window_samples = (
+            max(int(params.split_window_secs * rate) // 2, 1) * 2 * channels
+        )
+
+        self._segment: List[np.ndarray] = []
+        self._segment_len = 0
+        self._in_segment = False
+
+    @property
+    def in_segment(self) -> bool:
+        return self._in_segment
+
+    def append(self, audio: bytes) -> List[np.ndarray]:
+        """Analyzes the given audio and returns the segments completed by it, if
+        any.
+
+        """
+        # Divide by 32768 because we have signed 16-bit data.
+        samples = np.frombuffer(audio, dtype=np.int16).astype(np.float32) / 32768.0
+
+        state = self._vad_analyzer.analyze_audio(audio)
+
+        segments = []
+        if self._in_segment:
+            self._append_segment(samples)
+            if state == VADState.QUIET:
+                segments.append(self._finish_segment())
+        elif state == VADState.SPEAKING:
+            # Speech has started, go back in time so we don't clip it.
+            self._in_segment = True
+            self._append_segment(self._read_pre_roll())
+            self._append_segment(samples)
+        else:
+            self._write_pre_roll(samples)
+
+        while self._in_segment and self._segment_len >= self._max_segment_samples:
+            segments.append(self._split_segment())
+
+        return segments
+
+    def flush(self) -> np.ndarray | None:
+        """Returns the segment in progress, if any."""
+        return self._finish_segment() if self._in_segment else None
+
+    def reset(self):
+        self._segment = []
+        self._segment_len = 0
+        self._in_segment = False
+        self._pre_roll_pos = 0
+        self._pre_roll_len = 0
+
+    def _append_segment(self, samples: np.ndarray):
+        if len(samples) > 0:
+            self._segment.append(samples)
+            self._segment_len += len(samples)
+
+    def _finish_segment(self) -> np.ndarray:
+        segment = np.concatenate(self._segment) if self._segment else np.zeros(0, np.float32)
+        self.reset()
+        return segment
+
+    def _split_segment(self) -> np.ndarray:
+        audio = np.concatenate(self._segment)
+
+        # Find the quietest window towards the end of the segment.
+        window = self._split_window_samples
+        search_len = min(self._split_search_samples, len(audio)) // window * window
+        search_start = len(audio) - search_len
+        split = len(audio)
+        if search_len > 0:
+            windows = audio[search_start:].reshape(-1, window)
+            energies = np.square(windows).mean(axis=1)
+            # Split in the middle of the quietest window.
+            split = search_start + int(np.argmin(energies)) * window + window // 2
+
+        self._segment = [audio[split:]] if split < len(audio) else []
+        self._segment_len = len(audio) - split
+        return audio[:split]
+
+    def _write_pre_roll(self, samples: np.ndarray):
+        size = len(self._pre_roll)
+        if size == 0:
+            return
+        if len(samples) >= size:
+            self._pre_roll[:] = samples[-size:]
+            self._pre_roll_pos = 0
+            self._pre_roll_len = size
+            return
+        end = self._pre_roll_pos + len(samples)
+        if end <= size:
+            self._pre_roll[self._pre_roll_pos : end] = samples
+        else:
+            first = size - self._pre_roll_pos
+            self._pre_roll[self._pre_roll_pos :] = samples[:first]
+            self._pre_roll[: end - size] = samples[first:]
+        self._pre_roll_pos = end % size
+        self._pre_roll_len = min(self._pre_roll_len + len(samples), size)
+
+    def _read_pre_roll(self) -> np.ndarray:
+        if self._pre_roll_len < len(self._pre_roll):
+            # Not full yet, so it hasn't wrapped around.
+            return self._pre_roll[: self._pre_roll_len].copy()
+        return np.concatenate(
+            (self._pre_roll[self._pre_roll_pos :], self._pre_roll[: self._pre_roll_pos])
+        )
@@ -29,3 +29,43 @@ class LLMUsageMetricsData(MetricsData):
 
 class TTSUsageMetricsData(MetricsData):
     value: int
+
+
+class JitterBufferMetricsData(MetricsData):
+    value: float
+    jitter: float
+    late_frames: int
+    concealed_frames: int
+
+
+class TTSFlushMetricsData(MetricsData):
+    # Seconds the first TTS request of a response was sent before its first
+    # sentence was complete (0 if it was not flushed early).
+    value: float
+    # Number of TTS requests made for the response.
+    requests: int
+    # Number of TTS requests added by flushing early.
+    extra_requests: int
+
+
+class LLMPromptCacheMetricsData(MetricsData):
+    # Fraction of the prompt tokens of the request that were read from the
+    # provider's prompt cache.
+    value: float
+    cached_tokens: int
+    prompt_tokens: int
+    # Cached and prompt tokens of all the requests so far, for the overall
+    # hit rate.
+    total_cached_tokens: int
+    total_prompt_tokens: int
+
+
+class LLMSpeculationMetricsData(MetricsData):
+    # Seconds the response was started before the final context was ready (0
+    # if the speculative response could not be used).
+    value: float
+    # Whether the speculative response was used.
+    hit: bool
+    # Speculative responses used and started so far, for the hit rate.
+    hits: int
+    speculations: int
@@ -4,12 +4,21 @@
 # SPDX-License-Identifier: BSD 2-Clause License
 #
 
-from typing import Callable, Coroutine, List
-
-from pipecat.frames.frames import Frame
+from typing import Callable, Coroutine, List, Type
+
+from pipecat.frames.frames import (
+    AudioRawFrame,
+    Frame,
+    InputAudioRawFrame,
+    OutputAudioRawFrame,
+    StartFrame,
+)
 from pipecat.pipeline.base_pipeline import BasePipeline
+from pipecat.processors.audio.audio_resample_processor import AudioResampleProcessor
 from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
 
+from loguru import logger
+
 
 class PipelineSource(FrameProcessor):
     def __init__(self, upstream_push_frame: Callable[[Frame, FrameDirection], Coroutine]):
@@ -53,6 +62,21 @@ class Pipeline(BasePipeline):
 
         self._link_processors()
 
+    def negotiate_audio_formats(self):
+        """Walks the pipeline following input and output audio, and inserts an
+        `AudioResampleProcessor` in front of every processor that doesn't
+        accept the sample rate produced upstream. Resamplers are only added
+        where there's a mismatch, so audio is never converted more than needed.
+
+        """
+        processors = self._processors
+        for frame_type in [InputAudioRawFrame, OutputAudioRawFrame]:
+            processors = self._negotiate_audio_format(processors, frame_type)
+
+        if len(processors) != len(self._processors):
+            self._processors = processors
+            self._link_processors()
+
     #
     # BasePipeline
     #
@@ -70,12 +94,36 @@ class Pipeline(BasePipeline):
     # Frame processor
     #
 
+    def accepted_audio_sample_rates(self, frame_type: Type[AudioRawFrame]) -> List[int] | None:
+        # What the first processor that cares about this type of audio accepts,
+        # unless someone before it generates that audio.
+        for p in self._processors:
+            accepted = p.accepted_audio_sample_rates(frame_type)
+            if accepted:
+                return accepted
+            if p.produced_audio_sample_rate(frame_type):
+                return None
+        return None
+
+    def produced_audio_sample_rate(self, frame_type: Type[AudioRawFrame]) -> int | None:
+        sample_rate = None
+        for p in self._processors:
+            accepted = p.accepted_audio_sample_rates(frame_type)
+            if sample_rate and accepted and sample_rate not in accepted:
+                sample_rate = accepted[0]
+            sample_rate = p.produced_audio_sample_rate(frame_type) or sample_rate
+        return sample_rate
+
     async def cleanup(self):
         await self._cleanup_processors()
 
     async def process_frame(self, frame: Frame, direction: FrameDirection):
         await super().process_frame(frame, direction)
 
+        # Make sure audio formats match before any processor gets started.
+        if isinstance(frame, StartFrame):
+            self.negotiate_audio_formats()
+
         if direction == FrameDirection.DOWNSTREAM:
             await self._source.process_frame(frame, FrameDirection.DOWNSTREAM)
         elif direction == FrameDirection.UPSTREAM:
@@ -85,6 +133,26 @@ class Pipeline(BasePipeline):
         for p in self._processors:
             await p.cleanup()
 
+    def _negotiate_audio_format(
+        self, processors: List[FrameProcessor], frame_type: Type[AudioRawFrame]
+    ) -> List[FrameProcessor]:
+        result = []
+        sample_rate = None
+        for p in processors:
+            accepted = p.accepted_audio_sample_rates(frame_type)
+            if sample_rate and accepted and sample_rate not in accepted:
+                resampler = AudioResampleProcessor(
+                    frame_type=frame_type, in_sample_rate=sample_rate, out_sample_rate=accepted[0]
+                )
+                logger.debug(
+                    f"{self}: {p} doesn't accept {frame_type.__name__} at {sample_rate} Hz, inserting {resampler} ({sample_rate} Hz -> {accepted[0]} Hz)"
+                )
+                result.append(resampler)
+                sample_rate = accepted[0]
+            result.append(p)
+            sample_rate = p.produced_audio_sample_rate(frame_type) or sample_rate
+        return result
+
     def _link_processors(self):
         prev = self._processors[0]
         for curr in self._processors[1:]:
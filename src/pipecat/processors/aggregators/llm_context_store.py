@@ -0,0 +1,333 @@
+#
+# Copyright (c) 2024, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+import asyncio
+import io
+import json
+import os
+import sqlite3
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote, unquote
+
+from loguru import logger
+
+from pipecat.processors.aggregators.openai_llm_context import OpenAILLMContext
+
+
+@dataclass
+class ContextStoreRecord:
+    """A message of a conversation, stored as a JSON list of messages in the
+    standard (OpenAI) format (a message of some contexts, e.g. Anthropic's,
+    is more than one standard message). A record with the same `seq` as a
+    previous one replaces it.
+
+    """
+
+    conversation_id: str
+    seq: int
+    messages: str
+
+
+@dataclass
+class _ContextCursor:
+    # The last message saved, its record sequence number and its data, so we
+    # can find which messages are new and whether it has changed.
+    message: dict
+    seq: int
+    messages: str
+
+
+class ContextStore(ABC):
+    """Persists LLM contexts incrementally. `save()` only stores the messages
+    added (or changed) since the previous save, so it costs the same at every
+    turn no matter how long the conversation is. Records are written in
+    batches, in a thread, every `flush_interval_secs` (or as soon as there
+    are `max_batch_size` of them), so the event loop is not blocked.
+
+    Use `resume()` to load a conversation into a context and continue it.
+    Context aggregators save their context every time they push it if they
+    are given a store and a conversation id (see `create_context_aggregator()`).
+
+    Images of `OpenAILLMContext` messages are not stored, only their text.
+
+    """
+
+    def __init__(self, *, flush_interval_secs: float = 0.5, max_batch_size: int = 100):
+        self._flush_interval_secs = flush_interval_secs
+        self._max_batch_size = max_batch_size
+        self._pending: List[ContextStoreRecord] = []
+        self._cursors: Dict[str, _ContextCursor] = {}
+        self._lock = asyncio.Lock()
+        self._flush_event = asyncio.Event()
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def save(self, conversation_id: str, context: OpenAILLMContext):
+        """Stores the messages of the context that are new since the last
+        time it was saved (or resumed).
+
+        """
+        messages = context.messages
+        cursor = self._cursors.get(conversation_id)
+        start = 0
+        seq = 0
+        if cursor:
+            # The last saved message is usually one of the last ones.
+            index = len(messages) - 1
+            while index >= 0 and messages[index] is not cursor.message:
+                index -= 1
+            if index >= 0:
+                data = self._serialize(context, messages[index])
+                if data != cursor.messages:
+                    # The message has changed, e.g. Anthropic contexts merge
+                    # consecutive messages of the same role.
+                    self._enqueue(ContextStoreRecord(conversation_id, cursor.seq, data))
+                    cursor.messages = data
+                start = index + 1
+            seq = cursor.seq + 1
+
+        for message in messages[start:]:
+            data = self._serialize(context, message)
+            self._enqueue(ContextStoreRecord(conversation_id, seq, data))
+            cursor = _ContextCursor(message=message, seq=seq, messages=data)
+            seq += 1
+        if cursor:
+            self._cursors[conversation_id] = cursor
+
+    async def load(self, conversation_id: str) -> List[dict]:
+        """Returns the messages of a conversation, in the standard format."""
+        records = await self._load_records(conversation_id)
+        return [message for _, data in records for message in json.loads(data)]
+
+    async def resume(self, conversation_id: str, context: OpenAILLMContext) -> bool:
+        """Replaces the messages of the context with the ones of the
+        conversation, so new messages are saved after them. Returns False (and
+        leaves the context as it is) if the conversation doesn't exist.
+
+        """
+        records = await self._load_records(conversation_id)
+        if not records:
+            self._cursors.pop(conversation_id, None)
+            return False
+        messages = [
+            context.from_standard_message(message)
+            for _, data in records
+            for message in json.loads(data)
+        ]
+        context.set_messages(messages)
+        last = context.messages[-1]
+        self._cursors[conversation_id] = _ContextCursor(
+            message=last, seq=records[-1][0], messages=self._serialize(context, last)
+        )
+        return True
+
+    async def conversation_ids(self) -> List[str]:
+        await self.flush()
+        async with self._lock:
+            return await asyncio.to_thread(self._conversation_ids)
+
+    async def delete(self, conversation_id: str):
+        self._cursors.pop(conversation_id, None)
+        await self.flush()
+        async with self._lock:
+            await asyncio.to_thread(self._delete, conversation_id)
+
+    async def flush(self):
+        """Writes the pending records."""
+        async with self._lock:
+            self._flush_event.clear()
+            records = self._pending
+            self._pending = []
+            if not records:
+                return
+            try:
+                await asyncio.to_thread(self._write, records)
+            except Exception:
+                # Keep them, so we try again next time.
+                self._pending[:0] = records
+                raise
+
+    async def close(self):
+        if self._flush_task:
+            # Don't wait for the flush interval.
+            self._flush_event.set()
+            await self._flush_task
+        await self.flush()
+        async with self._lock:
+            await asyncio.to_thread(self._close)
+
+    def _enqueue(self, record: ContextStoreRecord):
+        self._pending.append(record)
+        if len(self._pending) >= self._max_batch_size:
+            self._flush_event.set()
+        if not self._flush_task:
+            self._flush_task = asyncio.create_task(self._flush_task_handler())
+
+    async def _flush_task_handler(self):
+        try:
+            await asyncio.wait_for(self._flush_event.wait(), timeout=self._flush_interval_secs)
+        except asyncio.TimeoutError:
+            pass
+        self._flush_task = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"{self} error writing context records: {e}")
+
+    async def _load_records(self, conversation_id: str) -> List[Tuple[int, str]]:
+        await self.flush()
+        async with self._lock:
+            return await asyncio.to_thread(self._read, conversation_id)
+
+    def _serialize(self, context: OpenAILLMContext, message: dict) -> str:
+        if isinstance(message.get("data"), io.BytesIO):
+            # Images are not stored.
+            message = {"role": message["role"], "content": message["content"]}
+        return json.dumps(context.to_standard_messages(message), ensure_ascii=False)
+
+    #
+    # Backends (these are called in a thread, one at a time)
+    #
+
+    @abstractmethod
+    def _write(self, records: List[ContextStoreRecord]):
+        pass
+
+    @abstractmethod
+    def _read(self, conversation_id: str) -> List[Tuple[int, str]]:
+        """Returns the (seq, messages) records of a conversation, in order and
+        with the replaced ones removed.
+
+        """
+        pass
+
+    @abstractmethod
+    def _conversation_ids(self) -> List[str]:
+        pass
+
+    @abstractmethod
+    def _delete(self, conversation_id: str):
+        pass
+
+    def _close(self):
+        pass
+
+
+class SQLiteContextStore(ContextStore):
+    """Stores conversations in an SQLite database in WAL mode, so writes are
+    cheap appends and conversations can be read while they are written.
+
+    """
+
+    def __init__(self, path: str, **kwargs):
+        super().__init__(**kwargs)
+        self._path = path
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._connection:
+            connection = sqlite3.connect(self._path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS context_messages ("
+                "conversation_id TEXT NOT NULL, "
+                "seq INTEGER NOT NULL, "
+                "messages TEXT NOT NULL, "
+                "PRIMARY KEY (conversation_id, seq)"
+                ") WITHOUT ROWID"
+            )
+            self._connection = connection
+        return self._connection
+
+    def _write(self, records: List[ContextStoreRecord]):
+        connection = self._connect()
+        with connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO context_messages VALUES (?, ?, ?)",
+                [(r.conversation_id, r.seq, r.messages) for r in records],
+            )
+
+    def _read(self, conversation_id: str) -> List[Tuple[int, str]]:
+        cursor = self._connect().execute(
+            "SELECT seq, messages FROM context_messages WHERE conversation_id = ? ORDER BY seq",
+            (conversation_id,),
+        )
+        return cursor.fetchall()
+
+    def _conversation_ids(self) -> List[str]:
+        cursor = self._connect().execute("SELECT DISTINCT conversation_id FROM context_messages")
+        return [row[0] for row in cursor.fetchall()]
+
+    def _delete(self, conversation_id: str):
+        connection = self._connect()
+        with connection:
+            connection.execute(
+                "DELETE FROM context_messages WHERE conversation_id = ?", (conversation_id,)
+            )
+
+    def _close(self):
+        if self._connection:
+            self._connection.close()
+            self._connection = None
+
+
+class JSONLContextStore(ContextStore):
+    """Stores each conversation in a JSON Lines file in the given directory.
+    Records are only appended. When a record replaces a previous one, the
+    last one is used when the conversation is loaded.
+
+    """
+
+    SUFFIX = ".jsonl"
+
+    def __init__(self, directory: str, **kwargs):
+        super().__init__(**kwargs)
+        self._directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _filename(self, conversation_id: str) -> str:
+        return os.path.join(self._directory, quote(conversation_id, safe="") + self.SUFFIX)
+
+    def _write(self, records: List[ContextStoreRecord]):
+        lines: Dict[str, List[str]] = {}
+        for r in records:
+            line = f'{{"seq": {r.seq}, "messages": {r.messages}}}\n'
+            lines.setdefault(r.conversation_id, []).append(line)
+        for conversation_id, conversation_lines in lines.items():
+            with open(self._filename(conversation_id), "a", encoding="utf-8") as file:
+                file.writelines(conversation_lines)
+
+    def _read(self, conversation_id: str) -> List[Tuple[int, str]]:
+        try:
+            file = open(self._filename(conversation_id), "r", encoding="utf-8")
+        except FileNotFoundError:
+            return []
+        records: Dict[int, str] = {}
+        with file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # The last line might be incomplete if we crashed while writing it.
+                    logger.warning(f"{self} ignoring invalid record of {conversation_id}")
+                    continue
+                records[record["seq"]] = json.dumps(record["messages"], ensure_ascii=False)
+        return sorted(records.items())
+
+    def _conversation_ids(self) -> List[str]:
+        return [
+            unquote(name[: -len(self.SUFFIX)])
+            for name in os.listdir(self._directory)
+            if name.endswith(self.SUFFIX)
+        ]
+
+    def _delete(self, conversation_id: str):
+        try:
+            os.remove(self._filename(conversation_id))
+        except FileNotFoundError:
+            pass
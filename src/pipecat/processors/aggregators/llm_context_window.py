@@ -0,0 +1,133 @@
+#
+# Copyright (c) 2024, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+import asyncio
+from typing import Awaitable, Callable, List, Optional
+
+from loguru import logger
+
+from pipecat.processors.aggregators.openai_llm_context import OpenAILLMContext
+
+# Receives the messages to summarize (in OpenAI format, starting with the
+# previous summary if there's one) and returns the new summary.
+LLMContextSummarizer = Callable[[List[dict]], Awaitable[str]]
+
+SUMMARY_PREFIX = "Summary of the earlier conversation: "
+
+
+def _is_turn_start(message: dict) -> bool:
+    # User messages, except for the ones with function call results (which
+    # are user messages in Anthropic).
+    if message.get("role") != "user":
+        return False
+    content = message.get("content")
+    if isinstance(content, list):
+        return not any(
+            isinstance(item, dict) and item.get("type") == "tool_result" for item in content
+        )
+    return True
+
+
+class LLMContextWindow:
+    """Keeps the messages of a context within a token budget, so long
+    conversations don't get slower (and more expensive) with every turn.
+
+    When the context is over `max_tokens`, the oldest turns (a user message
+    and everything that follows it, e.g. function calls and their results)
+    are removed. Leading system messages are never removed and the last
+    `min_turns` turns are always kept. Tools are not part of the messages,
+    so they are always kept too. Tokens are counted by the context (see
+    `OpenAILLMContext.set_tokenizer()`).
+
+    If a `summarizer` is given, removed turns are summarized in a background
+    task and the summary is added to the context at the next turn.
+
+    """
+
+    def __init__(
+        self,
+        *,
+        max_tokens: int,
+        min_turns: int = 1,
+        summarizer: Optional[LLMContextSummarizer] = None,
+    ):
+        self._max_tokens = max_tokens
+        self._min_turns = min_turns
+        self._summarizer = summarizer
+
+        self._summary: str | None = None
+        self._summary_applied = True
+        self._evicted: List[dict] = []
+        self._summary_task: asyncio.Task | None = None
+
+    @property
+    def summary(self) -> str | None:
+        return self._summary
+
+    async def apply(self, context: OpenAILLMContext):
+        """Called by the user context aggregator at the end of every user turn,
+        before the context is sent to the LLM.
+
+        """
+        if self._summary and not self._summary_applied:
+            context.set_summary(SUMMARY_PREFIX + self._summary)
+            self._summary_applied = True
+
+        total = context.token_count
+        if total <= self._max_tokens:
+            return
+
+        messages = context.messages
+        tokens = context.message_token_counts
+
+        pinned = 0
+        while pinned < len(messages) and messages[pinned].get("role") == "system":
+            pinned += 1
+        turns = [i for i in range(pinned, len(messages)) if _is_turn_start(messages[i])]
+
+        end = pinned
+        for start in turns[: max(0, len(turns) - self._min_turns + 1)]:
+            if total <= self._max_tokens:
+                break
+            total -= sum(tokens[end:start])
+            end = start
+
+        if end == pinned:
+            return
+
+        evicted = messages[pinned:end]
+        context.remove_messages(pinned, end)
+        logger.debug(f"{self} removed {len(evicted)} messages from the context ({total} tokens)")
+
+        if self._summarizer:
+            for message in evicted:
+                self._evicted.extend(context.to_standard_messages(message) or [])
+            if not self._summary_task:
+                self._summary_task = asyncio.get_running_loop().create_task(
+                    self._summary_task_handler()
+                )
+
+    async def cleanup(self):
+        if self._summary_task:
+            self._summary_task.cancel()
+            await asyncio.gather(self._summary_task, return_exceptions=True)
+            self._summary_task = None
+
+    async def _summary_task_handler(self):
+        try:
+            while self._evicted:
+                messages = self._evicted
+                self._evicted = []
+                if self._summary:
+                    messages = [{"role": "system", "content": self._summary}, *messages]
+                try:
+                    self._summary = await self._summarizer(messages)
+                    self._summary_applied = False
+                except Exception as e:
+                    # The messages are lost, but the conversation can go on.
+                    logger.error(f"{self} unable to summarize context: {e}")
+        finally:
+            self._summary_task = None
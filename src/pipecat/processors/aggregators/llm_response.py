@@ -4,7 +4,9 @@
 # SPDX-License-Identifier: BSD 2-Clause License
 #
 
-from typing import List, Type
+import asyncio
+import re
+from typing import List, Optional, Type
 
 from pipecat.frames.frames import (
     Frame,
@@ -21,13 +23,34 @@ from pipecat.frames.frames import (
     UserStartedSpeakingFrame,
     UserStoppedSpeakingFrame,
 )
+from pipecat.processors.aggregators.llm_context_store import ContextStore
+from pipecat.processors.aggregators.llm_context_window import LLMContextWindow
 from pipecat.processors.aggregators.openai_llm_context import (
+    LLMSpeculationCancelFrame,
+    LLMSpeculationCommitFrame,
     OpenAILLMContext,
     OpenAILLMContextFrame,
+    OpenAILLMSpeculativeContextFrame,
 )
 from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
 
 
+def _speculation_text_matches(speculation: str, text: str) -> bool:
+    """Transcriptions are usually the same but for punctuation and case.
+
+    >>> _speculation_text_matches("what time is it", "What time is it?")
+    True
+    >>> _speculation_text_matches("what time", "What time is it?")
+    False
+
+    """
+
+    def normalize(s: str) -> str:
+        return " ".join(re.sub(r"[^\w\s]", "", s.lower()).split())
+
+    return normalize(speculation) == normalize(text)
+
+
 class LLMResponseAggregator(FrameProcessor):
     def __init__(
         self,
@@ -40,6 +63,10 @@ class LLMResponseAggregator(FrameProcessor):
         interim_accumulator_frame: Type[TextFrame] | None = None,
         handle_interruptions: bool = False,
         expect_stripped_words: bool = True,  # if True, need to add spaces between words
+        # if given, start a speculative LLM response when the interim text has
+        # not changed for this long after the end frame (e.g. the user stopped
+        # speaking) and before the final text
+        speculation_stable_secs: Optional[float] = None,
     ):
         super().__init__()
 
@@ -51,6 +78,12 @@ class LLMResponseAggregator(FrameProcessor):
         self._interim_accumulator_frame = interim_accumulator_frame
         self._handle_interruptions = handle_interruptions
         self._expect_stripped_words = expect_stripped_words
+        self._speculation_stable_secs = speculation_stable_secs
+
+        # Current speculative response, if any.
+        self._speculation_id = 0
+        self._speculation_text: str | None = None
+        self._speculation_task: asyncio.Task | None = None
 
         # Reset our accumulator state.
         self._reset()
@@ -92,10 +125,12 @@ class LLMResponseAggregator(FrameProcessor):
 
         if isinstance(frame, self._start_frame):
             self._aggregation = ""
+            self._interim_aggregation = ""
             self._aggregating = True
             self._seen_start_frame = True
             self._seen_end_frame = False
             self._seen_interim_results = False
+            await self._cancel_speculation()
             await self.push_frame(frame, direction)
         elif isinstance(frame, self._end_frame):
             self._seen_end_frame = True
@@ -110,6 +145,8 @@ class LLMResponseAggregator(FrameProcessor):
             # more interim results received).
             send_aggregation = not self._aggregating
             await self.push_frame(frame, direction)
+            if not send_aggregation:
+                await self._update_speculation()
         elif isinstance(frame, self._accumulator_frame):
             if self._aggregating:
                 if self._expect_stripped_words:
@@ -123,8 +160,13 @@ class LLMResponseAggregator(FrameProcessor):
 
             # We just got our final result, so let's reset interim results.
             self._seen_interim_results = False
+            self._interim_aggregation = ""
+            if not send_aggregation:
+                await self._update_speculation()
         elif self._interim_accumulator_frame and isinstance(frame, self._interim_accumulator_frame):
             self._seen_interim_results = True
+            self._interim_aggregation = frame.text
+            await self._update_speculation()
         elif self._handle_interruptions and isinstance(frame, StartInterruptionFrame):
             await self._push_aggregation()
             # Reset anyways
@@ -140,7 +182,13 @@ class LLMResponseAggregator(FrameProcessor):
             await self.push_frame(frame, direction)
 
         if send_aggregation:
-            await self._push_aggregation()
+            if self._speculation_text is not None and _speculation_text_matches(
+                self._speculation_text, self._aggregation
+            ):
+                await self._push_speculation_commit()
+            else:
+                await self._cancel_speculation()
+                await self._push_aggregation()
 
     async def _push_aggregation(self):
         if len(self._aggregation) > 0:
@@ -153,6 +201,72 @@ class LLMResponseAggregator(FrameProcessor):
             frame = LLMMessagesFrame(self._messages)
             await self.push_frame(frame)
 
+    #
+    # Speculative responses
+    #
+
+    def _speculative_context(self, text: str) -> OpenAILLMContext:
+        messages = [dict(m) for m in self._messages]
+        messages.append({"role": self._role, "content": text})
+        return OpenAILLMContext.from_messages(messages)
+
+    async def _push_speculation_commit(self):
+        speculation_id = self._speculation_id
+        self._speculation_text = None
+        self._messages.append({"role": self._role, "content": self._aggregation})
+        self._aggregation = ""
+        context = OpenAILLMContext.from_messages(self._messages)
+        await self.push_frame(
+            LLMSpeculationCommitFrame(context=context, speculation_id=speculation_id)
+        )
+
+    def _current_text(self) -> str:
+        if not self._interim_aggregation:
+            return self._aggregation
+        if self._expect_stripped_words and self._aggregation:
+            return f"{self._aggregation} {self._interim_aggregation}"
+        return self._aggregation + self._interim_aggregation
+
+    async def _update_speculation(self):
+        # Speculate only in a pause (after the end frame, e.g. the user stopped
+        # speaking) while we wait for the final text. Pauses in the middle of
+        # an utterance would mostly waste requests.
+        if self._speculation_stable_secs is None or not self._seen_end_frame:
+            return
+        text = self._current_text()
+        if self._speculation_text is not None and _speculation_text_matches(
+            self._speculation_text, text
+        ):
+            return
+        # The user said something else, start over once the text is stable.
+        await self._cancel_speculation()
+        if text.strip():
+            self._speculation_task = self.get_event_loop().create_task(
+                self._speculation_task_handler(text)
+            )
+
+    async def _cancel_speculation(self):
+        if self._speculation_task and self._speculation_task is not asyncio.current_task():
+            self._speculation_task.cancel()
+            await asyncio.gather(self._speculation_task, return_exceptions=True)
+        self._speculation_task = None
+        if self._speculation_text is not None:
+            self._speculation_text = None
+            await self.push_frame(LLMSpeculationCancelFrame(speculation_id=self._speculation_id))
+
+    async def _speculation_task_handler(self, text: str):
+        try:
+            await asyncio.sleep(self._speculation_stable_secs)
+        except asyncio.CancelledError:
+            return
+        self._speculation_id += 1
+        self._speculation_text = text
+        await self.push_frame(
+            OpenAILLMSpeculativeContextFrame(
+                context=self._speculative_context(text), speculation_id=self._speculation_id
+            )
+        )
+
     # TODO-CB: Types
     def _add_messages(self, messages):
         self._messages.extend(messages)
@@ -168,6 +282,7 @@ class LLMResponseAggregator(FrameProcessor):
 
     def _reset(self):
         self._aggregation = ""
+        self._interim_aggregation = ""
         self._aggregating = False
         self._seen_start_frame = False
         self._seen_end_frame = False
@@ -187,7 +302,9 @@ class LLMAssistantResponseAggregator(LLMResponseAggregator):
 
 
 class LLMUserResponseAggregator(LLMResponseAggregator):
-    def __init__(self, messages: List[dict] = []):
+    def __init__(
+        self, messages: List[dict] = [], *, speculation_stable_secs: Optional[float] = None
+    ):
         super().__init__(
             messages=messages,
             role="user",
@@ -195,6 +312,7 @@ class LLMUserResponseAggregator(LLMResponseAggregator):
             end_frame=UserStoppedSpeakingFrame,
             accumulator_frame=TranscriptionFrame,
             interim_accumulator_frame=InterimTranscriptionFrame,
+            speculation_stable_secs=speculation_stable_secs,
         )
 
 
@@ -253,14 +371,36 @@ class LLMFullResponseAggregator(FrameProcessor):
 
 
 class LLMContextAggregator(LLMResponseAggregator):
-    def __init__(self, *, context: OpenAILLMContext, **kwargs):
+    def __init__(
+        self,
+        *,
+        context: OpenAILLMContext,
+        context_window: Optional[LLMContextWindow] = None,
+        context_store: Optional[ContextStore] = None,
+        conversation_id: Optional[str] = None,
+        **kwargs,
+    ):
         super().__init__(**kwargs)
+        if context_store and not conversation_id:
+            raise ValueError("A conversation_id is required to use a context_store")
         self._context = context
+        self._context_window = context_window
+        self._context_store = context_store
+        self._conversation_id = conversation_id
 
     @property
     def context(self):
         return self._context
 
+    async def push_frame(self, frame: Frame, direction: FrameDirection = FrameDirection.DOWNSTREAM):
+        # The context is saved every time it's pushed, which is when messages
+        # have been added to it. Only the new messages are stored.
+        if self._context_store and isinstance(
+            frame, (OpenAILLMContextFrame, LLMSpeculationCommitFrame)
+        ):
+            self._context_store.save(self._conversation_id, self._context)
+        await super().push_frame(frame, direction)
+
     def get_context_frame(self) -> OpenAILLMContextFrame:
         return OpenAILLMContextFrame(context=self._context)
 
@@ -278,6 +418,28 @@ class LLMContextAggregator(LLMResponseAggregator):
     def _set_tools(self, tools: List):
         self._context.set_tools(tools)
 
+    async def cleanup(self):
+        await super().cleanup()
+        if self._context_window:
+            await self._context_window.cleanup()
+
+    def _speculative_context(self, text: str) -> OpenAILLMContext:
+        context = self._context.copy()
+        context.add_message({"role": self._role, "content": text})
+        return context
+
+    async def _push_speculation_commit(self):
+        speculation_id = self._speculation_id
+        self._speculation_text = None
+        self._context.add_message({"role": self._role, "content": self._aggregation})
+        self._aggregation = ""
+        if self._context_window:
+            await self._context_window.apply(self._context)
+        await self.push_frame(
+            LLMSpeculationCommitFrame(context=self._context, speculation_id=speculation_id)
+        )
+        self._reset()
+
     async def _push_aggregation(self):
         if len(self._aggregation) > 0:
             self._context.add_message({"role": self._role, "content": self._aggregation})
@@ -286,6 +448,9 @@ class LLMContextAggregator(LLMResponseAggregator):
             # if the tasks gets cancelled we won't be able to clear things up.
             self._aggregation = ""
 
+            if self._context_window:
+                await self._context_window.apply(self._context)
+
             frame = OpenAILLMContextFrame(self._context)
             await self.push_frame(frame)
 
@@ -294,10 +459,19 @@ class LLMContextAggregator(LLMResponseAggregator):
 
 
 class LLMAssistantContextAggregator(LLMContextAggregator):
-    def __init__(self, context: OpenAILLMContext, *, expect_stripped_words: bool = True):
+    def __init__(
+        self,
+        context: OpenAILLMContext,
+        *,
+        expect_stripped_words: bool = True,
+        context_store: Optional[ContextStore] = None,
+        conversation_id: Optional[str] = None,
+    ):
         super().__init__(
             messages=[],
             context=context,
+            context_store=context_store,
+            conversation_id=conversation_id,
             role="assistant",
             start_frame=LLMFullResponseStartFrame,
             end_frame=LLMFullResponseEndFrame,
@@ -308,13 +482,25 @@ class LLMAssistantContextAggregator(LLMContextAggregator):
 
 
 class LLMUserContextAggregator(LLMContextAggregator):
-    def __init__(self, context: OpenAILLMContext):
+    def __init__(
+        self,
+        context: OpenAILLMContext,
+        *,
+        speculation_stable_secs: Optional[float] = None,
+        context_window: Optional[LLMContextWindow] = None,
+        context_store: Optional[ContextStore] = None,
+        conversation_id: Optional[str] = None,
+    ):
         super().__init__(
             messages=[],
             context=context,
+            context_window=context_window,
+            context_store=context_store,
+            conversation_id=conversation_id,
             role="user",
             start_frame=UserStartedSpeakingFrame,
             end_frame=UserStoppedSpeakingFrame,
             accumulator_frame=TranscriptionFrame,
             interim_accumulator_frame=InterimTranscriptionFrame,
+            speculation_stable_secs=speculation_stable_secs,
         )
@@ -4,15 +4,13 @@
 # SPDX-License-Identifier: BSD 2-Clause License
 #
 
-import base64
 import copy
 import io
 import json
 from dataclasses import dataclass
-from typing import Any, Awaitable, Callable, List
+from typing import Any, Awaitable, Callable, List, Optional
 
 from loguru import logger
-from PIL import Image
 
 from pipecat.frames.frames import (
     Frame,
@@ -21,6 +19,8 @@ from pipecat.frames.frames import (
     VisionImageRawFrame,
 )
 from pipecat.processors.frame_processor import FrameProcessor
+from pipecat.utils.image_cache import EncodedImage, get_image_cache
+from pipecat.utils.tokens import Tokenizer, count_message_tokens, estimate_tokens
 
 try:
     from openai._types import NOT_GIVEN, NotGiven
@@ -54,11 +54,27 @@ class OpenAILLMContext:
         messages: List[ChatCompletionMessageParam] | None = None,
         tools: List[ChatCompletionToolParam] | NotGiven = NOT_GIVEN,
         tool_choice: ChatCompletionToolChoiceOptionParam | NotGiven = NOT_GIVEN,
+        *,
+        tokenizer: Optional[Tokenizer] = None,
+        stable_prefix: bool = False,
     ):
         self._messages: List[ChatCompletionMessageParam] = messages if messages else []
         self._tool_choice: ChatCompletionToolChoiceOptionParam | NotGiven = tool_choice
         self._tools: List[ChatCompletionToolParam] | NotGiven = tools
         self._user_image_request_context = {}
+        self._summary: str | None = None
+
+        # Prompt caches (e.g. OpenAI's) are only used when a request starts
+        # exactly like a previous one. With a stable prefix, the tools and the
+        # leading system messages don't change once the conversation has
+        # started, and the summary is added after the previous messages.
+        self._stable_prefix = stable_prefix
+
+        # Number of tokens of each message, counted when they are added.
+        self._tokenizer: Tokenizer = tokenizer or estimate_tokens
+        self._message_tokens: List[int] = []
+        self._token_count = 0
+        self._count_all_tokens()
 
     @staticmethod
     def from_messages(messages: List[dict]) -> "OpenAILLMContext":
@@ -77,12 +93,29 @@ class OpenAILLMContext:
         expects images to be base64 encoded, but other vision models may not.
         So we'll store the image as bytes and do the base64 encoding as needed
         in the LLM service.
+        """
+        image = get_image_cache().encode_sync(
+            format=frame.format, size=frame.size, image=frame.image
+        )
+        return OpenAILLMContext.from_encoded_image(image, frame.text)
+
+    @staticmethod
+    def from_encoded_image(image: EncodedImage, text: str) -> "OpenAILLMContext":
+        """Like `from_image_frame()`, with an image encoded with
+        `ImageCache.encode()` (which doesn't block the event loop). The image
+        is kept as JPEG bytes, for services that upload them (e.g. Google).
+        Services that take a data URL should use `add_encoded_image_message()`
+        instead.
+
         """
         context = OpenAILLMContext()
-        buffer = io.BytesIO()
-        Image.frombytes(frame.format, frame.size, frame.image).save(buffer, format="JPEG")
         context.add_message(
-            {"content": frame.text, "role": "user", "data": buffer, "mime_type": "image/jpeg"}
+            {
+                "content": text,
+                "role": "user",
+                "data": io.BytesIO(image.jpeg),
+                "mime_type": image.mime_type,
+            }
         )
         return context
 
@@ -98,14 +131,82 @@ class OpenAILLMContext:
     def tool_choice(self) -> ChatCompletionToolChoiceOptionParam | NotGiven:
         return self._tool_choice
 
+    @property
+    def stable_prefix(self) -> bool:
+        return self._stable_prefix
+
+    @property
+    def token_count(self) -> int:
+        """Number of tokens of the messages. Messages are counted when they are
+        added, so this doesn't tokenize anything.
+
+        """
+        self._check_message_tokens()
+        return self._token_count
+
+    @property
+    def message_token_counts(self) -> List[int]:
+        """Number of tokens of each message."""
+        self._check_message_tokens()
+        return self._message_tokens
+
+    def set_tokenizer(self, tokenizer: Tokenizer):
+        self._tokenizer = tokenizer
+        self._count_all_tokens()
+
     def add_message(self, message: ChatCompletionMessageParam):
         self._messages.append(message)
+        self._append_message_tokens(message)
 
     def add_messages(self, messages: List[ChatCompletionMessageParam]):
-        self._messages.extend(messages)
+        for message in messages:
+            self.add_message(message)
 
     def set_messages(self, messages: List[ChatCompletionMessageParam]):
         self._messages[:] = messages
+        self._count_all_tokens()
+
+    def remove_messages(self, start: int, end: int):
+        """Removes the messages from `start` to `end` (not included)."""
+        self._check_message_tokens()
+        del self._messages[start:end]
+        self._token_count -= sum(self._message_tokens[start:end])
+        del self._message_tokens[start:end]
+
+    def set_summary(self, summary: str):
+        """Sets the summary of the messages that have been removed from the
+        context. It's added as a system message after the leading ones (or,
+        if the context has a stable prefix, right before the last user
+        message), and replaces the previous summary.
+
+        """
+        messages = self._messages
+        if self._stable_prefix:
+            for index in range(len(messages) - 1, -1, -1):
+                message = messages[index]
+                if message.get("role") == "system" and message.get("content") == self._summary:
+                    self.remove_messages(index, index + 1)
+                    break
+            # The user turn that is about to be answered goes after the
+            # summary, so the model reads it last.
+            index = len(messages)
+            if messages and messages[-1].get("role") == "user":
+                index -= 1
+        else:
+            index = 0
+            while index < len(messages) and messages[index].get("role") == "system":
+                if messages[index].get("content") == self._summary:
+                    self.remove_messages(index, index + 1)
+                    break
+                index += 1
+            while index < len(messages) and messages[index].get("role") == "system":
+                index += 1
+        message = {"role": "system", "content": summary}
+        messages.insert(index, message)
+        tokens = self._count_tokens(message)
+        self._message_tokens.insert(index, tokens)
+        self._token_count += tokens
+        self._summary = summary
 
     def get_messages(self) -> List[ChatCompletionMessageParam]:
         return self._messages
@@ -138,6 +239,21 @@ class OpenAILLMContext:
     def get_messages_for_initializing_history(self):
         return self._messages
 
+    def copy(self) -> "OpenAILLMContext":
+        """Returns a copy of this context with its own list of messages, so
+        messages can be added to it without changing this one.
+
+        """
+        context = copy.copy(self)
+        context._messages = list(self._messages)
+        context._message_tokens = list(self._message_tokens)
+        # Some contexts (e.g. Anthropic) merge a new message into the last one
+        # if they have the same role, so it can't be shared. Earlier messages
+        # are not modified.
+        if context._messages:
+            context._messages[-1] = copy.deepcopy(context._messages[-1])
+        return context
+
     def get_messages_for_persistent_storage(self):
         messages = []
         for m in self._messages:
@@ -146,26 +262,34 @@ class OpenAILLMContext:
         return messages
 
     def set_tool_choice(self, tool_choice: ChatCompletionToolChoiceOptionParam | NotGiven):
+        if tool_choice != self._tool_choice and self._is_prefix_frozen():
+            logger.warning("Ignoring tool choice change, the context prefix is stable")
+            return
         self._tool_choice = tool_choice
 
     def set_tools(self, tools: List[ChatCompletionToolParam] | NotGiven = NOT_GIVEN):
         if tools != NOT_GIVEN and len(tools) == 0:
             tools = NOT_GIVEN
+        if tools != self._tools and self._is_prefix_frozen():
+            logger.warning("Ignoring tools change, the context prefix is stable")
+            return
         self._tools = tools
 
     def add_image_frame_message(
         self, *, format: str, size: tuple[int, int], image: bytes, text: str = None
     ):
-        buffer = io.BytesIO()
-        Image.frombytes(format, size, image).save(buffer, format="JPEG")
-        encoded_image = base64.b64encode(buffer.getvalue()).decode("utf-8")
-
-        content = [
-            {"type": "text", "text": text},
-            {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{encoded_image}"}},
-        ]
+        encoded = get_image_cache().encode_sync(format=format, size=size, image=image)
+        self.add_encoded_image_message(encoded, text=text)
+
+    def add_encoded_image_message(self, image: EncodedImage, *, text: str = None):
+        """Like `add_image_frame_message()`, with an image encoded with
+        `ImageCache.encode()` (which doesn't block the event loop).
+
+        """
+        content = []
         if text:
             content.append({"type": "text", "text": text})
+        content.append({"type": "image_url", "image_url": {"url": image.data_url}})
         self.add_message({"role": "user", "content": content})
 
     async def call_function(
@@ -207,6 +331,47 @@ class OpenAILLMContext:
 
         await f(function_name, tool_call_id, arguments, llm, self, function_call_result_callback)
 
+    #
+    # Token counting
+    #
+
+    def _count_tokens(self, message: ChatCompletionMessageParam) -> int:
+        return count_message_tokens(message, self._tokenizer)
+
+    def _count_all_tokens(self):
+        self._message_tokens = [self._count_tokens(m) for m in self._messages]
+        self._token_count = sum(self._message_tokens)
+
+    def _append_message_tokens(self, message: ChatCompletionMessageParam):
+        tokens = self._count_tokens(message)
+        self._message_tokens.append(tokens)
+        self._token_count += tokens
+
+    def _update_message_tokens(self, index: int):
+        # For messages that are changed in place.
+        tokens = self._count_tokens(self._messages[index])
+        self._token_count += tokens - self._message_tokens[index]
+        self._message_tokens[index] = tokens
+
+    def _is_prefix_frozen(self) -> bool:
+        # The prefix can't change once the conversation has started.
+        return self._stable_prefix and any(m.get("role") != "system" for m in self._messages)
+
+    def _check_message_tokens(self):
+        # Messages might have been added or removed directly from the list.
+        if len(self._message_tokens) != len(self._messages):
+            self._count_all_tokens()
+
+
+@dataclass
+class LLMFunctionCall:
+    """A function call requested by an LLM."""
+
+    function_name: str
+    tool_call_id: str
+    arguments: Any
+    run_llm: bool = True
+
 
 @dataclass
 class OpenAILLMContextFrame(Frame):
@@ -217,3 +382,35 @@ class OpenAILLMContextFrame(Frame):
     """
 
     context: OpenAILLMContext
+
+
+@dataclass
+class OpenAILLMSpeculativeContextFrame(Frame):
+    """Asks the LLM to start generating a response for a context that might
+    still change (e.g. using an interim transcription). The response is held
+    until an `LLMSpeculationCommitFrame` with the same `speculation_id` is
+    received, and discarded with an `LLMSpeculationCancelFrame`.
+
+    """
+
+    context: OpenAILLMContext
+    speculation_id: int
+
+
+@dataclass
+class LLMSpeculationCommitFrame(Frame):
+    """The speculative response is good for the final context, so it can be
+    used. If the LLM doesn't have it anymore, it generates a response for
+    `context` like it would for an `OpenAILLMContextFrame`.
+
+    """
+
+    context: OpenAILLMContext
+    speculation_id: int
+
+
+@dataclass
+class LLMSpeculationCancelFrame(Frame):
+    """The speculative response is not needed anymore."""
+
+    speculation_id: int
@@ -0,0 +1,71 @@
+#
+# Copyright (c) 2024, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+from typing import List, Type
+
+from pipecat.audio.resampler import AudioResampler
+from pipecat.frames.frames import AudioRawFrame, Frame, StartInterruptionFrame
+from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
+
+
+class AudioResampleProcessor(FrameProcessor):
+    """Resamples audio frames of the given type (e.g. `InputAudioRawFrame` or
+    `OutputAudioRawFrame`) from `in_sample_rate` to `out_sample_rate`. Frames of
+    any other type or sample rate are pushed untouched.
+
+    Pipelines insert these processors automatically (see
+    `Pipeline.negotiate_audio_formats()`), so usually there's no need to add
+    them by hand.
+
+    """
+
+    def __init__(
+        self,
+        *,
+        frame_type: Type[AudioRawFrame],
+        in_sample_rate: int,
+        out_sample_rate: int,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self._frame_type = frame_type
+        self._in_sample_rate = in_sample_rate
+        self._out_sample_rate = out_sample_rate
+        self._resamplers = {}
+
+    def accepted_audio_sample_rates(self, frame_type: Type[AudioRawFrame]) -> List[int] | None:
+        return [self._in_sample_rate] if frame_type == self._frame_type else None
+
+    def produced_audio_sample_rate(self, frame_type: Type[AudioRawFrame]) -> int | None:
+        return self._out_sample_rate if frame_type == self._frame_type else None
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+
+        if isinstance(frame, StartInterruptionFrame):
+            for resampler in self._resamplers.values():
+                resampler.reset()
+        elif isinstance(frame, self._frame_type) and frame.sample_rate == self._in_sample_rate:
+            frame = self._resample(frame)
+
+        await self.push_frame(frame, direction)
+
+    def _resample(self, frame: AudioRawFrame) -> AudioRawFrame:
+        # One resampler per frame class, we don't want to mix the filter state
+        # of, for example, TTS audio and other output audio.
+        resampler = self._resamplers.get(type(frame))
+        if not resampler:
+            resampler = AudioResampler(
+                self._in_sample_rate, self._out_sample_rate, frame.num_channels
+            )
+            self._resamplers[type(frame)] = resampler
+        resampled = type(frame)(
+            audio=resampler.resample(frame.audio),
+            sample_rate=self._out_sample_rate,
+            num_channels=frame.num_channels,
+        )
+        resampled.pts = frame.pts
+        return resampled
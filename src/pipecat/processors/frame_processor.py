@@ -8,9 +8,11 @@ import asyncio
 import inspect
 
 from enum import Enum
+from typing import List, Type
 
 from pipecat.clocks.base_clock import BaseClock
 from pipecat.frames.frames import (
+    AudioRawFrame,
     EndFrame,
     ErrorFrame,
     Frame,
@@ -86,6 +88,21 @@ class FrameProcessor:
     def can_generate_metrics(self) -> bool:
         return False
 
+    def accepted_audio_sample_rates(self, frame_type: Type[AudioRawFrame]) -> List[int] | None:
+        """Sample rates this processor can consume for the given type of audio
+        frames (e.g. `InputAudioRawFrame`), in order of preference. None means
+        the processor doesn't care.
+
+        """
+        return None
+
+    def produced_audio_sample_rate(self, frame_type: Type[AudioRawFrame]) -> int | None:
+        """Sample rate of the audio frames of the given type this processor
+        pushes downstream. None means the processor doesn't generate them.
+
+        """
+        return None
+
     def set_core_metrics_data(self, data: MetricsData):
         self._metrics.set_core_metrics_data(data)
 
@@ -202,11 +219,13 @@ class FrameProcessor:
 
     async def __internal_push_frame(self, frame: Frame, direction: FrameDirection):
         try:
+            # This runs for every frame, so the log message is only formatted
+            # if the trace level is enabled.
             if direction == FrameDirection.DOWNSTREAM and self._next:
-                logger.trace(f"Pushing {frame} from {self} to {self._next}")
+                logger.trace("Pushing {} from {} to {}", frame, self, self._next)
                 await self._next.process_frame(frame, direction)
             elif direction == FrameDirection.UPSTREAM and self._prev:
-                logger.trace(f"Pushing {frame} upstream from {self} to {self._prev}")
+                logger.trace("Pushing {} upstream from {} to {}", frame, self, self._prev)
                 await self._prev.process_frame(frame, direction)
         except Exception as e:
             logger.exception(f"Uncaught exception in {self}: {e}")
@@ -17,3 +17,10 @@ class FrameSerializer(ABC):
     @abstractmethod
     def deserialize(self, data: str | bytes) -> Frame | None:
         pass
+
+    def reset(self):
+        """Called when a new client connects. Serializers that keep state
+        between frames should clear it here.
+
+        """
+        pass
@@ -0,0 +1,191 @@
+#
+# Copyright (c) 2024, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+import struct
+
+from typing import List, Literal
+
+from pydantic import BaseModel
+
+from pipecat.frames.frames import AudioRawFrame, Frame, StartInterruptionFrame
+from pipecat.serializers.base_serializer import FrameSerializer
+
+from loguru import logger
+
+try:
+    import opuslib
+except Exception as e:
+    logger.error(f"Exception: {e}")
+    logger.error(
+        "In order to use Opus, you need to `pip install pipecat-ai[opus]` and have libopus installed."
+    )
+    raise Exception(f"Missing module: {e}")
+
+
+OPUS_SAMPLE_RATES = [8000, 12000, 16000, 24000, 48000]
+OPUS_FRAME_DURATIONS_MS = [2.5, 5, 10, 20, 40, 60]
+# Longest duration a single Opus packet can hold.
+OPUS_MAX_PACKET_DURATION_MS = 120
+
+
+def pack_opus_packets(packets: List[bytes]) -> bytes:
+    """Concatenates Opus packets, each one prefixed with its length as a 16-bit
+    big-endian integer.
+
+    >>> pack_opus_packets([b"ab", b"c"])
+    b'\\x00\\x02ab\\x00\\x01c'
+
+    """
+    return b"".join(struct.pack(">H", len(packet)) + packet for packet in packets)
+
+
+def unpack_opus_packets(data: bytes) -> List[bytes]:
+    """Splits data created with `pack_opus_packets()` back into Opus packets.
+
+    >>> unpack_opus_packets(b'\\x00\\x02ab\\x00\\x01c')
+    [b'ab', b'c']
+
+    """
+    packets = []
+    offset = 0
+    while offset + 2 <= len(data):
+        (length,) = struct.unpack_from(">H", data, offset)
+        offset += 2
+        if offset + length > len(data):
+            raise ValueError("truncated Opus packet")
+        packets.append(data[offset : offset + length])
+        offset += length
+    if offset != len(data):
+        raise ValueError("truncated Opus packet length")
+    return packets
+
+
+class OpusFrameSerializer(FrameSerializer):
+    """Compresses audio with Opus on top of another serializer (e.g.
+    `ProtobufFrameSerializer`). Outgoing `AudioRawFrame`s are encoded and
+    incoming ones are decoded back to 16-bit PCM, any other frame is handled
+    by the wrapped serializer as is.
+
+    The audio field of serialized audio frames contains one or more Opus
+    packets, each one prefixed with its length as a 16-bit big-endian integer,
+    while the sample rate and number of channels fields still describe the PCM
+    audio. Don't combine it with `add_wav_header`.
+
+    The encoder and decoder keep their state between frames (as Opus expects)
+    until `reset()` is called, which transports do when a new client connects.
+    Outgoing audio that doesn't fill a whole Opus frame is kept until the next
+    audio frame arrives.
+
+    """
+
+    class InputParams(BaseModel):
+        # Sample rate and channels of the incoming audio once decoded.
+        sample_rate: int = 16000
+        num_channels: int = 1
+        bitrate: int = 24000
+        frame_duration_ms: float = 20
+        application: Literal["voip", "audio", "lowdelay"] = "voip"
+
+    def __init__(self, serializer: FrameSerializer, params: InputParams = InputParams()):
+        if params.sample_rate not in OPUS_SAMPLE_RATES:
+            raise ValueError(f"Opus doesn't support a sample rate of {params.sample_rate} Hz")
+        if params.frame_duration_ms not in OPUS_FRAME_DURATIONS_MS:
+            raise ValueError(f"Opus doesn't support frames of {params.frame_duration_ms} ms")
+
+        self._serializer = serializer
+        self._params = params
+
+        self._encoder: opuslib.Encoder | None = None
+        self._encoder_format = (0, 0)
+        self._encoder_buffer = bytearray()
+        self._decoder: opuslib.Decoder | None = None
+
+    def reset(self):
+        self._serializer.reset()
+        self._encoder = None
+        self._encoder_format = (0, 0)
+        self._encoder_buffer.clear()
+        self._decoder = None
+
+    def serialize(self, frame: Frame) -> str | bytes | None:
+        if isinstance(frame, AudioRawFrame):
+            payload = self._encode(frame)
+            if not payload:
+                return None
+            frame = AudioRawFrame(
+                audio=payload, sample_rate=frame.sample_rate, num_channels=frame.num_channels
+            )
+        elif isinstance(frame, StartInterruptionFrame):
+            # Whatever we were about to say is not needed anymore.
+            self._encoder_buffer.clear()
+        return self._serializer.serialize(frame)
+
+    def deserialize(self, data: str | bytes) -> Frame | None:
+        frame = self._serializer.deserialize(data)
+        if isinstance(frame, AudioRawFrame):
+            audio = self._decode(frame.audio)
+            if not audio:
+                return None
+            decoded_frame = AudioRawFrame(
+                audio=audio,
+                sample_rate=self._params.sample_rate,
+                num_channels=self._params.num_channels,
+            )
+            decoded_frame.pts = frame.pts
+            frame = decoded_frame
+        return frame
+
+    def _application(self) -> str:
+        match self._params.application:
+            case "audio":
+                return opuslib.APPLICATION_AUDIO
+            case "lowdelay":
+                return opuslib.APPLICATION_RESTRICTED_LOWDELAY
+            case _:
+                return opuslib.APPLICATION_VOIP
+
+    def _encode(self, frame: AudioRawFrame) -> bytes | None:
+        if frame.sample_rate not in OPUS_SAMPLE_RATES:
+            logger.error(f"Opus doesn't support a sample rate of {frame.sample_rate} Hz")
+            return None
+
+        # Output audio format shouldn't change, but just in case.
+        if self._encoder_format != (frame.sample_rate, frame.num_channels):
+            self._encoder = opuslib.Encoder(
+                frame.sample_rate, frame.num_channels, self._application()
+            )
+            self._encoder.bitrate = self._params.bitrate
+            self._encoder_format = (frame.sample_rate, frame.num_channels)
+            self._encoder_buffer.clear()
+
+        samples_per_frame = int(frame.sample_rate * self._params.frame_duration_ms / 1000)
+        bytes_per_frame = samples_per_frame * frame.num_channels * 2
+
+        self._encoder_buffer.extend(frame.audio)
+        num_frames = len(self._encoder_buffer) // bytes_per_frame
+        if num_frames == 0:
+            return None
+
+        packets = []
+        for i in range(num_frames):
+            pcm = bytes(self._encoder_buffer[i * bytes_per_frame : (i + 1) * bytes_per_frame])
+            packets.append(self._encoder.encode(pcm, samples_per_frame))
+        del self._encoder_buffer[: num_frames * bytes_per_frame]
+
+        return pack_opus_packets(packets)
+
+    def _decode(self, data: bytes) -> bytes | None:
+        if not self._decoder:
+            self._decoder = opuslib.Decoder(self._params.sample_rate, self._params.num_channels)
+
+        max_samples = self._params.sample_rate * OPUS_MAX_PACKET_DURATION_MS // 1000
+        try:
+            return b"".join(
+                self._decoder.decode(packet, max_samples) for packet in unpack_opus_packets(data)
+            )
+        except (ValueError, opuslib.OpusError) as e:
+            logger.warning(f"Unable to decode Opus audio: {e}")
+            return None
@@ -73,26 +73,20 @@ class ProtobufFrameSerializer(FrameSerializer):
         for field in proto.DESCRIPTOR.fields_by_name[which].message_type.fields:
             args_dict[field.name] = getattr(args, field.name)
 
-        # Remove special fields if needed
-        id = getattr(args, "id")
-        name = getattr(args, "name")
-        pts = getattr(args, "pts")
-        if not id:
-            del args_dict["id"]
-        if not name:
-            del args_dict["name"]
-        if not pts:
-            del args_dict["pts"]
+        # Remove special fields, they are not constructor arguments. Not all
+        # messages have all of them.
+        special_fields = {}
+        for field in ["id", "name", "pts"]:
+            if field in args_dict:
+                value = args_dict.pop(field)
+                if value:
+                    special_fields[field] = value
 
         # Create the instance
         instance = class_name(**args_dict)
 
         # Set special fields
-        if id:
-            setattr(instance, "id", getattr(args, "id"))
-        if name:
-            setattr(instance, "name", getattr(args, "name"))
-        if pts:
-            setattr(instance, "pts", getattr(args, "pts"))
+        for field, value in special_fields.items():
+            setattr(instance, field, value)
 
         return instance
@@ -56,4 +56,8 @@ class TwilioFrameSerializer(FrameSerializer):
             audio_frame = AudioRawFrame(
                 audio=deserialized_data, num_channels=1, sample_rate=self._params.sample_rate
             )
+            # Twilio gives us the media timestamp (in milliseconds) so input
+            # jitter buffers can reorder and pace the audio.
+            if "timestamp" in message["media"]:
+                audio_frame.pts = int(message["media"]["timestamp"]) * 1_000_000
             return audio_frame
@@ -6,20 +6,42 @@
 
 import asyncio
 import io
+import time
 import wave
 from abc import abstractmethod
-from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any,
+    AsyncGenerator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+)
 
+import numpy as np
 from loguru import logger
 
 from pipecat.audio.utils import calculate_audio_volume, exp_smoothing
+from pipecat.audio.vad.vad_analyzer import VADAnalyzer
+from pipecat.audio.vad.vad_segmenter import VADSegmenter, VADSegmenterParams
 from pipecat.frames.frames import (
     AudioRawFrame,
     CancelFrame,
     EndFrame,
     ErrorFrame,
     Frame,
+    FunctionCallInProgressFrame,
+    FunctionCallResultFrame,
+    InputAudioRawFrame,
     LLMFullResponseEndFrame,
+    MetricsFrame,
+    OutputAudioRawFrame,
     StartFrame,
     StartInterruptionFrame,
     STTUpdateSettingsFrame,
@@ -32,11 +54,30 @@ from pipecat.frames.frames import (
     UserImageRequestFrame,
     VisionImageRawFrame,
 )
-from pipecat.metrics.metrics import MetricsData
-from pipecat.processors.aggregators.openai_llm_context import OpenAILLMContext
+from pipecat.metrics.metrics import LLMSpeculationMetricsData, MetricsData, TTSFlushMetricsData
+from pipecat.processors.aggregators.openai_llm_context import (
+    LLMSpeculationCancelFrame,
+    LLMFunctionCall,
+    LLMSpeculationCommitFrame,
+    OpenAILLMContext,
+    OpenAILLMContextFrame,
+    OpenAILLMSpeculativeContextFrame,
+)
 from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
+from pipecat.services.function_cache import MISSING, get_function_call_cache
+from pipecat.services.llm_cache import (
+    LLMCache,
+    LLMCacheEntry,
+    LLMCacheFunctionCall,
+    llm_cache_key,
+)
+from pipecat.services.tts_cache import TTSCache, TTSCacheEntry, tts_cache_key
 from pipecat.transcriptions.language import Language
-from pipecat.utils.string import match_endofsentence
+from pipecat.utils.string import SentenceSegmenter
+
+# Kept importable from here for backwards compatibility.
+from pipecat.utils.string import match_endofsentence  # noqa: F401
+from pipecat.utils.text.base_flush_policy import BaseFlushPolicy
 from pipecat.utils.text.base_text_filter import BaseTextFilter
 from pipecat.utils.time import seconds_to_nanoseconds
 
@@ -127,25 +168,120 @@ class AIService(FrameProcessor):
                     await self.push_frame(f)
 
 
+class _LLMSpeculation:
+    def __init__(self, speculation_id: int):
+        self.speculation_id = speculation_id
+        self.start_time = time.monotonic()
+        self.task: Optional[asyncio.Task] = None
+        # Frames pushed by the response until it's committed.
+        self.frames: List[Tuple[Frame, FrameDirection]] = []
+        self.committed = asyncio.Event()
+
+
+class _LLMFunctionCallBatch:
+    def __init__(self, *, remaining: int, run_llm: bool):
+        # Function calls that haven't finished yet.
+        self.remaining = remaining
+        self.run_llm = run_llm
+
+
 class LLMService(AIService):
-    """This class is a no-op but serves as a base class for LLM services."""
+    """This class is a no-op but serves as a base class for LLM services.
+
+    It also implements speculative responses: when an
+    `OpenAILLMSpeculativeContextFrame` is received the response is generated
+    in the background and the frames it pushes are held until an
+    `LLMSpeculationCommitFrame` is received (function calls wait until then as
+    well). If it's cancelled instead, the frames are discarded.
+
+    """
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self._callbacks = {}
         self._start_callbacks = {}
+        self._function_timeouts: Dict[str | None, float] = {}
+        self._function_call_tasks: Set[asyncio.Task] = set()
+        self._function_cache_settings: Dict[str | None, Tuple[float, int]] = {}
+
+        self._speculation: Optional[_LLMSpeculation] = None
+        self._speculation_hits = 0
+        self._speculations = 0
+
+        # Services that support it set this to a cache of responses.
+        self._cache: Optional[LLMCache] = None
+        # Response being recorded for the cache.
+        self._cache_entry: Optional[LLMCacheEntry] = None
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+
+        if isinstance(frame, OpenAILLMSpeculativeContextFrame):
+            await self._start_speculation(frame)
+        elif isinstance(frame, LLMSpeculationCommitFrame):
+            await self._commit_speculation(frame, direction)
+        elif isinstance(frame, LLMSpeculationCancelFrame):
+            await self._cancel_speculation(frame.speculation_id)
+        elif isinstance(frame, StartInterruptionFrame):
+            await self._cancel_speculation()
+            await self._cancel_function_calls()
+
+    async def stop(self, frame: EndFrame):
+        await super().stop(frame)
+        await self._cancel_speculation()
+        await self._cancel_function_calls()
+
+    async def cancel(self, frame: CancelFrame):
+        await super().cancel(frame)
+        await self._cancel_speculation()
+        await self._cancel_function_calls()
+
+    async def push_frame(self, frame: Frame, direction: FrameDirection = FrameDirection.DOWNSTREAM):
+        if self._cache_entry and type(frame) is TextFrame:
+            self._cache_entry.chunks.append(frame.text)
+
+        speculation = self._speculation
+        if (
+            speculation
+            and not speculation.committed.is_set()
+            and asyncio.current_task() is speculation.task
+        ):
+            speculation.frames.append((frame, direction))
+            return
+        await super().push_frame(frame, direction)
 
     # TODO-CB: callback function type
-    def register_function(self, function_name: str | None, callback, start_callback=None):
+    def register_function(
+        self,
+        function_name: str | None,
+        callback,
+        start_callback=None,
+        *,
+        timeout_secs: Optional[float] = None,
+        cache_ttl_secs: Optional[float] = None,
+        cache_max_entries: int = 100,
+    ):
         # Registering a function with the function_name set to None will run that callback
         # for all functions
         self._callbacks[function_name] = callback
         # QUESTION FOR CB: maybe this isn't needed anymore?
         if start_callback:
             self._start_callbacks[function_name] = start_callback
+        if timeout_secs is not None:
+            self._function_timeouts[function_name] = timeout_secs
+        else:
+            self._function_timeouts.pop(function_name, None)
+        # Results of functions with a cache TTL are reused for calls with the
+        # same arguments (by all services in the process) until they expire.
+        if cache_ttl_secs is not None:
+            self._function_cache_settings[function_name] = (cache_ttl_secs, cache_max_entries)
+        else:
+            self._function_cache_settings.pop(function_name, None)
 
     def unregister_function(self, function_name: str | None):
         del self._callbacks[function_name]
+        self._function_timeouts.pop(function_name, None)
+        self._function_cache_settings.pop(function_name, None)
         if self._start_callbacks[function_name]:
             del self._start_callbacks[function_name]
 
@@ -163,21 +299,77 @@ class LLMService(AIService):
         arguments: str,
         run_llm: bool = True,
     ) -> None:
-        f = None
-        if function_name in self._callbacks.keys():
-            f = self._callbacks[function_name]
-        elif None in self._callbacks.keys():
-            f = self._callbacks[None]
-        else:
-            return None
-        await context.call_function(
-            f,
-            function_name=function_name,
-            tool_call_id=tool_call_id,
-            arguments=arguments,
-            llm=self,
-            run_llm=run_llm,
+        await self.call_functions(
+            context=context,
+            function_calls=[
+                LLMFunctionCall(
+                    function_name=function_name,
+                    tool_call_id=tool_call_id,
+                    arguments=arguments,
+                    run_llm=run_llm,
+                )
+            ],
+        )
+
+    async def call_functions(
+        self, *, context: OpenAILLMContext, function_calls: Sequence[LLMFunctionCall]
+    ) -> None:
+        """Runs the function calls of a response concurrently, each in its own
+        task, so the pipeline keeps running while they execute. Results are
+        pushed as they arrive, but only the last one asks the LLM to run (if
+        any of the calls did), so the LLM runs once with all of them.
+
+        Calls that take longer than the `timeout_secs` given to
+        `register_function()` get an error result, and calls still running
+        are cancelled if the user interrupts. Functions registered with a
+        `cache_ttl_secs` get the cached result of a previous call with the same
+        arguments, if there's one, without calling the function.
+
+        """
+        calls = []
+        for call in function_calls:
+            callback = self._callbacks.get(call.function_name, self._callbacks.get(None))
+            if callback:
+                calls.append((call, callback))
+        if not calls:
+            return
+
+        if self._cache_entry:
+            for call, _ in calls:
+                self._cache_entry.function_calls.append(
+                    LLMCacheFunctionCall(
+                        function_name=call.function_name,
+                        tool_call_id=call.tool_call_id,
+                        arguments=call.arguments,
+                        run_llm=call.run_llm,
+                    )
+                )
+        # Don't call functions for responses that might not be used.
+        speculation = self._speculation
+        if speculation and asyncio.current_task() is speculation.task:
+            await speculation.committed.wait()
+
+        # Let the context aggregators know about all the calls before any
+        # result arrives.
+        for call, _ in calls:
+            logger.info(f"Calling function {call.function_name} with arguments {call.arguments}")
+            await self.push_frame(
+                FunctionCallInProgressFrame(
+                    function_name=call.function_name,
+                    tool_call_id=call.tool_call_id,
+                    arguments=call.arguments,
+                )
+            )
+
+        batch = _LLMFunctionCallBatch(
+            remaining=len(calls), run_llm=any(call.run_llm for call, _ in calls)
         )
+        for call, callback in calls:
+            task = self.get_event_loop().create_task(
+                self._function_call_task_handler(context, call, callback, batch)
+            )
+            self._function_call_tasks.add(task)
+            task.add_done_callback(self._function_call_tasks.discard)
 
     # QUESTION FOR CB: maybe this isn't needed anymore?
     async def call_start_function(self, context: OpenAILLMContext, function_name: str):
@@ -191,6 +383,214 @@ class LLMService(AIService):
             UserImageRequestFrame(user_id=user_id, context=text_content), FrameDirection.UPSTREAM
         )
 
+    async def _function_call_task_handler(
+        self,
+        context: OpenAILLMContext,
+        call: LLMFunctionCall,
+        callback,
+        batch: "_LLMFunctionCallBatch",
+    ):
+        done = False
+
+        async def push_result(result):
+            nonlocal done
+            if done:
+                return
+            done = True
+            batch.remaining -= 1
+            await self.push_frame(
+                FunctionCallResultFrame(
+                    function_name=call.function_name,
+                    tool_call_id=call.tool_call_id,
+                    arguments=call.arguments,
+                    result=result,
+                    run_llm=batch.run_llm and batch.remaining == 0,
+                )
+            )
+
+        cache = get_function_call_cache()
+        cache_settings = self._function_cache_settings.get(
+            call.function_name, self._function_cache_settings.get(None)
+        )
+        if cache_settings:
+            result = cache.get(call.function_name, call.arguments)
+            if result is not MISSING:
+                logger.debug(f"{self} using cached result of function {call.function_name}")
+                await push_result(result)
+                return
+
+        async def function_call_result_callback(result):
+            if cache_settings and not done:
+                ttl_secs, max_entries = cache_settings
+                cache.put(
+                    call.function_name,
+                    call.arguments,
+                    result,
+                    ttl_secs=ttl_secs,
+                    max_entries=max_entries,
+                )
+            await push_result(result)
+
+        timeout = self._function_timeouts.get(call.function_name, self._function_timeouts.get(None))
+        try:
+            await asyncio.wait_for(
+                callback(
+                    call.function_name,
+                    call.tool_call_id,
+                    call.arguments,
+                    self,
+                    context,
+                    function_call_result_callback,
+                ),
+                timeout,
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"{self} function {call.function_name} timed out after {timeout}s")
+            await push_result({"error": f"The function timed out after {timeout} seconds"})
+        except Exception as e:
+            logger.exception(f"{self} function {call.function_name} exception: {e}")
+            await push_result({"error": str(e)})
+        finally:
+            # Functions don't need to return a result.
+            if not done:
+                done = True
+                batch.remaining -= 1
+
+    async def _cancel_function_calls(self):
+        tasks = list(self._function_call_tasks)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            logger.debug(f"{self} cancelled {len(tasks)} function calls")
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _llm_cache_key(self, context: OpenAILLMContext) -> str:
+        return llm_cache_key(
+            model=self.model_name,
+            messages=context.messages,
+            tools=context.tools,
+            tool_choice=context.tool_choice,
+            settings=self._settings,
+        )
+
+    async def _process_context_with_cache(
+        self,
+        context: OpenAILLMContext,
+        process_context: Callable[[OpenAILLMContext], Awaitable[None]],
+    ):
+        """Replays the cached response for the context, if any. Otherwise,
+        generates it with `process_context` (the service's own processing)
+        and records it.
+
+        """
+        key = self._llm_cache_key(context)
+        entry = await self._cache.get(key)
+        if entry:
+            logger.debug(f"{self}: using cached response: [{entry.text}]")
+            await self._push_cached_response(context, entry)
+            return
+
+        # Services set _cache_entry to None if something goes wrong.
+        self._cache_entry = LLMCacheEntry()
+        try:
+            await process_context(context)
+            entry = self._cache_entry
+            if entry and (entry.chunks or entry.function_calls):
+                self._cache.put(key, entry)
+        finally:
+            self._cache_entry = None
+
+    async def _push_cached_response(self, context: OpenAILLMContext, entry: LLMCacheEntry):
+        await self.start_ttfb_metrics()
+        for chunk in entry.chunks:
+            await self.stop_ttfb_metrics()
+            await self.push_frame(TextFrame(chunk))
+        await self.stop_ttfb_metrics()
+        if entry.function_calls:
+            await self.call_functions(
+                context=context,
+                function_calls=[
+                    LLMFunctionCall(
+                        function_name=call.function_name,
+                        tool_call_id=call.tool_call_id,
+                        arguments=call.arguments,
+                        run_llm=call.run_llm,
+                    )
+                    for call in entry.function_calls
+                ],
+            )
+
+    async def _start_speculation(self, frame: OpenAILLMSpeculativeContextFrame):
+        await self._cancel_speculation()
+        logger.debug(f"{self} starting speculative response {frame.speculation_id}")
+        speculation = _LLMSpeculation(frame.speculation_id)
+        speculation.task = self.get_event_loop().create_task(
+            self._speculation_task_handler(frame.context)
+        )
+        self._speculation = speculation
+        self._speculations += 1
+
+    async def _commit_speculation(
+        self, frame: LLMSpeculationCommitFrame, direction: FrameDirection
+    ):
+        speculation = self._speculation
+        if not speculation or speculation.speculation_id != frame.speculation_id:
+            # We don't have it (e.g. it was interrupted), generate it now.
+            await self._cancel_speculation()
+            await self.process_frame(OpenAILLMContextFrame(context=frame.context), direction)
+            return
+
+        logger.debug(f"{self} using speculative response {frame.speculation_id}")
+        self._speculation_hits += 1
+        await self._push_speculation_metrics(time.monotonic() - speculation.start_time, True)
+
+        # Push what we have so far and let the rest of the response through.
+        while speculation.frames:
+            held_frame, held_direction = speculation.frames.pop(0)
+            await super().push_frame(held_frame, held_direction)
+        speculation.committed.set()
+
+        # Wait until the response is done, like with any other context.
+        await asyncio.gather(speculation.task, return_exceptions=True)
+        if self._speculation is speculation:
+            self._speculation = None
+
+    async def _cancel_speculation(self, speculation_id: Optional[int] = None):
+        speculation = self._speculation
+        if not speculation or speculation.committed.is_set():
+            return
+        if speculation_id is not None and speculation.speculation_id != speculation_id:
+            return
+        logger.debug(f"{self} cancelling speculative response {speculation.speculation_id}")
+        self._speculation = None
+        if speculation.task:
+            speculation.task.cancel()
+            await asyncio.gather(speculation.task, return_exceptions=True)
+        await self._push_speculation_metrics(0.0, False)
+
+    async def _speculation_task_handler(self, context: OpenAILLMContext):
+        try:
+            await self.process_frame(
+                OpenAILLMContextFrame(context=context), FrameDirection.DOWNSTREAM
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"{self} error generating speculative response: {e}")
+
+    async def _push_speculation_metrics(self, value: float, hit: bool):
+        if not self.metrics_enabled:
+            return
+        data = LLMSpeculationMetricsData(
+            processor=self.name,
+            model=self.model_name or None,
+            value=value,
+            hit=hit,
+            hits=self._speculation_hits,
+            speculations=self._speculations,
+        )
+        await self.push_frame(MetricsFrame(data=[data]))
+
 
 class TTSService(AIService):
     def __init__(
@@ -207,6 +607,11 @@ class TTSService(AIService):
         # TTS output sample rate
         sample_rate: int = 16000,
         text_filter: Optional[BaseTextFilter] = None,
+        # if aggregating sentences, decides whether the first chunk of a
+        # response can be sent before the first sentence is complete
+        flush_policy: Optional[BaseFlushPolicy] = None,
+        # cache of synthesized audio, can be shared between services
+        cache: Optional[TTSCache] = None,
         **kwargs,
     ):
         super().__init__(**kwargs)
@@ -218,16 +623,35 @@ class TTSService(AIService):
         self._voice_id: str = ""
         self._settings: Dict[str, Any] = {}
         self._text_filter: Optional[BaseTextFilter] = text_filter
+        self._flush_policy: Optional[BaseFlushPolicy] = flush_policy
+        self._cache: Optional[TTSCache] = cache
 
         self._stop_frame_task: Optional[asyncio.Task] = None
         self._stop_frame_queue: asyncio.Queue = asyncio.Queue()
 
-        self._current_sentence: str = ""
+        self._sentence_segmenter = SentenceSegmenter()
+
+        # Current response state, used by the flush policy.
+        self._response_start_time: float | None = None
+        self._response_requests = 0
+        self._early_flush_time: float | None = None
+        self._first_sentence_time: float | None = None
+
+        # Whether we are between a TTSStartedFrame and a TTSStoppedFrame.
+        self._tts_started = False
+        # Audio being recorded for the cache.
+        self._cache_key: str | None = None
+        self._cache_entry: TTSCacheEntry | None = None
 
     @property
     def sample_rate(self) -> int:
         return self._sample_rate
 
+    def produced_audio_sample_rate(self, frame_type: Type[AudioRawFrame]) -> int | None:
+        if issubclass(frame_type, OutputAudioRawFrame):
+            return self._sample_rate
+        return None
+
     @abstractmethod
     async def set_model(self, model: str):
         self.set_model_name(model)
@@ -298,9 +722,11 @@ class TTSService(AIService):
         elif isinstance(frame, StartInterruptionFrame):
             await self._handle_interruption(frame, direction)
         elif isinstance(frame, (LLMFullResponseEndFrame, EndFrame)):
-            sentence = self._current_sentence
-            self._current_sentence = ""
+            sentence = self._sentence_segmenter.flush()
+            if sentence.strip() and self._first_sentence_time is None:
+                self._first_sentence_time = time.monotonic()
             await self._push_tts_frames(sentence)
+            await self._end_response()
             if isinstance(frame, LLMFullResponseEndFrame):
                 if self._push_text_frames:
                     await self.push_frame(frame, direction)
@@ -317,6 +743,9 @@ class TTSService(AIService):
     async def push_frame(self, frame: Frame, direction: FrameDirection = FrameDirection.DOWNSTREAM):
         await super().push_frame(frame, direction)
 
+        if self._cache is not None:
+            await self._cache_frame(frame)
+
         if self._push_stop_frames and (
             isinstance(frame, StartInterruptionFrame)
             or isinstance(frame, TTSStartedFrame)
@@ -326,7 +755,9 @@ class TTSService(AIService):
             await self._stop_frame_queue.put(frame)
 
     async def _handle_interruption(self, frame: StartInterruptionFrame, direction: FrameDirection):
-        self._current_sentence = ""
+        self._sentence_segmenter.reset()
+        self._reset_response()
+        self._reset_cache_recording()
         if self._text_filter:
             self._text_filter.handle_interruption()
         await self.push_frame(frame, direction)
@@ -336,11 +767,21 @@ class TTSService(AIService):
         if not self._aggregate_sentences:
             text = frame.text
         else:
-            self._current_sentence += frame.text
-            eos_end_marker = match_endofsentence(self._current_sentence)
+            now = time.monotonic()
+            if self._response_start_time is None:
+                self._response_start_time = now
+            eos_end_marker = self._sentence_segmenter.append(frame.text)
             if eos_end_marker:
-                text = self._current_sentence[:eos_end_marker]
-                self._current_sentence = self._current_sentence[eos_end_marker:]
+                text = self._sentence_segmenter.pop(eos_end_marker)
+                if self._first_sentence_time is None:
+                    self._first_sentence_time = now
+            elif self._flush_policy and self._response_requests == 0:
+                flush_end = self._flush_policy.find_flush(
+                    self._sentence_segmenter.text, now - self._response_start_time
+                )
+                if flush_end:
+                    text = self._sentence_segmenter.pop(flush_end)
+                    self._early_flush_time = now
 
         if text:
             await self._push_tts_frames(text)
@@ -351,17 +792,110 @@ class TTSService(AIService):
         if not text.strip():
             return
 
+        # Only requests of the current LLM response count for the flush policy
+        # (e.g. not a TTSSpeakFrame greeting).
+        if self._response_start_time is not None:
+            self._response_requests += 1
         await self.start_processing_metrics()
         if self._text_filter:
             self._text_filter.reset_interruption()
             text = self._text_filter.filter(text)
-        await self.process_generator(self.run_tts(text))
+        if self._cache is not None:
+            await self._run_tts_with_cache(text)
+        else:
+            await self.process_generator(self.run_tts(text))
         await self.stop_processing_metrics()
         if self._push_text_frames:
             # We send the original text after the audio. This way, if we are
             # interrupted, the text is not added to the assistant context.
             await self.push_frame(TextFrame(text))
 
+    def _tts_cache_key(self, text: str) -> str:
+        return tts_cache_key(
+            text,
+            voice=self._voice_id,
+            model=self.model_name,
+            sample_rate=self._sample_rate,
+            settings=self._settings,
+        )
+
+    async def _run_tts_with_cache(self, text: str):
+        key = self._tts_cache_key(text)
+
+        # We can only replay or record audio if this text is all that's said
+        # between a TTSStartedFrame and a TTSStoppedFrame. For example,
+        # websocket services send a whole LLM response in the same context.
+        if self._tts_started:
+            self._reset_cache_recording()
+            await self.process_generator(self.run_tts(text))
+            return
+
+        entry = await self._cache.get(key)
+        if entry:
+            logger.debug(f"{self}: using cached TTS: [{text}]")
+            self._reset_cache_recording()
+            await self._push_cached_tts(entry)
+            return
+
+        self._cache_key = key
+        await self.process_generator(self.run_tts(text))
+
+    async def _push_cached_tts(self, entry: TTSCacheEntry):
+        await self.push_frame(TTSStartedFrame())
+        for audio in entry.frames():
+            await self.push_frame(TTSAudioRawFrame(audio, entry.sample_rate, entry.num_channels))
+        await self.push_frame(TTSStoppedFrame())
+
+    async def _cache_frame(self, frame: Frame):
+        if isinstance(frame, TTSStartedFrame):
+            self._tts_started = True
+            if self._cache_key:
+                self._cache_entry = TTSCacheEntry(audio=bytearray(), sample_rate=0, num_channels=0)
+        elif isinstance(frame, TTSAudioRawFrame) and self._cache_entry:
+            entry = self._cache_entry
+            if not entry.frame_sizes:
+                entry.sample_rate = frame.sample_rate
+                entry.num_channels = frame.num_channels
+            if (entry.sample_rate, entry.num_channels) == (frame.sample_rate, frame.num_channels):
+                entry.audio += frame.audio
+                entry.frame_sizes.append(len(frame.audio))
+            else:
+                self._reset_cache_recording()
+        elif isinstance(frame, TTSStoppedFrame):
+            self._tts_started = False
+            if self._cache_key and self._cache_entry and self._cache_entry.audio:
+                self._cache_entry.audio = bytes(self._cache_entry.audio)
+                self._cache.put(self._cache_key, self._cache_entry)
+            self._reset_cache_recording()
+        elif isinstance(frame, (StartInterruptionFrame, ErrorFrame)):
+            self._tts_started = False
+            self._reset_cache_recording()
+
+    def _reset_cache_recording(self):
+        self._cache_key = None
+        self._cache_entry = None
+
+    async def _end_response(self):
+        if self._flush_policy and self._response_requests > 0 and self.metrics_enabled:
+            gain = 0.0
+            if self._early_flush_time is not None and self._first_sentence_time is not None:
+                gain = self._first_sentence_time - self._early_flush_time
+            data = TTSFlushMetricsData(
+                processor=self.name,
+                model=self.model_name or None,
+                value=gain,
+                requests=self._response_requests,
+                extra_requests=1 if self._early_flush_time is not None else 0,
+            )
+            await self.push_frame(MetricsFrame(data=[data]))
+        self._reset_response()
+
+    def _reset_response(self):
+        self._response_start_time = None
+        self._response_requests = 0
+        self._early_flush_time = None
+        self._first_sentence_time = None
+
     async def _stop_frame_handler(self):
         try:
             has_started = False
@@ -398,6 +932,14 @@ class WordTTSService(TTSService):
         self._word_timestamps = []
 
     async def add_word_timestamps(self, word_times: List[Tuple[str, float]]):
+        if self._cache_entry:
+            # Frame markers (e.g. "LLMFullResponseEndFrame") belong to the
+            # response being spoken, not to the cached text.
+            self._cache_entry.words.extend(
+                (word, timestamp)
+                for word, timestamp in word_times
+                if not self._is_word_timestamp_marker(word, timestamp)
+            )
         for word, timestamp in word_times:
             await self._words_queue.put((word, seconds_to_nanoseconds(timestamp)))
 
@@ -419,6 +961,20 @@ class WordTTSService(TTSService):
         await super()._handle_interruption(frame, direction)
         self.reset_word_timestamps()
 
+    async def _push_cached_tts(self, entry: TTSCacheEntry):
+        await self.push_frame(TTSStartedFrame())
+        # Cached word timestamps are relative to the beginning of the audio.
+        self.reset_word_timestamps()
+        self.start_word_timestamps()
+        for audio in entry.frames():
+            await self.push_frame(TTSAudioRawFrame(audio, entry.sample_rate, entry.num_channels))
+        # TTSStoppedFrame goes through the words queue, so it follows the last
+        # word.
+        await self.add_word_timestamps(entry.words + [("TTSStoppedFrame", 0)])
+
+    def _is_word_timestamp_marker(self, word: str, timestamp: float) -> bool:
+        return timestamp == 0 and word in ("TTSStoppedFrame", "LLMFullResponseEndFrame")
+
     async def _stop_words_task(self):
         if self._words_task:
             self._words_task.cancel()
@@ -502,6 +1058,16 @@ class SegmentedSTTService(STTService):
     """SegmentedSTTService is an STTService that will detect speech and will run
     speech-to-text on speech segments only, instead of a continous stream.
 
+    By default speech is detected with a smoothed volume and segments are
+    flushed after `max_silence_secs` of silence or every `max_buffer_secs`. If
+    a `vad_analyzer` is given, segments follow the VAD state instead: they
+    start a bit before speech is detected (see `VADSegmenterParams`), end when
+    the VAD goes back to quiet and, if too long, are split at a quiet point.
+
+    In volume mode, the buffered audio is passed to `run_stt()` as WAV. VAD
+    segments are passed to `run_stt_segment()` as float32 samples which, by
+    default, converts them to WAV and calls `run_stt()`.
+
     """
 
     def __init__(
@@ -512,6 +1078,8 @@ class SegmentedSTTService(STTService):
         max_buffer_secs: float = 1.5,
         sample_rate: int = 16000,
         num_channels: int = 1,
+        vad_analyzer: VADAnalyzer | None = None,
+        vad_segmenter_params: VADSegmenterParams = VADSegmenterParams(),
         **kwargs,
     ):
         super().__init__(**kwargs)
@@ -520,18 +1088,73 @@ class SegmentedSTTService(STTService):
         self._max_buffer_secs = max_buffer_secs
         self._sample_rate = sample_rate
         self._num_channels = num_channels
-        (self._content, self._wave) = self._new_wave()
+        self._buffer = bytearray()
         self._silence_num_frames = 0
         # Volume exponential smoothing
         self._smoothing_factor = 0.2
         self._prev_volume = 0
 
+        self._vad_segmenter: VADSegmenter | None = None
+        if vad_analyzer:
+            if vad_analyzer.sample_rate != sample_rate:
+                raise ValueError(
+                    f"VAD analyzer sample rate ({vad_analyzer.sample_rate}) doesn't match STT sample rate ({sample_rate})"
+                )
+            self._vad_segmenter = VADSegmenter(
+                vad_analyzer=vad_analyzer, params=vad_segmenter_params
+            )
+            # VAD analyzers might be slow, don't block the event loop.
+            self._executor = ThreadPoolExecutor(max_workers=1)
+
+    def accepted_audio_sample_rates(self, frame_type: Type[AudioRawFrame]) -> List[int] | None:
+        if issubclass(frame_type, InputAudioRawFrame):
+            return [self._sample_rate]
+        return None
+
+    async def run_stt_segment(self, audio: np.ndarray) -> AsyncGenerator[Frame, None]:
+        """Transcribes a speech segment given as float32 samples between -1.0
+        and 1.0. Services that can use the samples directly (e.g. local models)
+        should override this to avoid the conversion to WAV.
+
+        """
+        # Scale by 32768, like the conversion from 16-bit, so samples that came
+        # from 16-bit audio get back their original values.
+        pcm = np.clip(np.round(audio * 32768.0), -32768, 32767).astype(np.int16)
+        async for frame in self.run_stt(self._to_wav(pcm.tobytes())):
+            yield frame
+
     async def process_audio_frame(self, frame: AudioRawFrame):
+        if self._vad_segmenter:
+            await self._process_vad_audio_frame(frame)
+        else:
+            await self._process_volume_audio_frame(frame)
+
+    async def stop(self, frame: EndFrame):
+        if self._vad_segmenter:
+            # Transcribe whatever the user was saying.
+            segment = self._vad_segmenter.flush()
+            if segment is not None and len(segment) > 0:
+                await self.process_generator(self.run_stt_segment(segment))
+        self._buffer.clear()
+
+    async def cancel(self, frame: CancelFrame):
+        if self._vad_segmenter:
+            self._vad_segmenter.reset()
+        self._buffer.clear()
+
+    async def _process_vad_audio_frame(self, frame: AudioRawFrame):
+        segments = await self.get_event_loop().run_in_executor(
+            self._executor, self._vad_segmenter.append, frame.audio
+        )
+        for segment in segments:
+            await self.process_generator(self.run_stt_segment(segment))
+
+    async def _process_volume_audio_frame(self, frame: AudioRawFrame):
         # Try to filter out empty background noise
         volume = self._get_smoothed_volume(frame)
         if volume >= self._min_volume:
-            # If volume is high enough, write new data to wave file
-            self._wave.writeframes(frame.audio)
+            # If volume is high enough, keep the audio
+            self._buffer.extend(frame.audio)
             self._silence_num_frames = 0
         else:
             self._silence_num_frames += frame.num_frames
@@ -540,29 +1163,25 @@ class SegmentedSTTService(STTService):
         # If buffer is not empty and we have enough data or there's been a long
         # silence, transcribe the audio gathered so far.
         silence_secs = self._silence_num_frames / self._sample_rate
-        buffer_secs = self._wave.getnframes() / self._sample_rate
-        if self._content.tell() > 0 and (
+        buffer_secs = len(self._buffer) / (self._num_channels * 2) / self._sample_rate
+        if len(self._buffer) > 0 and (
             buffer_secs > self._max_buffer_secs or silence_secs > self._max_silence_secs
         ):
             self._silence_num_frames = 0
-            self._wave.close()
-            self._content.seek(0)
-            await self.process_generator(self.run_stt(self._content.read()))
-            (self._content, self._wave) = self._new_wave()
-
-    async def stop(self, frame: EndFrame):
-        self._wave.close()
-
-    async def cancel(self, frame: CancelFrame):
-        self._wave.close()
+            wav = self._to_wav(self._buffer)
+            self._buffer = bytearray()
+            await self.process_generator(self.run_stt(wav))
 
-    def _new_wave(self):
+    def _to_wav(self, pcm: bytes) -> bytes:
         content = io.BytesIO()
         ww = wave.open(content, "wb")
         ww.setsampwidth(2)
         ww.setnchannels(self._num_channels)
         ww.setframerate(self._sample_rate)
-        return (content, ww)
+        ww.writeframes(pcm)
+        ww.close()
+        content.seek(0)
+        return content.read()
 
     def _get_smoothed_volume(self, frame: AudioRawFrame) -> float:
         volume = calculate_audio_volume(frame.audio, frame.sample_rate)
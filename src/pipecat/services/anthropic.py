@@ -4,17 +4,13 @@
 # SPDX-License-Identifier: BSD 2-Clause License
 #
 
-import base64
 import copy
-import io
 import json
-import re
 from asyncio import CancelledError
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional
 
 from loguru import logger
-from PIL import Image
 from pydantic import BaseModel, Field
 
 from pipecat.frames.frames import (
@@ -33,6 +29,8 @@ from pipecat.frames.frames import (
     VisionImageRawFrame,
 )
 from pipecat.metrics.metrics import LLMTokenUsage
+from pipecat.processors.aggregators.llm_context_store import ContextStore
+from pipecat.processors.aggregators.llm_context_window import LLMContextWindow
 from pipecat.processors.aggregators.llm_response import (
     LLMAssistantContextAggregator,
     LLMUserContextAggregator,
@@ -43,6 +41,9 @@ from pipecat.processors.aggregators.openai_llm_context import (
 )
 from pipecat.processors.frame_processor import FrameDirection
 from pipecat.services.ai_services import LLMService
+from pipecat.services.llm_cache import LLMCache, LLMCacheEntry, llm_cache_key
+from pipecat.utils.image_cache import EncodedImage, get_image_cache
+from pipecat.utils.tokens import Tokenizer, estimate_tokens
 
 try:
     from anthropic import NOT_GIVEN, AsyncAnthropic, NotGiven
@@ -91,10 +92,12 @@ class AnthropicLLMService(LLMService):
         api_key: str,
         model: str = "claude-3-5-sonnet-20240620",
         params: InputParams = InputParams(),
+        cache: Optional[LLMCache] = None,
         **kwargs,
     ):
         super().__init__(**kwargs)
         self._client = AsyncAnthropic(api_key=api_key)
+        self._cache = cache
         self.set_model_name(model)
         self._settings = {
             "max_tokens": params.max_tokens,
@@ -114,11 +117,24 @@ class AnthropicLLMService(LLMService):
 
     @staticmethod
     def create_context_aggregator(
-        context: OpenAILLMContext, *, assistant_expect_stripped_words: bool = True
+        context: OpenAILLMContext,
+        *,
+        assistant_expect_stripped_words: bool = True,
+        context_window: Optional[LLMContextWindow] = None,
+        context_store: Optional[ContextStore] = None,
+        conversation_id: Optional[str] = None,
     ) -> AnthropicContextAggregatorPair:
-        user = AnthropicUserContextAggregator(context)
+        user = AnthropicUserContextAggregator(
+            context,
+            context_window=context_window,
+            context_store=context_store,
+            conversation_id=conversation_id,
+        )
         assistant = AnthropicAssistantContextAggregator(
-            user, expect_stripped_words=assistant_expect_stripped_words
+            user,
+            expect_stripped_words=assistant_expect_stripped_words,
+            context_store=context_store,
+            conversation_id=conversation_id,
         )
         return AnthropicContextAggregatorPair(_user=user, _assistant=assistant)
 
@@ -138,8 +154,8 @@ class AnthropicLLMService(LLMService):
             await self.push_frame(LLMFullResponseStartFrame())
             await self.start_processing_metrics()
 
-            logger.debug(
-                f"Generating chat: {context.system} | {context.get_messages_for_logging()}"
+            logger.opt(lazy=True).debug(
+                "Generating chat: {} | {}", lambda: context.system, context.get_messages_for_logging
             )
 
             messages = context.messages
@@ -182,12 +198,10 @@ class AnthropicLLMService(LLMService):
                 if event.type == "content_block_delta":
                     if hasattr(event.delta, "text"):
                         await self.push_frame(TextFrame(event.delta.text))
-                        completion_tokens_estimate += self._estimate_tokens(event.delta.text)
+                        completion_tokens_estimate += estimate_tokens(event.delta.text)
                     elif hasattr(event.delta, "partial_json") and tool_use_block:
                         json_accumulator += event.delta.partial_json
-                        completion_tokens_estimate += self._estimate_tokens(
-                            event.delta.partial_json
-                        )
+                        completion_tokens_estimate += estimate_tokens(event.delta.partial_json)
                 elif event.type == "content_block_start":
                     if event.content_block.type == "tool_use":
                         tool_use_block = event.content_block
@@ -247,6 +261,8 @@ class AnthropicLLMService(LLMService):
             raise
         except Exception as e:
             logger.exception(f"{self} exception: {e}")
+            # Don't cache incomplete responses.
+            self._cache_entry = None
         finally:
             await self.stop_processing_metrics()
             await self.push_frame(LLMFullResponseEndFrame())
@@ -275,7 +291,10 @@ class AnthropicLLMService(LLMService):
             # a new context. Generally we want a context manager to catch
             # UserImageRawFrames coming through the pipeline and add them
             # to the context.
-            context = AnthropicLLMContext.from_image_frame(frame)
+            image = await get_image_cache().encode(
+                format=frame.format, size=frame.size, image=frame.image
+            )
+            context = AnthropicLLMContext.from_encoded_image(image, frame.text)
         elif isinstance(frame, LLMUpdateSettingsFrame):
             await self._update_settings(frame.settings)
         elif isinstance(frame, LLMEnablePromptCachingFrame):
@@ -285,10 +304,26 @@ class AnthropicLLMService(LLMService):
             await self.push_frame(frame, direction)
 
         if context:
-            await self._process_context(context)
+            if self._cache is not None:
+                await self._process_context_with_cache(context, self._process_context)
+            else:
+                await self._process_context(context)
+
+    def _llm_cache_key(self, context: "AnthropicLLMContext") -> str:
+        return llm_cache_key(
+            model=self.model_name,
+            messages=[{"system": context.system}, *context.messages],
+            tools=context.tools,
+            tool_choice=context.tool_choice,
+            settings=self._settings,
+        )
 
-    def _estimate_tokens(self, text: str) -> int:
-        return int(len(re.split(r"[^\w]+", text)) * 1.3)
+    async def _push_cached_response(self, context: OpenAILLMContext, entry: LLMCacheEntry):
+        await self.push_frame(LLMFullResponseStartFrame())
+        await self.start_processing_metrics()
+        await super()._push_cached_response(context, entry)
+        await self.stop_processing_metrics()
+        await self.push_frame(LLMFullResponseEndFrame())
 
     async def _report_usage_metrics(
         self,
@@ -321,8 +356,11 @@ class AnthropicLLMContext(OpenAILLMContext):
         tool_choice: dict | None = None,
         *,
         system: str | NotGiven = NOT_GIVEN,
+        tokenizer: Optional[Tokenizer] = None,
     ):
-        super().__init__(messages=messages, tools=tools, tool_choice=tool_choice)
+        super().__init__(
+            messages=messages, tools=tools, tool_choice=tool_choice, tokenizer=tokenizer
+        )
 
         # For beta prompt caching. This is a counter that tracks the number of turns
         # we've seen above the cache threshold. We reset this when we reset the
@@ -364,6 +402,12 @@ class AnthropicLLMContext(OpenAILLMContext):
         )
         return context
 
+    @classmethod
+    def from_encoded_image(cls, image: EncodedImage, text: str) -> "AnthropicLLMContext":
+        context = cls()
+        context.add_encoded_image_message(image, text=text)
+        return context
+
     def set_messages(self, messages: List):
         self.turns_above_cache_threshold = 0
         self._messages[:] = messages
@@ -463,21 +507,15 @@ class AnthropicLLMContext(OpenAILLMContext):
 
         return message
 
-    def add_image_frame_message(
-        self, *, format: str, size: tuple[int, int], image: bytes, text: str = None
-    ):
-        buffer = io.BytesIO()
-        Image.frombytes(format, size, image).save(buffer, format="JPEG")
-        encoded_image = base64.b64encode(buffer.getvalue()).decode("utf-8")
-
+    def add_encoded_image_message(self, image: EncodedImage, *, text: str = None):
         # Anthropic docs say that the image should be the first content block in the message.
         content = [
             {
                 "type": "image",
                 "source": {
                     "type": "base64",
-                    "media_type": "image/jpeg",
-                    "data": encoded_image,
+                    "media_type": image.mime_type,
+                    "data": image.base64,
                 },
             }
         ]
@@ -503,13 +541,25 @@ class AnthropicLLMContext(OpenAILLMContext):
                         message["content"] = [{"type": "text", "text": message["content"]}]
                     # append the content of this message to the last message
                     self.messages[-1]["content"].extend(message["content"])
+                    self._update_message_tokens(-1)
                 else:
                     self.messages.append(message)
+                    self._append_message_tokens(message)
             else:
                 self.messages.append(message)
+                self._append_message_tokens(message)
         except Exception as e:
             logger.error(f"Error adding message: {e}")
 
+    def set_summary(self, summary: str):
+        # There are no system messages in Anthropic, so the summary goes at
+        # the end of the system prompt.
+        system = self.system if self.system else ""
+        if self._summary and system.endswith(self._summary):
+            system = system[: -len(self._summary)].rstrip()
+        self.system = f"{system}\n\n{summary}" if system else summary
+        self._summary = summary
+
     def get_messages_with_cache_control_markers(self) -> List[dict]:
         try:
             messages = copy.deepcopy(self.messages)
@@ -577,6 +627,8 @@ class AnthropicLLMContext(OpenAILLMContext):
             elif isinstance(message["content"], list) and len(message["content"]) == 0:
                 message["content"] = [{"type": "text", "text": "(empty)"}]
 
+        self._count_all_tokens()
+
     def get_messages_for_persistent_storage(self):
         messages = super().get_messages_for_persistent_storage()
         if self.system:
@@ -597,8 +649,8 @@ class AnthropicLLMContext(OpenAILLMContext):
 
 
 class AnthropicUserContextAggregator(LLMUserContextAggregator):
-    def __init__(self, context: OpenAILLMContext | AnthropicLLMContext):
-        super().__init__(context=context)
+    def __init__(self, context: OpenAILLMContext | AnthropicLLMContext, **kwargs):
+        super().__init__(context=context, **kwargs)
 
         if isinstance(context, OpenAILLMContext):
             self._context = AnthropicLLMContext.from_openai_context(context)
@@ -727,12 +779,12 @@ class AnthropicAssistantContextAggregator(LLMAssistantContextAggregator):
             if self._pending_image_frame_message:
                 frame = self._pending_image_frame_message
                 self._pending_image_frame_message = None
-                self._context.add_image_frame_message(
+                image = await get_image_cache().encode(
                     format=frame.user_image_raw_frame.format,
                     size=frame.user_image_raw_frame.size,
                     image=frame.user_image_raw_frame.image,
-                    text=frame.text,
                 )
+                self._context.add_encoded_image_message(image, text=frame.text)
                 run_llm = True
 
             if run_llm:
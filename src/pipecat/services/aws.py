@@ -4,7 +4,7 @@
 # SPDX-License-Identifier: BSD 2-Clause License
 #
 
-from typing import AsyncGenerator, Optional
+from typing import AsyncGenerator, Iterator, Optional
 
 from loguru import logger
 from pydantic import BaseModel
@@ -18,6 +18,7 @@ from pipecat.frames.frames import (
 )
 from pipecat.services.ai_services import TTSService
 from pipecat.transcriptions.language import Language
+from pipecat.utils.threads import iterate_in_thread
 
 try:
     import boto3
@@ -163,6 +164,13 @@ class AWSTTSService(TTSService):
 
         return ssml
 
+    def _synthesize_speech(self, params: dict) -> Iterator[bytes]:
+        response = self._polly_client.synthesize_speech(**params)
+        if "AudioStream" in response:
+            stream = response["AudioStream"]
+            with stream:
+                yield from stream.iter_chunks(chunk_size=4096)
+
     async def run_tts(self, text: str) -> AsyncGenerator[Frame, None]:
         logger.debug(f"Generating TTS: [{text}]")
 
@@ -184,24 +192,15 @@ class AWSTTSService(TTSService):
             # Filter out None values
             filtered_params = {k: v for k, v in params.items() if v is not None}
 
-            response = self._polly_client.synthesize_speech(**filtered_params)
-
             await self.start_tts_usage_metrics(text)
 
             yield TTSStartedFrame()
 
-            if "AudioStream" in response:
-                with response["AudioStream"] as stream:
-                    audio_data = stream.read()
-                    chunk_size = 8192
-                    for i in range(0, len(audio_data), chunk_size):
-                        chunk = audio_data[i : i + chunk_size]
-                        if len(chunk) > 0:
-                            await self.stop_ttfb_metrics()
-                            frame = TTSAudioRawFrame(chunk, self._settings["sample_rate"], 1)
-                            yield frame
-
-            yield TTSStoppedFrame()
+            # boto3 is synchronous, so the request is made and the audio is
+            # read in a thread. Chunks are pushed as they arrive.
+            async for chunk in iterate_in_thread(self._synthesize_speech(filtered_params)):
+                await self.stop_ttfb_metrics()
+                yield TTSAudioRawFrame(chunk, self._settings["sample_rate"], 1)
 
         except (BotoCoreError, ClientError) as error:
             logger.exception(f"{self} error generating TTS: {error}")
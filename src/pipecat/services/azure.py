@@ -6,7 +6,7 @@
 
 import asyncio
 import io
-from typing import AsyncGenerator, Optional
+from typing import AsyncGenerator, Iterator, List, Optional, Type
 
 import aiohttp
 from loguru import logger
@@ -14,10 +14,12 @@ from PIL import Image
 from pydantic import BaseModel
 
 from pipecat.frames.frames import (
+    AudioRawFrame,
     CancelFrame,
     EndFrame,
     ErrorFrame,
     Frame,
+    InputAudioRawFrame,
     StartFrame,
     TranscriptionFrame,
     TTSAudioRawFrame,
@@ -28,16 +30,21 @@ from pipecat.frames.frames import (
 from pipecat.services.ai_services import ImageGenService, STTService, TTSService
 from pipecat.services.openai import BaseOpenAILLMService
 from pipecat.transcriptions.language import Language
+from pipecat.utils.http_clients import get_http_client_registry
+from pipecat.utils.threads import iterate_in_thread
 from pipecat.utils.time import time_now_iso8601
 
 # See .env.example for Azure configuration needed
 try:
     from azure.cognitiveservices.speech import (
+        AudioDataStream,
         CancellationReason,
         ResultReason,
         SpeechConfig,
         SpeechRecognizer,
+        SpeechSynthesisOutputFormat,
         SpeechSynthesizer,
+        StreamStatus,
     )
     from azure.cognitiveservices.speech.audio import (
         AudioStreamFormat,
@@ -68,6 +75,7 @@ class AzureLLMService(BaseOpenAILLMService):
             api_key=api_key,
             azure_endpoint=self._endpoint,
             api_version=self._api_version,
+            http_client=get_http_client_registry().httpx_client(self._endpoint),
         )
 
 
@@ -95,6 +103,10 @@ class AzureTTSService(TTSService):
         super().__init__(sample_rate=sample_rate, **kwargs)
 
         speech_config = SpeechConfig(subscription=api_key, region=region)
+        # Raw PCM, so audio can be pushed as it arrives (without a WAV header).
+        speech_config.set_speech_synthesis_output_format(
+            self._sample_rate_to_output_format(sample_rate)
+        )
         self._speech_synthesizer = SpeechSynthesizer(speech_config=speech_config, audio_config=None)
 
         self._settings = {
@@ -249,6 +261,48 @@ class AzureTTSService(TTSService):
 
         return ssml
 
+    def _sample_rate_to_output_format(self, sample_rate: int) -> SpeechSynthesisOutputFormat:
+        match sample_rate:
+            case 8000:
+                return SpeechSynthesisOutputFormat.Raw8Khz16BitMonoPcm
+            case 16000:
+                return SpeechSynthesisOutputFormat.Raw16Khz16BitMonoPcm
+            case 22050:
+                return SpeechSynthesisOutputFormat.Raw22050Hz16BitMonoPcm
+            case 24000:
+                return SpeechSynthesisOutputFormat.Raw24Khz16BitMonoPcm
+            case 44100:
+                return SpeechSynthesisOutputFormat.Raw44100Hz16BitMonoPcm
+            case 48000:
+                return SpeechSynthesisOutputFormat.Raw48Khz16BitMonoPcm
+        # Audio is pushed with our sample rate, so it would play at the wrong
+        # speed with a different one.
+        raise ValueError(f"Azure TTS doesn't support a sample rate of {sample_rate}")
+
+    def _synthesize_ssml(self, ssml: str) -> Iterator[bytes]:
+        # Returns as soon as the synthesis starts, the audio is read as it's
+        # synthesized.
+        result = self._speech_synthesizer.start_speaking_ssml_async(ssml).get()
+        if result.reason == ResultReason.Canceled:
+            self._log_cancellation(result.cancellation_details)
+            return
+        stream = AudioDataStream(result)
+        buffer = bytes(4096)
+        try:
+            while size := stream.read_data(buffer):
+                yield buffer[:size]
+            if stream.status == StreamStatus.Canceled:
+                self._log_cancellation(stream.cancellation_details)
+        finally:
+            if stream.status != StreamStatus.AllData:
+                # We have been interrupted.
+                self._speech_synthesizer.stop_speaking_async()
+
+    def _log_cancellation(self, cancellation_details):
+        logger.warning(f"Speech synthesis canceled: {cancellation_details.reason}")
+        if cancellation_details.reason == CancellationReason.Error:
+            logger.error(f"{self} error: {cancellation_details.error_details}")
+
     async def run_tts(self, text: str) -> AsyncGenerator[Frame, None]:
         logger.debug(f"Generating TTS: [{text}]")
 
@@ -256,24 +310,22 @@ class AzureTTSService(TTSService):
 
         ssml = self._construct_ssml(text)
 
-        result = await asyncio.to_thread(self._speech_synthesizer.speak_ssml, (ssml))
-
-        if result.reason == ResultReason.SynthesizingAudioCompleted:
-            await self.start_tts_usage_metrics(text)
-            await self.stop_ttfb_metrics()
-            yield TTSStartedFrame()
-            # Azure always sends a 44-byte header. Strip it off.
+        # The Speech SDK is synchronous, so audio is read in a thread and
+        # pushed as it's synthesized.
+        started = False
+        async for audio in iterate_in_thread(self._synthesize_ssml(ssml)):
+            if not started:
+                started = True
+                await self.start_tts_usage_metrics(text)
+                await self.stop_ttfb_metrics()
+                yield TTSStartedFrame()
             yield TTSAudioRawFrame(
-                audio=result.audio_data[44:],
+                audio=audio,
                 sample_rate=self._settings["sample_rate"],
                 num_channels=1,
             )
+        if started:
             yield TTSStoppedFrame()
-        elif result.reason == ResultReason.Canceled:
-            cancellation_details = result.cancellation_details
-            logger.warning(f"Speech synthesis canceled: {cancellation_details.reason}")
-            if cancellation_details.reason == CancellationReason.Error:
-                logger.error(f"{self} error: {cancellation_details.error_details}")
 
 
 class AzureSTTService(STTService):
@@ -289,6 +341,8 @@ class AzureSTTService(STTService):
     ):
         super().__init__(**kwargs)
 
+        self._sample_rate = sample_rate
+
         speech_config = SpeechConfig(subscription=api_key, region=region)
         speech_config.speech_recognition_language = language
 
@@ -301,6 +355,11 @@ class AzureSTTService(STTService):
         )
         self._speech_recognizer.recognized.connect(self._on_handle_recognized)
 
+    def accepted_audio_sample_rates(self, frame_type: Type[AudioRawFrame]) -> List[int] | None:
+        if issubclass(frame_type, InputAudioRawFrame):
+            return [self._sample_rate]
+        return None
+
     async def run_stt(self, audio: bytes) -> AsyncGenerator[Frame, None]:
         await self.start_processing_metrics()
         self._audio_stream.write(audio)
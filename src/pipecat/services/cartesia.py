@@ -8,7 +8,7 @@ import asyncio
 import base64
 import json
 import uuid
-from typing import AsyncGenerator, List, Optional, Union
+from typing import Any, AsyncGenerator, Awaitable, Callable, Dict, List, Optional, Set, Union
 
 from loguru import logger
 from pydantic.main import BaseModel
@@ -66,7 +66,184 @@ def language_to_cartesia_language(language: Language) -> str | None:
     return None
 
 
+CartesiaMessageHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+class _CartesiaConnection:
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self.contexts: Set[str] = set()
+        self.receive_task: Optional[asyncio.Task] = None
+
+
+class CartesiaConnectionManager:
+    """Shares a few Cartesia websockets between many `CartesiaTTSService`s
+    (e.g. all the sessions of a process), since the Cartesia protocol can
+    handle multiple independent contexts in the same connection. This saves
+    the websocket handshake when sessions start and reduces the number of
+    sockets on busy hosts.
+
+    Each context is sent to the connection with the fewest active contexts,
+    and a new connection is opened when all of them have
+    `max_contexts_per_connection` contexts (up to `max_connections`).
+    Received messages are routed to the service that owns the context.
+
+    """
+
+    def __init__(
+        self,
+        *,
+        api_key: str,
+        cartesia_version: str = "2024-06-10",
+        url: str = "wss://api.cartesia.ai/tts/websocket",
+        max_connections: int = 4,
+        max_contexts_per_connection: int = 32,
+    ):
+        self._api_key = api_key
+        self._cartesia_version = cartesia_version
+        self._url = url
+        self._max_connections = max_connections
+        self._max_contexts_per_connection = max_contexts_per_connection
+
+        self._connections: List[_CartesiaConnection] = []
+        self._context_connections: Dict[str, _CartesiaConnection] = {}
+        self._handlers: Dict[str, CartesiaMessageHandler] = {}
+        self._lock = asyncio.Lock()
+
+    @property
+    def num_connections(self) -> int:
+        return len(self._connections)
+
+    async def connect(self):
+        """Opens the first connection, if there's none."""
+        async with self._lock:
+            if not self._connections:
+                await self._open_connection()
+
+    async def close(self):
+        async with self._lock:
+            connections = self._connections
+            self._connections = []
+        for connection in connections:
+            await self._close_connection(connection)
+
+    async def send(self, context_id: str, msg: str, handler: CartesiaMessageHandler):
+        """Sends a message for the given context. Messages received for the
+        context are given to `handler` until it's done or cancelled.
+
+        """
+        connection = await self._get_connection(context_id)
+        self._handlers[context_id] = handler
+        try:
+            await connection.websocket.send(msg)
+        except Exception:
+            self._release_context(context_id)
+            await self._drop_connection(connection)
+            raise
+
+    async def cancel(self, context_id: str):
+        """Cancels the given context. No more messages will be received for it."""
+        connection = self._context_connections.get(context_id)
+        self._release_context(context_id)
+        if connection:
+            try:
+                await connection.websocket.send(
+                    json.dumps({"context_id": context_id, "cancel": True})
+                )
+            except Exception as e:
+                logger.warning(f"{self} unable to cancel context {context_id}: {e}")
+
+    async def _get_connection(self, context_id: str) -> _CartesiaConnection:
+        async with self._lock:
+            connection = self._context_connections.get(context_id)
+            if connection:
+                return connection
+
+            available = [
+                c for c in self._connections if len(c.contexts) < self._max_contexts_per_connection
+            ]
+            if available:
+                connection = min(available, key=lambda c: len(c.contexts))
+            elif len(self._connections) < self._max_connections:
+                connection = await self._open_connection()
+            else:
+                connection = min(self._connections, key=lambda c: len(c.contexts))
+
+            connection.contexts.add(context_id)
+            self._context_connections[context_id] = connection
+            return connection
+
+    async def _open_connection(self) -> _CartesiaConnection:
+        websocket = await websockets.connect(
+            f"{self._url}?api_key={self._api_key}&cartesia_version={self._cartesia_version}"
+        )
+        connection = _CartesiaConnection(websocket)
+        connection.receive_task = asyncio.get_running_loop().create_task(
+            self._receive_task_handler(connection)
+        )
+        self._connections.append(connection)
+        return connection
+
+    async def _close_connection(self, connection: _CartesiaConnection):
+        if connection.receive_task and connection.receive_task is not asyncio.current_task():
+            connection.receive_task.cancel()
+            await asyncio.gather(connection.receive_task, return_exceptions=True)
+        try:
+            await connection.websocket.close()
+        except Exception as e:
+            logger.warning(f"{self} error closing websocket: {e}")
+
+    async def _drop_connection(self, connection: _CartesiaConnection):
+        if connection in self._connections:
+            self._connections.remove(connection)
+        # Let the owners of the contexts know they won't get anything else.
+        for context_id in list(connection.contexts):
+            handler = self._handlers.get(context_id)
+            self._release_context(context_id)
+            if handler:
+                await self._dispatch(
+                    handler,
+                    {"type": "error", "context_id": context_id, "error": "connection closed"},
+                )
+        await self._close_connection(connection)
+
+    def _release_context(self, context_id: str):
+        self._handlers.pop(context_id, None)
+        connection = self._context_connections.pop(context_id, None)
+        if connection:
+            connection.contexts.discard(context_id)
+
+    async def _dispatch(self, handler: CartesiaMessageHandler, msg: Dict[str, Any]):
+        try:
+            await handler(msg)
+        except Exception as e:
+            logger.error(f"{self} error handling message: {e}")
+
+    async def _receive_task_handler(self, connection: _CartesiaConnection):
+        try:
+            async for message in connection.websocket:
+                msg = json.loads(message)
+                context_id = msg.get("context_id")
+                handler = self._handlers.get(context_id)
+                if not handler:
+                    continue
+                if msg.get("type") in ("done", "error"):
+                    self._release_context(context_id)
+                await self._dispatch(handler, msg)
+        except asyncio.CancelledError:
+            return
+        except Exception as e:
+            logger.warning(f"{self} connection error: {e}")
+        await self._drop_connection(connection)
+
+
 class CartesiaTTSService(WordTTSService):
+    """Cartesia TTS over websockets. If a `connection_manager` is given, its
+    connections (and so its `api_key`, `cartesia_version` and `url`) are
+    used, and those arguments can be omitted.
+
+    """
+
     class InputParams(BaseModel):
         encoding: Optional[str] = "pcm_s16le"
         sample_rate: Optional[int] = 16000
@@ -78,14 +255,33 @@ class CartesiaTTSService(WordTTSService):
     def __init__(
         self,
         *,
-        api_key: str,
+        api_key: Optional[str] = None,
         voice_id: str,
-        cartesia_version: str = "2024-06-10",
-        url: str = "wss://api.cartesia.ai/tts/websocket",
+        cartesia_version: Optional[str] = None,
+        url: Optional[str] = None,
         model: str = "sonic-english",
         params: InputParams = InputParams(),
+        connection_manager: Optional[CartesiaConnectionManager] = None,
         **kwargs,
     ):
+        if connection_manager:
+            manager_settings = {
+                "api_key": connection_manager._api_key,
+                "cartesia_version": connection_manager._cartesia_version,
+                "url": connection_manager._url,
+            }
+            settings = {"api_key": api_key, "cartesia_version": cartesia_version, "url": url}
+            for name, value in settings.items():
+                if value is not None and value != manager_settings[name]:
+                    raise ValueError(
+                        f"CartesiaTTSService {name} doesn't match the connection manager's"
+                    )
+            api_key = manager_settings["api_key"]
+            cartesia_version = manager_settings["cartesia_version"]
+            url = manager_settings["url"]
+        elif not api_key:
+            raise ValueError("CartesiaTTSService needs an api_key or a connection_manager")
+
         # Aggregating sentences still gives cleaner-sounding results and fewer
         # artifacts than streaming one word at a time. On average, waiting for a
         # full sentence should only "cost" us 15ms or so with GPT-4o or a Llama
@@ -104,8 +300,8 @@ class CartesiaTTSService(WordTTSService):
         )
 
         self._api_key = api_key
-        self._cartesia_version = cartesia_version
-        self._url = url
+        self._cartesia_version = cartesia_version or "2024-06-10"
+        self._url = url or "wss://api.cartesia.ai/tts/websocket"
         self._settings = {
             "output_format": {
                 "container": params.container,
@@ -121,6 +317,8 @@ class CartesiaTTSService(WordTTSService):
         self.set_model_name(model)
         self.set_voice(voice_id)
 
+        # If given, the connection is shared with other services.
+        self._connection_manager = connection_manager
         self._websocket = None
         self._context_id = None
         self._receive_task = None
@@ -175,6 +373,13 @@ class CartesiaTTSService(WordTTSService):
         await self._disconnect()
 
     async def _connect(self):
+        if self._connection_manager:
+            try:
+                await self._connection_manager.connect()
+            except Exception as e:
+                logger.error(f"{self} initialization error: {e}")
+            return
+
         try:
             self._websocket = await websockets.connect(
                 f"{self._url}?api_key={self._api_key}&cartesia_version={self._cartesia_version}"
@@ -188,6 +393,9 @@ class CartesiaTTSService(WordTTSService):
         try:
             await self.stop_all_metrics()
 
+            if self._connection_manager and self._context_id:
+                await self._connection_manager.cancel(self._context_id)
+
             if self._websocket:
                 await self._websocket.close()
                 self._websocket = None
@@ -206,63 +414,82 @@ class CartesiaTTSService(WordTTSService):
             return self._websocket
         raise Exception("Websocket not connected")
 
+    async def _send(self, msg: str):
+        if self._connection_manager:
+            await self._connection_manager.send(self._context_id, msg, self._handle_message)
+        else:
+            await self._get_websocket().send(msg)
+
+    async def _cancel_context(self, context_id: str):
+        if self._connection_manager:
+            await self._connection_manager.cancel(context_id)
+        elif self._websocket:
+            try:
+                await self._websocket.send(json.dumps({"context_id": context_id, "cancel": True}))
+            except Exception as e:
+                logger.warning(f"{self} unable to cancel context: {e}")
+
     async def _handle_interruption(self, frame: StartInterruptionFrame, direction: FrameDirection):
         await super()._handle_interruption(frame, direction)
         await self.stop_all_metrics()
+        # Stop generating audio nobody is going to hear.
+        if self._context_id:
+            await self._cancel_context(self._context_id)
         self._context_id = None
 
     async def flush_audio(self):
-        if not self._context_id or not self._websocket:
+        if not self._context_id or not (self._websocket or self._connection_manager):
             return
         logger.trace("Flushing audio")
         msg = self._build_msg(text="", continue_transcript=False)
-        await self._websocket.send(msg)
+        await self._send(msg)
 
     async def _receive_task_handler(self):
         try:
             async for message in self._get_websocket():
-                msg = json.loads(message)
-                if not msg or msg["context_id"] != self._context_id:
-                    continue
-                if msg["type"] == "done":
-                    await self.stop_ttfb_metrics()
-                    # Unset _context_id but not the _context_id_start_timestamp
-                    # because we are likely still playing out audio and need the
-                    # timestamp to set send context frames.
-                    self._context_id = None
-                    await self.add_word_timestamps(
-                        [("TTSStoppedFrame", 0), ("LLMFullResponseEndFrame", 0)]
-                    )
-                elif msg["type"] == "timestamps":
-                    await self.add_word_timestamps(
-                        list(zip(msg["word_timestamps"]["words"], msg["word_timestamps"]["start"]))
-                    )
-                elif msg["type"] == "chunk":
-                    await self.stop_ttfb_metrics()
-                    self.start_word_timestamps()
-                    frame = TTSAudioRawFrame(
-                        audio=base64.b64decode(msg["data"]),
-                        sample_rate=self._settings["output_format"]["sample_rate"],
-                        num_channels=1,
-                    )
-                    await self.push_frame(frame)
-                elif msg["type"] == "error":
-                    logger.error(f"{self} error: {msg}")
-                    await self.push_frame(TTSStoppedFrame())
-                    await self.stop_all_metrics()
-                    await self.push_error(ErrorFrame(f'{self} error: {msg["error"]}'))
-                else:
-                    logger.error(f"Cartesia error, unknown message type: {msg}")
+                await self._handle_message(json.loads(message))
         except asyncio.CancelledError:
             pass
         except Exception as e:
             logger.error(f"{self} exception: {e}")
 
+    async def _handle_message(self, msg: Dict[str, Any]):
+        if not msg or msg["context_id"] != self._context_id:
+            return
+        if msg["type"] == "done":
+            await self.stop_ttfb_metrics()
+            # Unset _context_id but not the _context_id_start_timestamp
+            # because we are likely still playing out audio and need the
+            # timestamp to set send context frames.
+            self._context_id = None
+            await self.add_word_timestamps([("TTSStoppedFrame", 0), ("LLMFullResponseEndFrame", 0)])
+        elif msg["type"] == "timestamps":
+            await self.add_word_timestamps(
+                list(zip(msg["word_timestamps"]["words"], msg["word_timestamps"]["start"]))
+            )
+        elif msg["type"] == "chunk":
+            await self.stop_ttfb_metrics()
+            self.start_word_timestamps()
+            frame = TTSAudioRawFrame(
+                audio=base64.b64decode(msg["data"]),
+                sample_rate=self._settings["output_format"]["sample_rate"],
+                num_channels=1,
+            )
+            await self.push_frame(frame)
+        elif msg["type"] == "error":
+            logger.error(f"{self} error: {msg}")
+            self._context_id = None
+            await self.push_frame(TTSStoppedFrame())
+            await self.stop_all_metrics()
+            await self.push_error(ErrorFrame(f'{self} error: {msg["error"]}'))
+        else:
+            logger.error(f"Cartesia error, unknown message type: {msg}")
+
     async def run_tts(self, text: str) -> AsyncGenerator[Frame, None]:
         logger.debug(f"Generating TTS: [{text}]")
 
         try:
-            if not self._websocket:
+            if not self._connection_manager and not self._websocket:
                 await self._connect()
 
             if not self._context_id:
@@ -273,13 +500,15 @@ class CartesiaTTSService(WordTTSService):
             msg = self._build_msg(text=text or " ")  # Text must contain at least one character
 
             try:
-                await self._get_websocket().send(msg)
+                await self._send(msg)
                 await self.start_tts_usage_metrics(text)
             except Exception as e:
                 logger.error(f"{self} error sending message: {e}")
                 yield TTSStoppedFrame()
-                await self._disconnect()
-                await self._connect()
+                self._context_id = None
+                if not self._connection_manager:
+                    await self._disconnect()
+                    await self._connect()
                 return
             yield None
         except Exception as e:
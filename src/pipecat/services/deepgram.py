@@ -4,16 +4,17 @@
 # SPDX-License-Identifier: BSD 2-Clause License
 #
 
-import asyncio
-from typing import AsyncGenerator
+from typing import AsyncGenerator, List, Type
 
 from loguru import logger
 
 from pipecat.frames.frames import (
+    AudioRawFrame,
     CancelFrame,
     EndFrame,
     ErrorFrame,
     Frame,
+    InputAudioRawFrame,
     InterimTranscriptionFrame,
     StartFrame,
     TranscriptionFrame,
@@ -55,7 +56,7 @@ class DeepgramTTSService(TTSService):
         encoding: str = "linear16",
         **kwargs,
     ):
-        super().__init__(**kwargs)
+        super().__init__(sample_rate=sample_rate, **kwargs)
 
         self._settings = {
             "sample_rate": sample_rate,
@@ -80,33 +81,38 @@ class DeepgramTTSService(TTSService):
         try:
             await self.start_ttfb_metrics()
 
-            response = await asyncio.to_thread(
-                self._deepgram_client.speak.v("1").stream, {"text": text}, options
+            # The audio is read as it arrives, instead of waiting for the
+            # whole response.
+            response = await self._deepgram_client.speak.asyncrest.v("1").stream_raw(
+                {"text": text}, options
             )
-
-            await self.start_tts_usage_metrics(text)
-            yield TTSStartedFrame()
-
-            # The response.stream_memory is already a BytesIO object
-            audio_buffer = response.stream_memory
-
-            if audio_buffer is None:
-                raise ValueError("No audio data received from Deepgram")
-
-            # Read and yield the audio data in chunks
-            audio_buffer.seek(0)  # Ensure we're at the start of the buffer
-            chunk_size = 8192  # Use a fixed buffer size
-            while True:
-                await self.stop_ttfb_metrics()
-                chunk = audio_buffer.read(chunk_size)
-                if not chunk:
-                    break
-                frame = TTSAudioRawFrame(
-                    audio=chunk, sample_rate=self._settings["sample_rate"], num_channels=1
-                )
-                yield frame
+            try:
+                if response.status_code != 200:
+                    error = (await response.aread()).decode(errors="replace")
+                    raise ValueError(f"Deepgram returned {response.status_code}: {error}")
+
+                await self.start_tts_usage_metrics(text)
+                yield TTSStartedFrame()
+
+                # Chunks can end in the middle of a 16-bit sample, so an odd
+                # trailing byte is kept for the next chunk.
+                pending = b""
+                async for chunk in response.aiter_bytes():
+                    await self.stop_ttfb_metrics()
+                    if pending:
+                        chunk = pending + chunk
+                    num_bytes = len(chunk) - len(chunk) % 2
+                    pending = chunk[num_bytes:]
+                    if num_bytes > 0:
+                        yield TTSAudioRawFrame(
+                            audio=chunk[:num_bytes] if pending else chunk,
+                            sample_rate=self._settings["sample_rate"],
+                            num_channels=1,
+                        )
 
                 yield TTSStoppedFrame()
+            finally:
+                await response.aclose()
 
         except Exception as e:
             logger.exception(f"{self} exception: {e}")
@@ -157,6 +163,11 @@ class DeepgramSTTService(STTService):
     def vad_enabled(self):
         return self._settings["vad_events"]
 
+    def accepted_audio_sample_rates(self, frame_type: Type[AudioRawFrame]) -> List[int] | None:
+        if issubclass(frame_type, InputAudioRawFrame):
+            return [self._settings["sample_rate"]]
+        return None
+
     def can_generate_metrics(self) -> bool:
         return self.vad_enabled
 
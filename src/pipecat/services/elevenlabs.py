@@ -4,7 +4,6 @@
 # SPDX-License-Identifier: BSD 2-Clause License
 #
 
-import asyncio
 import base64
 import json
 from typing import Any, AsyncGenerator, Dict, List, Literal, Mapping, Optional, Tuple
@@ -24,6 +23,11 @@ from pipecat.frames.frames import (
 )
 from pipecat.processors.frame_processor import FrameDirection
 from pipecat.services.ai_services import WordTTSService
+from pipecat.services.websocket_service import (
+    WebsocketPool,
+    WebsocketService,
+    credentials_hash,
+)
 from pipecat.transcriptions.language import Language
 
 # See .env.example for ElevenLabs configuration needed
@@ -71,7 +75,7 @@ def calculate_word_times(
     return word_times
 
 
-class ElevenLabsTTSService(WordTTSService):
+class ElevenLabsTTSService(WordTTSService, WebsocketService):
     class InputParams(BaseModel):
         language: Optional[Language] = Language.EN
         output_format: Literal["pcm_16000", "pcm_22050", "pcm_24000", "pcm_44100"] = "pcm_16000"
@@ -99,6 +103,7 @@ class ElevenLabsTTSService(WordTTSService):
         model: str = "eleven_turbo_v2_5",
         url: str = "wss://api.elevenlabs.io",
         params: InputParams = InputParams(),
+        websocket_pool: Optional[WebsocketPool] = None,
         **kwargs,
     ):
         # Aggregating sentences still gives cleaner-sounding results and fewer
@@ -123,6 +128,8 @@ class ElevenLabsTTSService(WordTTSService):
             sample_rate=sample_rate_from_output_format(params.output_format),
             **kwargs,
         )
+        # ElevenLabs closes the connection after 20 seconds without text.
+        WebsocketService.__init__(self, pool=websocket_pool, keepalive_secs=10)
 
         self._api_key = api_key
         self._url = url
@@ -142,8 +149,6 @@ class ElevenLabsTTSService(WordTTSService):
         self.set_voice(voice_id)
         self._voice_settings = self._set_voice_settings()
 
-        # Websocket connection to ElevenLabs.
-        self._websocket = None
         # Indicates if we have sent TTSStartedFrame. It will reset to False when
         # there's an interruption or TTSStoppedFrame.
         self._started = False
@@ -249,19 +254,19 @@ class ElevenLabsTTSService(WordTTSService):
         await super().set_model(model)
         logger.info(f"Switching TTS model to: [{model}]")
         await self._disconnect()
-        await self._connect()
+        await self._connect_websocket()
 
     async def _update_settings(self, settings: Dict[str, Any]):
         prev_voice = self._voice_id
         await super()._update_settings(settings)
         if not prev_voice == self._voice_id:
             await self._disconnect()
-            await self._connect()
+            await self._connect_websocket()
             logger.info(f"Switching TTS voice to: [{self._voice_id}]")
 
     async def start(self, frame: StartFrame):
         await super().start(frame)
-        await self._connect()
+        await self._connect_websocket()
 
     async def stop(self, frame: EndFrame):
         await super().stop(frame)
@@ -283,94 +288,85 @@ class ElevenLabsTTSService(WordTTSService):
             if isinstance(frame, TTSStoppedFrame):
                 await self.add_word_timestamps([("LLMFullResponseEndFrame", 0)])
 
-    async def _connect(self):
-        try:
-            voice_id = self._voice_id
-            model = self.model_name
-            output_format = self._settings["output_format"]
-            url = f"{self._url}/v1/text-to-speech/{voice_id}/stream-input?model_id={model}&output_format={output_format}"
-
-            if self._settings["optimize_streaming_latency"]:
-                url += f"&optimize_streaming_latency={self._settings['optimize_streaming_latency']}"
-
-            # Language can only be used with the 'eleven_turbo_v2_5' model
-            language = self._settings["language"]
-            if model == "eleven_turbo_v2_5":
-                url += f"&language_code={language}"
-            else:
-                logger.warning(
-                    f"Language code [{language}] not applied. Language codes can only be used with the 'eleven_turbo_v2_5' model."
-                )
+    async def _disconnect(self):
+        await self.stop_all_metrics()
+        await self._disconnect_websocket()
+        self._started = False
 
-            self._websocket = await websockets.connect(url)
-            self._receive_task = self.get_event_loop().create_task(self._receive_task_handler())
-            self._keepalive_task = self.get_event_loop().create_task(self._keepalive_task_handler())
-
-            # According to ElevenLabs, we should always start with a single space.
-            msg: Dict[str, Any] = {
-                "text": " ",
-                "xi_api_key": self._api_key,
-            }
-            if self._voice_settings:
-                msg["voice_settings"] = self._voice_settings
-            await self._websocket.send(json.dumps(msg))
-        except Exception as e:
-            logger.error(f"{self} initialization error: {e}")
-            self._websocket = None
+    def _url_for_settings(self) -> str:
+        voice_id = self._voice_id
+        model = self.model_name
+        output_format = self._settings["output_format"]
+        url = f"{self._url}/v1/text-to-speech/{voice_id}/stream-input?model_id={model}&output_format={output_format}"
+
+        if self._settings["optimize_streaming_latency"]:
+            url += f"&optimize_streaming_latency={self._settings['optimize_streaming_latency']}"
+
+        # Language can only be used with the 'eleven_turbo_v2_5' model
+        if model == "eleven_turbo_v2_5":
+            url += f"&language_code={self._settings['language']}"
+        return url
+
+    #
+    # Websocket service
+    #
+
+    def _websocket_pool_key(self) -> str:
+        # Connections are authenticated with the API key when they are opened.
+        return (
+            f"{self._url_for_settings()} {json.dumps(self._voice_settings, sort_keys=True)}"
+            f" {credentials_hash(self._api_key)}"
+        )
 
-    async def _disconnect(self):
-        try:
-            await self.stop_all_metrics()
+    def _websocket_pool_max_idle_secs(self) -> Optional[float]:
+        # ElevenLabs closes the connection after 20 seconds without text.
+        return 15.0
 
-            if self._websocket:
-                await self._websocket.send(json.dumps({"text": ""}))
-                await self._websocket.close()
-                self._websocket = None
+    async def _open_websocket(self):
+        if self.model_name != "eleven_turbo_v2_5":
+            logger.warning(
+                f"Language code [{self._settings['language']}] not applied. Language codes can only be used with the 'eleven_turbo_v2_5' model."
+            )
 
-            if self._receive_task:
-                self._receive_task.cancel()
-                await self._receive_task
-                self._receive_task = None
+        websocket = await websockets.connect(self._url_for_settings())
 
-            if self._keepalive_task:
-                self._keepalive_task.cancel()
-                await self._keepalive_task
-                self._keepalive_task = None
+        # According to ElevenLabs, we should always start with a single space.
+        msg: Dict[str, Any] = {
+            "text": " ",
+            "xi_api_key": self._api_key,
+        }
+        if self._voice_settings:
+            msg["voice_settings"] = self._voice_settings
+        await websocket.send(json.dumps(msg))
+        return websocket
+
+    async def _close_websocket(self, websocket):
+        if websocket.open:
+            await websocket.send(json.dumps({"text": ""}))
+        await websocket.close()
+
+    async def _on_websocket_disconnected(self):
+        await self.stop_all_metrics()
+        self._started = False
 
-            self._started = False
-        except Exception as e:
-            logger.error(f"{self} error closing websocket: {e}")
+    async def _send_keepalive(self):
+        await self._send_text("")
 
-    async def _receive_task_handler(self):
-        try:
-            async for message in self._websocket:
-                msg = json.loads(message)
-                if msg.get("audio"):
-                    await self.stop_ttfb_metrics()
-                    self.start_word_timestamps()
-
-                    audio = base64.b64decode(msg["audio"])
-                    frame = TTSAudioRawFrame(audio, self._settings["sample_rate"], 1)
-                    await self.push_frame(frame)
-
-                if msg.get("alignment"):
-                    word_times = calculate_word_times(msg["alignment"], self._cumulative_time)
-                    await self.add_word_timestamps(word_times)
-                    self._cumulative_time = word_times[-1][1]
-        except asyncio.CancelledError:
-            pass
-        except Exception as e:
-            logger.error(f"{self} exception: {e}")
+    async def _receive_messages(self):
+        async for message in self._websocket:
+            msg = json.loads(message)
+            if msg.get("audio"):
+                await self.stop_ttfb_metrics()
+                self.start_word_timestamps()
 
-    async def _keepalive_task_handler(self):
-        while True:
-            try:
-                await asyncio.sleep(10)
-                await self._send_text("")
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error(f"{self} exception: {e}")
+                audio = base64.b64decode(msg["audio"])
+                frame = TTSAudioRawFrame(audio, self._settings["sample_rate"], 1)
+                await self.push_frame(frame)
+
+            if msg.get("alignment"):
+                word_times = calculate_word_times(msg["alignment"], self._cumulative_time)
+                await self.add_word_timestamps(word_times)
+                self._cumulative_time = word_times[-1][1]
 
     async def _send_text(self, text: str):
         if self._websocket:
@@ -381,8 +377,9 @@ class ElevenLabsTTSService(WordTTSService):
         logger.debug(f"Generating TTS: [{text}]")
 
         try:
-            if not self._websocket:
-                await self._connect()
+            if not await self._wait_for_websocket():
+                logger.error(f"{self} unable to generate TTS: not connected")
+                return
 
             try:
                 if not self._started:
@@ -397,7 +394,7 @@ class ElevenLabsTTSService(WordTTSService):
                 logger.error(f"{self} error sending message: {e}")
                 yield TTSStoppedFrame()
                 await self._disconnect()
-                await self._connect()
+                await self._connect_websocket()
                 return
             yield None
         except Exception as e:
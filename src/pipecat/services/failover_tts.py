@@ -0,0 +1,251 @@
+#
+# Copyright (c) 2024, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+import asyncio
+import time
+
+from typing import Any, AsyncGenerator, Dict, List, Optional, Sequence
+
+from loguru import logger
+
+from pipecat.frames.frames import (
+    CancelFrame,
+    EndFrame,
+    ErrorFrame,
+    Frame,
+    StartFrame,
+    TTSAudioRawFrame,
+)
+from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
+from pipecat.services.ai_services import TTSService, WordTTSService
+from pipecat.services.websocket_service import WebsocketService
+
+# Marks the end of the frames of a request.
+_DONE = object()
+
+
+class _ServiceOutput(FrameProcessor):
+    """Linked to both sides of a wrapped service, so the frames the service
+    pushes by itself (e.g. errors) are pushed by the failover service.
+
+    """
+
+    def __init__(self, failover: FrameProcessor, **kwargs):
+        super().__init__(**kwargs)
+        self._failover = failover
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+        await self._failover.push_frame(frame, direction)
+
+
+class FailoverTTSService(TTSService):
+    """Sends every request to the best ranked of the given TTS services and,
+    if it doesn't produce audio within `hedge_after_secs`, sends the same
+    request to the next one (and so on). Audio is streamed from the service
+    that responds first and the other requests are cancelled. Services that
+    fail are replaced by the next one right away.
+
+    Services are ranked by a moving average of their time to first audio
+    (the first one given is the primary), so a service that has a slow spell
+    is used as a backup until it gets faster than the others. Requests that
+    lose are counted with the time they had been waiting, and failed requests
+    with `failure_penalty_secs`.
+
+    Wrapped services need to generate their audio in `run_tts()`, which is
+    the case of HTTP-based services. Websocket-based services push audio from
+    a receive task, which can't be hedged, so they are not accepted. All the
+    services need to generate audio with the same sample rate. Frames that
+    the services push by themselves (e.g. errors) are pushed by this service.
+
+    """
+
+    def __init__(
+        self,
+        *,
+        services: Sequence[TTSService],
+        hedge_after_secs: float = 0.8,
+        failure_penalty_secs: float = 5.0,
+        latency_smoothing: float = 0.3,
+        **kwargs,
+    ):
+        if len(services) < 2:
+            raise ValueError("FailoverTTSService needs at least two services")
+        for service in services:
+            if isinstance(service, (WordTTSService, WebsocketService)):
+                raise ValueError(
+                    f"FailoverTTSService doesn't support websocket-based services: {service}"
+                )
+        sample_rates = {service.sample_rate for service in services}
+        if len(sample_rates) > 1:
+            raise ValueError(
+                f"FailoverTTSService services need the same sample rate: {sorted(sample_rates)}"
+            )
+        super().__init__(sample_rate=services[0].sample_rate, **kwargs)
+        self._services = list(services)
+        for service in self._services:
+            service.set_parent(self)
+            output = _ServiceOutput(self)
+            output.link(service)
+            service.link(output)
+        self._hedge_after_secs = hedge_after_secs
+        self._failure_penalty_secs = failure_penalty_secs
+        self._latency_smoothing = latency_smoothing
+
+        # Moving average of the time to first audio of each service, None if
+        # the service has not been used yet.
+        self._latencies: List[Optional[float]] = [None] * len(self._services)
+
+    @property
+    def services(self) -> List[TTSService]:
+        """Services in the order they will be tried."""
+        return [self._services[i] for i in self._ranking()]
+
+    def can_generate_metrics(self) -> bool:
+        return True
+
+    async def set_model(self, model: str):
+        # Models and voices are specific to each service, change them with a
+        # TTSUpdateSettingsFrame or in the services themselves.
+        logger.warning(f"{self} unable to set model of wrapped services: [{model}]")
+
+    def set_voice(self, voice: str):
+        logger.warning(f"{self} unable to set voice of wrapped services: [{voice}]")
+
+    async def flush_audio(self):
+        for service in self._services:
+            await service.flush_audio()
+
+    async def start(self, frame: StartFrame):
+        await super().start(frame)
+        for service in self._services:
+            await service.start(frame)
+
+    async def stop(self, frame: EndFrame):
+        await super().stop(frame)
+        for service in self._services:
+            await service.stop(frame)
+
+    async def cancel(self, frame: CancelFrame):
+        await super().cancel(frame)
+        for service in self._services:
+            await service.cancel(frame)
+
+    async def _update_settings(self, settings: Dict[str, Any]):
+        for service in self._services:
+            await service._update_settings(settings)
+
+    async def run_tts(self, text: str) -> AsyncGenerator[Frame, None]:
+        logger.debug(f"Generating TTS: [{text}]")
+
+        ranking = self._ranking()
+        queue: asyncio.Queue = asyncio.Queue()
+        tasks: Dict[int, asyncio.Task] = {}
+        start_times: Dict[int, float] = {}
+        buffers: Dict[int, List[Frame]] = {}
+        winner: Optional[int] = None
+        last_start_time = 0.0
+
+        def start_next():
+            nonlocal last_start_time
+            index = ranking[len(start_times)]
+            last_start_time = time.monotonic()
+            start_times[index] = last_start_time
+            buffers[index] = []
+            tasks[index] = self.get_event_loop().create_task(
+                self._request_task_handler(index, text, queue)
+            )
+            if len(start_times) > 1:
+                logger.debug(f"{self} hedging request with {self._services[index]}")
+
+        await self.start_ttfb_metrics()
+        start_next()
+        try:
+            while True:
+                timeout = None
+                if winner is None and len(start_times) < len(ranking):
+                    elapsed = time.monotonic() - last_start_time
+                    timeout = max(0.0, self._hedge_after_secs - elapsed)
+                try:
+                    index, frame = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    start_next()
+                    continue
+
+                if winner is None:
+                    if index not in tasks:
+                        continue
+                    if frame is _DONE or isinstance(frame, ErrorFrame):
+                        # This one failed, try the next one (if it's not
+                        # already running).
+                        logger.warning(f"{self} {self._services[index]} failed: [{frame}]")
+                        self._add_latency(index, self._failure_penalty_secs)
+                        await self._cancel_task(tasks.pop(index))
+                        if len(start_times) < len(ranking):
+                            start_next()
+                        elif not tasks:
+                            await self.stop_ttfb_metrics()
+                            yield ErrorFrame(f"{self} error: all TTS services failed")
+                            return
+                        continue
+
+                    buffers[index].append(frame)
+                    if isinstance(frame, TTSAudioRawFrame):
+                        winner = index
+                        await self.stop_ttfb_metrics()
+                        now = time.monotonic()
+                        for i, start_time in start_times.items():
+                            if i in tasks:
+                                self._add_latency(i, now - start_time)
+                        for i in list(tasks):
+                            if i != winner:
+                                await self._cancel_task(tasks.pop(i))
+                        for buffered in buffers[winner]:
+                            yield buffered
+                elif index == winner:
+                    if frame is _DONE:
+                        break
+                    yield frame
+        finally:
+            for task in tasks.values():
+                await self._cancel_task(task)
+
+    def _ranking(self) -> List[int]:
+        # Services that have not been used keep their order, after the ones
+        # we know about.
+        def key(i: int):
+            latency = self._latencies[i]
+            return (latency is None, latency or 0.0, i)
+
+        return sorted(range(len(self._services)), key=key)
+
+    def _add_latency(self, index: int, latency: float):
+        current = self._latencies[index]
+        if current is None:
+            self._latencies[index] = latency
+        else:
+            alpha = self._latency_smoothing
+            self._latencies[index] = alpha * latency + (1 - alpha) * current
+
+    async def _request_task_handler(self, index: int, text: str, queue: asyncio.Queue):
+        generator = self._services[index].run_tts(text)
+        try:
+            async for frame in generator:
+                if frame:
+                    await queue.put((index, frame))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"{self} {self._services[index]} exception: {e}")
+            await queue.put((index, ErrorFrame(str(e))))
+        finally:
+            await generator.aclose()
+        await queue.put((index, _DONE))
+
+    async def _cancel_task(self, task: asyncio.Task):
+        if not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
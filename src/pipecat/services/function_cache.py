@@ -0,0 +1,107 @@
+#
+# Copyright (c) 2024, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
+
+# Returned by `FunctionCallCache.get()` when there's no cached result (results
+# can be None).
+MISSING = object()
+
+
+def function_cache_key(function_name: str, arguments: Any) -> str:
+    """Returns the cache key of a function call. Arguments are canonicalized,
+    so the order of their keys doesn't matter.
+
+    >>> a = function_cache_key("get_weather", {"location": "SF", "unit": "C"})
+    >>> b = function_cache_key("get_weather", {"unit": "C", "location": "SF"})
+    >>> a == b
+    True
+    >>> a == function_cache_key("get_weather", {"location": "NYC", "unit": "C"})
+    False
+
+    """
+    if isinstance(arguments, str):
+        # Some services give us the arguments as a JSON string.
+        try:
+            arguments = json.loads(arguments)
+        except ValueError:
+            pass
+    data = json.dumps(
+        {"function_name": function_name, "arguments": arguments},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+class FunctionCallCache:
+    """Results of function calls, kept in memory. Each function has its own
+    time to live and maximum number of results (the least recently used
+    results are removed first). A single cache is shared by all the LLM
+    services of the process (see `get_function_call_cache()`), so results are
+    reused across sessions.
+
+    """
+
+    def __init__(self):
+        self._results: Dict[str, OrderedDict[str, Tuple[float, Any]]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return sum(len(results) for results in self._results.values())
+
+    def get(self, function_name: str, arguments: Any) -> Any:
+        results = self._results.get(function_name)
+        key = function_cache_key(function_name, arguments)
+        item = results.get(key) if results else None
+        if item and item[0] < time.monotonic():
+            del results[key]
+            item = None
+        if not item:
+            self.misses += 1
+            return MISSING
+        results.move_to_end(key)
+        self.hits += 1
+        return item[1]
+
+    def put(
+        self,
+        function_name: str,
+        arguments: Any,
+        result: Any,
+        *,
+        ttl_secs: float,
+        max_entries: int,
+    ):
+        results = self._results.setdefault(function_name, OrderedDict())
+        key = function_cache_key(function_name, arguments)
+        results.pop(key, None)
+        results[key] = (time.monotonic() + ttl_secs, result)
+        while len(results) > max_entries:
+            results.popitem(last=False)
+
+    def clear(self):
+        self._results.clear()
+
+
+_function_call_cache = FunctionCallCache()
+
+
+def get_function_call_cache() -> FunctionCallCache:
+    """Returns the cache shared by all the LLM services."""
+    return _function_call_cache
+
+
+def set_function_call_cache(cache: FunctionCallCache):
+    """Replaces the default cache (e.g. to have one per session)."""
+    global _function_call_cache
+    _function_call_cache = cache
@@ -6,15 +6,17 @@
 
 import base64
 import json
-from typing import AsyncGenerator, Optional
+from typing import AsyncGenerator, List, Optional, Type
 
 from loguru import logger
 from pydantic.main import BaseModel
 
 from pipecat.frames.frames import (
+    AudioRawFrame,
     CancelFrame,
     EndFrame,
     Frame,
+    InputAudioRawFrame,
     InterimTranscriptionFrame,
     StartFrame,
     TranscriptionFrame,
@@ -66,6 +68,11 @@ class GladiaSTTService(STTService):
         }
         self._confidence = confidence
 
+    def accepted_audio_sample_rates(self, frame_type: Type[AudioRawFrame]) -> List[int] | None:
+        if issubclass(frame_type, InputAudioRawFrame):
+            return [self._settings["sample_rate"]]
+        return None
+
     def language_to_service_language(self, language: Language) -> str | None:
         match language:
             case Language.BG:
@@ -31,6 +31,7 @@ from pipecat.processors.aggregators.openai_llm_context import (
 from pipecat.processors.frame_processor import FrameDirection
 from pipecat.services.ai_services import LLMService, TTSService
 from pipecat.transcriptions.language import Language
+from pipecat.utils.image_cache import get_image_cache
 
 try:
     import google.ai.generativelanguage as glm
@@ -56,6 +57,7 @@ class GoogleLLMService(LLMService):
     def __init__(self, *, api_key: str, model: str = "gemini-1.5-flash-latest", **kwargs):
         super().__init__(**kwargs)
         gai.configure(api_key=api_key)
+        self._api_key = api_key
         self._create_client(model)
 
     def can_generate_metrics(self) -> bool:
@@ -64,6 +66,14 @@ class GoogleLLMService(LLMService):
     def _create_client(self, model: str):
         self.set_model_name(model)
         self._client = gai.GenerativeModel(model)
+        # Created when needed, because gRPC asyncio channels belong to the
+        # event loop they are created in. Each service has its own client (the
+        # library's default one is shared by the whole process, and so bound
+        # to the loop of whoever used it first).
+        self._async_client: glm.GenerativeServiceAsyncClient | None = None
+
+    def _create_async_client(self) -> glm.GenerativeServiceAsyncClient:
+        return glm.GenerativeServiceAsyncClient(client_options={"api_key": self._api_key})
 
     def _get_messages_from_openai_context(self, context: OpenAILLMContext) -> List[glm.Content]:
         openai_messages = context.get_messages()
@@ -90,36 +100,38 @@ class GoogleLLMService(LLMService):
 
         return google_messages
 
-    async def _async_generator_wrapper(self, sync_generator):
-        for item in sync_generator:
-            yield item
-            await asyncio.sleep(0)
-
     async def _process_context(self, context: OpenAILLMContext):
         await self.push_frame(LLMFullResponseStartFrame())
         try:
-            logger.debug(f"Generating chat: {context.get_messages_json()}")
+            logger.opt(lazy=True).debug("Generating chat: {}", context.get_messages_json)
 
             messages = self._get_messages_from_openai_context(context)
 
             await self.start_ttfb_metrics()
 
-            response = self._client.generate_content(messages, stream=True)
-
-            await self.stop_ttfb_metrics()
-
-            async for chunk in self._async_generator_wrapper(response):
-                try:
-                    text = chunk.text
+            # We use the async client directly (instead of
+            # `generate_content_async()`, which reads a chunk ahead), so chunks
+            # are pushed as soon as they arrive and the event loop is not
+            # blocked while waiting for them. If we are interrupted, the task
+            # is cancelled and so is the request.
+            if not self._async_client:
+                self._async_client = self._create_async_client()
+            request = glm.GenerateContentRequest(model=self._client.model_name, contents=messages)
+            response = await self._async_client.stream_generate_content(request)
+
+            async for chunk in response:
+                await self.stop_ttfb_metrics()
+                if not chunk.candidates:
+                    continue
+                candidate = chunk.candidates[0]
+                text = "".join(part.text for part in candidate.content.parts)
+                if text:
                     await self.push_frame(TextFrame(text))
-                except Exception as e:
+                elif candidate.finish_reason == glm.Candidate.FinishReason.SAFETY:
                     # Google LLMs seem to flag safety issues a lot!
-                    if chunk.candidates[0].finish_reason == 3:
-                        logger.debug(
-                            f"LLM refused to generate content for safety reasons - {messages}."
-                        )
-                    else:
-                        logger.exception(f"{self} error: {e}")
+                    logger.debug(
+                        f"LLM refused to generate content for safety reasons - {messages}."
+                    )
 
         except Exception as e:
             logger.exception(f"{self} exception: {e}")
@@ -136,7 +148,10 @@ class GoogleLLMService(LLMService):
         elif isinstance(frame, LLMMessagesFrame):
             context = OpenAILLMContext.from_messages(frame.messages)
         elif isinstance(frame, VisionImageRawFrame):
-            context = OpenAILLMContext.from_image_frame(frame)
+            image = await get_image_cache().encode(
+                format=frame.format, size=frame.size, image=frame.image
+            )
+            context = OpenAILLMContext.from_encoded_image(image, frame.text)
         elif isinstance(frame, LLMUpdateSettingsFrame):
             await self._update_settings(frame.settings)
         else:
@@ -0,0 +1,200 @@
+#
+# Copyright (c) 2024, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+import asyncio
+import hashlib
+import io
+import json
+import os
+import tempfile
+import time
+
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from loguru import logger
+
+LLM_CACHE_FILE_SUFFIX = ".llm.json"
+
+
+@dataclass
+class LLMCacheFunctionCall:
+    function_name: str
+    tool_call_id: str
+    arguments: Any
+    run_llm: bool = True
+
+
+@dataclass
+class LLMCacheEntry:
+    """A response generated by an LLM service: the text chunks, as they were
+    streamed, and the function calls the response asked for.
+
+    """
+
+    chunks: List[str] = field(default_factory=list)
+    function_calls: List[LLMCacheFunctionCall] = field(default_factory=list)
+
+    @property
+    def text(self) -> str:
+        return "".join(self.chunks)
+
+
+def _json_default(obj: Any) -> Any:
+    # Images are stored in messages as BytesIO.
+    if isinstance(obj, io.BytesIO):
+        return hashlib.sha256(obj.getbuffer()).hexdigest()
+    return str(obj)
+
+
+def llm_cache_key(
+    *,
+    model: str,
+    messages: List[Any],
+    tools: Any = None,
+    tool_choice: Any = None,
+    settings: Optional[Mapping[str, Any]] = None,
+) -> str:
+    """Returns the cache key of a request. Everything that can change the
+    response needs to be given.
+
+    >>> messages = [{"role": "user", "content": "Hi"}]
+    >>> a = llm_cache_key(model="m", messages=messages, settings={"temperature": 0, "seed": 1})
+    >>> b = llm_cache_key(model="m", messages=messages, settings={"seed": 1, "temperature": 0})
+    >>> a == b
+    True
+    >>> a == llm_cache_key(model="m2", messages=messages, settings={"temperature": 0, "seed": 1})
+    False
+
+    """
+    data = json.dumps(
+        {
+            "model": model,
+            "messages": messages,
+            "tools": tools,
+            "tool_choice": tool_choice,
+            "settings": settings or {},
+        },
+        sort_keys=True,
+        default=_json_default,
+    )
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """Cache of LLM responses that can be given to LLM services (and shared
+    between them), for deterministic flows (e.g. scripted bots with
+    temperature 0) where the same requests are made over and over.
+
+    Entries are kept in memory in a least-recently-used list of up to
+    `max_entries`, and expire after `ttl_secs` (if given). If `disk_path` is
+    given, entries are also written to that directory so they can be shared
+    by multiple worker processes and survive restarts.
+
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 1000,
+        ttl_secs: Optional[float] = None,
+        disk_path: Optional[str] = None,
+    ):
+        self._max_entries = max_entries
+        self._ttl_secs = ttl_secs
+        self._disk_path = disk_path
+
+        # Entries with the time they were created (wall clock, so it can be
+        # shared with other processes).
+        self._entries: OrderedDict[str, Tuple[float, LLMCacheEntry]] = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+        if disk_path:
+            os.makedirs(disk_path, exist_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: str) -> LLMCacheEntry | None:
+        entry = None
+        item = self._entries.get(key)
+        if item and self._expired(item[0]):
+            del self._entries[key]
+        elif item:
+            self._entries.move_to_end(key)
+            entry = item[1]
+
+        if not entry and self._disk_path:
+            item = await asyncio.to_thread(self._read_file, key)
+            if item:
+                self._add(key, *item)
+                entry = item[1]
+
+        if entry:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return entry
+
+    def put(self, key: str, entry: LLMCacheEntry):
+        created = time.time()
+        self._add(key, created, entry)
+        if self._disk_path:
+            # We don't need to wait for this, the entry is already in memory.
+            asyncio.get_running_loop().run_in_executor(None, self._write_file, key, created, entry)
+
+    def clear(self):
+        self._entries.clear()
+
+    def _expired(self, created: float) -> bool:
+        return self._ttl_secs is not None and time.time() - created > self._ttl_secs
+
+    def _add(self, key: str, created: float, entry: LLMCacheEntry):
+        self._entries.pop(key, None)
+        self._entries[key] = (created, entry)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    #
+    # Disk store (these run in a thread)
+    #
+
+    def _file_path(self, key: str) -> str:
+        return os.path.join(self._disk_path, key + LLM_CACHE_FILE_SUFFIX)
+
+    def _read_file(self, key: str) -> Tuple[float, LLMCacheEntry] | None:
+        path = self._file_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if self._expired(data["created"]):
+                os.remove(path)
+                return None
+            entry = LLMCacheEntry(
+                chunks=data["chunks"],
+                function_calls=[LLMCacheFunctionCall(**c) for c in data["function_calls"]],
+            )
+            return (data["created"], entry)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"{self} unable to read {path}: {e}")
+            return None
+
+    def _write_file(self, key: str, created: float, entry: LLMCacheEntry):
+        data: Dict[str, Any] = {"created": created, **asdict(entry)}
+        try:
+            # Write to a temporary file first, so other processes never see
+            # partial files.
+            fd, tmp_path = tempfile.mkstemp(dir=self._disk_path, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, default=str)
+            os.replace(tmp_path, self._file_path(key))
+        except Exception as e:
+            logger.warning(f"{self} unable to write cache file: {e}")
@@ -4,8 +4,9 @@
 # SPDX-License-Identifier: BSD 2-Clause License
 #
 
-import asyncio
-from typing import AsyncGenerator
+import json
+from dataclasses import dataclass
+from typing import AsyncGenerator, Optional
 
 from loguru import logger
 
@@ -22,11 +23,16 @@ from pipecat.frames.frames import (
 )
 from pipecat.processors.frame_processor import FrameDirection
 from pipecat.services.ai_services import TTSService
+from pipecat.services.websocket_service import (
+    WebsocketPool,
+    WebsocketService,
+    credentials_hash,
+)
 from pipecat.transcriptions.language import Language
 
 # See .env.example for LMNT configuration needed
 try:
-    from lmnt.api import Speech
+    from lmnt.api import Speech, StreamingSynthesisConnection
 except ModuleNotFoundError as e:
     logger.error(f"Exception: {e}")
     logger.error(
@@ -35,7 +41,13 @@ except ModuleNotFoundError as e:
     raise Exception(f"Missing module: {e}")
 
 
-class LmntTTSService(TTSService):
+@dataclass
+class _LmntConnection:
+    speech: Speech
+    connection: StreamingSynthesisConnection
+
+
+class LmntTTSService(TTSService, WebsocketService):
     def __init__(
         self,
         *,
@@ -43,11 +55,13 @@ class LmntTTSService(TTSService):
         voice_id: str,
         sample_rate: int = 24000,
         language: Language = Language.EN,
+        websocket_pool: Optional[WebsocketPool] = None,
         **kwargs,
     ):
         # Let TTSService produce TTSStoppedFrames after a short delay of
         # no activity.
         super().__init__(push_stop_frames=True, sample_rate=sample_rate, **kwargs)
+        WebsocketService.__init__(self, pool=websocket_pool)
 
         self._api_key = api_key
         self._settings = {
@@ -61,9 +75,6 @@ class LmntTTSService(TTSService):
 
         self.set_voice(voice_id)
 
-        self._speech = None
-        self._connection = None
-        self._receive_task = None
         # Indicates if we have sent TTSStartedFrame. It will reset to False when
         # there's an interruption or TTSStoppedFrame.
         self._started = False
@@ -98,7 +109,7 @@ class LmntTTSService(TTSService):
 
     async def start(self, frame: StartFrame):
         await super().start(frame)
-        await self._connect()
+        await self._connect_websocket()
 
     async def stop(self, frame: EndFrame):
         await super().stop(frame)
@@ -113,67 +124,73 @@ class LmntTTSService(TTSService):
         if isinstance(frame, (TTSStoppedFrame, StartInterruptionFrame)):
             self._started = False
 
-    async def _connect(self):
+    async def _disconnect(self):
+        await self.stop_all_metrics()
+        await self._disconnect_websocket()
+        self._started = False
+
+    #
+    # Websocket service
+    #
+
+    def _websocket_pool_key(self) -> str:
+        # Connections are authenticated with the API key when they are opened.
+        settings = json.dumps(self._settings, sort_keys=True)
+        return (
+            f"{type(self).__name__} {self._voice_id} {settings} {credentials_hash(self._api_key)}"
+        )
+
+    async def _open_websocket(self):
+        # Each connection has its own client, since closing the client closes
+        # its connections.
+        speech = Speech(api_key=self._api_key)
         try:
-            self._speech = Speech()
-            self._connection = await self._speech.synthesize_streaming(
+            connection = await speech.synthesize_streaming(
                 self._voice_id,
                 format="raw",
                 sample_rate=self._settings["output_format"]["sample_rate"],
                 language=self._settings["language"],
             )
-            self._receive_task = self.get_event_loop().create_task(self._receive_task_handler())
-        except Exception as e:
-            logger.exception(f"{self} initialization error: {e}")
-            self._connection = None
+        except Exception:
+            await speech.close()
+            raise
+        return _LmntConnection(speech=speech, connection=connection)
 
-    async def _disconnect(self):
+    async def _close_websocket(self, websocket: "_LmntConnection"):
         try:
-            await self.stop_all_metrics()
-
-            if self._receive_task:
-                self._receive_task.cancel()
-                await self._receive_task
-                self._receive_task = None
-            if self._connection:
-                await self._connection.socket.close()
-                self._connection = None
-            if self._speech:
-                await self._speech.close()
-                self._speech = None
-            self._started = False
-        except Exception as e:
-            logger.exception(f"{self} error closing websocket: {e}")
+            await websocket.connection.socket.close()
+        finally:
+            await websocket.speech.close()
 
-    async def _receive_task_handler(self):
-        try:
-            async for msg in self._connection:
-                if "error" in msg:
-                    logger.error(f'{self} error: {msg["error"]}')
-                    await self.push_frame(TTSStoppedFrame())
-                    await self.stop_all_metrics()
-                    await self.push_error(ErrorFrame(f'{self} error: {msg["error"]}'))
-                elif "audio" in msg:
-                    await self.stop_ttfb_metrics()
-                    frame = TTSAudioRawFrame(
-                        audio=msg["audio"],
-                        sample_rate=self._settings["output_format"]["sample_rate"],
-                        num_channels=1,
-                    )
-                    await self.push_frame(frame)
-                else:
-                    logger.error(f"LMNT error, unknown message type: {msg}")
-        except asyncio.CancelledError:
-            pass
-        except Exception as e:
-            logger.exception(f"{self} exception: {e}")
+    async def _on_websocket_disconnected(self):
+        await self.stop_all_metrics()
+        self._started = False
+
+    async def _receive_messages(self):
+        async for msg in self._websocket.connection:
+            if "error" in msg:
+                logger.error(f'{self} error: {msg["error"]}')
+                await self.push_frame(TTSStoppedFrame())
+                await self.stop_all_metrics()
+                await self.push_error(ErrorFrame(f'{self} error: {msg["error"]}'))
+            elif "audio" in msg:
+                await self.stop_ttfb_metrics()
+                frame = TTSAudioRawFrame(
+                    audio=msg["audio"],
+                    sample_rate=self._settings["output_format"]["sample_rate"],
+                    num_channels=1,
+                )
+                await self.push_frame(frame)
+            else:
+                logger.error(f"LMNT error, unknown message type: {msg}")
 
     async def run_tts(self, text: str) -> AsyncGenerator[Frame, None]:
         logger.debug(f"Generating TTS: [{text}]")
 
         try:
-            if not self._connection:
-                await self._connect()
+            if not await self._wait_for_websocket():
+                logger.error(f"{self} unable to generate TTS: not connected")
+                return
 
             if not self._started:
                 await self.start_ttfb_metrics()
@@ -181,14 +198,14 @@ class LmntTTSService(TTSService):
                 self._started = True
 
             try:
-                await self._connection.append_text(text)
-                await self._connection.flush()
+                await self._websocket.connection.append_text(text)
+                await self._websocket.connection.flush()
                 await self.start_tts_usage_metrics(text)
             except Exception as e:
                 logger.error(f"{self} error sending message: {e}")
                 yield TTSStoppedFrame()
                 await self._disconnect()
-                await self._connect()
+                await self._connect_websocket()
                 return
             yield None
         except Exception as e:
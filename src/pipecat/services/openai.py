@@ -4,6 +4,7 @@
 # SPDX-License-Identifier: BSD 2-Clause License
 #
 
+import asyncio
 import base64
 import io
 import json
@@ -11,7 +12,6 @@ from dataclasses import dataclass
 from typing import Any, AsyncGenerator, Dict, List, Literal, Optional
 
 import aiohttp
-import httpx
 from loguru import logger
 from PIL import Image
 from pydantic import BaseModel, Field
@@ -25,6 +25,7 @@ from pipecat.frames.frames import (
     LLMFullResponseStartFrame,
     LLMMessagesFrame,
     LLMUpdateSettingsFrame,
+    MetricsFrame,
     StartInterruptionFrame,
     TextFrame,
     TTSAudioRawFrame,
@@ -35,17 +36,23 @@ from pipecat.frames.frames import (
     UserImageRequestFrame,
     VisionImageRawFrame,
 )
-from pipecat.metrics.metrics import LLMTokenUsage
+from pipecat.metrics.metrics import LLMPromptCacheMetricsData, LLMTokenUsage
+from pipecat.processors.aggregators.llm_context_store import ContextStore
+from pipecat.processors.aggregators.llm_context_window import LLMContextWindow
 from pipecat.processors.aggregators.llm_response import (
     LLMAssistantContextAggregator,
     LLMUserContextAggregator,
 )
 from pipecat.processors.aggregators.openai_llm_context import (
+    LLMFunctionCall,
     OpenAILLMContext,
     OpenAILLMContextFrame,
 )
 from pipecat.processors.frame_processor import FrameDirection
 from pipecat.services.ai_services import ImageGenService, LLMService, TTSService
+from pipecat.services.llm_cache import LLMCache
+from pipecat.utils.http_clients import get_http_client_registry
+from pipecat.utils.image_cache import get_image_cache
 
 try:
     from openai import (
@@ -53,7 +60,6 @@ try:
         AsyncOpenAI,
         AsyncStream,
         BadRequestError,
-        DefaultAsyncHttpxClient,
     )
     from openai.types.chat import ChatCompletionChunk, ChatCompletionMessageParam
 except ModuleNotFoundError as e:
@@ -64,6 +70,8 @@ except ModuleNotFoundError as e:
     raise Exception(f"Missing module: {e}")
 
 
+OPENAI_BASE_URL = "https://api.openai.com/v1"
+
 ValidVoice = Literal["alloy", "echo", "fable", "onyx", "nova", "shimmer"]
 
 VALID_VOICES: Dict[str, ValidVoice] = {
@@ -109,9 +117,13 @@ class BaseOpenAILLMService(LLMService):
         api_key=None,
         base_url=None,
         params: InputParams = InputParams(),
+        cache: Optional[LLMCache] = None,
         **kwargs,
     ):
         super().__init__(**kwargs)
+        self._cache = cache
+        self._total_cached_tokens = 0
+        self._total_prompt_tokens = 0
         self._settings = {
             "frequency_penalty": params.frequency_penalty,
             "presence_penalty": params.presence_penalty,
@@ -127,11 +139,7 @@ class BaseOpenAILLMService(LLMService):
         return AsyncOpenAI(
             api_key=api_key,
             base_url=base_url,
-            http_client=DefaultAsyncHttpxClient(
-                limits=httpx.Limits(
-                    max_keepalive_connections=100, max_connections=1000, keepalive_expiry=None
-                )
-            ),
+            http_client=get_http_client_registry().httpx_client(base_url or OPENAI_BASE_URL),
         )
 
     def can_generate_metrics(self) -> bool:
@@ -162,14 +170,17 @@ class BaseOpenAILLMService(LLMService):
     async def _stream_chat_completions(
         self, context: OpenAILLMContext
     ) -> AsyncStream[ChatCompletionChunk]:
-        logger.debug(f"Generating chat: {context.get_messages_for_logging()}")
+        # Copying and serializing the whole context is expensive, so it's only
+        # done if the debug level is enabled.
+        logger.opt(lazy=True).debug("Generating chat: {}", context.get_messages_for_logging)
 
         messages: List[ChatCompletionMessageParam] = context.get_messages()
 
-        # base64 encode any images
+        # base64 encode any images (only once, messages are changed in place)
         for message in messages:
             if message.get("mime_type") == "image/jpeg":
-                encoded_image = base64.b64encode(message["data"].getvalue()).decode("utf-8")
+                data = message["data"].getvalue()
+                encoded_image = (await asyncio.to_thread(base64.b64encode, data)).decode("utf-8")
                 text = message["content"]
                 message["content"] = [
                     {"type": "text", "text": text},
@@ -185,6 +196,31 @@ class BaseOpenAILLMService(LLMService):
 
         return chunks
 
+    def _cached_prompt_tokens(self, usage) -> Optional[int]:
+        # Only given by APIs with prompt caching, and not declared by older
+        # versions of the openai package.
+        details = getattr(usage, "prompt_tokens_details", None)
+        if isinstance(details, dict):
+            return details.get("cached_tokens")
+        return getattr(details, "cached_tokens", None)
+
+    async def _push_prompt_cache_metrics(self, cached_tokens: int, prompt_tokens: int):
+        self._total_cached_tokens += cached_tokens
+        self._total_prompt_tokens += prompt_tokens
+        if not (self.can_generate_metrics() and self.usage_metrics_enabled):
+            return
+        data = LLMPromptCacheMetricsData(
+            processor=self.name,
+            model=self.model_name or None,
+            value=cached_tokens / prompt_tokens if prompt_tokens else 0.0,
+            cached_tokens=cached_tokens,
+            prompt_tokens=prompt_tokens,
+            total_cached_tokens=self._total_cached_tokens,
+            total_prompt_tokens=self._total_prompt_tokens,
+        )
+        logger.debug(f"{self} prompt cache: {cached_tokens}/{prompt_tokens} tokens")
+        await self.push_frame(MetricsFrame(data=[data]))
+
     async def _process_context(self, context: OpenAILLMContext):
         functions_list = []
         arguments_list = []
@@ -202,12 +238,16 @@ class BaseOpenAILLMService(LLMService):
 
         async for chunk in chunk_stream:
             if chunk.usage:
+                cached_tokens = self._cached_prompt_tokens(chunk.usage)
                 tokens = LLMTokenUsage(
                     prompt_tokens=chunk.usage.prompt_tokens,
                     completion_tokens=chunk.usage.completion_tokens,
                     total_tokens=chunk.usage.total_tokens,
+                    cache_read_input_tokens=cached_tokens,
                 )
                 await self.start_llm_usage_metrics(tokens)
+                if cached_tokens is not None:
+                    await self._push_prompt_cache_metrics(cached_tokens, tokens.prompt_tokens)
 
             if len(chunk.choices) == 0:
                 continue
@@ -255,23 +295,25 @@ class BaseOpenAILLMService(LLMService):
             arguments_list.append(arguments)
             tool_id_list.append(tool_call_id)
 
-            for index, (function_name, arguments, tool_id) in enumerate(
-                zip(functions_list, arguments_list, tool_id_list), start=1
+            function_calls = []
+            for function_name, arguments, tool_id in zip(
+                functions_list, arguments_list, tool_id_list
             ):
-                if self.has_function(function_name):
-                    run_llm = False
-                    arguments = json.loads(arguments)
-                    await self.call_function(
-                        context=context,
-                        function_name=function_name,
-                        arguments=arguments,
-                        tool_call_id=tool_id,
-                        run_llm=run_llm,
-                    )
-                else:
+                if not self.has_function(function_name):
                     raise OpenAIUnhandledFunctionException(
                         f"The LLM tried to call a function named '{function_name}', but there isn't a callback registered for that function."
                     )
+                function_calls.append(
+                    LLMFunctionCall(
+                        function_name=function_name,
+                        tool_call_id=tool_id,
+                        arguments=json.loads(arguments),
+                    )
+                )
+
+            # Parallel function calls run concurrently and the LLM runs again
+            # once all of them have finished.
+            await self.call_functions(context=context, function_calls=function_calls)
 
     async def process_frame(self, frame: Frame, direction: FrameDirection):
         await super().process_frame(frame, direction)
@@ -282,7 +324,12 @@ class BaseOpenAILLMService(LLMService):
         elif isinstance(frame, LLMMessagesFrame):
             context = OpenAILLMContext.from_messages(frame.messages)
         elif isinstance(frame, VisionImageRawFrame):
-            context = OpenAILLMContext.from_image_frame(frame)
+            image = await get_image_cache().encode(
+                format=frame.format, size=frame.size, image=frame.image
+            )
+            # The data URL is encoded once by the image cache.
+            context = OpenAILLMContext()
+            context.add_encoded_image_message(image, text=frame.text)
         elif isinstance(frame, LLMUpdateSettingsFrame):
             await self._update_settings(frame.settings)
         else:
@@ -291,7 +338,10 @@ class BaseOpenAILLMService(LLMService):
         if context:
             await self.push_frame(LLMFullResponseStartFrame())
             await self.start_processing_metrics()
-            await self._process_context(context)
+            if self._cache is not None:
+                await self._process_context_with_cache(context, self._process_context)
+            else:
+                await self._process_context(context)
             await self.stop_processing_metrics()
             await self.push_frame(LLMFullResponseEndFrame())
 
@@ -320,15 +370,76 @@ class OpenAILLMService(BaseOpenAILLMService):
 
     @staticmethod
     def create_context_aggregator(
-        context: OpenAILLMContext, *, assistant_expect_stripped_words: bool = True
+        context: OpenAILLMContext,
+        *,
+        assistant_expect_stripped_words: bool = True,
+        context_window: Optional[LLMContextWindow] = None,
+        context_store: Optional[ContextStore] = None,
+        conversation_id: Optional[str] = None,
     ) -> OpenAIContextAggregatorPair:
-        user = OpenAIUserContextAggregator(context)
+        user = OpenAIUserContextAggregator(
+            context,
+            context_window=context_window,
+            context_store=context_store,
+            conversation_id=conversation_id,
+        )
         assistant = OpenAIAssistantContextAggregator(
-            user, expect_stripped_words=assistant_expect_stripped_words
+            user,
+            expect_stripped_words=assistant_expect_stripped_words,
+            context_store=context_store,
+            conversation_id=conversation_id,
         )
         return OpenAIContextAggregatorPair(_user=user, _assistant=assistant)
 
 
+class OpenAIContextSummarizer:
+    """Summarizes the messages removed from a context by an `LLMContextWindow`
+    with a (cheap) OpenAI model. It can be used with any OpenAI-compatible
+    API by giving its `base_url`.
+
+    """
+
+    DEFAULT_PROMPT = (
+        "Summarize the following conversation between a user and an assistant "
+        "in a few sentences. Keep names, numbers, decisions and anything the "
+        "assistant will need to continue the conversation. If the conversation "
+        "starts with a previous summary, include it in the new one."
+    )
+
+    def __init__(
+        self,
+        *,
+        api_key: str | None = None,
+        base_url: str | None = None,
+        model: str = "gpt-4o-mini",
+        prompt: str = DEFAULT_PROMPT,
+    ):
+        self._client = AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            http_client=get_http_client_registry().httpx_client(base_url or OPENAI_BASE_URL),
+        )
+        self._model = model
+        self._prompt = prompt
+
+    async def __call__(self, messages: List[dict]) -> str:
+        lines = []
+        for message in messages:
+            content = message.get("content") or message.get("tool_calls")
+            if not isinstance(content, str):
+                content = json.dumps(content)
+            lines.append(f"{message['role']}: {content}")
+        conversation = "\n".join(lines)
+        response = await self._client.chat.completions.create(
+            model=self._model,
+            messages=[
+                {"role": "system", "content": self._prompt},
+                {"role": "user", "content": conversation},
+            ],
+        )
+        return response.choices[0].message.content or ""
+
+
 class OpenAIImageGenService(ImageGenService):
     def __init__(
         self,
@@ -394,7 +505,10 @@ class OpenAITTSService(TTSService):
         self.set_model_name(model)
         self.set_voice(voice)
 
-        self._client = AsyncOpenAI(api_key=api_key)
+        self._client = AsyncOpenAI(
+            api_key=api_key,
+            http_client=get_http_client_registry().httpx_client(OPENAI_BASE_URL),
+        )
 
     def can_generate_metrics(self) -> bool:
         return True
@@ -445,8 +559,8 @@ class OpenAIImageMessageFrame(Frame):
 
 
 class OpenAIUserContextAggregator(LLMUserContextAggregator):
-    def __init__(self, context: OpenAILLMContext):
-        super().__init__(context=context)
+    def __init__(self, context: OpenAILLMContext, **kwargs):
+        super().__init__(context=context, **kwargs)
 
     async def process_frame(self, frame, direction):
         await super().process_frame(frame, direction)
@@ -560,12 +674,12 @@ class OpenAIAssistantContextAggregator(LLMAssistantContextAggregator):
             if self._pending_image_frame_message:
                 frame = self._pending_image_frame_message
                 self._pending_image_frame_message = None
-                self._context.add_image_frame_message(
+                image = await get_image_cache().encode(
                     format=frame.user_image_raw_frame.format,
                     size=frame.user_image_raw_frame.size,
                     image=frame.user_image_raw_frame.image,
-                    text=frame.text,
                 )
+                self._context.add_encoded_image_message(image, text=frame.text)
                 run_llm = True
 
             if run_llm:
@@ -10,10 +10,12 @@ import json
 import time
 
 from dataclasses import dataclass
+from typing import List, Optional, Type
 
 import websockets
 
 from pipecat.frames.frames import (
+    AudioRawFrame,
     BotStoppedSpeakingFrame,
     CancelFrame,
     EndFrame,
@@ -25,6 +27,7 @@ from pipecat.frames.frames import (
     LLMMessagesAppendFrame,
     LLMSetToolsFrame,
     LLMUpdateSettingsFrame,
+    OutputAudioRawFrame,
     StartFrame,
     StartInterruptionFrame,
     StopInterruptionFrame,
@@ -37,7 +40,9 @@ from pipecat.frames.frames import (
     UserStoppedSpeakingFrame,
 )
 from pipecat.metrics.metrics import LLMTokenUsage
+from pipecat.processors.aggregators.llm_context_store import ContextStore
 from pipecat.processors.aggregators.openai_llm_context import (
+    LLMFunctionCall,
     OpenAILLMContext,
     OpenAILLMContextFrame,
 )
@@ -104,6 +109,17 @@ class OpenAIRealtimeBetaLLMService(LLMService):
     def can_generate_metrics(self) -> bool:
         return True
 
+    # The Realtime API only supports 24 kHz for PCM audio.
+    def accepted_audio_sample_rates(self, frame_type: Type[AudioRawFrame]) -> List[int] | None:
+        if issubclass(frame_type, InputAudioRawFrame):
+            return [24000]
+        return None
+
+    def produced_audio_sample_rate(self, frame_type: Type[AudioRawFrame]) -> int | None:
+        if issubclass(frame_type, OutputAudioRawFrame):
+            return 24000
+        return None
+
     def set_audio_input_paused(self, paused: bool):
         self._audio_input_paused = paused
 
@@ -413,6 +429,7 @@ class OpenAIRealtimeBetaLLMService(LLMService):
             prompt_tokens=evt.response.usage.input_tokens,
             completion_tokens=evt.response.usage.output_tokens,
             total_tokens=evt.response.usage.total_tokens,
+            cache_read_input_tokens=evt.response.usage.input_token_details.cached_tokens,
         )
         await self.start_llm_usage_metrics(tokens)
         await self.stop_processing_metrics()
@@ -466,33 +483,21 @@ class OpenAIRealtimeBetaLLMService(LLMService):
         await self._handle_function_call_items(function_calls)
 
     async def _handle_function_call_items(self, items):
-        total_items = len(items)
-        for index, item in enumerate(items):
-            function_name = item.name
-            tool_id = item.call_id
-            arguments = json.loads(item.arguments)
-            if self.has_function(function_name):
-                run_llm = index == total_items - 1
-                if function_name in self._callbacks.keys():
-                    await self.call_function(
-                        context=self._context,
-                        tool_call_id=tool_id,
-                        function_name=function_name,
-                        arguments=arguments,
-                        run_llm=run_llm,
-                    )
-                elif None in self._callbacks.keys():
-                    await self.call_function(
-                        context=self._context,
-                        tool_call_id=tool_id,
-                        function_name=function_name,
-                        arguments=arguments,
-                        run_llm=run_llm,
-                    )
-            else:
+        function_calls = []
+        for item in items:
+            if not self.has_function(item.name):
                 raise OpenAIUnhandledFunctionException(
-                    f"The LLM tried to call a function named '{function_name}', but there isn't a callback registered for that function."
+                    f"The LLM tried to call a function named '{item.name}', but there isn't a callback registered for that function."
                 )
+            function_calls.append(
+                LLMFunctionCall(
+                    function_name=item.name,
+                    tool_call_id=item.call_id,
+                    arguments=json.loads(item.arguments),
+                )
+            )
+        # Only the last result to arrive runs the LLM.
+        await self.call_functions(context=self._context, function_calls=function_calls)
 
     #
     # state and client events for the current conversation
@@ -526,7 +531,7 @@ class OpenAIRealtimeBetaLLMService(LLMService):
             await self._update_settings()
             self._context.llm_needs_settings_update = False
 
-        logger.debug(f"Creating response: {self._context.get_messages_for_logging()}")
+        logger.opt(lazy=True).debug("Creating response: {}", self._context.get_messages_for_logging)
 
         await self.push_frame(LLMFullResponseStartFrame())
         await self.start_processing_metrics()
@@ -542,11 +547,21 @@ class OpenAIRealtimeBetaLLMService(LLMService):
         await self.send_client_event(events.InputAudioBufferAppendEvent(audio=payload))
 
     def create_context_aggregator(
-        self, context: OpenAILLMContext, *, assistant_expect_stripped_words: bool = False
+        self,
+        context: OpenAILLMContext,
+        *,
+        assistant_expect_stripped_words: bool = False,
+        context_store: Optional[ContextStore] = None,
+        conversation_id: Optional[str] = None,
     ) -> OpenAIContextAggregatorPair:
         OpenAIRealtimeLLMContext.upgrade_to_realtime(context)
-        user = OpenAIRealtimeUserContextAggregator(context)
+        user = OpenAIRealtimeUserContextAggregator(
+            context, context_store=context_store, conversation_id=conversation_id
+        )
         assistant = OpenAIRealtimeAssistantContextAggregator(
-            user, expect_stripped_words=assistant_expect_stripped_words
+            user,
+            expect_stripped_words=assistant_expect_stripped_words,
+            context_store=context_store,
+            conversation_id=conversation_id,
         )
         return OpenAIContextAggregatorPair(_user=user, _assistant=assistant)
@@ -4,13 +4,11 @@
 # SPDX-License-Identifier: BSD 2-Clause License
 #
 
-import asyncio
 import io
 import json
 import struct
 from typing import AsyncGenerator, Optional
 
-import aiohttp
 import websockets
 from loguru import logger
 from pydantic.main import BaseModel
@@ -28,7 +26,13 @@ from pipecat.frames.frames import (
 )
 from pipecat.processors.frame_processor import FrameDirection
 from pipecat.services.ai_services import TTSService
+from pipecat.services.websocket_service import (
+    WebsocketPool,
+    WebsocketService,
+    credentials_hash,
+)
 from pipecat.transcriptions.language import Language
+from pipecat.utils.http_clients import get_http_client_registry
 
 try:
     from pyht.async_client import AsyncClient
@@ -102,7 +106,7 @@ def language_to_playht_language(language: Language) -> str | None:
     return None
 
 
-class PlayHTTTSService(TTSService):
+class PlayHTTTSService(TTSService, WebsocketService):
     class InputParams(BaseModel):
         language: Optional[Language] = Language.EN
         speed: Optional[float] = 1.0
@@ -118,15 +122,15 @@ class PlayHTTTSService(TTSService):
         sample_rate: int = 16000,
         output_format: str = "wav",
         params: InputParams = InputParams(),
+        websocket_pool: Optional[WebsocketPool] = None,
         **kwargs,
     ):
         super().__init__(sample_rate=sample_rate, **kwargs)
+        WebsocketService.__init__(self, pool=websocket_pool)
 
         self._api_key = api_key
         self._user_id = user_id
         self._websocket_url = None
-        self._websocket = None
-        self._receive_task = None
 
         self._settings = {
             "sample_rate": sample_rate,
@@ -150,7 +154,7 @@ class PlayHTTTSService(TTSService):
 
     async def start(self, frame: StartFrame):
         await super().start(frame)
-        await self._connect()
+        await self._connect_websocket()
 
     async def stop(self, frame: EndFrame):
         await super().stop(frame)
@@ -160,58 +164,29 @@ class PlayHTTTSService(TTSService):
         await super().cancel(frame)
         await self._disconnect()
 
-    async def _connect(self):
-        try:
-            if not self._websocket_url:
-                await self._get_websocket_url()
-
-            if not isinstance(self._websocket_url, str):
-                raise ValueError("WebSocket URL is not a string")
-
-            self._websocket = await websockets.connect(self._websocket_url)
-            self._receive_task = self.get_event_loop().create_task(self._receive_task_handler())
-            logger.debug("Connected to TTS WebSocket")
-        except ValueError as ve:
-            logger.error(f"{self} initialization error: {ve}")
-            self._websocket = None
-        except Exception as e:
-            logger.error(f"{self} initialization error: {e}")
-            self._websocket = None
-
     async def _disconnect(self):
-        try:
-            await self.stop_all_metrics()
-
-            if self._websocket:
-                await self._websocket.close()
-                self._websocket = None
-
-            if self._receive_task:
-                self._receive_task.cancel()
-                await self._receive_task
-                self._receive_task = None
-
-        except Exception as e:
-            logger.error(f"{self} error closing websocket: {e}")
+        await self.stop_all_metrics()
+        await self._disconnect_websocket()
 
     async def _get_websocket_url(self):
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                "https://api.play.ht/api/v3/websocket-auth",
-                headers={
-                    "Authorization": f"Bearer {self._api_key}",
-                    "X-User-Id": self._user_id,
-                    "Content-Type": "application/json",
-                },
-            ) as response:
-                if response.status in (200, 201):
-                    data = await response.json()
-                    if "websocket_url" in data and isinstance(data["websocket_url"], str):
-                        self._websocket_url = data["websocket_url"]
-                    else:
-                        raise ValueError("Invalid or missing WebSocket URL in response")
+        url = "https://api.play.ht/api/v3/websocket-auth"
+        session = get_http_client_registry().aiohttp_session(url)
+        async with session.post(
+            url,
+            headers={
+                "Authorization": f"Bearer {self._api_key}",
+                "X-User-Id": self._user_id,
+                "Content-Type": "application/json",
+            },
+        ) as response:
+            if response.status in (200, 201):
+                data = await response.json()
+                if "websocket_url" in data and isinstance(data["websocket_url"], str):
+                    self._websocket_url = data["websocket_url"]
                 else:
-                    raise Exception(f"Failed to get WebSocket URL: {response.status}")
+                    raise ValueError("Invalid or missing WebSocket URL in response")
+            else:
+                raise Exception(f"Failed to get WebSocket URL: {response.status}")
 
     def _get_websocket(self):
         if self._websocket:
@@ -222,46 +197,70 @@ class PlayHTTTSService(TTSService):
         await super()._handle_interruption(frame, direction)
         await self.stop_all_metrics()
 
-    async def _receive_task_handler(self):
+    #
+    # Websocket service
+    #
+
+    def _websocket_pool_key(self) -> str:
+        # Commands include all the settings, so any connection of the same
+        # account can be used.
+        return f"{type(self).__name__} {self._user_id}"
+
+    async def _open_websocket(self):
+        if not self._websocket_url:
+            await self._get_websocket_url()
+
         try:
-            header_size = 78  # Size of the WAV header + extra bytes we want to skip
-            header_received = False
-            async for message in self._get_websocket():
-                if isinstance(message, bytes):
-                    chunk_size = len(message)
-
-                    # Skip the WAV header
-                    if not header_received and chunk_size == header_size:
-                        header_received = True
-                        continue
+            websocket = await websockets.connect(self._websocket_url)
+        except Exception:
+            # The URL might have expired, get a new one next time.
+            self._websocket_url = None
+            raise
+        logger.debug("Connected to TTS WebSocket")
+        return websocket
+
+    async def _close_websocket(self, websocket):
+        await websocket.close()
+
+    async def _on_websocket_disconnected(self):
+        await self.stop_all_metrics()
 
-                    await self.stop_ttfb_metrics()
-                    frame = TTSAudioRawFrame(message, self._settings["sample_rate"], 1)
-                    await self.push_frame(frame)
-                else:
-                    logger.debug(f"Received text message: {message}")
-                    try:
-                        msg = json.loads(message)
-                        if "request_id" in msg:
-                            await self.push_frame(TTSStoppedFrame())
-                            header_received = False  # Reset for the next audio stream
-                        elif "error" in msg:
-                            logger.error(f"{self} error: {msg}")
-                            await self.push_error(ErrorFrame(f'{self} error: {msg["error"]}'))
-                    except json.JSONDecodeError:
-                        logger.error(f"Invalid JSON message: {message}")
-        except asyncio.CancelledError:
-            pass
-        except Exception as e:
-            logger.error(f"{self} exception in receive task: {e}")
+    async def _receive_messages(self):
+        header_size = 78  # Size of the WAV header + extra bytes we want to skip
+        header_received = False
+        async for message in self._get_websocket():
+            if isinstance(message, bytes):
+                chunk_size = len(message)
+
+                # Skip the WAV header
+                if not header_received and chunk_size == header_size:
+                    header_received = True
+                    continue
+
+                await self.stop_ttfb_metrics()
+                frame = TTSAudioRawFrame(message, self._settings["sample_rate"], 1)
+                await self.push_frame(frame)
+            else:
+                logger.debug(f"Received text message: {message}")
+                try:
+                    msg = json.loads(message)
+                    if "request_id" in msg:
+                        await self.push_frame(TTSStoppedFrame())
+                        header_received = False  # Reset for the next audio stream
+                    elif "error" in msg:
+                        logger.error(f"{self} error: {msg}")
+                        await self.push_error(ErrorFrame(f'{self} error: {msg["error"]}'))
+                except json.JSONDecodeError:
+                    logger.error(f"Invalid JSON message: {message}")
 
     async def run_tts(self, text: str) -> AsyncGenerator[Frame, None]:
         logger.debug(f"Generating TTS: [{text}]")
 
         try:
-            # Reconnect if the websocket is closed
-            if not self._websocket or self._websocket.closed:
-                await self._connect()
+            # Wait if we are reconnecting
+            if not await self._wait_for_websocket():
+                yield ErrorFrame(f"{self} error: not connected")
+                return
 
             await self.start_ttfb_metrics()
             yield TTSStartedFrame()
@@ -283,11 +282,10 @@ class PlayHTTTSService(TTSService):
             except Exception as e:
                 logger.error(f"{self} error sending message: {e}")
                 yield TTSStoppedFrame()
-                await self._disconnect()
-                await self._connect()
+                await self._reconnect_websocket()
                 return
 
-            # The actual audio frames will be handled in _receive_task_handler
+            # The actual audio frames will be handled in _receive_messages
             yield None
 
         except Exception as e:
@@ -319,9 +317,12 @@ class PlayHTHttpTTSService(TTSService):
         self._user_id = user_id
         self._api_key = api_key
 
-        self._client = AsyncClient(
-            user_id=self._user_id,
-            api_key=self._api_key,
+        # The client keeps its own connections, so it's shared by all the
+        # services with the same credentials.
+        credentials = credentials_hash(f"{user_id}:{api_key}")
+        self._client = get_http_client_registry().shared_client(
+            f"pyht:{credentials}",
+            lambda: AsyncClient(user_id=self._user_id, api_key=self._api_key),
         )
         self._settings = {
             "sample_rate": sample_rate,
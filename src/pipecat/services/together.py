@@ -6,16 +6,16 @@
 
 from typing import Any, Dict, Optional
 
-import httpx
 from loguru import logger
 from pydantic import BaseModel, Field
 
 from pipecat.services.openai import OpenAILLMService
+from pipecat.utils.http_clients import get_http_client_registry
 
 try:
     # Together.ai is recommending OpenAI-compatible function calling, so we've switched over
     # to using the OpenAI client library here rather than the Together Python client library.
-    from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+    from openai import AsyncOpenAI
 except ModuleNotFoundError as e:
     logger.error(f"Exception: {e}")
     logger.error(
@@ -68,9 +68,5 @@ class TogetherLLMService(OpenAILLMService):
         return AsyncOpenAI(
             api_key=api_key,
             base_url=base_url,
-            http_client=DefaultAsyncHttpxClient(
-                limits=httpx.Limits(
-                    max_keepalive_connections=100, max_connections=1000, keepalive_expiry=None
-                )
-            ),
+            http_client=get_http_client_registry().httpx_client(base_url),
         )
@@ -0,0 +1,251 @@
+#
+# Copyright (c) 2024, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+import asyncio
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import tempfile
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, List, Mapping, Optional, Tuple
+
+from loguru import logger
+
+# Cached audio files start with this, followed by the length of a JSON header
+# (32-bit big-endian integer), the JSON header and the audio.
+TTS_CACHE_FILE_MAGIC = b"PCTTS1"
+TTS_CACHE_FILE_SUFFIX = ".tts"
+
+
+@dataclass
+class TTSCacheEntry:
+    """Audio (16-bit PCM) generated by a TTS service for a piece of text. The
+    audio is split in frames of `frame_sizes` bytes, the same way the service
+    generated it. `words` are the word timestamps (in seconds from the
+    beginning of the audio) reported by word timestamp services.
+
+    Entries read from disk keep their audio memory-mapped (a `memoryview`), so
+    it's only copied one frame at a time when it's played.
+
+    """
+
+    audio: bytes | memoryview
+    sample_rate: int
+    num_channels: int
+    frame_sizes: List[int] = field(default_factory=list)
+    words: List[Tuple[str, float]] = field(default_factory=list)
+
+    @property
+    def size(self) -> int:
+        return len(self.audio)
+
+    def frames(self) -> List[bytes]:
+        frames = []
+        offset = 0
+        for size in self.frame_sizes:
+            frames.append(bytes(self.audio[offset : offset + size]))
+            offset += size
+        if offset < len(self.audio):
+            frames.append(bytes(self.audio[offset:]))
+        return frames
+
+
+def tts_cache_key(
+    text: str, *, voice: str, model: str, sample_rate: int, settings: Mapping[str, Any]
+) -> str:
+    """Returns the cache key of some text synthesized with the given voice,
+    model, sample rate and settings (which include the language). Whitespace
+    is normalized, so the spaces TTS services get between sentences don't
+    matter.
+
+    >>> a = tts_cache_key(" Hello  there.", voice="v", model="m", sample_rate=16000, settings={})
+    >>> b = tts_cache_key("Hello there. ", voice="v", model="m", sample_rate=16000, settings={})
+    >>> a == b
+    True
+    >>> a == tts_cache_key("Hello there.", voice="v2", model="m", sample_rate=16000, settings={})
+    False
+
+    """
+    normalized = re.sub(r"\s+", " ", text).strip()
+    data = json.dumps(
+        {
+            "text": normalized,
+            "voice": voice,
+            "model": model,
+            "sample_rate": sample_rate,
+            "settings": settings,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+class TTSCache:
+    """Cache of synthesized audio that can be given to TTS services (and
+    shared between them) so phrases that are said often (greetings,
+    confirmations, error messages...) don't need to be synthesized every
+    time.
+
+    Entries are kept in memory in a least-recently-used list of up to
+    `max_bytes` of audio. If `disk_path` is given, entries are also written to
+    that directory, so they survive restarts and can be shared by multiple
+    worker processes. Files are written atomically and the audio is used
+    directly from a memory map of the file, so it's not read into each
+    process and processes share the same pages of the page cache. If
+    `disk_max_bytes` is given, the least recently used files are removed when
+    the directory grows larger.
+
+    """
+
+    def __init__(
+        self,
+        *,
+        max_bytes: int = 32 * 1024 * 1024,
+        disk_path: Optional[str] = None,
+        disk_max_bytes: Optional[int] = None,
+    ):
+        self._max_bytes = max_bytes
+        self._disk_path = disk_path
+        self._disk_max_bytes = disk_max_bytes
+
+        self._entries: OrderedDict[str, TTSCacheEntry] = OrderedDict()
+        self._size = 0
+
+        self.hits = 0
+        self.misses = 0
+
+        if disk_path:
+            os.makedirs(disk_path, exist_ok=True)
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: str) -> TTSCacheEntry | None:
+        entry = self._entries.get(key)
+        if entry:
+            self._entries.move_to_end(key)
+        elif self._disk_path:
+            entry = await asyncio.to_thread(self._read_file, key)
+            if entry:
+                self._add(key, entry)
+
+        if entry:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return entry
+
+    def put(self, key: str, entry: TTSCacheEntry):
+        self._add(key, entry)
+        if self._disk_path:
+            # We don't need to wait for this, the entry is already in memory.
+            asyncio.get_running_loop().run_in_executor(None, self._write_file, key, entry)
+
+    def clear(self):
+        self._entries.clear()
+        self._size = 0
+
+    def _add(self, key: str, entry: TTSCacheEntry):
+        if entry.size > self._max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous:
+            self._size -= previous.size
+        self._entries[key] = entry
+        self._size += entry.size
+        while self._size > self._max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= evicted.size
+
+    #
+    # Disk store (these run in a thread)
+    #
+
+    def _file_path(self, key: str) -> str:
+        return os.path.join(self._disk_path, key + TTS_CACHE_FILE_SUFFIX)
+
+    def _read_file(self, key: str) -> TTSCacheEntry | None:
+        path = self._file_path(key)
+        try:
+            with open(path, "rb") as f:
+                m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic_len = len(TTS_CACHE_FILE_MAGIC)
+            if m[:magic_len] != TTS_CACHE_FILE_MAGIC:
+                m.close()
+                raise ValueError("invalid file")
+            (header_len,) = struct.unpack_from(">I", m, magic_len)
+            offset = magic_len + 4
+            header = json.loads(m[offset : offset + header_len])
+            # The map stays open as long as the entry (through the view) is
+            # alive. It remains valid if the file is replaced or removed.
+            audio = memoryview(m)[offset + header_len :]
+            # Keep track of when it was last used, for disk eviction.
+            os.utime(path)
+            return TTSCacheEntry(
+                audio=audio,
+                sample_rate=header["sample_rate"],
+                num_channels=header["num_channels"],
+                frame_sizes=header["frame_sizes"],
+                words=[(w, t) for w, t in header["words"]],
+            )
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"{self} unable to read {path}: {e}")
+            return None
+
+    def _write_file(self, key: str, entry: TTSCacheEntry):
+        header = json.dumps(
+            {
+                "sample_rate": entry.sample_rate,
+                "num_channels": entry.num_channels,
+                "frame_sizes": entry.frame_sizes,
+                "words": entry.words,
+            }
+        ).encode("utf-8")
+        try:
+            # Write to a temporary file first, so other processes never see
+            # partial files.
+            fd, tmp_path = tempfile.mkstemp(dir=self._disk_path, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(TTS_CACHE_FILE_MAGIC)
+                f.write(struct.pack(">I", len(header)))
+                f.write(header)
+                f.write(entry.audio)
+            os.replace(tmp_path, self._file_path(key))
+            if self._disk_max_bytes is not None:
+                self._evict_files()
+        except Exception as e:
+            logger.warning(f"{self} unable to write cache file: {e}")
+
+    def _evict_files(self):
+        files = []
+        total = 0
+        with os.scandir(self._disk_path) as it:
+            for f in it:
+                if f.name.endswith(TTS_CACHE_FILE_SUFFIX):
+                    stat = f.stat()
+                    files.append((stat.st_mtime, stat.st_size, f.path))
+                    total += stat.st_size
+        files.sort()
+        for _, size, path in files:
+            if total <= self._disk_max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
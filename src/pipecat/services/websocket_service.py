@@ -0,0 +1,323 @@
+#
+# Copyright (c) 2024, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+import asyncio
+import hashlib
+import random
+import time
+
+from abc import abstractmethod
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from loguru import logger
+
+WebsocketConnect = Callable[[], Awaitable[Any]]
+WebsocketClose = Callable[[Any], Awaitable[None]]
+
+
+def credentials_hash(credentials: str) -> str:
+    """Returns a hash of some credentials (e.g. an API key) to be used in
+    pool keys, so connections authenticated with different credentials are
+    not shared and the credentials are not kept in the key.
+
+    >>> credentials_hash("key") == credentials_hash("key")
+    True
+    >>> credentials_hash("key") == credentials_hash("other key")
+    False
+
+    """
+    return hashlib.sha256(credentials.encode("utf-8")).hexdigest()[:16]
+
+
+class WebsocketPool:
+    """Keeps connected (and, if the service requires it, authenticated)
+    websockets ready to be used, so sessions don't need to wait for the TLS
+    and websocket handshakes. The same pool is meant to be shared by all the
+    services of a process.
+
+    Connections are grouped by a key given by the services (e.g. URL, voice
+    and settings), since they are usually bound to them. Every time a
+    connection is taken, a new one is opened in the background so there are
+    always `size` connections ready for each key. Connections are never
+    returned to the pool, and idle connections older than `max_idle_secs`
+    are closed instead of being used. Services whose servers close idle
+    connections sooner can give a lower limit for their own connections.
+
+    """
+
+    def __init__(self, *, size: int = 1, max_idle_secs: float = 60.0):
+        self._size = size
+        self._max_idle_secs = max_idle_secs
+        # Idle connections by key: (expiration time, websocket, close).
+        self._idle: Dict[str, List[Tuple[float, Any, WebsocketClose]]] = {}
+        self._connecting: Dict[str, int] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    def idle_count(self, key: str) -> int:
+        return len(self._idle.get(key, []))
+
+    async def acquire(
+        self,
+        key: str,
+        connect: WebsocketConnect,
+        close: WebsocketClose,
+        max_idle_secs: Optional[float] = None,
+    ) -> Any:
+        """Returns a connection for the given key, opening one if none is
+        ready, and starts opening a replacement in the background. Idle
+        connections are kept for `max_idle_secs`, if given, or the pool's
+        default otherwise.
+
+        """
+        websocket = None
+        idle = self._idle.get(key, [])
+        while idle and not websocket:
+            expiration, candidate, candidate_close = idle.pop(0)
+            if time.monotonic() < expiration:
+                websocket = candidate
+            else:
+                await self._close(candidate, candidate_close)
+
+        self.fill(key, connect, close, max_idle_secs)
+
+        if not websocket:
+            websocket = await connect()
+        return websocket
+
+    def fill(
+        self,
+        key: str,
+        connect: WebsocketConnect,
+        close: WebsocketClose,
+        max_idle_secs: Optional[float] = None,
+    ):
+        """Opens connections in the background until there are `size`
+        connections ready for the given key.
+
+        """
+        if max_idle_secs is None:
+            max_idle_secs = self._max_idle_secs
+        missing = self._size - self.idle_count(key) - self._connecting.get(key, 0)
+        for _ in range(missing):
+            self._connecting[key] = self._connecting.get(key, 0) + 1
+            task = asyncio.get_running_loop().create_task(
+                self._open(key, connect, close, max_idle_secs)
+            )
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def close(self):
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        idle = self._idle
+        self._idle = {}
+        for websockets in idle.values():
+            for _, websocket, close in websockets:
+                await self._close(websocket, close)
+
+    async def _open(
+        self, key: str, connect: WebsocketConnect, close: WebsocketClose, max_idle_secs: float
+    ):
+        try:
+            websocket = await connect()
+            expiration = time.monotonic() + max_idle_secs
+            self._idle.setdefault(key, []).append((expiration, websocket, close))
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.warning(f"{self} unable to open websocket: {e}")
+        finally:
+            self._connecting[key] -= 1
+
+    async def _close(self, websocket: Any, close: WebsocketClose):
+        try:
+            await close(websocket)
+        except Exception as e:
+            logger.warning(f"{self} error closing websocket: {e}")
+
+
+class WebsocketService:
+    """Connection lifecycle for services that use a websocket (or any other
+    long-lived connection). It is meant to be mixed in with a service class,
+    which needs to call `WebsocketService.__init__()` and implement:
+
+    - `_open_websocket()`: connects (and authenticates) a new websocket.
+    - `_close_websocket()`: closes a websocket.
+    - `_receive_messages()`: handles messages from `self._websocket` until
+      the connection is closed.
+
+    Services should call `_connect_websocket()` when they start, which tries
+    to connect right away and then keeps the connection alive in the
+    background: if the connection is lost (or can't be established) it is
+    opened again with exponential backoff. If `keepalive_secs` is given,
+    `_send_keepalive()` is called periodically. If a `WebsocketPool` is given,
+    connections are taken from it (see `_websocket_pool_key()`).
+
+    """
+
+    def __init__(
+        self,
+        *,
+        pool: Optional[WebsocketPool] = None,
+        keepalive_secs: Optional[float] = None,
+        reconnect_initial_delay_secs: float = 0.5,
+        reconnect_max_delay_secs: float = 10.0,
+    ):
+        self._websocket: Any = None
+        self._websocket_pool = pool
+        self._keepalive_secs = keepalive_secs
+        self._reconnect_initial_delay_secs = reconnect_initial_delay_secs
+        self._reconnect_max_delay_secs = reconnect_max_delay_secs
+
+        self._websocket_connected = asyncio.Event()
+        self._websocket_task: Optional[asyncio.Task] = None
+        self._keepalive_task: Optional[asyncio.Task] = None
+
+    @abstractmethod
+    async def _open_websocket(self) -> Any:
+        pass
+
+    @abstractmethod
+    async def _close_websocket(self, websocket: Any):
+        pass
+
+    @abstractmethod
+    async def _receive_messages(self):
+        pass
+
+    async def _send_keepalive(self):
+        pass
+
+    def _websocket_pool_key(self) -> str:
+        """Connections from the pool are only used by services with the same
+        key, so it should include everything the connection depends on
+        (including the credentials, see `credentials_hash()`).
+
+        """
+        return f"{type(self).__name__}"
+
+    def _websocket_pool_max_idle_secs(self) -> Optional[float]:
+        """How long pooled connections can be idle before they are closed by
+        the server, if it's less than the pool's `max_idle_secs`.
+
+        """
+        return None
+
+    async def _on_websocket_disconnected(self):
+        """Called when the connection is lost, before reconnecting."""
+        pass
+
+    async def _connect_websocket(self):
+        if self._websocket_task:
+            return
+
+        try:
+            await self._set_websocket(await self._acquire_websocket())
+        except Exception as e:
+            logger.error(f"{self} unable to connect: {e}")
+
+        loop = asyncio.get_running_loop()
+        self._websocket_task = loop.create_task(self._websocket_task_handler())
+        if self._keepalive_secs:
+            self._keepalive_task = loop.create_task(self._keepalive_task_handler())
+
+    async def _disconnect_websocket(self):
+        for task in [self._keepalive_task, self._websocket_task]:
+            if task:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+        self._keepalive_task = None
+        self._websocket_task = None
+        await self._drop_websocket()
+
+    async def _reconnect_websocket(self):
+        await self._disconnect_websocket()
+        await self._connect_websocket()
+
+    async def _wait_for_websocket(self, timeout: float = 5.0) -> bool:
+        """Waits until there's a connection (e.g. if we are reconnecting) and
+        returns whether there is one.
+
+        """
+        if self._websocket:
+            return True
+        if not self._websocket_task:
+            await self._connect_websocket()
+        try:
+            await asyncio.wait_for(self._websocket_connected.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self._websocket is not None
+
+    async def _acquire_websocket(self) -> Any:
+        if self._websocket_pool:
+            return await self._websocket_pool.acquire(
+                self._websocket_pool_key(),
+                self._open_websocket,
+                self._close_websocket,
+                self._websocket_pool_max_idle_secs(),
+            )
+        return await self._open_websocket()
+
+    async def _set_websocket(self, websocket: Any):
+        self._websocket = websocket
+        self._websocket_connected.set()
+
+    async def _drop_websocket(self):
+        websocket = self._websocket
+        self._websocket = None
+        self._websocket_connected.clear()
+        if websocket:
+            try:
+                await self._close_websocket(websocket)
+            except Exception as e:
+                logger.warning(f"{self} error closing websocket: {e}")
+
+    async def _websocket_task_handler(self):
+        delay = self._reconnect_initial_delay_secs
+        while True:
+            connected_time = None
+            try:
+                if not self._websocket:
+                    await self._set_websocket(await self._acquire_websocket())
+                    logger.debug(f"{self} reconnected")
+                connected_time = time.monotonic()
+                await self._receive_messages()
+                logger.warning(f"{self} connection closed")
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.warning(f"{self} connection error: {e}")
+
+            if self._websocket:
+                await self._drop_websocket()
+                await self._on_websocket_disconnected()
+
+            # If the connection was working for a while, reconnect right away.
+            # Otherwise, wait a bit more every time (with some jitter).
+            if (
+                connected_time
+                and time.monotonic() - connected_time > self._reconnect_max_delay_secs
+            ):
+                delay = self._reconnect_initial_delay_secs
+                continue
+            try:
+                await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+            except asyncio.CancelledError:
+                break
+            delay = min(delay * 2, self._reconnect_max_delay_secs)
+
+    async def _keepalive_task_handler(self):
+        while True:
+            try:
+                await asyncio.sleep(self._keepalive_secs)
+                if self._websocket:
+                    await self._send_keepalive()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.warning(f"{self} keepalive error: {e}")
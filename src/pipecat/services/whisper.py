@@ -7,6 +7,8 @@
 """This module implements Whisper transcription with a locally-downloaded model."""
 
 import asyncio
+import io
+import wave
 
 from enum import Enum
 from typing import AsyncGenerator
@@ -71,7 +73,16 @@ class WhisperSTTService(SegmentedSTTService):
         logger.debug("Loaded Whisper model")
 
     async def run_stt(self, audio: bytes) -> AsyncGenerator[Frame, None]:
-        """Transcribes given audio using Whisper"""
+        """Transcribes given 16-bit WAV audio using Whisper"""
+        with wave.open(io.BytesIO(audio), "rb") as ww:
+            pcm = ww.readframes(ww.getnframes())
+        # Divide by 32768 because we have signed 16-bit data.
+        audio_float = np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+        async for frame in self.run_stt_segment(audio_float):
+            yield frame
+
+    async def run_stt_segment(self, audio: np.ndarray) -> AsyncGenerator[Frame, None]:
+        """Transcribes given float32 audio using Whisper"""
         if not self._model:
             logger.error(f"{self} error: Whisper model not available")
             yield ErrorFrame("Whisper model not available")
@@ -80,10 +91,7 @@ class WhisperSTTService(SegmentedSTTService):
         await self.start_processing_metrics()
         await self.start_ttfb_metrics()
 
-        # Divide by 32768 because we have signed 16-bit data.
-        audio_float = np.frombuffer(audio, dtype=np.int16).astype(np.float32) / 32768.0
-
-        segments, _ = await asyncio.to_thread(self._model.transcribe, audio_float)
+        segments, _ = await asyncio.to_thread(self._model.transcribe, audio)
         text: str = ""
         for segment in segments:
             if segment.no_speech_prob < self._no_speech_prob:
@@ -4,11 +4,10 @@
 # SPDX-License-Identifier: BSD 2-Clause License
 #
 
-from typing import Any, AsyncGenerator, Dict
+from typing import Any, AsyncGenerator, Dict, Optional
 
 import aiohttp
 
-from pipecat.audio.utils import resample_audio
 from pipecat.frames.frames import (
     ErrorFrame,
     Frame,
@@ -19,6 +18,7 @@ from pipecat.frames.frames import (
 )
 from pipecat.services.ai_services import TTSService
 from pipecat.transcriptions.language import Language
+from pipecat.utils.http_clients import get_http_client_registry
 
 from loguru import logger
 
@@ -38,10 +38,11 @@ class XTTSService(TTSService):
         voice_id: str,
         language: Language,
         base_url: str,
-        aiohttp_session: aiohttp.ClientSession,
+        aiohttp_session: Optional[aiohttp.ClientSession] = None,
+        sample_rate: int = 24000,
         **kwargs,
     ):
-        super().__init__(**kwargs)
+        super().__init__(sample_rate=sample_rate, **kwargs)
 
         self._settings = {
             "language": self.language_to_service_language(language),
@@ -49,7 +50,9 @@ class XTTSService(TTSService):
         }
         self.set_voice(voice_id)
         self._studio_speakers: Dict[str, Any] | None = None
-        self._aiohttp_session = aiohttp_session
+        self._aiohttp_session = aiohttp_session or get_http_client_registry().aiohttp_session(
+            base_url
+        )
 
     def can_generate_metrics(self) -> bool:
         return True
@@ -146,32 +149,17 @@ class XTTSService(TTSService):
 
             yield TTSStartedFrame()
 
+            # XTTS streams 24 kHz audio. We push it as it arrives, the pipeline
+            # will resample it if the output needs a different sample rate.
             buffer = bytearray()
             async for chunk in r.content.iter_chunked(1024):
                 if len(chunk) > 0:
                     await self.stop_ttfb_metrics()
-                    # Append new chunk to the buffer
                     buffer.extend(chunk)
-
-                    # Check if buffer has enough data for processing
-                    while (
-                        len(buffer) >= 48000
-                    ):  # Assuming at least 0.5 seconds of audio data at 24000 Hz
-                        # Process the buffer up to a safe size for resampling
-                        process_data = buffer[:48000]
-                        # Remove processed data from buffer
-                        buffer = buffer[48000:]
-
-                        # Resample the audio from 24000 Hz to 16000 Hz
-                        resampled_audio = resample_audio(bytes(process_data), 24000, 16000)
-                        # Create the frame with the resampled audio
-                        frame = TTSAudioRawFrame(resampled_audio, 16000, 1)
-                        yield frame
-
-            # Process any remaining data in the buffer
-            if len(buffer) > 0:
-                resampled_audio = resample_audio(bytes(buffer), 24000, 16000)
-                frame = TTSAudioRawFrame(resampled_audio, 16000, 1)
-                yield frame
+                    # Only push complete 16-bit samples.
+                    num_bytes = len(buffer) - len(buffer) % 2
+                    if num_bytes > 0:
+                        yield TTSAudioRawFrame(bytes(buffer[:num_bytes]), self.sample_rate, 1)
+                        del buffer[:num_bytes]
 
             yield TTSStoppedFrame()
@@ -5,17 +5,23 @@
 #
 
 import asyncio
+import time
 from concurrent.futures import ThreadPoolExecutor
+from typing import Type
 
 from loguru import logger
 
+from pipecat.audio.jitter_buffer import AudioJitterBuffer
+from pipecat.audio.resampler import AudioResampler
 from pipecat.audio.vad.vad_analyzer import VADAnalyzer, VADState
 from pipecat.frames.frames import (
+    AudioRawFrame,
     BotInterruptionFrame,
     CancelFrame,
     EndFrame,
     Frame,
     InputAudioRawFrame,
+    MetricsFrame,
     StartFrame,
     StartInterruptionFrame,
     StopInterruptionFrame,
@@ -24,6 +30,7 @@ from pipecat.frames.frames import (
     UserStoppedSpeakingFrame,
     VADParamsUpdateFrame,
 )
+from pipecat.metrics.metrics import JitterBufferMetricsData
 from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
 from pipecat.transports.base_transport import TransportParams
 
@@ -40,13 +47,44 @@ class BaseInputTransport(FrameProcessor):
         # if passthrough is enabled.
         self._audio_task = None
 
+        # Task to release audio from the jitter buffer (if any) at a steady
+        # pace.
+        self._jitter_buffer_task = None
+        self._jitter_buffer_event = asyncio.Event()
+
+        # Only used if the VAD analyzer sample rate doesn't match the input
+        # sample rate.
+        self._vad_resampler: AudioResampler | None = None
+
+    def produced_audio_sample_rate(self, frame_type: Type[AudioRawFrame]) -> int | None:
+        if issubclass(frame_type, InputAudioRawFrame) and (
+            self._params.audio_in_enabled or self._params.vad_enabled
+        ):
+            return self._params.audio_in_sample_rate
+        return None
+
     async def start(self, frame: StartFrame):
         # Create audio input queue and task if needed.
         if self._params.audio_in_enabled or self._params.vad_enabled:
+            vad_analyzer = self.vad_analyzer()
+            if vad_analyzer and vad_analyzer.sample_rate != self._params.audio_in_sample_rate:
+                logger.warning(
+                    f"{self} VAD analyzer sample rate ({vad_analyzer.sample_rate}) doesn't match input sample rate ({self._params.audio_in_sample_rate}), audio will be resampled for VAD"
+                )
+                self._vad_resampler = AudioResampler(
+                    self._params.audio_in_sample_rate,
+                    vad_analyzer.sample_rate,
+                    self._params.audio_in_channels,
+                )
             self._audio_in_queue = asyncio.Queue()
             self._audio_task = self.get_event_loop().create_task(self._audio_task_handler())
+            if self.jitter_buffer():
+                self._jitter_buffer_task = self.get_event_loop().create_task(
+                    self._jitter_buffer_task_handler()
+                )
 
     async def stop(self, frame: EndFrame):
+        await self._stop_jitter_buffer_task()
         # Cancel and wait for the audio input task to finish.
         if self._audio_task and (self._params.audio_in_enabled or self._params.vad_enabled):
             self._audio_task.cancel()
@@ -54,6 +92,7 @@ class BaseInputTransport(FrameProcessor):
             self._audio_task = None
 
     async def cancel(self, frame: CancelFrame):
+        await self._stop_jitter_buffer_task()
         # Cancel and wait for the audio input task to finish.
         if self._audio_task and (self._params.audio_in_enabled or self._params.vad_enabled):
             self._audio_task.cancel()
@@ -63,9 +102,17 @@ class BaseInputTransport(FrameProcessor):
     def vad_analyzer(self) -> VADAnalyzer | None:
         return self._params.vad_analyzer
 
+    def jitter_buffer(self) -> AudioJitterBuffer | None:
+        return self._params.audio_in_jitter_buffer
+
     async def push_audio_frame(self, frame: InputAudioRawFrame):
         if self._params.audio_in_enabled or self._params.vad_enabled:
-            await self._audio_in_queue.put(frame)
+            jitter_buffer = self.jitter_buffer()
+            if jitter_buffer:
+                jitter_buffer.put(frame, time.monotonic())
+                self._jitter_buffer_event.set()
+            else:
+                await self._audio_in_queue.put(frame)
 
     #
     # Frame processor
@@ -133,6 +180,8 @@ class BaseInputTransport(FrameProcessor):
         state = VADState.QUIET
         vad_analyzer = self.vad_analyzer()
         if vad_analyzer:
+            if self._vad_resampler:
+                audio_frames = self._vad_resampler.resample(audio_frames)
             state = await self.get_event_loop().run_in_executor(
                 self._executor, vad_analyzer.analyze_audio, audio_frames
             )
@@ -180,3 +229,51 @@ class BaseInputTransport(FrameProcessor):
                 break
             except Exception as e:
                 logger.exception(f"{self} error reading audio frames: {e}")
+
+    #
+    # Jitter buffer
+    #
+
+    async def _stop_jitter_buffer_task(self):
+        if self._jitter_buffer_task:
+            self._jitter_buffer_task.cancel()
+            await self._jitter_buffer_task
+            self._jitter_buffer_task = None
+            self.jitter_buffer().reset()
+
+    async def _jitter_buffer_metrics(self):
+        jitter_buffer = self.jitter_buffer()
+        data = JitterBufferMetricsData(
+            processor=self.name,
+            value=jitter_buffer.delay,
+            jitter=jitter_buffer.jitter,
+            late_frames=jitter_buffer.late_frames,
+            concealed_frames=jitter_buffer.concealed_frames,
+        )
+        await self.push_frame(MetricsFrame(data=[data]))
+
+    async def _jitter_buffer_task_handler(self):
+        jitter_buffer = self.jitter_buffer()
+        last_metrics_time = time.monotonic()
+        while True:
+            try:
+                self._jitter_buffer_event.clear()
+                delay = jitter_buffer.next_delay(time.monotonic())
+                if delay is None:
+                    await self._jitter_buffer_event.wait()
+                    continue
+                elif delay > 0:
+                    await asyncio.sleep(delay)
+
+                now = time.monotonic()
+                frame = jitter_buffer.pop(now)
+                if frame:
+                    await self._audio_in_queue.put(frame)
+
+                if self.metrics_enabled and now - last_metrics_time >= 1.0:
+                    await self._jitter_buffer_metrics()
+                    last_metrics_time = now
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.exception(f"{self} error processing jitter buffer: {e}")
@@ -8,12 +8,14 @@ import asyncio
 import itertools
 import sys
 import time
-from typing import List
+from typing import List, Type
 
 from loguru import logger
 from PIL import Image
 
+from pipecat.audio.chunker import AudioChunker
 from pipecat.frames.frames import (
+    AudioRawFrame,
     BotSpeakingFrame,
     BotStartedSpeakingFrame,
     BotStoppedSpeakingFrame,
@@ -65,7 +67,7 @@ class BaseOutputTransport(FrameProcessor):
             int(self._params.audio_out_sample_rate / 100) * self._params.audio_out_channels * 2
         )
         self._audio_chunk_size = audio_bytes_10ms * 2
-        self._audio_buffer = bytearray()
+        self._audio_chunker = AudioChunker(self._audio_chunk_size)
 
         self._stopped_event = asyncio.Event()
 
@@ -79,6 +81,11 @@ class BaseOutputTransport(FrameProcessor):
         # generating frames upstream while, for example, the audio is playing.
         self._create_sink_tasks()
 
+    def accepted_audio_sample_rates(self, frame_type: Type[AudioRawFrame]) -> List[int] | None:
+        if issubclass(frame_type, OutputAudioRawFrame) and self._params.audio_out_enabled:
+            return [self._params.audio_out_sample_rate]
+        return None
+
     async def start(self, frame: StartFrame):
         # Create camera output queue and task if needed.
         if self._params.camera_out_enabled:
@@ -230,15 +237,13 @@ class BaseOutputTransport(FrameProcessor):
         if self._params.audio_out_is_live:
             await self._audio_out_queue.put(frame)
         else:
-            self._audio_buffer.extend(frame.audio)
-            while len(self._audio_buffer) >= self._audio_chunk_size:
+            for audio in self._audio_chunker.push(frame.audio):
                 chunk = OutputAudioRawFrame(
-                    bytes(self._audio_buffer[: self._audio_chunk_size]),
+                    audio,
                     sample_rate=frame.sample_rate,
                     num_channels=frame.num_channels,
                 )
                 await self._sink_queue.put(chunk)
-                self._audio_buffer = self._audio_buffer[self._audio_chunk_size :]
 
     async def _handle_image(self, frame: OutputImageRawFrame | SpriteFrame):
         if not self._params.camera_out_enabled:
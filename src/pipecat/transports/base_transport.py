@@ -12,6 +12,7 @@ from abc import ABC, abstractmethod
 from pydantic import ConfigDict
 from pydantic.main import BaseModel
 
+from pipecat.audio.jitter_buffer import AudioJitterBuffer
 from pipecat.audio.vad.vad_analyzer import VADAnalyzer
 from pipecat.processors.frame_processor import FrameProcessor
 
@@ -36,6 +37,7 @@ class TransportParams(BaseModel):
     audio_in_enabled: bool = False
     audio_in_sample_rate: int = 16000
     audio_in_channels: int = 1
+    audio_in_jitter_buffer: AudioJitterBuffer | None = None
     vad_enabled: bool = False
     vad_audio_passthrough: bool = False
     vad_analyzer: VADAnalyzer | None = None
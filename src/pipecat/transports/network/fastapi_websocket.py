@@ -12,6 +12,7 @@ import wave
 from typing import Awaitable, Callable
 from pydantic.main import BaseModel
 
+from pipecat.audio.chunker import AudioChunker
 from pipecat.frames.frames import (
     AudioRawFrame,
     CancelFrame,
@@ -80,21 +81,33 @@ class FastAPIWebsocketInputTransport(BaseInputTransport):
         if self._websocket.client_state != WebSocketState.DISCONNECTED:
             await self._websocket.close()
 
+    async def _iter_messages(self):
+        # Serializers might send text (e.g. JSON) or binary (e.g. protobuf)
+        # messages, so accept both.
+        while True:
+            message = await self._websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            if message.get("bytes") is not None:
+                yield message["bytes"]
+            elif message.get("text") is not None:
+                yield message["text"]
+
     async def _receive_messages(self):
-        async for message in self._websocket.iter_text():
+        async for message in self._iter_messages():
             frame = self._params.serializer.deserialize(message)
 
             if not frame:
                 continue
 
             if isinstance(frame, AudioRawFrame):
-                await self.push_audio_frame(
-                    InputAudioRawFrame(
-                        audio=frame.audio,
-                        sample_rate=frame.sample_rate,
-                        num_channels=frame.num_channels,
-                    )
+                audio_frame = InputAudioRawFrame(
+                    audio=frame.audio,
+                    sample_rate=frame.sample_rate,
+                    num_channels=frame.num_channels,
                 )
+                audio_frame.pts = frame.pts
+                await self.push_audio_frame(audio_frame)
 
         await self._callbacks.on_client_disconnected(self._websocket)
 
@@ -105,7 +118,7 @@ class FastAPIWebsocketOutputTransport(BaseOutputTransport):
 
         self._websocket = websocket
         self._params = params
-        self._websocket_audio_buffer = bytes()
+        self._websocket_audio_chunker = AudioChunker(self._params.audio_frame_size)
 
     async def process_frame(self, frame: Frame, direction: FrameDirection):
         await super().process_frame(frame, direction)
@@ -114,10 +127,10 @@ class FastAPIWebsocketOutputTransport(BaseOutputTransport):
             await self._write_frame(frame)
 
     async def write_raw_audio_frames(self, frames: bytes):
-        self._websocket_audio_buffer += frames
-        while len(self._websocket_audio_buffer):
+        self._websocket_audio_chunker.extend(frames)
+        while len(self._websocket_audio_chunker):
             frame = AudioRawFrame(
-                audio=self._websocket_audio_buffer[: self._params.audio_frame_size],
+                audio=self._websocket_audio_chunker.read(self._params.audio_frame_size),
                 sample_rate=self._params.audio_out_sample_rate,
                 num_channels=self._params.audio_out_channels,
             )
@@ -136,17 +149,15 @@ class FastAPIWebsocketOutputTransport(BaseOutputTransport):
                 )
                 frame = wav_frame
 
-            payload = self._params.serializer.serialize(frame)
-            if payload and self._websocket.client_state == WebSocketState.CONNECTED:
-                await self._websocket.send_text(payload)
-
-            self._websocket_audio_buffer = self._websocket_audio_buffer[
-                self._params.audio_frame_size :
-            ]
+            await self._write_frame(frame)
 
     async def _write_frame(self, frame: Frame):
         payload = self._params.serializer.serialize(frame)
-        if payload and self._websocket.client_state == WebSocketState.CONNECTED:
+        if not payload or self._websocket.client_state != WebSocketState.CONNECTED:
+            return
+        if isinstance(payload, bytes):
+            await self._websocket.send_bytes(payload)
+        else:
             await self._websocket.send_text(payload)
 
 
@@ -11,6 +11,7 @@ import wave
 from typing import Awaitable, Callable
 from pydantic.main import BaseModel
 
+from pipecat.audio.chunker import AudioChunker
 from pipecat.frames.frames import (
     AudioRawFrame,
     CancelFrame,
@@ -92,6 +93,10 @@ class WebsocketServerInputTransport(BaseInputTransport):
 
         self._websocket = websocket
 
+        # Serializers might keep state (e.g. audio codecs) for the previous
+        # client.
+        self._params.serializer.reset()
+
         # Notify
         await self._callbacks.on_client_connected(websocket)
 
@@ -103,13 +108,13 @@ class WebsocketServerInputTransport(BaseInputTransport):
                 continue
 
             if isinstance(frame, AudioRawFrame):
-                await self.push_audio_frame(
-                    InputAudioRawFrame(
-                        audio=frame.audio,
-                        sample_rate=frame.sample_rate,
-                        num_channels=frame.num_channels,
-                    )
+                audio_frame = InputAudioRawFrame(
+                    audio=frame.audio,
+                    sample_rate=frame.sample_rate,
+                    num_channels=frame.num_channels,
                 )
+                audio_frame.pts = frame.pts
+                await self.push_audio_frame(audio_frame)
             else:
                 await self.push_frame(frame)
 
@@ -130,7 +135,7 @@ class WebsocketServerOutputTransport(BaseOutputTransport):
 
         self._websocket: websockets.WebSocketServerProtocol | None = None
 
-        self._websocket_audio_buffer = bytes()
+        self._websocket_audio_chunker = AudioChunker(self._params.audio_frame_size)
 
     async def set_client_connection(self, websocket: websockets.WebSocketServerProtocol | None):
         if self._websocket:
@@ -142,10 +147,9 @@ class WebsocketServerOutputTransport(BaseOutputTransport):
         if not self._websocket:
             return
 
-        self._websocket_audio_buffer += frames
-        while len(self._websocket_audio_buffer) >= self._params.audio_frame_size:
+        for audio in self._websocket_audio_chunker.push(frames):
             frame = AudioRawFrame(
-                audio=self._websocket_audio_buffer[: self._params.audio_frame_size],
+                audio=audio,
                 sample_rate=self._params.audio_out_sample_rate,
                 num_channels=self._params.audio_out_channels,
             )
@@ -168,10 +172,6 @@ class WebsocketServerOutputTransport(BaseOutputTransport):
             if proto:
                 await self._websocket.send(proto)
 
-            self._websocket_audio_buffer = self._websocket_audio_buffer[
-                self._params.audio_frame_size :
-            ]
-
 
 class WebsocketServerTransport(BaseTransport):
     def __init__(
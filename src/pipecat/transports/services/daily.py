@@ -10,7 +10,6 @@ from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import Any, Awaitable, Callable, Mapping, Optional
 
-import aiohttp
 from daily import (
     CallClient,
     Daily,
@@ -44,6 +43,7 @@ from pipecat.transcriptions.language import Language
 from pipecat.transports.base_input import BaseInputTransport
 from pipecat.transports.base_output import BaseOutputTransport
 from pipecat.transports.base_transport import BaseTransport, TransportParams
+from pipecat.utils.http_clients import get_http_client_registry
 
 try:
     from daily import CallClient, Daily, EventHandler
@@ -913,33 +913,33 @@ class DailyTransport(BaseTransport):
         if not self._params.dialin_settings:
             return
 
-        async with aiohttp.ClientSession() as session:
-            headers = {
-                "Authorization": f"Bearer {self._params.api_key}",
-                "Content-Type": "application/json",
-            }
-            data = {
-                "callId": self._params.dialin_settings.call_id,
-                "callDomain": self._params.dialin_settings.call_domain,
-                "sipUri": sip_endpoint,
-            }
+        session = get_http_client_registry().aiohttp_session(self._params.api_url)
+        headers = {
+            "Authorization": f"Bearer {self._params.api_key}",
+            "Content-Type": "application/json",
+        }
+        data = {
+            "callId": self._params.dialin_settings.call_id,
+            "callDomain": self._params.dialin_settings.call_domain,
+            "sipUri": sip_endpoint,
+        }
 
-            url = f"{self._params.api_url}/dialin/pinlessCallUpdate"
+        url = f"{self._params.api_url}/dialin/pinlessCallUpdate"
 
-            try:
-                async with session.post(url, headers=headers, json=data, timeout=10) as r:
-                    if r.status != 200:
-                        text = await r.text()
-                        logger.error(
-                            f"Unable to handle dialin-ready event (status: {r.status}, error: {text})"
-                        )
-                        return
-
-                    logger.debug("Event dialin-ready was handled successfully")
-            except asyncio.TimeoutError:
-                logger.error(f"Timeout handling dialin-ready event ({url})")
-            except Exception as e:
-                logger.exception(f"Error handling dialin-ready event ({url}): {e}")
+        try:
+            async with session.post(url, headers=headers, json=data, timeout=10) as r:
+                if r.status != 200:
+                    text = await r.text()
+                    logger.error(
+                        f"Unable to handle dialin-ready event (status: {r.status}, error: {text})"
+                    )
+                    return
+
+                logger.debug("Event dialin-ready was handled successfully")
+        except asyncio.TimeoutError:
+            logger.error(f"Timeout handling dialin-ready event ({url})")
+        except Exception as e:
+            logger.exception(f"Error handling dialin-ready event ({url}): {e}")
 
     async def _on_dialin_ready(self, sip_endpoint):
         if self._params.dialin_settings:
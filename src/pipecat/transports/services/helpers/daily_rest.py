@@ -19,6 +19,8 @@ from urllib.parse import urlparse
 from pydantic import Field, BaseModel, ValidationError
 from typing import Literal, Optional
 
+from pipecat.utils.http_clients import get_http_client_registry
+
 
 class DailyRoomSipParams(BaseModel):
     display_name: str = "sw-sip-dialin"
@@ -66,11 +68,18 @@ class DailyRESTHelper:
         *,
         daily_api_key: str,
         daily_api_url: str = "https://api.daily.co/v1",
-        aiohttp_session: aiohttp.ClientSession,
+        aiohttp_session: Optional[aiohttp.ClientSession] = None,
     ):
         self.daily_api_key = daily_api_key
         self.daily_api_url = daily_api_url
-        self.aiohttp_session = aiohttp_session
+        self._aiohttp_session = aiohttp_session
+
+    @property
+    def aiohttp_session(self) -> aiohttp.ClientSession:
+        # If we are not given a session, use the one shared by the process.
+        if self._aiohttp_session:
+            return self._aiohttp_session
+        return get_http_client_registry().aiohttp_session(self.daily_api_url)
 
     def get_name_from_url(self, room_url: str) -> str:
         return urlparse(room_url).path[1:]
@@ -0,0 +1,195 @@
+#
+# Copyright (c) 2024, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+import asyncio
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import aiohttp
+
+from loguru import logger
+
+
+@dataclass
+class HttpClientStats:
+    """Usage of the shared clients of a host. Connections are only tracked
+    for aiohttp sessions.
+
+    """
+
+    requests: int = 0
+    connections_created: int = 0
+    connections_reused: int = 0
+
+
+def http_client_key(url: str) -> str:
+    """Clients are shared by all the URLs of the same host.
+
+    >>> http_client_key("https://api.openai.com/v1")
+    'https://api.openai.com:443'
+    >>> http_client_key("http://localhost:8000/tts_stream")
+    'http://localhost:8000'
+
+    """
+    parsed = urlparse(url)
+    scheme = parsed.scheme or "https"
+    port = parsed.port or (443 if scheme in ("https", "wss") else 80)
+    return f"{scheme}://{parsed.hostname}:{port}"
+
+
+class HttpClientRegistry:
+    """Process-wide HTTP clients (aiohttp sessions and httpx clients) shared
+    by all the services that talk to the same host, so all the sessions of a
+    process use the same keep-alive connections instead of opening (and
+    TLS-handshaking) their own.
+
+    Clients are bound to the event loop they are created in, so there's one
+    client per host and event loop. Credentials are not part of the client:
+    services send them with every request.
+
+    """
+
+    def __init__(
+        self,
+        *,
+        limit: int = 1000,
+        limit_per_host: int = 100,
+        keepalive_secs: Optional[float] = 60.0,
+    ):
+        self._limit = limit
+        self._limit_per_host = limit_per_host
+        self._keepalive_secs = keepalive_secs
+
+        self._aiohttp_sessions: Dict[Tuple[asyncio.AbstractEventLoop, str], Any] = {}
+        self._httpx_clients: Dict[Tuple[asyncio.AbstractEventLoop, str], Any] = {}
+        self._shared_clients: Dict[Tuple[asyncio.AbstractEventLoop, str], Any] = {}
+        self._stats: Dict[str, HttpClientStats] = {}
+
+    def stats(self, url: str) -> HttpClientStats:
+        return self._stats.setdefault(http_client_key(url), HttpClientStats())
+
+    def aiohttp_session(self, url: str) -> aiohttp.ClientSession:
+        """Returns the aiohttp session for the host of `url`. Needs to be
+        called from the event loop the session is going to be used in.
+
+        """
+        key = (asyncio.get_running_loop(), http_client_key(url))
+        session = self._aiohttp_sessions.get(key)
+        if session is None or session.closed:
+            self._prune()
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self._limit,
+                    limit_per_host=self._limit_per_host,
+                    keepalive_timeout=self._keepalive_secs,
+                ),
+                trace_configs=[self._aiohttp_trace_config(self.stats(url))],
+            )
+            self._aiohttp_sessions[key] = session
+        return session
+
+    def httpx_client(self, url: str):
+        """Returns the httpx client for the host of `url`. Needs to be called
+        from the event loop the client is going to be used in.
+
+        """
+        import httpx
+
+        key = (asyncio.get_running_loop(), http_client_key(url))
+        client = self._httpx_clients.get(key)
+        if client is None or client.is_closed:
+            self._prune()
+            stats = self.stats(url)
+
+            async def on_request(request):
+                stats.requests += 1
+
+            # httpx clients are already per host, so both limits apply to
+            # the whole client.
+            max_connections = min(self._limit, self._limit_per_host)
+            client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_connections,
+                    keepalive_expiry=self._keepalive_secs,
+                ),
+                follow_redirects=True,
+                event_hooks={"request": [on_request]},
+            )
+            self._httpx_clients[key] = client
+        return client
+
+    def shared_client(self, key: str, create: Callable[[], Any]) -> Any:
+        """Returns a client created by `create()` the first time it's called
+        with `key` in the current event loop. This is for SDK clients that
+        have their own connections (e.g. gRPC channels), so `key` needs to
+        include the URL and credentials.
+
+        """
+        loop_key = (asyncio.get_running_loop(), key)
+        client = self._shared_clients.get(loop_key)
+        if client is None:
+            self._prune()
+            client = create()
+            self._shared_clients[loop_key] = client
+        return client
+
+    async def close(self):
+        """Closes the clients of the current event loop."""
+        loop = asyncio.get_running_loop()
+        for clients in [self._aiohttp_sessions, self._httpx_clients, self._shared_clients]:
+            for key in [k for k in clients if k[0] == loop]:
+                client = clients.pop(key)
+                try:
+                    if hasattr(client, "aclose"):
+                        await client.aclose()
+                    elif hasattr(client, "close"):
+                        result = client.close()
+                        if asyncio.iscoroutine(result):
+                            await result
+                except Exception as e:
+                    logger.warning(f"{self} error closing HTTP client: {e}")
+
+    def _prune(self):
+        # Forget about clients of event loops that are gone.
+        for clients in [self._aiohttp_sessions, self._httpx_clients, self._shared_clients]:
+            for key in [k for k in clients if k[0].is_closed()]:
+                del clients[key]
+
+    def _aiohttp_trace_config(self, stats: HttpClientStats) -> aiohttp.TraceConfig:
+        async def on_request_start(session, context, params):
+            stats.requests += 1
+
+        async def on_connection_create_end(session, context, params):
+            stats.connections_created += 1
+
+        async def on_connection_reuseconn(session, context, params):
+            stats.connections_reused += 1
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        return trace_config
+
+
+_http_client_registry = HttpClientRegistry()
+
+
+def get_http_client_registry() -> HttpClientRegistry:
+    """Returns the registry used by services that are not given a client."""
+    return _http_client_registry
+
+
+def set_http_client_registry(registry: HttpClientRegistry):
+    """Replaces the default registry (e.g. to change the connection limits).
+    Only affects services created afterwards.
+
+    """
+    global _http_client_registry
+    _http_client_registry = registry
@@ -0,0 +1,152 @@
+#
+# Copyright (c) 2024, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+import asyncio
+import base64
+import hashlib
+import io
+import math
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from PIL import Image
+
+# Vision models use about one token for every 750 pixels.
+PIXELS_PER_TOKEN = 750
+
+
+def image_tokens(size: Tuple[int, int]) -> int:
+    """Approximate number of tokens used by an image of the given size.
+
+    >>> image_tokens((1000, 750))
+    1000
+
+    """
+    return math.ceil(size[0] * size[1] / PIXELS_PER_TOKEN)
+
+
+def downscaled_size(size: Tuple[int, int], max_tokens: int) -> Tuple[int, int]:
+    """Returns the size the image needs to have (keeping its aspect ratio) to
+    use at most `max_tokens`.
+
+    >>> downscaled_size((2000, 1500), 1000)
+    (1000, 750)
+    >>> downscaled_size((640, 480), 1000)
+    (640, 480)
+
+    """
+    if image_tokens(size) <= max_tokens:
+        return size
+    scale = math.sqrt(max_tokens * PIXELS_PER_TOKEN / (size[0] * size[1]))
+    return (max(1, int(size[0] * scale)), max(1, int(size[1] * scale)))
+
+
+@dataclass(frozen=True)
+class EncodedImage:
+    """An image encoded the way LLM providers need it: JPEG bytes (e.g. for
+    Google) and base64 (e.g. for OpenAI and Anthropic).
+
+    """
+
+    key: str
+    size: Tuple[int, int]
+    jpeg: bytes
+    base64: str
+    mime_type: str = "image/jpeg"
+
+    @property
+    def data_url(self) -> str:
+        return f"data:{self.mime_type};base64,{self.base64}"
+
+
+class ImageCache:
+    """Encodes raw images for LLM contexts. Images are encoded only once: they
+    are kept (up to `max_entries`) by their content, so the same image (e.g.
+    the same video frame, or an image that is in the context of every turn)
+    is not encoded again.
+
+    If `max_tokens` is given, images are downscaled so they use at most that
+    many tokens.
+
+    """
+
+    def __init__(
+        self, *, max_entries: int = 32, max_tokens: Optional[int] = None, jpeg_quality: int = 75
+    ):
+        self._max_entries = max_entries
+        self._max_tokens = max_tokens
+        self._jpeg_quality = jpeg_quality
+        self._images: OrderedDict[str, EncodedImage] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._images)
+
+    async def encode(self, *, format: str, size: Tuple[int, int], image: bytes) -> EncodedImage:
+        """Encodes the image in a thread, so the event loop is not blocked."""
+        key = await asyncio.to_thread(self._key, format, size, image)
+        encoded = self._get(key)
+        if not encoded:
+            encoded = await asyncio.to_thread(self._encode, key, format, size, image)
+            self._add(encoded)
+        return encoded
+
+    def encode_sync(self, *, format: str, size: Tuple[int, int], image: bytes) -> EncodedImage:
+        """Like `encode()`, but in the current thread."""
+        key = self._key(format, size, image)
+        encoded = self._get(key)
+        if not encoded:
+            encoded = self._encode(key, format, size, image)
+            self._add(encoded)
+        return encoded
+
+    def clear(self):
+        self._images.clear()
+
+    def _key(self, format: str, size: Tuple[int, int], image: bytes) -> str:
+        h = hashlib.sha256(image)
+        h.update(f"{format}:{size[0]}x{size[1]}".encode())
+        return h.hexdigest()
+
+    def _get(self, key: str) -> EncodedImage | None:
+        encoded = self._images.get(key)
+        if encoded:
+            self._images.move_to_end(key)
+        return encoded
+
+    def _add(self, encoded: EncodedImage):
+        self._images[encoded.key] = encoded
+        while len(self._images) > self._max_entries:
+            self._images.popitem(last=False)
+
+    def _encode(self, key: str, format: str, size: Tuple[int, int], image: bytes) -> EncodedImage:
+        img = Image.frombytes(format, size, image)
+        if self._max_tokens:
+            new_size = downscaled_size(size, self._max_tokens)
+            if new_size != size:
+                img = img.resize(new_size)
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        buffer = io.BytesIO()
+        img.save(buffer, format="JPEG", quality=self._jpeg_quality)
+        jpeg = buffer.getvalue()
+        return EncodedImage(
+            key=key, size=img.size, jpeg=jpeg, base64=base64.b64encode(jpeg).decode("utf-8")
+        )
+
+
+_image_cache = ImageCache()
+
+
+def get_image_cache() -> ImageCache:
+    """Returns the cache used by LLM contexts and services."""
+    return _image_cache
+
+
+def set_image_cache(cache: ImageCache):
+    """Replaces the default cache (e.g. to downscale images)."""
+    global _image_cache
+    _image_cache = cache
@@ -19,7 +19,85 @@ ENDOFSENTENCE_PATTERN_STR = r"""
 """
 ENDOFSENTENCE_PATTERN = re.compile(ENDOFSENTENCE_PATTERN_STR, re.VERBOSE)
 
+ENDOFSENTENCE_FULLWIDTH_PUNCTUATION = "。？！：；"
+
 
 def match_endofsentence(text: str) -> int:
     match = ENDOFSENTENCE_PATTERN.search(text.rstrip())
     return match.end() if match else 0
+
+
+class SentenceSegmenter:
+    """Finds the end of the first sentence in streamed text (e.g. LLM tokens).
+    The result is the same as calling `match_endofsentence()` with all the text
+    appended so far, but only the newly appended text is scanned each time.
+
+    >>> segmenter = SentenceSegmenter()
+    >>> segmenter.append("Hello, Mr")
+    0
+    >>> segmenter.append(". Smith. How")
+    17
+    >>> segmenter.pop(17)
+    'Hello, Mr. Smith.'
+    >>> segmenter.append(" are you?")
+    13
+    >>> segmenter.flush()
+    ' How are you?'
+
+    """
+
+    def __init__(self):
+        self._text = ""
+        # Nothing before this position ends a sentence.
+        self._scan_pos = 0
+        self._match = 0
+
+    @property
+    def text(self) -> str:
+        return self._text
+
+    def append(self, text: str) -> int:
+        """Appends text and returns the end of the first sentence, or 0 if
+        there's no complete sentence yet.
+
+        """
+        self._text += text
+
+        if self._match:
+            return self._match
+
+        # Punctuation only depends on what comes before it, so we can resume
+        # the search where we left it.
+        match = ENDOFSENTENCE_PATTERN.search(self._text, self._scan_pos)
+        if match and match.group() not in ENDOFSENTENCE_FULLWIDTH_PUNCTUATION:
+            self._match = match.end()
+            return self._match
+        self._scan_pos = len(self._text)
+
+        # Full-width punctuation only counts at the end, so it can't be
+        # remembered.
+        end = len(self._text)
+        while end > 0 and self._text[end - 1].isspace():
+            end -= 1
+        if end > 0 and self._text[end - 1] in ENDOFSENTENCE_FULLWIDTH_PUNCTUATION:
+            return end
+
+        return 0
+
+    def pop(self, end: int) -> str:
+        """Removes and returns the text up to `end` (usually the value returned
+        by `append()`).
+
+        """
+        text = self._text[:end]
+        self._text = self._text[end:]
+        self._scan_pos = 0
+        self._match = 0
+        return text
+
+    def flush(self) -> str:
+        """Removes and returns all the text."""
+        return self.pop(len(self._text))
+
+    def reset(self):
+        self.pop(len(self._text))
@@ -0,0 +1,23 @@
+#
+# Copyright (c) 2024, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+from abc import ABC, abstractmethod
+
+
+class BaseFlushPolicy(ABC):
+    """Decides when the first chunk of an LLM response can be sent to a TTS
+    service before a whole sentence has been aggregated.
+
+    """
+
+    @abstractmethod
+    def find_flush(self, text: str, elapsed_secs: float) -> int:
+        """Returns the position up to which `text` can be sent to the TTS
+        service, or 0 if we should keep waiting. `elapsed_secs` is the time
+        since the first text of the response arrived.
+
+        """
+        pass
@@ -0,0 +1,59 @@
+#
+# Copyright (c) 2024, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+import re
+
+from typing import Optional
+
+from pipecat.utils.text.base_flush_policy import BaseFlushPolicy
+
+# Commas need to be followed by a space, so numbers like "1,000" are not
+# split. Dashes need spaces around them, unless they are em/en dashes.
+CLAUSE_BOUNDARY_PATTERN = re.compile(r"[,，、](?=\s)|\s[-–—]\s|[–—]")
+
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+class ClauseFlushPolicy(BaseFlushPolicy):
+    """Flushes the first chunk of a response at the first clause boundary
+    (a comma or a dash) once there are at least `min_words` words before it.
+    If no clause boundary is found after `timeout_secs`, all the complete
+    words received so far are flushed instead. The timeout is checked as new
+    text arrives.
+
+    >>> policy = ClauseFlushPolicy(min_words=3)
+    >>> policy.find_flush("Well, let me think", 0.0)
+    0
+    >>> text = "Well, let me think about it, "
+    >>> text[: policy.find_flush(text, 0.0)]
+    'Well, let me think about it,'
+    >>> text = "The total is 1,000 dollars"
+    >>> policy.find_flush(text, 0.0)
+    0
+    >>> text[: policy.find_flush(text, 2.0)]
+    'The total is 1,000'
+
+    """
+
+    def __init__(self, *, min_words: int = 4, timeout_secs: Optional[float] = 1.0):
+        self._min_words = min_words
+        self._timeout_secs = timeout_secs
+
+    def find_flush(self, text: str, elapsed_secs: float) -> int:
+        for match in CLAUSE_BOUNDARY_PATTERN.finditer(text):
+            end = match.end()
+            if len(text[:end].split()) >= self._min_words:
+                return end
+
+        if self._timeout_secs is not None and elapsed_secs >= self._timeout_secs:
+            # Only complete words, the last one might still be arriving.
+            last_space = None
+            for last_space in WHITESPACE_PATTERN.finditer(text):
+                pass
+            if last_space and text[: last_space.start()].strip():
+                return last_space.start()
+
+        return 0
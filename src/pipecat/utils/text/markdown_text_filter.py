@@ -5,13 +5,48 @@
 #
 
 import re
-from typing import Any, Mapping, Optional
+from typing import Any, List, Mapping, Optional, Tuple
 
-from markdown import Markdown
 from pydantic import BaseModel
 
 from pipecat.utils.text.base_text_filter import BaseTextFilter
 
+# Characters (or sequences) that need attention when rendering inline text.
+# Anything else is copied as is. Runs of 5 or more repeated characters are
+# removed (e.g. "-----" or "*****").
+_INLINE_SPECIAL_RE = re.compile(r"(?P<run>(\S)\2{4,})|[*_`\\!\[<&|]")
+
+_ATX_HEADER_RE = re.compile(r"^(#{1,6})(.*?)#*$")
+_HR_RE = re.compile(r"^(?:(?:-[ ]{0,2}){3,}|(?:_[ ]{0,2}){3,}|(?:\*[ ]{0,2}){3,})[ ]*$")
+_SETEXT_UNDERLINE_RE = re.compile(r"^[=-]+[ ]*$")
+_LIST_ITEM_RE = re.compile(r"^(?:\d+\.|[*+-])[ ]+(.*)$")
+_NUMBERED_ITEM_RE = re.compile(r"^\d+\.\s")
+_QUOTE_RE = re.compile(r"^>[ ]?(.*)$")
+_SEPARATOR_LINE_RE = re.compile(r"^[-:]+$")
+# The row after a table header (e.g. "|---|:---:|"). It has at least one pipe
+# and it's not indented (blank lines before it become a leading space).
+_TABLE_DELIMITER_RE = re.compile(r"^(?=[^|]*\|)\|?(?:[ ]*:?-+:?[ ]*\|)*[ ]*:?-+:?[ ]*\|?[ ]*$")
+
+_INLINE_CODE_RE = re.compile(r"(?<!`)`([^`\n]+)`(?!`)")
+_LINK_RE = re.compile(r"\[([^\]]*)\]\(([^)]*)\)")
+_AUTOLINK_RE = re.compile(r"<((?:[Ff]|[Hh][Tt])[Tt][Pp][Ss]?://[^<>]*)>")
+_HTML_TAG_RE = re.compile(r"<(\/?[a-zA-Z][^<>@ ]*( [^<>]*)?|!--(?:(?!<!--|-->).)*--)>")
+_ENTITIES = {"&nbsp;": " ", "&lt;": "<", "&gt;": ">", "&amp;": "&"}
+_ESCAPABLE = "\\`*_{}[]()>#+-.!"
+
+
+def _is_word_char(c: str) -> bool:
+    return c.isalnum() or c == "_"
+
+
+def _count_table_cells(row: str) -> int:
+    row = row.strip()
+    if row.startswith("|"):
+        row = row[1:]
+    if row.endswith("|"):
+        row = row[:-1]
+    return row.count("|") + 1
+
 
 class MarkdownTextFilter(BaseTextFilter):
     """Removes Markdown formatting from text in TextFrames.
@@ -19,6 +54,12 @@ class MarkdownTextFilter(BaseTextFilter):
     Converts Markdown to plain text while preserving the overall structure,
     including leading and trailing spaces. Handles special cases like
     asterisks and table formatting.
+
+    Each chunk of text (usually a sentence aggregated by the TTS service) is
+    processed in a single pass, line by line. Code blocks and tables (if
+    filtered) can span multiple chunks, the state is kept until they end or
+    there's an interruption.
+
     """
 
     class InputParams(BaseModel):
@@ -39,70 +80,19 @@ class MarkdownTextFilter(BaseTextFilter):
                 setattr(self._settings, key, value)
 
     def filter(self, text: str) -> str:
-        if self._settings.enable_text_filter:
-            # Remove newlines and replace with a space only when there's no text before or after
-            filtered_text = re.sub(r"^\s*\n", " ", text, flags=re.MULTILINE)
-
-            # Remove backticks from inline code, but not from code blocks
-            filtered_text = re.sub(r"(?<!`)`([^`\n]+)`(?!`)", r"\1", filtered_text)
-
-            # Remove repeated sequences of 5 or more characters
-            filtered_text = re.sub(r"(\S)(\1{4,})", "", filtered_text)
-
-            # Preserve numbered list items with a unique marker, §NUM§
-            filtered_text = re.sub(r"^(\d+\.)\s", r"§NUM§\1 ", filtered_text)
-
-            # Preserve leading/trailing spaces with a unique marker, §
-            # Critical for word-by-word streaming in bot-tts-text
-            filtered_text = re.sub(
-                r"^( +)|\s+$", lambda m: "§" * len(m.group(0)), filtered_text, flags=re.MULTILINE
-            )
-
-            # Remove space placeholders before tables, so that tables are converted to HTML
-            # correctly
-            filtered_text = re.sub(r"§\| ", "| ", filtered_text)
-
-            # Convert markdown to HTML
-            extension = ["tables"] if self._settings.filter_tables else []
-            md = Markdown(extensions=extension)
-            filtered_text = md.convert(filtered_text)
-
-            # Remove tables
-            if self._settings.filter_tables:
-                filtered_text = self.remove_tables(filtered_text)
-
-            # Remove HTML tags
-            filtered_text = re.sub("<[^<]+?>", "", filtered_text)
-
-            # Replace HTML entities
-            filtered_text = filtered_text.replace("&nbsp;", " ")
-            filtered_text = filtered_text.replace("&lt;", "<")
-            filtered_text = filtered_text.replace("&gt;", ">")
-            filtered_text = filtered_text.replace("&amp;", "&")
-
-            # Remove double asterisks (consecutive without any exceptions)
-            filtered_text = re.sub(r"\*\*", "", filtered_text)
-
-            # Remove single asterisks at the start or end of words
-            filtered_text = re.sub(r"(^|\s)\*|\*($|\s)", r"\1\2", filtered_text)
-
-            # Remove Markdown table formatting
-            filtered_text = re.sub(r"\|", "", filtered_text)
-            filtered_text = re.sub(r"^\s*[-:]+\s*$", "", filtered_text, flags=re.MULTILINE)
-
-            # Remove code blocks
-            if self._settings.filter_code:
-                filtered_text = self._remove_code_blocks(filtered_text)
+        if not self._settings.enable_text_filter:
+            return text
 
-            # Restore numbered list items
-            filtered_text = filtered_text.replace("§NUM§", "")
+        if self._interrupted:
+            self._in_code_block = False
+            self._in_table = False
 
-            # Restore leading and trailing spaces
-            filtered_text = re.sub("§", " ", filtered_text)
+        # A numbered item at the very beginning is kept as is, so the number is
+        # spoken.
+        keep_numbered_item = bool(_NUMBERED_ITEM_RE.match(text))
 
-            return filtered_text
-        else:
-            return text
+        blocks = self._parse_blocks(self._split_lines(text), keep_numbered_item)
+        return "\n".join(blocks)
 
     def handle_interruption(self):
         self._interrupted = True
@@ -113,104 +103,337 @@ class MarkdownTextFilter(BaseTextFilter):
         self._interrupted = False
 
     #
-    # Filter code
+    # Lines
     #
 
-    def _remove_code_blocks(self, text: str) -> str:
-        """
-        Main method to remove code blocks from the input text.
-        Handles interruptions and delegates to specific methods based on the current state.
-        """
-        if self._interrupted:
-            self._in_code_block = False
-            return text
+    def _split_lines(self, text: str) -> List[str]:
+        """Splits text in lines. Blank lines are replaced by a space at the
+        beginning of the next line and a final newline becomes a space, so
+        leading and trailing spaces are preserved.
 
-        # Pattern to match three consecutive backticks (code block delimiter)
-        code_block_pattern = r"```"
-        match = re.search(code_block_pattern, text)
-
-        if self._in_code_block:
-            return self._handle_in_code_block(match, text)
-
-        return self._handle_not_in_code_block(match, text, code_block_pattern)
-
-    def _handle_in_code_block(self, match, text):
-        """
-        Handle text when we're currently inside a code block.
-        If we find the end of the block, return text after it. Otherwise, skip the content.
         """
-        if match:
-            self._in_code_block = False
-            end_index = match.end()
-            return text[end_index:].strip()
-        return ""  # Skip content inside code block
+        lines = []
+        blank = False
+        raw_lines = text.split("\n")
+        last = len(raw_lines) - 1
+        for i, line in enumerate(raw_lines):
+            if i < last and (not line or line.isspace()):
+                blank = True
+                continue
+            if blank:
+                line = f" {line}"
+            if "\t" in line:
+                line = line.expandtabs(4)
+            # Tables rows are not indented.
+            if line.startswith(" ") and line.lstrip(" ").startswith("| "):
+                line = line[1:]
+            lines.append(line)
+            blank = False
+
+        if len(lines) > 1 and (not lines[-1] or lines[-1].isspace()):
+            trailing = lines.pop()
+            lines[-1] += f" {trailing}"
+
+        return lines
+
+    def _filter_code_line(self, line: str) -> str | None:
+        """Removes code blocks from the line. Returns None if there's nothing
+        left to say.
 
-    def _handle_not_in_code_block(self, match, text, code_block_pattern):
-        """
-        Handle text when we're not currently inside a code block.
-        Delegate to specific methods based on whether we find a code block delimiter.
         """
-        if not match:
-            return text  # No code block found, return original text
+        result = ""
+        closed = False
+        while True:
+            fence = line.find("```")
+            if self._in_code_block:
+                if fence < 0:
+                    break
+                end = fence
+                while end < len(line) and line[end] == "`":
+                    end += 1
+                line = line[end:]
+                self._in_code_block = False
+                closed = True
+            elif fence < 0:
+                result += line
+                break
+            else:
+                result += line[:fence]
+                line = line[fence + 3 :]
+                self._in_code_block = True
 
-        start_index = match.start()
-        if start_index == 0 or text[:start_index].isspace():
-            return self._handle_start_of_code_block(text, start_index)
-        return self._handle_code_block_within_text(text, code_block_pattern)
+        if not result or (closed and result.isspace()):
+            return None
+        return result
 
-    def _handle_start_of_code_block(self, text, start_index):
-        """
-        Handle the case where we find the start of a code block.
-        Return any text before the code block and set the state to inside a code block.
-        """
-        self._in_code_block = True
-        return text[:start_index].strip()
+    def _is_table_row(self, lines: List[str], i: int) -> bool:
+        """Returns whether the i-th line is part of a table. Like Markdown, a
+        table starts with a header row followed by a delimiter row with the
+        same number of cells, and rows continue until a line without pipes
+        (possibly in the next chunk).
 
-    def _handle_code_block_within_text(self, text, code_block_pattern):
-        """
-        Handle the case where we find a code block within the text.
-        If it's a complete code block, remove it and return surrounding text.
-        If it's the start of a code block, return text before it and set state.
         """
-        parts = re.split(code_block_pattern, text)
-        if len(parts) > 2:
-            return (parts[0] + " " + parts[-1]).strip()
-        self._in_code_block = True
-        return parts[0].strip()
+        line = lines[i]
+        if "|" not in line:
+            self._in_table = False
+        elif not self._in_table and i + 1 < len(lines):
+            delimiter = lines[i + 1]
+            cells = _count_table_cells(line)
+            self._in_table = (
+                bool(_TABLE_DELIMITER_RE.match(delimiter))
+                and cells == _count_table_cells(delimiter)
+                # Single column tables need leading pipes.
+                and (cells > 1 or (line.lstrip().startswith("|") and delimiter.startswith("|")))
+            )
+        return self._in_table
 
     #
-    # Filter tables
+    # Blocks
     #
-    def remove_tables(self, text: str) -> str:
-        """
-        Remove tables from the input text, handling cases where
-        both start and end tags are in the same input.
-        """
-        if self._interrupted:
-            self._in_table = False
-            return text
 
-        # Pattern to match entire table or parts of it
-        table_pattern = r"<table>.*?</table>"
-        partial_table_start = r"<table>.*"
-        partial_table_end = r".*</table>"
+    def _parse_blocks(self, lines: List[str], keep_numbered_item: bool = False) -> List[str]:
+        blocks: List[str] = []
+        paragraph: List[str] = []
+        items: List[str] = []
+        block_start = True
+        # Number of lines in the current block.
+        block_lines = 0
+
+        def flush():
+            if paragraph:
+                blocks.append(self._render_inline("\n".join(paragraph)))
+                paragraph.clear()
+            if items:
+                rendered = "\n".join(self._render_inline(item) for item in items)
+                blocks.append(f"\n{rendered}\n")
+                items.clear()
+
+        for i, line in enumerate(lines):
+            if self._settings.filter_code:
+                line = self._filter_code_line(line)
+                if line is None:
+                    continue
+
+            if self._settings.filter_tables and self._is_table_row(lines, i):
+                continue
+
+            block_lines = 1 if block_start else block_lines + 1
+
+            # Lines starting with spaces are always plain text.
+            if not line or line[0].isspace():
+                if items:
+                    items[-1] += f"\n{line}"
+                else:
+                    paragraph.append(line)
+                block_start = False
+                continue
+
+            if i == 0 and keep_numbered_item:
+                paragraph.append(line)
+                block_start = False
+                continue
+
+            if match := _ATX_HEADER_RE.match(line):
+                flush()
+                blocks.append(self._render_inline(match.group(2).strip()))
+                block_start = True
+                continue
+
+            if block_lines == 2 and len(paragraph) == 1 and _SETEXT_UNDERLINE_RE.match(line):
+                blocks.append(self._render_inline(paragraph.pop().strip()))
+                block_start = True
+                continue
+
+            if _HR_RE.match(line):
+                flush()
+                blocks.append("")
+                block_start = True
+                continue
+
+            if match := _QUOTE_RE.match(line):
+                # Everything until the end of the block is part of the quote.
+                flush()
+                quote = [match.group(1)]
+                for next_line in lines[i + 1 :]:
+                    match = _QUOTE_RE.match(next_line)
+                    quote.append(match.group(1) if match else next_line)
+                rendered = "\n".join(self._parse_blocks(quote))
+                blocks.append(f"\n{rendered}\n")
+                return blocks
+
+            if match := _LIST_ITEM_RE.match(line):
+                if block_start or items:
+                    if paragraph:
+                        flush()
+                    items.append(match.group(1))
+                    block_start = False
+                    continue
+
+            if items:
+                items[-1] += f"\n{line}"
+            else:
+                paragraph.append(line)
+            block_start = False
+
+        flush()
 
-        # Remove complete tables
-        text = re.sub(table_pattern, "", text, flags=re.DOTALL | re.IGNORECASE)
+        return blocks
 
-        # Handle partial tables at the start
-        if self._in_table:
-            match = re.match(partial_table_end, text, re.DOTALL | re.IGNORECASE)
-            if match:
-                self._in_table = False
-                return text[match.end() :].strip()
+    #
+    # Inline
+    #
+
+    def _render_inline(self, text: str) -> str:
+        out: List[str] = []
+        in_emphasis = False
+        i = 0
+        n = len(text)
+        while i < n:
+            match = _INLINE_SPECIAL_RE.search(text, i)
+            if not match:
+                out.append(text[i:])
+                break
+
+            start = match.start()
+            out.append(text[i:start])
+            i = start
+
+            if match.group("run"):
+                i = match.end()
+                continue
+
+            c = text[i]
+            if c == "*":
+                (i, in_emphasis) = self._render_asterisks(text, i, in_emphasis, out)
+            elif c == "_":
+                i = self._render_underscores(text, i, out)
+            elif c == "`":
+                i = self._render_backticks(text, i, out)
+            elif c == "\\":
+                if i + 1 < n and text[i + 1] == "*":
+                    # Escaped asterisks are still removed next to spaces.
+                    prev_space = i == 0 or text[i - 1].isspace()
+                    next_space = i + 2 == n or text[i + 2].isspace()
+                    if not prev_space and not next_space:
+                        out.append("*")
+                    i += 2
+                elif i + 1 < n and text[i + 1] in _ESCAPABLE:
+                    out.append(text[i + 1])
+                    i += 2
+                else:
+                    out.append(c)
+                    i += 1
+            elif c == "!" and text.startswith("[", i + 1) and (m := _LINK_RE.match(text, i + 1)):
+                # Images are not spoken.
+                i = m.end()
+            elif c == "[" and (m := _LINK_RE.match(text, i)):
+                out.append(self._render_inline(m.group(1)))
+                i = m.end()
+            elif c == "<" and (m := _AUTOLINK_RE.match(text, i)):
+                out.append(m.group(1))
+                i = m.end()
+            elif c == "<" and (m := _HTML_TAG_RE.match(text, i)):
+                i = m.end()
+            elif c == "&":
+                (i, entity) = self._render_entity(text, i)
+                out.append(entity)
+            elif c == "|":
+                i += 1
             else:
-                return ""  # Still inside a table, remove all content
+                out.append(c)
+                i += 1
+
+        result = "".join(out)
 
-        # Handle partial tables at the end
-        match = re.search(partial_table_start, text, re.DOTALL | re.IGNORECASE)
-        if match:
-            self._in_table = True
-            return text[: match.start()].strip()
+        # Lines with only dashes or colons are table leftovers.
+        if "-" in result or ":" in result:
+            result = "\n".join(
+                "" if _SEPARATOR_LINE_RE.match(line) else line for line in result.split("\n")
+            )
 
-        return text.strip()
+        return result
+
+    def _render_asterisks(
+        self, text: str, i: int, in_emphasis: bool, out: List[str]
+    ) -> Tuple[int, bool]:
+        end = i
+        while end < len(text) and text[end] == "*":
+            end += 1
+
+        # Bold markers are always removed.
+        if end - i > 1:
+            return (end, in_emphasis)
+
+        # Single asterisks are removed if they are part of an emphasis or next
+        # to a space. Otherwise (e.g. "3*4") we keep them.
+        if in_emphasis:
+            return (end, False)
+        if end == len(text) or text[end].isspace():
+            return (end, False)
+        if text.find("*", end) >= 0:
+            return (end, True)
+        if i == 0 or text[i - 1].isspace():
+            return (end, False)
+        out.append("*")
+        return (end, False)
+
+    def _render_underscores(self, text: str, i: int, out: List[str]) -> int:
+        end = i
+        while end < len(text) and text[end] == "_":
+            end += 1
+        count = end - i
+
+        # Emphasis (_text_) and strong (__text__) only if underscores are not
+        # within a word.
+        if count <= 2 and (i == 0 or not _is_word_char(text[i - 1])):
+            marker = "_" * count
+            close = text.find(marker, end + 1)
+            while close >= 0 and "\n" not in text[end:close]:
+                after = close + count
+                if text[close - 1] != "_" and (
+                    after == len(text) or not _is_word_char(text[after])
+                ):
+                    out.append(self._render_inline(text[end:close]))
+                    return after
+                close = text.find(marker, close + 1)
+
+        out.append(text[i:end])
+        return end
+
+    def _render_backticks(self, text: str, i: int, out: List[str]) -> int:
+        end = i
+        while end < len(text) and text[end] == "`":
+            end += 1
+        marker = text[i:end]
+
+        # Look for the same number of backticks.
+        close = text.find(marker, end)
+        while close >= 0:
+            after = close + len(marker)
+            if after == len(text) or text[after] != "`":
+                code = text[end:close]
+                if len(marker) > 1:
+                    code = _INLINE_CODE_RE.sub(r"\1", code.strip())
+                elif "\n" in code:
+                    code = code.strip()
+                out.append(self._render_code(code))
+                return after
+            while after < len(text) and text[after] == "`":
+                after += 1
+            close = text.find(marker, after)
+
+        out.append(marker)
+        return end
+
+    def _render_code(self, code: str) -> str:
+        # Code is not formatted, but we still remove repeated characters and
+        # table separators.
+        return _INLINE_SPECIAL_RE.sub(
+            lambda m: "" if m.group("run") or m.group(0) == "|" else m.group(0), code
+        )
+
+    def _render_entity(self, text: str, i: int) -> Tuple[int, str]:
+        for entity, value in _ENTITIES.items():
+            if text.startswith(entity, i):
+                return (i + len(entity), value)
+        return (i + 1, "&")
@@ -0,0 +1,64 @@
+#
+# Copyright (c) 2024, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+import asyncio
+import threading
+from typing import AsyncGenerator, Iterator, TypeVar
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+async def iterate_in_thread(iterator: Iterator[T]) -> AsyncGenerator[T, None]:
+    """Iterates a blocking iterator (e.g. a generator that reads a response of
+    a synchronous client) in a thread, yielding its items as they arrive, so
+    the event loop is not blocked. Exceptions of the iterator are raised here.
+
+    If we stop iterating (e.g. the task is cancelled), the thread stops after
+    the item it's waiting for and closes the iterator, so generators can clean
+    up (e.g. close the response) in a `finally` block.
+
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    stopped = threading.Event()
+
+    def put(item, error=None):
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, (item, error))
+        except RuntimeError:
+            # The event loop is closed, nobody is waiting for the items.
+            stopped.set()
+
+    def run():
+        try:
+            for item in iterator:
+                if stopped.is_set():
+                    break
+                put(item)
+        except Exception as e:
+            put(None, e)
+        finally:
+            close = getattr(iterator, "close", None)
+            if close:
+                close()
+            put(_DONE)
+
+    # A thread of its own (instead of the default executor), because it might
+    # be waiting for a slow response for a while.
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, error = await queue.get()
+            if error:
+                raise error
+            if item is _DONE:
+                return
+            yield item
+    finally:
+        stopped.set()
@@ -0,0 +1,85 @@
+#
+# Copyright (c) 2024, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+import re
+from typing import Any, Callable, Iterator, Optional
+
+from loguru import logger
+
+# Returns the number of tokens of a text.
+Tokenizer = Callable[[str], int]
+
+# Tokens used by every message besides its content (role, separators...).
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# Images are not tokenized, they are counted as this.
+IMAGE_TOKENS = 800
+
+
+def estimate_tokens(text: str) -> int:
+    """Fast estimate of the number of tokens of a text, used when no tokenizer
+    is given.
+
+    >>> estimate_tokens("What time is it?")
+    6
+
+    """
+    return int(len(re.split(r"[^\w]+", text)) * 1.3)
+
+
+def tiktoken_tokenizer(model: str = "gpt-4o") -> Tokenizer:
+    """Returns a tokenizer that uses `tiktoken` (if it's installed) with the
+    encoding of the given OpenAI model. Otherwise, it returns the
+    `estimate_tokens()` fallback.
+
+    """
+    try:
+        import tiktoken
+    except ModuleNotFoundError:
+        logger.warning("tiktoken is not installed, estimating tokens instead")
+        return estimate_tokens
+
+    try:
+        encoding = tiktoken.encoding_for_model(model)
+    except KeyError:
+        encoding = tiktoken.get_encoding("o200k_base")
+
+    def tokenizer(text: str) -> int:
+        return len(encoding.encode(text, disallowed_special=()))
+
+    return tokenizer
+
+
+def _message_texts(value: Any) -> Iterator[Optional[str]]:
+    # Yields None for images.
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, list):
+        for item in value:
+            yield from _message_texts(item)
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            if key in ("role", "type", "id", "tool_call_id", "tool_use_id", "mime_type"):
+                continue
+            if key in ("data", "image_url", "source"):
+                yield None
+                continue
+            yield from _message_texts(item)
+
+
+def count_message_tokens(message: dict, tokenizer: Tokenizer = estimate_tokens) -> int:
+    """Returns the number of tokens of a message in OpenAI or Anthropic format.
+
+    >>> count_message_tokens({"role": "user", "content": "What time is it?"})
+    10
+    >>> count_message_tokens({"role": "user", "content": "Hi"}, lambda text: len(text))
+    6
+
+    """
+    tokens = MESSAGE_OVERHEAD_TOKENS
+    for text in _message_texts(message):
+        tokens += tokenizer(text) if text is not None else IMAGE_TOKENS
+    return tokens
@@ -1,9 +1,23 @@
+import random
 import unittest
 
 from typing import AsyncGenerator
 
-from pipecat.services.ai_services import AIService, match_endofsentence
-from pipecat.frames.frames import EndFrame, Frame, TextFrame
+from pipecat.services.ai_services import AIService, TTSService, match_endofsentence
+from pipecat.frames.frames import (
+    EndFrame,
+    Frame,
+    LLMFullResponseEndFrame,
+    MetricsFrame,
+    StartFrame,
+    TextFrame,
+    TTSSpeakFrame,
+)
+from pipecat.clocks.system_clock import SystemClock
+from pipecat.metrics.metrics import TTSFlushMetricsData
+from pipecat.processors.frame_processor import FrameDirection
+from pipecat.utils.string import SentenceSegmenter
+from pipecat.utils.text.clause_flush_policy import ClauseFlushPolicy
 
 
 class SimpleAIService(AIService):
@@ -11,6 +25,32 @@ class SimpleAIService(AIService):
         yield frame
 
 
+class MockTTSService(TTSService):
+    def __init__(self, **kwargs):
+        super().__init__(push_text_frames=False, **kwargs)
+        self.requests = []
+        self.pushed_frames = []
+
+    async def set_model(self, model: str):
+        pass
+
+    def set_voice(self, voice: str):
+        pass
+
+    async def flush_audio(self):
+        pass
+
+    def can_generate_metrics(self) -> bool:
+        return True
+
+    async def run_tts(self, text: str) -> AsyncGenerator[Frame, None]:
+        self.requests.append(text)
+        yield TextFrame(text)
+
+    async def push_frame(self, frame: Frame, direction: FrameDirection = FrameDirection.DOWNSTREAM):
+        self.pushed_frames.append(frame)
+
+
 class TestBaseAIService(unittest.IsolatedAsyncioTestCase):
     async def test_simple_processing(self):
         service = SimpleAIService()
@@ -53,6 +93,97 @@ class TestBaseAIService(unittest.IsolatedAsyncioTestCase):
             assert match_endofsentence(i)
         assert not match_endofsentence("你好，")
 
+    async def test_sentence_segmenter(self):
+        text = (
+            "Hello Mr. Smith, it's 3:00 a.m. in the U.S.A. right now. Pi is 3.14! "
+            "Prof. Walker said: call Dr. Who; or Mrs. Jones?  你好。吃了吗？ 安全第一； "
+            "He counted 1. 2. 3. and left...  Done"
+        )
+        rng = random.Random(0)
+        for _ in range(50):
+            # Split the text in random tokens, like an LLM would stream it.
+            tokens = []
+            i = 0
+            while i < len(text):
+                n = rng.randint(1, 6)
+                tokens.append(text[i : i + n])
+                i += n
+
+            segmenter = SentenceSegmenter()
+            current = ""
+            for token in tokens:
+                current += token
+                expected = match_endofsentence(current)
+                self.assertEqual(segmenter.append(token), expected)
+                if expected:
+                    self.assertEqual(segmenter.pop(expected), current[:expected])
+                    current = current[expected:]
+                self.assertEqual(segmenter.text, current)
+            self.assertEqual(segmenter.flush(), current)
+
+
+class TestTTSService(unittest.IsolatedAsyncioTestCase):
+    async def stream(self, tts: TTSService, tokens):
+        await tts.process_frame(
+            StartFrame(clock=SystemClock(), enable_metrics=True), FrameDirection.DOWNSTREAM
+        )
+        for token in tokens:
+            await tts.process_frame(TextFrame(token), FrameDirection.DOWNSTREAM)
+        await tts.process_frame(LLMFullResponseEndFrame(), FrameDirection.DOWNSTREAM)
+
+    async def test_sentences(self):
+        tts = MockTTSService()
+        await self.stream(tts, ["Well, ", "I think ", "that, ", "yes. ", "Bye, ", "bye ", "now."])
+        self.assertEqual(tts.requests, ["Well, I think that, yes.", " Bye, bye now."])
+
+    async def test_clause_flush_policy(self):
+        tts = MockTTSService(flush_policy=ClauseFlushPolicy(min_words=3, timeout_secs=None))
+        tokens = ["Well, ", "I think ", "that, ", "yes. ", "Bye, ", "bye ", "now. ", "And, ", "so"]
+        await self.stream(tts, tokens)
+        # Only the first chunk is flushed early.
+        self.assertEqual(
+            tts.requests, ["Well, I think that,", " yes.", " Bye, bye now.", " And, so"]
+        )
+
+        metrics = [
+            d
+            for f in tts.pushed_frames
+            if isinstance(f, MetricsFrame)
+            for d in f.data
+            if isinstance(d, TTSFlushMetricsData)
+        ]
+        self.assertEqual(len(metrics), 1)
+        self.assertEqual(metrics[0].requests, 4)
+        self.assertEqual(metrics[0].extra_requests, 1)
+        self.assertGreaterEqual(metrics[0].value, 0)
+
+        # Next response starts flushing early again.
+        tts.requests.clear()
+        await self.stream(tts, ["One, ", "two, ", "three, ", "four."])
+        self.assertEqual(tts.requests, ["One, two, three,", " four."])
+
+    async def test_clause_flush_policy_after_speak(self):
+        tts = MockTTSService(flush_policy=ClauseFlushPolicy(min_words=3, timeout_secs=None))
+        # A greeting is not part of the next LLM response.
+        await tts.process_frame(TTSSpeakFrame("Hello there!"), FrameDirection.DOWNSTREAM)
+        await self.stream(tts, ["One, ", "two, ", "three, ", "four."])
+        self.assertEqual(tts.requests, ["Hello there!", "One, two, three,", " four."])
+
+        metrics = [
+            d
+            for f in tts.pushed_frames
+            if isinstance(f, MetricsFrame)
+            for d in f.data
+            if isinstance(d, TTSFlushMetricsData)
+        ]
+        self.assertEqual([(m.requests, m.extra_requests) for m in metrics], [(2, 1)])
+
+    async def test_clause_flush_policy_timeout(self):
+        tts = MockTTSService(flush_policy=ClauseFlushPolicy(min_words=3, timeout_secs=0))
+        await self.stream(tts, ["The ", "number ", "is ", "1,000 ", "dollars."])
+        # With no clause boundary, complete words are flushed after the timeout.
+        self.assertEqual(tts.requests, ["The", " number is 1,000 dollars."])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+
+from pipecat.audio.chunker import AudioChunker
+
+
+class TestAudioChunker(unittest.TestCase):
+    def test_partial(self):
+        chunker = AudioChunker(4)
+        self.assertEqual(chunker.push(b"01"), [])
+        self.assertEqual(chunker.push(b"2"), [])
+        self.assertEqual(len(chunker), 3)
+        self.assertEqual(chunker.push(b"3456"), [b"0123"])
+        self.assertEqual(chunker.flush(), b"456")
+        self.assertEqual(len(chunker), 0)
+        self.assertEqual(chunker.flush(), b"")
+
+    def test_exact(self):
+        chunker = AudioChunker(4)
+        audio = b"0123"
+        chunks = chunker.push(audio)
+        # Nothing pending, so the frame is passed through without a copy.
+        self.assertEqual(chunks, [audio])
+        self.assertIs(chunks[0], audio)
+        self.assertEqual(chunker.push(b"45678901"), [b"4567", b"8901"])
+        self.assertEqual(len(chunker), 0)
+
+        # With pending audio the chunk spans both frames.
+        chunker.push(b"ab")
+        self.assertEqual(chunker.push(b"cdef"), [b"abcd"])
+        self.assertEqual(chunker.flush(), b"ef")
+
+    def test_compaction(self):
+        chunker = AudioChunker(4)
+        # Frame sizes that leave different remainders, so the read offset
+        # crosses the compaction threshold at different points.
+        sizes = [3, 5, 7, 4, 1, 9, 6, 2] * 20
+        stream = bytes(range(256)) * 4
+        chunks = []
+        start = 0
+        for size in sizes:
+            chunks.extend(chunker.push(stream[start : start + size]))
+            start += size
+            # Consumed bytes are dropped, the buffer doesn't keep growing.
+            self.assertLess(len(chunker), 4)
+            self.assertLess(len(chunker._buffer), 2 * (4 + max(sizes)))
+        self.assertTrue(all(len(chunk) == 4 for chunk in chunks))
+        self.assertEqual(b"".join(chunks) + chunker.flush(), stream[:start])
+
+    def test_extend_and_read(self):
+        chunker = AudioChunker(4)
+        chunker.extend(b"0123456789")
+        self.assertEqual(list(chunker.chunks()), [b"0123", b"4567"])
+        chunker.extend(b"ab")
+        self.assertEqual(chunker.read(3), b"89a")
+        self.assertEqual(chunker.push(b"cdefg"), [b"bcde"])
+        chunker.clear()
+        self.assertEqual(len(chunker), 0)
+
+    def test_invalid_chunk_size(self):
+        with self.assertRaises(ValueError):
+            AudioChunker(0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+
+from typing import List, Type
+
+from pipecat.frames.frames import (
+    AudioRawFrame,
+    InputAudioRawFrame,
+    OutputAudioRawFrame,
+)
+from pipecat.pipeline.pipeline import Pipeline
+from pipecat.processors.audio.audio_resample_processor import AudioResampleProcessor
+from pipecat.processors.frame_processor import FrameProcessor
+
+
+class AudioProcessor(FrameProcessor):
+    def __init__(
+        self,
+        *,
+        accepts: dict | None = None,
+        produces: dict | None = None,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self._accepts = accepts or {}
+        self._produces = produces or {}
+
+    def accepted_audio_sample_rates(self, frame_type: Type[AudioRawFrame]) -> List[int] | None:
+        return self._accepts.get(frame_type)
+
+    def produced_audio_sample_rate(self, frame_type: Type[AudioRawFrame]) -> int | None:
+        return self._produces.get(frame_type)
+
+
+class TestAudioNegotiation(unittest.IsolatedAsyncioTestCase):
+    def resamplers(self, pipeline: Pipeline) -> List[AudioResampleProcessor]:
+        return [p for p in pipeline._processors if isinstance(p, AudioResampleProcessor)]
+
+    async def test_no_mismatch(self):
+        pipeline = Pipeline(
+            [
+                AudioProcessor(produces={InputAudioRawFrame: 16000}),
+                AudioProcessor(accepts={InputAudioRawFrame: [16000]}),
+                AudioProcessor(produces={OutputAudioRawFrame: 16000}),
+                AudioProcessor(accepts={OutputAudioRawFrame: [16000]}),
+            ]
+        )
+        pipeline.negotiate_audio_formats()
+        self.assertEqual(self.resamplers(pipeline), [])
+
+    async def test_inserts_resamplers(self):
+        stt = AudioProcessor(accepts={InputAudioRawFrame: [8000]})
+        output = AudioProcessor(accepts={OutputAudioRawFrame: [16000]})
+        pipeline = Pipeline(
+            [
+                AudioProcessor(produces={InputAudioRawFrame: 16000}),
+                stt,
+                AudioProcessor(produces={OutputAudioRawFrame: 24000}),
+                output,
+            ]
+        )
+        pipeline.negotiate_audio_formats()
+
+        resamplers = self.resamplers(pipeline)
+        self.assertEqual(len(resamplers), 2)
+        self.assertEqual(resamplers[0].produced_audio_sample_rate(InputAudioRawFrame), 8000)
+        self.assertEqual(resamplers[1].produced_audio_sample_rate(OutputAudioRawFrame), 16000)
+        self.assertIs(resamplers[0]._next, stt)
+        self.assertIs(resamplers[1]._next, output)
+
+        # Negotiating again doesn't add more resamplers.
+        pipeline.negotiate_audio_formats()
+        self.assertEqual(len(self.resamplers(pipeline)), 2)
+
+    async def test_nested_pipeline(self):
+        inner = Pipeline([AudioProcessor(produces={OutputAudioRawFrame: 24000})])
+        pipeline = Pipeline([inner, AudioProcessor(accepts={OutputAudioRawFrame: [16000, 8000]})])
+        pipeline.negotiate_audio_formats()
+
+        resamplers = self.resamplers(pipeline)
+        self.assertEqual(len(resamplers), 1)
+        self.assertEqual(resamplers[0].accepted_audio_sample_rates(OutputAudioRawFrame), [24000])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,206 @@
+import asyncio
+import base64
+import json
+import unittest
+
+import websockets
+
+from pipecat.clocks.system_clock import SystemClock
+from pipecat.frames.frames import (
+    EndFrame,
+    StartFrame,
+    StartInterruptionFrame,
+    TTSAudioRawFrame,
+)
+from pipecat.processors.frame_processor import FrameDirection
+from pipecat.services.cartesia import CartesiaConnectionManager, CartesiaTTSService
+
+HOST = "localhost"
+PORT = 8768
+
+
+class CartesiaServer:
+    """Stand-in for the Cartesia websocket API. Every transcript is answered
+    with a chunk (the audio is the transcript itself) and its word timestamps,
+    and contexts are done when `continue` is false.
+
+    """
+
+    def __init__(self):
+        self.connections = []
+        self.messages = []
+        self.cancelled = []
+        self._server = None
+
+    async def start(self):
+        self._server = await websockets.serve(self._handler, HOST, PORT)
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def send(self, context_id: str, msg: dict):
+        # Cartesia keeps sending messages for a while after a context is
+        # cancelled, we use this to simulate that.
+        await self.connections[-1].send(json.dumps({"context_id": context_id, **msg}))
+
+    async def _handler(self, websocket):
+        self.connections.append(websocket)
+        async for message in websocket:
+            msg = json.loads(message)
+            msg["connection"] = self.connections.index(websocket)
+            self.messages.append(msg)
+            context_id = msg["context_id"]
+            if msg.get("cancel"):
+                self.cancelled.append(context_id)
+                continue
+            transcript = msg["transcript"].strip()
+            if transcript:
+                audio = base64.b64encode(transcript.encode("utf-8")).decode("utf-8")
+                words = transcript.split()
+                await websocket.send(
+                    json.dumps({"type": "chunk", "context_id": context_id, "data": audio})
+                )
+                await websocket.send(
+                    json.dumps(
+                        {
+                            "type": "timestamps",
+                            "context_id": context_id,
+                            "word_timestamps": {
+                                "words": words,
+                                "start": [i * 0.01 for i in range(len(words))],
+                            },
+                        }
+                    )
+                )
+            if not msg["continue"]:
+                await websocket.send(json.dumps({"type": "done", "context_id": context_id}))
+
+
+async def wait_for(condition, timeout: float = 2.0):
+    for _ in range(int(timeout / 0.01)):
+        if condition():
+            return True
+        await asyncio.sleep(0.01)
+    return condition()
+
+
+class MockCartesiaTTSService(CartesiaTTSService):
+    def __init__(self, **kwargs):
+        super().__init__(api_key="key", voice_id="voice", url=f"ws://{HOST}:{PORT}", **kwargs)
+        self.audio = []
+
+    async def push_frame(self, frame, direction=FrameDirection.DOWNSTREAM):
+        await super().push_frame(frame, direction)
+        if isinstance(frame, TTSAudioRawFrame):
+            self.audio.append(frame.audio.decode("utf-8"))
+
+
+class TestCartesiaConnectionManager(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = CartesiaServer()
+        await self.server.start()
+
+    async def asyncTearDown(self):
+        await self.server.stop()
+
+    def manager(self, **kwargs):
+        return CartesiaConnectionManager(api_key="key", url=f"ws://{HOST}:{PORT}", **kwargs)
+
+    async def start_service(self, manager: CartesiaConnectionManager):
+        tts = MockCartesiaTTSService(connection_manager=manager)
+        await tts.process_frame(StartFrame(clock=SystemClock()), FrameDirection.DOWNSTREAM)
+        return tts
+
+    async def say(self, tts: CartesiaTTSService, text: str):
+        await tts.process_generator(tts.run_tts(text))
+
+    async def test_manager_credentials(self):
+        manager = self.manager()
+        # The manager's credentials are used.
+        tts = CartesiaTTSService(voice_id="voice", connection_manager=manager)
+        self.assertEqual(tts._api_key, "key")
+        self.assertEqual(tts._url, f"ws://{HOST}:{PORT}")
+        await tts.cleanup()
+        with self.assertRaises(ValueError):
+            CartesiaTTSService(api_key="other", voice_id="voice", connection_manager=manager)
+        with self.assertRaises(ValueError):
+            CartesiaTTSService(voice_id="voice")
+
+    async def test_shared_connection(self):
+        manager = self.manager()
+        tts1 = await self.start_service(manager)
+        tts2 = await self.start_service(manager)
+
+        await self.say(tts1, "Hello from one.")
+        await self.say(tts2, "Hello from two.")
+        await self.say(tts1, "Bye from one.")
+        await tts1.flush_audio()
+        await tts2.flush_audio()
+
+        self.assertTrue(await wait_for(lambda: len(tts1.audio) == 2 and len(tts2.audio) == 1))
+        self.assertEqual(tts1.audio, ["Hello from one.", "Bye from one."])
+        self.assertEqual(tts2.audio, ["Hello from two."])
+        self.assertEqual(len(self.server.connections), 1)
+
+        # Each service only gets its own word timestamps.
+        await tts1._words_queue.join()
+        await tts2._words_queue.join()
+        self.assertTrue(await wait_for(lambda: tts1._context_id is None))
+        self.assertTrue(await wait_for(lambda: tts2._context_id is None))
+
+        await tts1.stop(EndFrame())
+        await tts2.stop(EndFrame())
+        await tts1._stop_words_task()
+        await tts2._stop_words_task()
+        await manager.close()
+
+    async def test_interruption_cancels_context(self):
+        manager = self.manager()
+        tts1 = await self.start_service(manager)
+        tts2 = await self.start_service(manager)
+
+        await self.say(tts1, "Hello from one.")
+        await self.say(tts2, "Hello from two.")
+        self.assertTrue(await wait_for(lambda: tts1.audio and tts2.audio))
+        context_id = tts1._context_id
+
+        await tts1.process_frame(StartInterruptionFrame(), FrameDirection.DOWNSTREAM)
+        self.assertTrue(await wait_for(lambda: self.server.cancelled == [context_id]))
+
+        # Late audio for the cancelled context is dropped, the other service
+        # is not affected.
+        audio = base64.b64encode(b"late").decode("utf-8")
+        await self.server.send(context_id, {"type": "chunk", "data": audio})
+        await self.say(tts2, "More from two.")
+        self.assertTrue(await wait_for(lambda: len(tts2.audio) == 2))
+        self.assertEqual(tts1.audio, ["Hello from one."])
+
+        await tts1.stop(EndFrame())
+        await tts2.stop(EndFrame())
+        await tts1._stop_words_task()
+        await tts2._stop_words_task()
+        await manager.close()
+
+    async def test_max_contexts_per_connection(self):
+        manager = self.manager(max_connections=2, max_contexts_per_connection=1)
+        tts1 = await self.start_service(manager)
+        tts2 = await self.start_service(manager)
+
+        await self.say(tts1, "Hello from one.")
+        await self.say(tts2, "Hello from two.")
+        self.assertTrue(await wait_for(lambda: tts1.audio and tts2.audio))
+        self.assertEqual(manager.num_connections, 2)
+        connections = {m["context_id"]: m["connection"] for m in self.server.messages}
+        self.assertEqual(connections[tts1._context_id], 0)
+        self.assertEqual(connections[tts2._context_id], 1)
+
+        await tts1.stop(EndFrame())
+        await tts2.stop(EndFrame())
+        await tts1._stop_words_task()
+        await tts2._stop_words_task()
+        await manager.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
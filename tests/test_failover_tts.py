@@ -0,0 +1,146 @@
+import asyncio
+import unittest
+
+from pipecat.clocks.system_clock import SystemClock
+from pipecat.frames.frames import (
+    ErrorFrame,
+    StartFrame,
+    TextFrame,
+    TTSAudioRawFrame,
+    TTSStartedFrame,
+    TTSStoppedFrame,
+)
+from pipecat.processors.frame_processor import FrameDirection
+from pipecat.services.ai_services import TTSService, WordTTSService
+from pipecat.services.failover_tts import FailoverTTSService
+
+
+class SlowTTSService(TTSService):
+    def __init__(self, name: str, delay: float, fail: bool = False, **kwargs):
+        super().__init__(name=name, **kwargs)
+        self.delay = delay
+        self.fail = fail
+        self.requests = []
+        self.cancelled = []
+
+    async def set_model(self, model: str):
+        pass
+
+    def set_voice(self, voice: str):
+        pass
+
+    async def flush_audio(self):
+        pass
+
+    async def run_tts(self, text: str):
+        self.requests.append(text)
+        try:
+            yield TTSStartedFrame()
+            await asyncio.sleep(self.delay)
+            if self.fail:
+                yield ErrorFrame("failed")
+                return
+            yield TTSAudioRawFrame(self.name.encode("utf-8"), 16000, 1)
+            yield TTSStoppedFrame()
+        except asyncio.CancelledError:
+            self.cancelled.append(text)
+            raise
+
+
+class SlowWordTTSService(SlowTTSService, WordTTSService):
+    pass
+
+
+class MockFailoverTTSService(FailoverTTSService):
+    def __init__(self, **kwargs):
+        super().__init__(aggregate_sentences=False, push_text_frames=False, **kwargs)
+        self.pushed_frames = []
+
+    async def push_frame(self, frame, direction=FrameDirection.DOWNSTREAM):
+        await super().push_frame(frame, direction)
+        self.pushed_frames.append(frame)
+
+    @property
+    def audio(self):
+        return [f.audio.decode() for f in self.pushed_frames if isinstance(f, TTSAudioRawFrame)]
+
+
+class TestFailoverTTSService(unittest.IsolatedAsyncioTestCase):
+    async def say(self, tts: TTSService, text: str):
+        await tts.process_frame(TextFrame(text), FrameDirection.DOWNSTREAM)
+
+    async def start(self, tts: TTSService):
+        await tts.process_frame(StartFrame(clock=SystemClock()), FrameDirection.DOWNSTREAM)
+
+    async def test_sample_rates(self):
+        services = [SlowTTSService("a", 0), SlowTTSService("b", 0, sample_rate=24000)]
+        with self.assertRaises(ValueError):
+            MockFailoverTTSService(services=services)
+
+    async def test_websocket_services(self):
+        services = [SlowTTSService("a", 0), SlowWordTTSService("b", 0)]
+        with self.assertRaises(ValueError):
+            MockFailoverTTSService(services=services)
+        services[1]._words_task.cancel()
+
+    async def test_service_errors(self):
+        primary = SlowTTSService("primary", 0.01)
+        secondary = SlowTTSService("secondary", 0.01)
+        tts = MockFailoverTTSService(services=[primary, secondary])
+        await self.start(tts)
+
+        # Errors pushed by the services themselves (e.g. in start()) are not lost.
+        error = ErrorFrame("no speakers")
+        await primary.push_error(error)
+        errors = [f for f in tts.pushed_frames if isinstance(f, ErrorFrame)]
+        self.assertEqual(errors, [error])
+
+    async def test_primary(self):
+        primary = SlowTTSService("primary", 0.01)
+        secondary = SlowTTSService("secondary", 0.01)
+        tts = MockFailoverTTSService(services=[primary, secondary], hedge_after_secs=0.2)
+        await self.start(tts)
+
+        await self.say(tts, "Hello.")
+        self.assertEqual(tts.audio, ["primary"])
+        self.assertEqual(secondary.requests, [])
+        started = [f for f in tts.pushed_frames if isinstance(f, TTSStartedFrame)]
+        stopped = [f for f in tts.pushed_frames if isinstance(f, TTSStoppedFrame)]
+        self.assertEqual((len(started), len(stopped)), (1, 1))
+
+    async def test_hedge(self):
+        primary = SlowTTSService("primary", 0.5)
+        secondary = SlowTTSService("secondary", 0.01)
+        tts = MockFailoverTTSService(services=[primary, secondary], hedge_after_secs=0.05)
+        await self.start(tts)
+
+        await self.say(tts, "Hello.")
+        # The secondary answered first and the primary was cancelled.
+        self.assertEqual(tts.audio, ["secondary"])
+        self.assertEqual(primary.cancelled, ["Hello."])
+
+        # The secondary is now faster, so it goes first.
+        self.assertEqual(tts.services, [secondary, primary])
+        await self.say(tts, "Bye.")
+        self.assertEqual(tts.audio, ["secondary", "secondary"])
+        self.assertEqual(primary.requests, ["Hello."])
+
+    async def test_failure(self):
+        primary = SlowTTSService("primary", 0.01, fail=True)
+        secondary = SlowTTSService("secondary", 0.01)
+        tts = MockFailoverTTSService(services=[primary, secondary], hedge_after_secs=1.0)
+        await self.start(tts)
+
+        await self.say(tts, "Hello.")
+        # We didn't wait for the hedging budget.
+        self.assertEqual(tts.audio, ["secondary"])
+        self.assertFalse(any(isinstance(f, ErrorFrame) for f in tts.pushed_frames))
+
+        secondary.fail = True
+        await self.say(tts, "Bye.")
+        errors = [f for f in tts.pushed_frames if isinstance(f, ErrorFrame)]
+        self.assertEqual(len(errors), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import asyncio
+import unittest
+
+from pipecat.frames.frames import FunctionCallResultFrame
+from pipecat.processors.aggregators.openai_llm_context import (
+    LLMFunctionCall,
+    OpenAILLMContext,
+)
+from pipecat.processors.frame_processor import FrameDirection
+from pipecat.services.ai_services import LLMService
+from pipecat.services.function_cache import (
+    MISSING,
+    FunctionCallCache,
+    set_function_call_cache,
+)
+
+
+class MockLLMService(LLMService):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.pushed_frames = []
+        self.calls = []
+
+    async def push_frame(self, frame, direction=FrameDirection.DOWNSTREAM):
+        await super().push_frame(frame, direction)
+        self.pushed_frames.append(frame)
+
+    @property
+    def results(self):
+        return [f.result for f in self.pushed_frames if isinstance(f, FunctionCallResultFrame)]
+
+    async def get_weather(self, function_name, tool_call_id, args, llm, context, result_callback):
+        self.calls.append(args)
+        if args.get("location") == "nowhere":
+            raise Exception("unknown location")
+        await result_callback({"location": args["location"], "temperature": 20})
+
+    async def call(self, arguments):
+        await self.call_functions(
+            context=OpenAILLMContext(),
+            function_calls=[
+                LLMFunctionCall(
+                    function_name="get_weather", tool_call_id="call_1", arguments=arguments
+                )
+            ],
+        )
+        await asyncio.gather(*self._function_call_tasks)
+
+
+class TestFunctionCallCache(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.cache = FunctionCallCache()
+        set_function_call_cache(self.cache)
+
+    async def asyncTearDown(self):
+        set_function_call_cache(FunctionCallCache())
+
+    async def test_hit(self):
+        llm = MockLLMService()
+        llm.register_function("get_weather", llm.get_weather, cache_ttl_secs=60)
+        await llm.call({"location": "SF", "unit": "C"})
+        # The order of the arguments doesn't matter.
+        await llm.call('{"unit": "C", "location": "SF"}')
+        self.assertEqual(len(llm.calls), 1)
+        self.assertEqual(llm.results, [{"location": "SF", "temperature": 20}] * 2)
+
+        # The cache is shared by all services.
+        other = MockLLMService()
+        other.register_function("get_weather", other.get_weather, cache_ttl_secs=60)
+        await other.call({"location": "SF", "unit": "C"})
+        self.assertEqual(other.calls, [])
+        self.assertEqual(self.cache.hits, 2)
+
+    async def test_not_cached(self):
+        llm = MockLLMService()
+        llm.register_function("get_weather", llm.get_weather)
+        await llm.call({"location": "SF"})
+        await llm.call({"location": "SF"})
+        self.assertEqual(len(llm.calls), 2)
+
+        # Errors are not cached.
+        llm.register_function("get_weather", llm.get_weather, cache_ttl_secs=60)
+        await llm.call({"location": "nowhere"})
+        await llm.call({"location": "nowhere"})
+        self.assertEqual(len(llm.calls), 4)
+        self.assertEqual(len(self.cache), 0)
+
+    async def test_ttl_and_lru(self):
+        llm = MockLLMService()
+        llm.register_function(
+            "get_weather", llm.get_weather, cache_ttl_secs=0.05, cache_max_entries=2
+        )
+        for location in ["SF", "NYC", "SF", "LA"]:
+            await llm.call({"location": location})
+        self.assertEqual(len(llm.calls), 3)
+        # "NYC" was the least recently used.
+        self.assertIs(self.cache.get("get_weather", {"location": "NYC"}), MISSING)
+        self.assertIsNot(self.cache.get("get_weather", {"location": "SF"}), MISSING)
+
+        await asyncio.sleep(0.1)
+        await llm.call({"location": "SF"})
+        self.assertEqual(len(llm.calls), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import asyncio
+import time
+import unittest
+
+from pipecat.frames.frames import (
+    FunctionCallInProgressFrame,
+    FunctionCallResultFrame,
+    StartInterruptionFrame,
+)
+from pipecat.processors.aggregators.openai_llm_context import (
+    LLMFunctionCall,
+    OpenAILLMContext,
+)
+from pipecat.processors.frame_processor import FrameDirection
+from pipecat.services.ai_services import LLMService
+
+
+class MockLLMService(LLMService):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.pushed_frames = []
+        self.cancelled = []
+        self.event = asyncio.Event()
+
+    async def push_frame(self, frame, direction=FrameDirection.DOWNSTREAM):
+        await super().push_frame(frame, direction)
+        self.pushed_frames.append(frame)
+
+    @property
+    def results(self):
+        return [f for f in self.pushed_frames if isinstance(f, FunctionCallResultFrame)]
+
+    async def sleep(self, function_name, tool_call_id, args, llm, context, result_callback):
+        try:
+            await asyncio.sleep(args["secs"])
+            await result_callback({"slept": args["secs"]})
+        except asyncio.CancelledError:
+            self.cancelled.append(tool_call_id)
+            raise
+
+    async def wait_event(self, function_name, tool_call_id, args, llm, context, result_callback):
+        try:
+            await self.event.wait()
+            await result_callback({"done": True})
+        except asyncio.CancelledError:
+            self.cancelled.append(tool_call_id)
+            raise
+
+
+def calls(*secs):
+    return [
+        LLMFunctionCall(function_name="sleep", tool_call_id=f"call_{i}", arguments={"secs": s})
+        for i, s in enumerate(secs)
+    ]
+
+
+class TestFunctionCalls(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.llm = MockLLMService()
+        self.context = OpenAILLMContext()
+
+    async def wait(self):
+        await asyncio.gather(*self.llm._function_call_tasks)
+
+    async def test_concurrent(self):
+        self.llm.register_function("sleep", self.llm.sleep)
+
+        start = time.monotonic()
+        await self.llm.call_functions(context=self.context, function_calls=calls(0.2, 0.1, 0.2))
+        # The pipeline is not blocked while functions run.
+        self.assertLess(time.monotonic() - start, 0.1)
+        in_progress = [
+            f for f in self.llm.pushed_frames if isinstance(f, FunctionCallInProgressFrame)
+        ]
+        self.assertEqual(len(in_progress), 3)
+
+        await self.wait()
+        self.assertLess(time.monotonic() - start, 0.35)
+        results = self.llm.results
+        self.assertEqual(results[0].tool_call_id, "call_1")
+        # Only the last result runs the LLM.
+        self.assertEqual([r.run_llm for r in results], [False, False, True])
+
+    async def test_timeout(self):
+        self.llm.register_function("sleep", self.llm.sleep, timeout_secs=0.5)
+        # The event is never set, so only the timeout can end this call.
+        self.llm.register_function("wait_event", self.llm.wait_event, timeout_secs=0.5)
+        function_calls = [
+            LLMFunctionCall(function_name="sleep", tool_call_id="call_0", arguments={"secs": 0}),
+            LLMFunctionCall(function_name="wait_event", tool_call_id="call_1", arguments={}),
+        ]
+        await self.llm.call_functions(context=self.context, function_calls=function_calls)
+        await self.wait()
+        results = {r.tool_call_id: r for r in self.llm.results}
+        self.assertEqual(results["call_0"].result, {"slept": 0})
+        self.assertIn("error", results["call_1"].result)
+        self.assertTrue(results["call_1"].run_llm)
+        self.assertEqual(self.llm.cancelled, ["call_1"])
+
+    async def test_interruption(self):
+        self.llm.register_function("sleep", self.llm.sleep)
+        await self.llm.call_functions(context=self.context, function_calls=calls(1.0))
+        await asyncio.sleep(0.01)
+        await self.llm.process_frame(StartInterruptionFrame(), FrameDirection.DOWNSTREAM)
+        self.assertEqual(self.llm.cancelled, ["call_0"])
+        self.assertEqual(self.llm.results, [])
+        self.assertEqual(len(self.llm._function_call_tasks), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
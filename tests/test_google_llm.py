@@ -0,0 +1,139 @@
+import asyncio
+import threading
+import time
+import unittest
+from concurrent import futures
+
+import grpc
+from google.ai.generativelanguage_v1beta.services.generative_service import (
+    GenerativeServiceAsyncClient,
+)
+from google.ai.generativelanguage_v1beta.services.generative_service.transports import (
+    GenerativeServiceGrpcAsyncIOTransport,
+)
+from google.ai.generativelanguage_v1beta.types import (
+    GenerateContentRequest,
+    GenerateContentResponse,
+)
+
+from pipecat.frames.frames import MetricsFrame, TextFrame
+from pipecat.metrics.metrics import TTFBMetricsData
+from pipecat.processors.aggregators.openai_llm_context import OpenAILLMContext
+from pipecat.processors.frame_processor import FrameDirection
+from pipecat.services.google import GoogleLLMService
+
+CHUNK_DELAY = 0.2
+
+
+class StubGenerativeService:
+    """A local Gemini API that streams a few chunks slowly."""
+
+    def __init__(self):
+        self.cancelled = threading.Event()
+        self.server = grpc.server(futures.ThreadPoolExecutor(max_workers=2))
+        handler = grpc.method_handlers_generic_handler(
+            "google.ai.generativelanguage.v1beta.GenerativeService",
+            {
+                "StreamGenerateContent": grpc.unary_stream_rpc_method_handler(
+                    self.stream_generate_content,
+                    request_deserializer=GenerateContentRequest.deserialize,
+                    response_serializer=GenerateContentResponse.serialize,
+                )
+            },
+        )
+        self.server.add_generic_rpc_handlers((handler,))
+        self.port = self.server.add_insecure_port("localhost:0")
+        self.server.start()
+
+    def stream_generate_content(self, request, context):
+        for text in ["Hello", " there", "!"]:
+            time.sleep(CHUNK_DELAY)
+            if not context.is_active():
+                self.cancelled.set()
+                return
+            yield GenerateContentResponse(
+                candidates=[{"content": {"role": "model", "parts": [{"text": text}]}}]
+            )
+
+    def stop(self):
+        self.server.stop(None)
+
+
+class MockGoogleLLMService(GoogleLLMService):
+    def __init__(self, port: int):
+        super().__init__(api_key="test")
+        self._enable_metrics = True
+        self.pushed_frames = []
+        channel = grpc.aio.insecure_channel(f"localhost:{port}")
+        self._async_client = GenerativeServiceAsyncClient(
+            transport=GenerativeServiceGrpcAsyncIOTransport(channel=channel)
+        )
+
+    async def push_frame(self, frame, direction=FrameDirection.DOWNSTREAM):
+        self.pushed_frames.append(frame)
+
+
+class TestGoogleLLMService(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = StubGenerativeService()
+        self.llm = MockGoogleLLMService(self.server.port)
+        self.context = OpenAILLMContext([{"role": "user", "content": "Hi"}])
+
+    async def asyncTearDown(self):
+        self.server.stop()
+
+    async def test_streaming_does_not_block(self):
+        ticks = []
+
+        async def ticker():
+            while True:
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.01)
+
+        ticker_task = asyncio.create_task(ticker())
+        await self.llm._process_context(self.context)
+        ticker_task.cancel()
+
+        text = [f.text for f in self.llm.pushed_frames if isinstance(f, TextFrame)]
+        self.assertEqual("".join(text), "Hello there!")
+        # The loop kept running while waiting for chunks.
+        gaps = [b - a for a, b in zip(ticks, ticks[1:])]
+        self.assertGreater(len(ticks), 20)
+        self.assertLess(max(gaps), CHUNK_DELAY / 2)
+
+        # TTFB is measured until the first chunk arrives.
+        ttfb = [
+            d
+            for f in self.llm.pushed_frames
+            if isinstance(f, MetricsFrame)
+            for d in f.data
+            if isinstance(d, TTFBMetricsData)
+        ]
+        self.assertEqual(len(ttfb), 1)
+        self.assertGreaterEqual(ttfb[0].value, CHUNK_DELAY)
+        self.assertLess(ttfb[0].value, CHUNK_DELAY * 2)
+
+    async def test_cancel(self):
+        task = asyncio.create_task(self.llm._process_context(self.context))
+        await asyncio.sleep(CHUNK_DELAY * 1.5)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        # The request is cancelled too.
+        cancelled = await asyncio.to_thread(self.server.cancelled.wait, CHUNK_DELAY * 3)
+        self.assertTrue(cancelled)
+        text = [f.text for f in self.llm.pushed_frames if isinstance(f, TextFrame)]
+        self.assertEqual(text, ["Hello"])
+
+
+class TestGoogleLLMClient(unittest.IsolatedAsyncioTestCase):
+    async def test_client_per_service(self):
+        first = GoogleLLMService(api_key="first")._create_async_client()
+        second = GoogleLLMService(api_key="second")._create_async_client()
+        # Not the process-wide default client, which could belong to another loop.
+        self.assertIsInstance(first, GenerativeServiceAsyncClient)
+        self.assertIsNot(first, second)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import asyncio
+import unittest
+
+from aiohttp import web
+
+from pipecat.transports.services.helpers.daily_rest import DailyRESTHelper
+from pipecat.utils.http_clients import HttpClientRegistry, set_http_client_registry
+
+HOST = "localhost"
+PORT = 8769
+
+
+class TestHttpClientRegistry(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        async def rooms(request):
+            return web.json_response(
+                {
+                    "id": "id",
+                    "name": request.match_info["name"],
+                    "api_created": True,
+                    "privacy": "public",
+                    "url": f"https://example.daily.co/{request.match_info['name']}",
+                    "created_at": "2024-10-01T00:00:00.000Z",
+                    "config": {},
+                }
+            )
+
+        async def hello(request):
+            return web.Response(text="hello")
+
+        app = web.Application()
+        app.router.add_get("/v1/rooms/{name}", rooms)
+        app.router.add_get("/hello", hello)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, HOST, PORT).start()
+
+    async def asyncTearDown(self):
+        await self.runner.cleanup()
+
+    async def test_shared_aiohttp_session(self):
+        registry = HttpClientRegistry()
+        url = f"http://{HOST}:{PORT}"
+
+        session = registry.aiohttp_session(f"{url}/v1")
+        self.assertIs(session, registry.aiohttp_session(f"{url}/other"))
+        self.assertIsNot(session, registry.aiohttp_session("http://127.0.0.1:8000"))
+
+        # Sequential requests reuse the same connection.
+        for _ in range(3):
+            async with registry.aiohttp_session(url).get(f"{url}/hello") as r:
+                self.assertEqual(await r.text(), "hello")
+        stats = registry.stats(url)
+        self.assertEqual(stats.requests, 3)
+        self.assertEqual(stats.connections_created, 1)
+        self.assertEqual(stats.connections_reused, 2)
+
+        await registry.close()
+        self.assertTrue(session.closed)
+        self.assertIsNot(session, registry.aiohttp_session(url))
+        await registry.close()
+
+    async def test_httpx_limits(self):
+        registry = HttpClientRegistry(limit=10, limit_per_host=2)
+        client = registry.httpx_client(f"http://{HOST}:{PORT}")
+        # Each client is for a single host, so the per-host limit applies.
+        self.assertEqual(client._transport._pool._max_connections, 2)
+        await registry.close()
+
+    async def test_clients_per_event_loop(self):
+        registry = HttpClientRegistry()
+        url = f"http://{HOST}:{PORT}"
+        session = registry.aiohttp_session(url)
+
+        def other_loop():
+            async def get_session():
+                other = registry.aiohttp_session(url)
+                await registry.close()
+                return other
+
+            return asyncio.run(get_session())
+
+        other = await asyncio.to_thread(other_loop)
+        self.assertIsNot(session, other)
+        self.assertFalse(session.closed)
+        await registry.close()
+
+    async def test_default_registry(self):
+        registry = HttpClientRegistry()
+        set_http_client_registry(registry)
+        try:
+            helper1 = DailyRESTHelper(daily_api_key="key", daily_api_url=f"http://{HOST}:{PORT}/v1")
+            helper2 = DailyRESTHelper(daily_api_key="key", daily_api_url=f"http://{HOST}:{PORT}/v1")
+            self.assertIs(helper1.aiohttp_session, helper2.aiohttp_session)
+            room = await helper1.get_room_from_url("https://example.daily.co/room")
+            self.assertEqual(room.name, "room")
+            self.assertEqual(registry.stats(f"http://{HOST}:{PORT}").requests, 1)
+        finally:
+            await registry.close()
+            set_http_client_registry(HttpClientRegistry())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import base64
+import io
+import threading
+import unittest
+
+from PIL import Image
+
+from pipecat.frames.frames import VisionImageRawFrame
+from pipecat.processors.aggregators.openai_llm_context import OpenAILLMContext
+from pipecat.processors.frame_processor import FrameDirection
+from pipecat.services.anthropic import AnthropicLLMContext
+from pipecat.services.openai import BaseOpenAILLMService
+from pipecat.utils.image_cache import ImageCache, get_image_cache
+
+
+def raw_image(size=(64, 48), color=(255, 0, 0)) -> bytes:
+    return Image.new("RGB", size, color).tobytes()
+
+
+class ThreadCheckingImageCache(ImageCache):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.threads = []
+
+    def _encode(self, *args):
+        self.threads.append(threading.current_thread())
+        return super()._encode(*args)
+
+
+class MockOpenAILLMService(BaseOpenAILLMService):
+    def __init__(self):
+        super().__init__(model="gpt-4o", api_key="test")
+        self.contexts = []
+
+    async def push_frame(self, frame, direction=FrameDirection.DOWNSTREAM):
+        pass
+
+    async def _process_context(self, context):
+        self.contexts.append(context)
+
+
+class TestImageCache(unittest.IsolatedAsyncioTestCase):
+    async def test_encode_once(self):
+        cache = ThreadCheckingImageCache()
+        image = raw_image()
+        encoded = await cache.encode(format="RGB", size=(64, 48), image=image)
+        self.assertIs(encoded, await cache.encode(format="RGB", size=(64, 48), image=image))
+        self.assertIs(encoded, cache.encode_sync(format="RGB", size=(64, 48), image=image))
+        # Encoded only once, and not in the event loop thread.
+        self.assertEqual(len(cache.threads), 1)
+        self.assertIsNot(cache.threads[0], threading.main_thread())
+
+        self.assertEqual(Image.open(io.BytesIO(encoded.jpeg)).size, (64, 48))
+        self.assertEqual(base64.b64decode(encoded.base64), encoded.jpeg)
+        self.assertTrue(encoded.data_url.startswith("data:image/jpeg;base64,"))
+
+        other = await cache.encode(format="RGB", size=(64, 48), image=raw_image(color=(0, 0, 255)))
+        self.assertNotEqual(other.key, encoded.key)
+        self.assertEqual(len(cache), 2)
+
+    async def test_downscale(self):
+        cache = ImageCache(max_tokens=100)
+        encoded = await cache.encode(format="RGB", size=(1000, 750), image=raw_image((1000, 750)))
+        self.assertEqual(encoded.size, (316, 237))
+        self.assertEqual(Image.open(io.BytesIO(encoded.jpeg)).size, (316, 237))
+
+    async def test_contexts(self):
+        image = await get_image_cache().encode(format="RGB", size=(64, 48), image=raw_image())
+
+        context = OpenAILLMContext()
+        context.add_encoded_image_message(image, text="What's this?")
+        self.assertEqual(
+            context.messages[0]["content"],
+            [
+                {"type": "text", "text": "What's this?"},
+                {"type": "image_url", "image_url": {"url": image.data_url}},
+            ],
+        )
+
+        context = AnthropicLLMContext()
+        context.add_encoded_image_message(image, text="What's this?")
+        self.assertEqual(context.messages[0]["content"][0]["source"]["data"], image.base64)
+
+        # Images from frames are taken from the cache.
+        frame = VisionImageRawFrame(image=raw_image(), size=(64, 48), format="RGB", text="Hi")
+        context = OpenAILLMContext.from_image_frame(frame)
+        self.assertEqual(context.messages[0]["data"].getvalue(), image.jpeg)
+
+    async def test_openai_image_frame(self):
+        image = await get_image_cache().encode(format="RGB", size=(64, 48), image=raw_image())
+        llm = MockOpenAILLMService()
+        frame = VisionImageRawFrame(image=raw_image(), size=(64, 48), format="RGB", text="Hi")
+        await llm.process_frame(frame, FrameDirection.DOWNSTREAM)
+        # The cached data URL is used, there's nothing left to encode.
+        (context,) = llm.contexts
+        self.assertEqual(context.messages[0]["content"][1]["image_url"]["url"], image.data_url)
+        self.assertNotIn("data", context.messages[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+
+from pipecat.audio.jitter_buffer import AudioJitterBuffer, JitterBufferParams
+from pipecat.frames.frames import InputAudioRawFrame
+
+SAMPLE_RATE = 16000
+FRAME_SECS = 0.02
+
+
+def audio_frame(index: int, with_pts: bool = True) -> InputAudioRawFrame:
+    num_samples = int(SAMPLE_RATE * FRAME_SECS)
+    frame = InputAudioRawFrame(
+        audio=bytes([index % 256, 0]) * num_samples, sample_rate=SAMPLE_RATE, num_channels=1
+    )
+    if with_pts:
+        frame.pts = int(index * FRAME_SECS * 1_000_000_000)
+    return frame
+
+
+def drain(jitter_buffer: AudioJitterBuffer, now: float, until: float):
+    frames = []
+    while now <= until:
+        delay = jitter_buffer.next_delay(now)
+        if delay is None:
+            break
+        now += delay
+        frame = jitter_buffer.pop(now)
+        if frame:
+            frames.append((now, frame))
+    return frames
+
+
+class TestAudioJitterBuffer(unittest.TestCase):
+    def test_paces_bursts(self):
+        jitter_buffer = AudioJitterBuffer(params=JitterBufferParams(min_delay_secs=0.04))
+        # Ten frames arriving all at once.
+        for i in range(10):
+            jitter_buffer.put(audio_frame(i, with_pts=False), 1.0)
+        frames = drain(jitter_buffer, 1.0, 2.0)
+        self.assertEqual(len(frames), 10)
+        self.assertAlmostEqual(frames[0][0], 1.04, places=3)
+        intervals = [b[0] - a[0] for a, b in zip(frames, frames[1:])]
+        for interval in intervals:
+            self.assertAlmostEqual(interval, FRAME_SECS, delta=0.0025)
+
+    def test_reorders(self):
+        jitter_buffer = AudioJitterBuffer()
+        for i in [0, 2, 1, 3]:
+            jitter_buffer.put(audio_frame(i), 1.0 + i * FRAME_SECS)
+        frames = drain(jitter_buffer, 1.0, 2.0)
+        self.assertEqual([f.audio[0] for _, f in frames], [0, 1, 2, 3])
+        self.assertEqual(jitter_buffer.concealed_frames, 0)
+
+    def test_conceals_small_gaps(self):
+        jitter_buffer = AudioJitterBuffer()
+        for i in [0, 1, 3]:
+            jitter_buffer.put(audio_frame(i), 1.0)
+        frames = drain(jitter_buffer, 1.0, 2.0)
+        self.assertEqual(len(frames), 4)
+        self.assertEqual(jitter_buffer.concealed_frames, 1)
+        self.assertEqual(frames[3][1].audio[0], 3)
+
+    def test_drops_late_frames(self):
+        jitter_buffer = AudioJitterBuffer()
+        for i in [0, 1, 2]:
+            jitter_buffer.put(audio_frame(i), 1.0 + i * FRAME_SECS)
+        drain(jitter_buffer, 1.0, 2.0)
+        self.assertFalse(jitter_buffer.put(audio_frame(1), 2.0))
+        self.assertEqual(jitter_buffer.late_frames, 1)
+
+    def test_adapts_to_jitter(self):
+        jitter_buffer = AudioJitterBuffer()
+        for i in range(100):
+            arrival_time = 1.0 + i * FRAME_SECS + (0.05 if i % 2 else 0.0)
+            jitter_buffer.put(audio_frame(i), arrival_time)
+        self.assertGreater(jitter_buffer.jitter, 0.03)
+        self.assertGreater(jitter_buffer.target_delay, 0.1)
+
+
+if __name__ == "__main__":
+    unittest.main()
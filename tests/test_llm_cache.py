@@ -0,0 +1,111 @@
+import asyncio
+import tempfile
+import unittest
+
+from pipecat.frames.frames import TextFrame
+from pipecat.processors.aggregators.openai_llm_context import (
+    OpenAILLMContext,
+    OpenAILLMContextFrame,
+)
+from pipecat.processors.frame_processor import FrameDirection
+from pipecat.services.ai_services import LLMService
+from pipecat.services.llm_cache import LLMCache, LLMCacheEntry
+
+
+class MockLLMService(LLMService):
+    def __init__(self, *, cache: LLMCache, fail: bool = False, **kwargs):
+        super().__init__(**kwargs)
+        self._cache = cache
+        self.fail = fail
+        self.requests = []
+        self.pushed_frames = []
+        self.function_calls = []
+
+        async def get_weather(function_name, tool_call_id, args, llm, context, result_callback):
+            self.function_calls.append((tool_call_id, args))
+
+        self.register_function("get_weather", get_weather)
+
+    async def push_frame(self, frame, direction=FrameDirection.DOWNSTREAM):
+        await super().push_frame(frame, direction)
+        self.pushed_frames.append(frame)
+
+    async def process_frame(self, frame, direction):
+        await super().process_frame(frame, direction)
+        if isinstance(frame, OpenAILLMContextFrame):
+            await self._process_context_with_cache(frame.context, self._process_context)
+
+    async def _process_context(self, context: OpenAILLMContext):
+        self.requests.append(context.messages[-1]["content"])
+        await self.push_frame(TextFrame("Let me "))
+        await self.push_frame(TextFrame("check."))
+        if self.fail:
+            raise Exception("failed")
+        await self.call_function(
+            context=context,
+            tool_call_id="call_1",
+            function_name="get_weather",
+            arguments={"location": "SF"},
+            run_llm=False,
+        )
+
+    @property
+    def text(self):
+        return [f.text for f in self.pushed_frames if isinstance(f, TextFrame)]
+
+
+class TestLLMCache(unittest.IsolatedAsyncioTestCase):
+    async def ask(self, llm: LLMService, text: str):
+        context = OpenAILLMContext([{"role": "user", "content": text}])
+        await llm.process_frame(OpenAILLMContextFrame(context), FrameDirection.DOWNSTREAM)
+        # Function calls run in their own tasks.
+        await asyncio.gather(*llm._function_call_tasks)
+
+    async def test_replay(self):
+        llm = MockLLMService(cache=LLMCache())
+        await self.ask(llm, "Weather?")
+        await self.ask(llm, "Weather?")
+        self.assertEqual(llm.requests, ["Weather?"])
+        # Same chunks and function calls as the original response.
+        self.assertEqual(llm.text, ["Let me ", "check.", "Let me ", "check."])
+        self.assertEqual(llm.function_calls, [("call_1", {"location": "SF"})] * 2)
+
+        await self.ask(llm, "Weather today?")
+        self.assertEqual(llm.requests, ["Weather?", "Weather today?"])
+
+    async def test_failure_not_cached(self):
+        cache = LLMCache()
+        llm = MockLLMService(cache=cache, fail=True)
+        with self.assertRaises(Exception):
+            await self.ask(llm, "Weather?")
+        self.assertEqual(len(cache), 0)
+
+    async def test_ttl_and_lru(self):
+        cache = LLMCache(max_entries=2, ttl_secs=0.05)
+        cache.put("a", LLMCacheEntry(chunks=["a"]))
+        cache.put("b", LLMCacheEntry(chunks=["b"]))
+        self.assertIsNotNone(await cache.get("a"))
+        cache.put("c", LLMCacheEntry(chunks=["c"]))
+        # "b" was the least recently used.
+        self.assertIsNone(await cache.get("b"))
+        self.assertEqual((await cache.get("a")).text, "a")
+        await asyncio.sleep(0.1)
+        self.assertIsNone(await cache.get("a"))
+        self.assertEqual(len(cache), 1)
+
+    async def test_disk(self):
+        with tempfile.TemporaryDirectory() as path:
+            llm1 = MockLLMService(cache=LLMCache(disk_path=path))
+            await self.ask(llm1, "Weather?")
+            # Let the file be written.
+            await asyncio.sleep(0.1)
+
+            llm2 = MockLLMService(cache=LLMCache(disk_path=path))
+            await self.ask(llm2, "Weather?")
+            self.assertEqual(llm2.requests, [])
+            self.assertEqual(llm2.text, ["Let me ", "check."])
+            self.assertEqual(llm2.function_calls, [("call_1", {"location": "SF"})])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+import os
+import tempfile
+import threading
+import unittest
+
+from pipecat.processors.aggregators.llm_context_store import (
+    JSONLContextStore,
+    SQLiteContextStore,
+)
+from pipecat.processors.aggregators.llm_response import LLMUserContextAggregator
+from pipecat.processors.aggregators.openai_llm_context import OpenAILLMContext
+from pipecat.services.anthropic import AnthropicLLMContext
+
+
+class RecordingMixin:
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.writes = []
+
+    def _write(self, records):
+        self.writes.append((threading.current_thread(), len(records)))
+        super()._write(records)
+
+
+class RecordingSQLiteContextStore(RecordingMixin, SQLiteContextStore):
+    pass
+
+
+class RecordingJSONLContextStore(RecordingMixin, JSONLContextStore):
+    pass
+
+
+SYSTEM = {"role": "system", "content": "You are helpful."}
+
+
+class BaseTestContextStore:
+    def create_store(self):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    async def test_incremental(self):
+        store = self.create_store()
+        context = OpenAILLMContext([SYSTEM])
+        context.add_message({"role": "user", "content": "Hi"})
+        store.save("c1", context)
+        context.add_message({"role": "assistant", "content": "Hello!"})
+        store.save("c1", context)
+        store.save("c1", context)
+        await store.flush()
+        # Written in a single batch, outside of the event loop thread.
+        self.assertEqual(len(store.writes), 1)
+        thread, count = store.writes[0]
+        self.assertIsNot(thread, threading.main_thread())
+        self.assertEqual(count, 3)
+
+        context.add_message({"role": "user", "content": "Bye"})
+        store.save("c1", context)
+        await store.flush()
+        self.assertEqual(store.writes[-1][1], 1)
+
+        # Messages removed from the context (e.g. by a context window) are kept.
+        context.remove_messages(1, 3)
+        context.add_message({"role": "assistant", "content": "Bye!"})
+        store.save("c1", context)
+        messages = await store.load("c1")
+        self.assertEqual(
+            [m["content"] for m in messages], ["You are helpful.", "Hi", "Hello!", "Bye", "Bye!"]
+        )
+        self.assertEqual(await store.conversation_ids(), ["c1"])
+        await store.close()
+
+    async def test_resume(self):
+        store = self.create_store()
+        context = OpenAILLMContext([SYSTEM, {"role": "user", "content": "Hi"}])
+        store.save("c1", context)
+        await store.close()
+
+        store = self.create_store()
+        context = OpenAILLMContext([SYSTEM])
+        self.assertFalse(await store.resume("other", context))
+        self.assertTrue(await store.resume("c1", context))
+        self.assertEqual(context.messages[-1]["content"], "Hi")
+        context.add_message({"role": "assistant", "content": "Hello!"})
+        store.save("c1", context)
+        await store.flush()
+        # Only the new message is written.
+        self.assertEqual(store.writes[-1][1], 1)
+        self.assertEqual(len(await store.load("c1")), 3)
+
+        await store.delete("c1")
+        self.assertEqual(await store.load("c1"), [])
+        await store.close()
+
+    async def test_changed_message(self):
+        store = self.create_store()
+        context = AnthropicLLMContext([{"role": "user", "content": "Hi"}])
+        store.save("c1", context)
+        # Anthropic merges consecutive messages with the same role.
+        context.add_message({"role": "user", "content": "Are you there?"})
+        store.save("c1", context)
+        messages = await store.load("c1")
+        self.assertEqual(len(messages), 1)
+        self.assertEqual([c["text"] for c in messages[0]["content"]], ["Hi", "Are you there?"])
+        await store.close()
+
+    async def test_aggregator(self):
+        store = self.create_store()
+        context = OpenAILLMContext([SYSTEM])
+        aggregator = LLMUserContextAggregator(context, context_store=store, conversation_id="c1")
+        context.add_message({"role": "user", "content": "Hi"})
+        await aggregator.push_context_frame()
+        self.assertEqual(len(await store.load("c1")), 2)
+        await store.close()
+
+        with self.assertRaises(ValueError):
+            LLMUserContextAggregator(context, context_store=store)
+
+
+class TestSQLiteContextStore(BaseTestContextStore, unittest.IsolatedAsyncioTestCase):
+    def create_store(self):
+        return RecordingSQLiteContextStore(os.path.join(self.tmp.name, "contexts.db"))
+
+
+class TestJSONLContextStore(BaseTestContextStore, unittest.IsolatedAsyncioTestCase):
+    def create_store(self):
+        return RecordingJSONLContextStore(self.tmp.name)
+
+    async def test_incomplete_line(self):
+        store = self.create_store()
+        context = OpenAILLMContext([SYSTEM])
+        store.save("c/1", context)
+        await store.flush()
+        with open(os.path.join(self.tmp.name, "c%2F1.jsonl"), "a") as file:
+            file.write('{"seq": 1, "messa')
+        self.assertEqual(await store.load("c/1"), [SYSTEM])
+        self.assertEqual(await store.conversation_ids(), ["c/1"])
+        await store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
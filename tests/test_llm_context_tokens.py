@@ -0,0 +1,72 @@
+import unittest
+
+from pipecat.processors.aggregators.openai_llm_context import OpenAILLMContext
+from pipecat.services.anthropic import AnthropicLLMContext
+from pipecat.utils.tokens import MESSAGE_OVERHEAD_TOKENS, count_message_tokens
+
+
+class CountingTokenizer:
+    def __init__(self):
+        self.texts = []
+
+    def __call__(self, text: str) -> int:
+        self.texts.append(text)
+        return len(text)
+
+
+class TestLLMContextTokens(unittest.TestCase):
+    def test_incremental(self):
+        tokenizer = CountingTokenizer()
+        context = OpenAILLMContext(
+            [{"role": "system", "content": "Be brief."}], tokenizer=tokenizer
+        )
+        self.assertEqual(context.token_count, 9 + MESSAGE_OVERHEAD_TOKENS)
+
+        context.add_message({"role": "user", "content": "Hi"})
+        context.add_message({"role": "assistant", "content": "Hello"})
+        self.assertEqual(context.message_token_counts, [13, 6, 9])
+        self.assertEqual(context.token_count, 28)
+        # Every message was tokenized once.
+        self.assertEqual(tokenizer.texts, ["Be brief.", "Hi", "Hello"])
+
+        context.remove_messages(1, 2)
+        self.assertEqual(context.token_count, 22)
+        context.set_messages([{"role": "user", "content": "Bye"}])
+        self.assertEqual(context.token_count, 7)
+
+        # Messages added directly to the list are counted too.
+        context.messages.append({"role": "assistant", "content": "Bye"})
+        self.assertEqual(context.token_count, 14)
+
+        # Copies keep their own counts.
+        copy = context.copy()
+        copy.add_message({"role": "user", "content": "Hi"})
+        self.assertEqual((context.token_count, copy.token_count), (14, 20))
+
+    def test_anthropic(self):
+        context = AnthropicLLMContext(tokenizer=len)
+        context.add_message({"role": "user", "content": "Hi"})
+        # Anthropic merges messages with the same role.
+        context.add_message({"role": "user", "content": "there"})
+        self.assertEqual(len(context.messages), 1)
+        self.assertEqual(context.token_count, count_message_tokens(context.messages[0], len))
+        self.assertEqual(context.token_count, 7 + MESSAGE_OVERHEAD_TOKENS)
+
+        context.set_messages(
+            [
+                {"role": "system", "content": "Be brief."},
+                {"role": "user", "content": "Hi"},
+            ]
+        )
+        # The system message is not part of the messages anymore.
+        self.assertEqual(context.token_count, 2 + MESSAGE_OVERHEAD_TOKENS)
+
+    def test_images(self):
+        context = OpenAILLMContext()
+        context.add_image_frame_message(format="RGB", size=(1, 1), image=b"\x00\x00\x00", text="")
+        # Images are not tokenized as text.
+        self.assertLess(context.token_count, 1000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+import asyncio
+import unittest
+
+from pipecat.frames.frames import (
+    TranscriptionFrame,
+    UserStartedSpeakingFrame,
+    UserStoppedSpeakingFrame,
+)
+from pipecat.processors.aggregators.llm_context_window import LLMContextWindow
+from pipecat.processors.aggregators.llm_response import LLMUserContextAggregator
+from pipecat.processors.aggregators.openai_llm_context import OpenAILLMContext
+from pipecat.processors.frame_processor import FrameDirection
+from pipecat.services.anthropic import AnthropicLLMContext
+
+
+def no_tokens(text):
+    # Messages only count MESSAGE_OVERHEAD_TOKENS.
+    return 0
+
+
+def turn(i):
+    return [
+        {"role": "user", "content": f"question {i}"},
+        {
+            "role": "assistant",
+            "tool_calls": [
+                {
+                    "id": f"call_{i}",
+                    "type": "function",
+                    "function": {"name": "f", "arguments": "{}"},
+                }
+            ],
+        },
+        {"role": "tool", "tool_call_id": f"call_{i}", "content": "42"},
+        {"role": "assistant", "content": f"answer {i}"},
+    ]
+
+
+class TestLLMContextWindow(unittest.IsolatedAsyncioTestCase):
+    async def test_eviction(self):
+        messages = [{"role": "system", "content": "Be brief."}]
+        for i in range(3):
+            messages.extend(turn(i))
+        messages.append({"role": "user", "content": "question 3"})
+        context = OpenAILLMContext(messages, tokenizer=no_tokens)
+
+        window = LLMContextWindow(max_tokens=24)
+        await window.apply(context)
+        # Whole turns are removed, so function calls keep their results.
+        self.assertEqual(context.messages[0]["content"], "Be brief.")
+        self.assertEqual(context.messages[1]["content"], "question 2")
+        self.assertEqual(len(context.messages), 6)
+
+        # We always keep the last turn.
+        window = LLMContextWindow(max_tokens=4)
+        await window.apply(context)
+        self.assertEqual(context.messages[1:], [{"role": "user", "content": "question 3"}])
+
+    async def test_summary(self):
+        summaries = []
+
+        async def summarizer(messages):
+            await asyncio.sleep(0.01)
+            summaries.append(messages)
+            return f"{len(messages)} messages"
+
+        messages = [{"role": "system", "content": "Be brief."}, *turn(0)]
+        messages.append({"role": "user", "content": "question 1"})
+        context = OpenAILLMContext(messages, tokenizer=no_tokens)
+        window = LLMContextWindow(max_tokens=8, summarizer=summarizer)
+
+        await window.apply(context)
+        self.assertEqual(len(context.messages), 2)
+        await asyncio.sleep(0.05)
+        self.assertEqual(window.summary, "4 messages")
+        self.assertEqual(len(summaries), 1)
+
+        # The summary is added at the next turn, and replaced by later ones.
+        context.add_messages(turn(1)[1:] + [{"role": "user", "content": "question 2"}])
+        await window.apply(context)
+        self.assertEqual(
+            context.messages[1]["content"], "Summary of the earlier conversation: 4 messages"
+        )
+        self.assertEqual(context.messages[2]["content"], "question 2")
+        await asyncio.sleep(0.05)
+        # The previous summary is given to the summarizer.
+        self.assertEqual(summaries[1][0], {"role": "system", "content": "4 messages"})
+
+        context.add_message({"role": "assistant", "content": "answer 2"})
+        context.add_message({"role": "user", "content": "question 3"})
+        await window.apply(context)
+        self.assertEqual(
+            context.messages[1]["content"], "Summary of the earlier conversation: 5 messages"
+        )
+        self.assertEqual([m["role"] for m in context.messages].count("system"), 2)
+        await window.cleanup()
+
+    async def test_anthropic(self):
+        async def summarizer(messages):
+            return "summary"
+
+        context = AnthropicLLMContext(system="Be brief.", tokenizer=no_tokens)
+        for message in turn(0) + [{"role": "user", "content": "question 1"}]:
+            context.add_message(context.from_standard_message(message))
+        window = LLMContextWindow(max_tokens=4, summarizer=summarizer)
+
+        await window.apply(context)
+        self.assertEqual(context.messages, [{"role": "user", "content": "question 1"}])
+        await asyncio.sleep(0.01)
+        context.add_message({"role": "assistant", "content": "answer 1"})
+        context.add_message({"role": "user", "content": "question 2"})
+        await window.apply(context)
+        self.assertEqual(
+            context.system, "Be brief.\n\nSummary of the earlier conversation: summary"
+        )
+        self.assertEqual(context.messages[0]["content"], "question 2")
+
+    async def test_aggregator(self):
+        context = OpenAILLMContext(
+            [{"role": "system", "content": "Be brief."}], tokenizer=no_tokens
+        )
+        aggregator = LLMUserContextAggregator(
+            context, context_window=LLMContextWindow(max_tokens=8)
+        )
+        for i in range(3):
+            await aggregator.process_frame(UserStartedSpeakingFrame(), FrameDirection.DOWNSTREAM)
+            await aggregator.process_frame(
+                TranscriptionFrame(f"question {i}", "user", ""), FrameDirection.DOWNSTREAM
+            )
+            await aggregator.process_frame(UserStoppedSpeakingFrame(), FrameDirection.DOWNSTREAM)
+            context.add_message({"role": "assistant", "content": f"answer {i}"})
+        self.assertEqual(
+            [m["content"] for m in context.messages], ["Be brief.", "question 2", "answer 2"]
+        )
+        await aggregator.cleanup()
+
+
+if __name__ == "__main__":
+    unittest.main()
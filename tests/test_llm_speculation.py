@@ -0,0 +1,155 @@
+import asyncio
+import unittest
+
+from pipecat.clocks.system_clock import SystemClock
+from pipecat.frames.frames import (
+    InterimTranscriptionFrame,
+    LLMFullResponseEndFrame,
+    LLMFullResponseStartFrame,
+    MetricsFrame,
+    StartFrame,
+    TextFrame,
+    TranscriptionFrame,
+    UserStartedSpeakingFrame,
+    UserStoppedSpeakingFrame,
+)
+from pipecat.metrics.metrics import LLMSpeculationMetricsData
+from pipecat.processors.aggregators.llm_response import LLMUserContextAggregator
+from pipecat.processors.aggregators.openai_llm_context import (
+    OpenAILLMContext,
+    OpenAILLMContextFrame,
+)
+from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
+from pipecat.services.ai_services import LLMService
+from pipecat.services.anthropic import AnthropicLLMContext
+
+
+class MockLLMService(LLMService):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.requests = []
+
+    async def process_frame(self, frame, direction):
+        await super().process_frame(frame, direction)
+        if isinstance(frame, OpenAILLMContextFrame):
+            text = frame.context.messages[-1]["content"]
+            self.requests.append(text)
+            await self.push_frame(LLMFullResponseStartFrame())
+            await asyncio.sleep(0.05)
+            await self.push_frame(TextFrame(f"Reply to: {text}"))
+            await self.push_frame(LLMFullResponseEndFrame())
+        else:
+            await self.push_frame(frame, direction)
+
+
+class Sink(FrameProcessor):
+    def __init__(self):
+        super().__init__()
+        self.frames = []
+
+    async def process_frame(self, frame, direction):
+        await super().process_frame(frame, direction)
+        self.frames.append(frame)
+
+    @property
+    def text(self):
+        return [f.text for f in self.frames if type(f) is TextFrame]
+
+    @property
+    def metrics(self):
+        return [
+            d
+            for f in self.frames
+            if isinstance(f, MetricsFrame)
+            for d in f.data
+            if isinstance(d, LLMSpeculationMetricsData)
+        ]
+
+
+async def wait_for(condition, timeout: float = 2.0):
+    for _ in range(int(timeout / 0.01)):
+        if condition():
+            return True
+        await asyncio.sleep(0.01)
+    return condition()
+
+
+class TestLLMSpeculation(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.context = OpenAILLMContext([{"role": "system", "content": "Be brief."}])
+        self.aggregator = LLMUserContextAggregator(self.context, speculation_stable_secs=0.05)
+        self.llm = MockLLMService()
+        self.sink = Sink()
+        self.aggregator.link(self.llm)
+        self.llm.link(self.sink)
+        await self.send(StartFrame(clock=SystemClock(), enable_metrics=True))
+
+    async def send(self, frame):
+        await self.aggregator.process_frame(frame, FrameDirection.DOWNSTREAM)
+
+    async def say(self, interim: str, final: str):
+        await self.send(UserStartedSpeakingFrame())
+        await self.send(InterimTranscriptionFrame(interim, "user", ""))
+        await self.send(UserStoppedSpeakingFrame())
+        # Stable interim text, the response starts but is not pushed.
+        self.assertTrue(await wait_for(lambda: self.llm.requests))
+        await asyncio.sleep(0.1)
+        self.assertEqual(self.sink.text, [])
+        await self.send(TranscriptionFrame(final, "user", ""))
+
+    async def test_hit(self):
+        await self.say("what time is it", "What time is it?")
+        self.assertTrue(await wait_for(lambda: self.sink.text))
+        self.assertEqual(self.sink.text, ["Reply to: what time is it"])
+        self.assertEqual(self.llm.requests, ["what time is it"])
+        self.assertEqual(self.context.messages[-1]["content"], "What time is it?")
+
+        metrics = self.sink.metrics
+        self.assertEqual(len(metrics), 1)
+        self.assertTrue(metrics[0].hit)
+        self.assertGreater(metrics[0].value, 0)
+
+    async def test_miss(self):
+        await self.say("what time", "What time is it?")
+        self.assertTrue(await wait_for(lambda: self.sink.text))
+        self.assertEqual(self.sink.text, ["Reply to: What time is it?"])
+        self.assertEqual(self.llm.requests, ["what time", "What time is it?"])
+        # Only the final message is in the context.
+        self.assertEqual(len(self.context.messages), 2)
+
+        metrics = self.sink.metrics
+        self.assertEqual(len(metrics), 1)
+        self.assertFalse(metrics[0].hit)
+        self.assertEqual((metrics[0].hits, metrics[0].speculations), (0, 1))
+
+    async def test_user_keeps_speaking(self):
+        await self.send(UserStartedSpeakingFrame())
+        await self.send(InterimTranscriptionFrame("what", "user", ""))
+        # No speculation while the user is speaking, even if they pause.
+        await asyncio.sleep(0.1)
+        self.assertEqual(self.llm.requests, [])
+        await self.send(InterimTranscriptionFrame("what time", "user", ""))
+        await self.send(UserStoppedSpeakingFrame())
+        self.assertTrue(await wait_for(lambda: self.llm.requests))
+        # New interim text cancels the speculative response and starts a new
+        # one once it's stable.
+        await self.send(InterimTranscriptionFrame("what time is it", "user", ""))
+        self.assertTrue(await wait_for(lambda: len(self.llm.requests) == 2))
+        await self.send(TranscriptionFrame("What time is it", "user", ""))
+        self.assertTrue(await wait_for(lambda: self.sink.text))
+        self.assertEqual(self.sink.text, ["Reply to: what time is it"])
+        self.assertEqual([m.hit for m in self.sink.metrics], [False, True])
+
+    async def test_speculative_context_is_a_copy(self):
+        # Anthropic merges messages with the same role into the last one.
+        context = AnthropicLLMContext([{"role": "user", "content": "Hi"}])
+        tokens = context.token_count
+        speculative = context.copy()
+        speculative.add_message({"role": "user", "content": "What time is it?"})
+        self.assertEqual(context.messages, [{"role": "user", "content": "Hi"}])
+        self.assertEqual(context.token_count, tokens)
+        self.assertEqual(len(speculative.messages[-1]["content"]), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import io
+import unittest
+
+from loguru import logger
+
+from pipecat.frames.frames import TextFrame
+from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
+
+
+class CountingTextFrame(TextFrame):
+    formatted = 0
+
+    def __str__(self):
+        CountingTextFrame.formatted += 1
+        return super().__str__()
+
+
+class Sink(FrameProcessor):
+    async def process_frame(self, frame, direction):
+        pass
+
+
+class TestHotPathLogging(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.source = FrameProcessor()
+        self.source.link(Sink())
+        CountingTextFrame.formatted = 0
+
+    async def push(self, level: str) -> str:
+        output = io.StringIO()
+        handler_id = logger.add(output, level=level)
+        try:
+            push = self.source._FrameProcessor__internal_push_frame
+            await push(CountingTextFrame("Hello"), FrameDirection.DOWNSTREAM)
+        finally:
+            logger.remove(handler_id)
+        return output.getvalue()
+
+    async def test_not_formatted(self):
+        await self.push("INFO")
+        # The frame is not formatted if no handler logs traces.
+        self.assertEqual(CountingTextFrame.formatted, 0)
+
+        self.assertIn("Pushing CountingTextFrame", await self.push("TRACE"))
+        self.assertEqual(CountingTextFrame.formatted, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import unittest
+
+from pipecat.utils.string import SentenceSegmenter
+from pipecat.utils.text.markdown_text_filter import MarkdownTextFilter
+
+
+def stream_sentences(text: str, token_size: int = 4):
+    # Split text the same way TTS services do while an LLM is streaming.
+    segmenter = SentenceSegmenter()
+    sentences = []
+    for i in range(0, len(text), token_size):
+        end = segmenter.append(text[i : i + token_size])
+        if end:
+            sentences.append(segmenter.pop(end))
+    rest = segmenter.flush()
+    if rest:
+        sentences.append(rest)
+    return sentences
+
+
+class TestMarkdownTextFilter(unittest.TestCase):
+    def test_inline(self):
+        cases = [
+            ("***bold italic*** and **bold** and *italic*", "bold italic and bold and italic"),
+            ("Some intra*word*emphasis and 2*3=6 math", "Some intrawordemphasis and 2*3=6 math"),
+            (
+                "__init__ and _private_ and snake_case_name and _unclosed",
+                "init and private and snake_case_name and _unclosed",
+            ),
+            (
+                "Use ``double `tick` code`` and `single` code",
+                "Use double tick code and single code",
+            ),
+            (
+                "Escaped \\*stars\\* and \\_underscores\\_ here",
+                "Escaped stars and _underscores_ here",
+            ),
+            (
+                "Read [the guide](https://example.com/guide) and see ![logo](https://x.com/logo.png) too",
+                "Read the guide and see  too",
+            ),
+            (
+                "Visit <https://pipecat.ai> or write <b>bold</b> html",
+                "Visit https://pipecat.ai or write bold html",
+            ),
+            (
+                "Entities: &copy; &amp; &lt;tag&gt; and &nbsp;space",
+                "Entities: &copy; & <tag> and  space",
+            ),
+            ("Wow!!!!! That's great?????", "Wow That's great"),
+            ("Tabs\tinside text", "Tabs    inside text"),
+        ]
+        for text, expected in cases:
+            self.assertEqual(MarkdownTextFilter().filter(text), expected)
+
+    def test_blocks(self):
+        cases = [
+            ("# Title\nSome text right after.", "Title\nSome text right after."),
+            ("Subtitle\n---\nBody text.", "Subtitle\nBody text."),
+            ("Header line\n## Second header\nMore text", "Header line\nSecond header\nMore text"),
+            ("Text before\n---\ntext after", "Text before\ntext after"),
+            (
+                "- first item\n- second item\n- third item",
+                "\nfirst item\nsecond item\nthird item\n",
+            ),
+            ("1. one\n2. two\n3. three", "1. one\n2. two\n3. three"),
+            ("> quoted text\ncontinues here", "\nquoted text\ncontinues here\n"),
+            (
+                "A list after text\n- not a list\n* also not",
+                "A list after text\n- not a list\n also not",
+            ),
+            ("| a | b |\n|---|---|\n| 1 | 2 |", " a  b \n\n 1  2 "),
+        ]
+        for text, expected in cases:
+            self.assertEqual(MarkdownTextFilter().filter(text), expected)
+
+    def test_streamed_sentences(self):
+        text = (
+            "Here are a few options:\n\n"
+            "1. **Pasta** with *fresh* tomatoes.\n"
+            "2. A `quick` salad.\n\n"
+            "Let me know which one you prefer!"
+        )
+        filter = MarkdownTextFilter()
+        output = [filter.filter(s) for s in stream_sentences(text)]
+        self.assertEqual(
+            output,
+            [
+                "Here are a few options:",
+                " 1. Pasta with fresh tomatoes.",
+                " 2. A quick salad.",
+                " Let me know which one you prefer!",
+            ],
+        )
+
+    def test_filter_tables(self):
+        text = (
+            "Here's a comparison:\n\n"
+            "| Name | Age |\n"
+            "| ---- | --- |\n"
+            "| Alice | 30 |\n"
+            "| Bob | 25 |\n\n"
+            "Alice is older."
+        )
+        filter = MarkdownTextFilter(MarkdownTextFilter.InputParams(filter_tables=True))
+        self.assertEqual(filter.filter(text), "Here's a comparison:\n Alice is older.")
+
+        # Tables split across sentences, text after the table is kept.
+        filter = MarkdownTextFilter(MarkdownTextFilter.InputParams(filter_tables=True))
+        output = "".join(filter.filter(s) for s in stream_sentences(text))
+        self.assertIn("Alice is older.", output)
+        self.assertNotIn("30", output)
+
+        # Pipes without a header and a matching delimiter row are not a table.
+        for text in ["| !---", "Use a | b.\n| Or c.", "| a |\n| - | - |\nText."]:
+            filter = MarkdownTextFilter(MarkdownTextFilter.InputParams(filter_tables=True))
+            self.assertEqual(filter.filter(text), MarkdownTextFilter().filter(text))
+
+    def test_filter_code(self):
+        text = 'Here\'s an example:\n\n```python\ndef hello():\n    print("hi")\n```\n\nThis prints hi.'
+        filter = MarkdownTextFilter(MarkdownTextFilter.InputParams(filter_code=True))
+        self.assertEqual(filter.filter(text), "Here's an example:\n \n This prints hi.")
+
+        filter = MarkdownTextFilter(MarkdownTextFilter.InputParams(filter_code=True))
+        output = "".join(filter.filter(s) for s in stream_sentences(text))
+        self.assertIn("This prints hi.", output)
+        self.assertNotIn("print(", output)
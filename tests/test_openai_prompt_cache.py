@@ -0,0 +1,114 @@
+import unittest
+
+from openai.types.chat import ChatCompletionChunk
+
+from pipecat.frames.frames import MetricsFrame
+from pipecat.metrics.metrics import LLMPromptCacheMetricsData, LLMUsageMetricsData
+from pipecat.processors.aggregators.openai_llm_context import OpenAILLMContext
+from pipecat.processors.frame_processor import FrameDirection
+from pipecat.services.openai import BaseOpenAILLMService
+
+TOOLS = [
+    {
+        "type": "function",
+        "function": {"name": "get_weather", "parameters": {"type": "object", "properties": {}}},
+    }
+]
+
+
+def chunk(**kwargs) -> ChatCompletionChunk:
+    return ChatCompletionChunk.model_validate(
+        {
+            "id": "chatcmpl-1",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": "gpt-4o",
+            "choices": [],
+            **kwargs,
+        }
+    )
+
+
+class MockOpenAILLMService(BaseOpenAILLMService):
+    def __init__(self, cached_tokens: list):
+        super().__init__(model="gpt-4o", api_key="test")
+        self._enable_usage_metrics = True
+        self.cached_tokens = cached_tokens
+        self.pushed_frames = []
+
+    async def push_frame(self, frame, direction=FrameDirection.DOWNSTREAM):
+        self.pushed_frames.append(frame)
+
+    async def get_chat_completions(self, context, messages):
+        usage = {"prompt_tokens": 1000, "completion_tokens": 10, "total_tokens": 1010}
+        cached_tokens = self.cached_tokens.pop(0)
+        if cached_tokens is not None:
+            usage["prompt_tokens_details"] = {"cached_tokens": cached_tokens}
+
+        async def chunks():
+            delta = {"role": "assistant", "content": "Hi!"}
+            yield chunk(choices=[{"index": 0, "delta": delta}])
+            yield chunk(usage=usage)
+
+        return chunks()
+
+    def metrics(self, cls):
+        return [
+            data
+            for frame in self.pushed_frames
+            if isinstance(frame, MetricsFrame)
+            for data in frame.data
+            if isinstance(data, cls)
+        ]
+
+
+class TestOpenAIPromptCache(unittest.IsolatedAsyncioTestCase):
+    async def test_cached_tokens(self):
+        llm = MockOpenAILLMService(cached_tokens=[0, 768, None])
+        context = OpenAILLMContext([{"role": "user", "content": "Hi"}])
+        for _ in range(3):
+            await llm._process_context(context)
+
+        usage = [m.value.cache_read_input_tokens for m in llm.metrics(LLMUsageMetricsData)]
+        self.assertEqual(usage, [0, 768, None])
+
+        # No cache metrics if the API doesn't report cached tokens.
+        cache = llm.metrics(LLMPromptCacheMetricsData)
+        self.assertEqual([m.value for m in cache], [0.0, 0.768])
+        self.assertEqual(cache[-1].total_cached_tokens, 768)
+        self.assertEqual(cache[-1].total_prompt_tokens, 2000)
+
+    async def test_stable_prefix(self):
+        system = {"role": "system", "content": "You are helpful."}
+        context = OpenAILLMContext([system], TOOLS, stable_prefix=True)
+        # The prefix can change until the conversation starts.
+        context.set_tool_choice("auto")
+        context.add_message({"role": "user", "content": "Hi"})
+        context.set_tools([])
+        context.set_tool_choice("none")
+        self.assertEqual(context.tools, TOOLS)
+        self.assertEqual(context.tool_choice, "auto")
+
+        context.add_message({"role": "assistant", "content": "Hello!"})
+        prefix = list(context.messages)
+        question = {"role": "user", "content": "How are you?"}
+        context.add_message(question)
+        context.set_summary("The user said hi.")
+        context.set_summary("The user said hi twice.")
+        # The summary goes after the previous messages, but before the user
+        # message that is about to be answered.
+        self.assertEqual(context.messages[:3], prefix)
+        self.assertEqual(context.messages[3]["content"], "The user said hi twice.")
+        self.assertEqual(context.messages[4], question)
+        self.assertEqual(len(context.messages), 5)
+        self.assertEqual(context.token_count, sum(context._message_tokens))
+
+        # Without a trailing user message, it's added at the end.
+        context.add_message({"role": "assistant", "content": "Fine."})
+        context.set_summary("The user asked how I was.")
+        self.assertEqual(context.messages[-1]["content"], "The user asked how I was.")
+        self.assertEqual(len(context.messages), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
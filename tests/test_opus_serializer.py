@@ -0,0 +1,112 @@
+import asyncio
+import math
+import struct
+import unittest
+
+from pipecat.frames.frames import AudioRawFrame, TextFrame
+from pipecat.serializers.protobuf import ProtobufFrameSerializer
+
+try:
+    import websockets
+
+    from pipecat.serializers.opus import OpusFrameSerializer, unpack_opus_packets
+except Exception:
+    OpusFrameSerializer = None
+
+SAMPLE_RATE = 16000
+
+
+def sine(duration_secs: float, frequency: int = 440, phase: int = 0) -> bytes:
+    num_samples = int(SAMPLE_RATE * duration_secs)
+    return b"".join(
+        struct.pack("<h", int(8000 * math.sin(2 * math.pi * frequency * (phase + i) / SAMPLE_RATE)))
+        for i in range(num_samples)
+    )
+
+
+def rms(audio: bytes) -> float:
+    samples = struct.unpack(f"<{len(audio) // 2}h", audio)
+    return math.sqrt(sum(s * s for s in samples) / len(samples))
+
+
+@unittest.skipUnless(OpusFrameSerializer, "opuslib and libopus are required")
+class TestOpusFrameSerializer(unittest.IsolatedAsyncioTestCase):
+    def serializer(self, **kwargs) -> "OpusFrameSerializer":
+        return OpusFrameSerializer(
+            ProtobufFrameSerializer(), OpusFrameSerializer.InputParams(**kwargs)
+        )
+
+    def test_invalid_params(self):
+        with self.assertRaises(ValueError):
+            self.serializer(sample_rate=44100)
+        with self.assertRaises(ValueError):
+            self.serializer(frame_duration_ms=30)
+
+    def test_non_audio_frames(self):
+        sender = self.serializer()
+        receiver = self.serializer()
+        frame = receiver.deserialize(sender.serialize(TextFrame(text="hello")))
+        self.assertIsInstance(frame, TextFrame)
+        self.assertEqual(frame.text, "hello")
+
+    def test_partial_frames_are_kept(self):
+        sender = self.serializer(frame_duration_ms=20)
+        frame_bytes = SAMPLE_RATE // 50 * 2
+
+        # Less than one Opus frame, nothing to send yet.
+        audio = sine(0.03)
+        self.assertIsNone(
+            sender.serialize(AudioRawFrame(audio[: frame_bytes // 2], SAMPLE_RATE, 1))
+        )
+
+        # The rest completes the first frame and half of the second one.
+        data = sender.serialize(AudioRawFrame(audio[frame_bytes // 2 :], SAMPLE_RATE, 1))
+        frame = ProtobufFrameSerializer().deserialize(data)
+        self.assertEqual(len(unpack_opus_packets(frame.audio)), 1)
+
+        # Resetting drops the pending audio.
+        sender.reset()
+        self.assertIsNone(
+            sender.serialize(AudioRawFrame(audio[: frame_bytes // 2], SAMPLE_RATE, 1))
+        )
+
+    async def test_websocket_loopback(self):
+        received = asyncio.Queue()
+        server_serializer = self.serializer(bitrate=16000)
+
+        async def handler(websocket):
+            async for message in websocket:
+                await received.put(server_serializer.deserialize(message))
+
+        client_serializer = self.serializer(bitrate=16000)
+
+        async with websockets.serve(handler, "localhost", 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            async with websockets.connect(f"ws://localhost:{port}") as websocket:
+                sent_bytes = 0
+                pcm_bytes = 0
+                # Ten 200ms chunks of continuous audio.
+                chunk_samples = SAMPLE_RATE // 5
+                for i in range(10):
+                    audio = sine(0.2, phase=i * chunk_samples)
+                    pcm_bytes += len(audio)
+                    data = client_serializer.serialize(AudioRawFrame(audio, SAMPLE_RATE, 1))
+                    sent_bytes += len(data)
+                    await websocket.send(data)
+
+                frames = [await asyncio.wait_for(received.get(), 1.0) for _ in range(10)]
+
+        # 16 kbps instead of 256 kbps, plus some framing.
+        self.assertLess(sent_bytes, pcm_bytes / 10)
+
+        audio = b"".join(frame.audio for frame in frames)
+        self.assertTrue(all(frame.sample_rate == SAMPLE_RATE for frame in frames))
+        self.assertEqual(len(audio), pcm_bytes)
+
+        # Skip the codec start-up and compare the signal level.
+        original = sine(2.0)
+        self.assertAlmostEqual(rms(audio[3200:]) / rms(original[3200:]), 1.0, delta=0.2)
+
+
+if __name__ == "__main__":
+    unittest.main()
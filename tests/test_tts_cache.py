@@ -0,0 +1,189 @@
+import asyncio
+import tempfile
+import unittest
+
+from typing import AsyncGenerator
+
+from pipecat.clocks.system_clock import SystemClock
+from pipecat.frames.frames import (
+    Frame,
+    LLMFullResponseEndFrame,
+    StartFrame,
+    TextFrame,
+    TTSAudioRawFrame,
+    TTSSpeakFrame,
+    TTSStartedFrame,
+    TTSStoppedFrame,
+)
+from pipecat.processors.frame_processor import FrameDirection
+from pipecat.services.ai_services import TTSService, WordTTSService
+from pipecat.services.tts_cache import TTSCache, TTSCacheEntry
+
+
+class MockTTSService(TTSService):
+    def __init__(self, **kwargs):
+        super().__init__(push_text_frames=False, **kwargs)
+        self.requests = []
+        self.pushed_frames = []
+
+    async def set_model(self, model: str):
+        pass
+
+    def set_voice(self, voice: str):
+        self._voice_id = voice
+
+    async def flush_audio(self):
+        pass
+
+    async def run_tts(self, text: str) -> AsyncGenerator[Frame, None]:
+        self.requests.append(text)
+        yield TTSStartedFrame()
+        for word in text.split():
+            yield TTSAudioRawFrame(word.encode() * 10, self.sample_rate, 1)
+        yield TTSStoppedFrame()
+
+    async def push_frame(self, frame: Frame, direction: FrameDirection = FrameDirection.DOWNSTREAM):
+        await super().push_frame(frame, direction)
+        self.pushed_frames.append(frame)
+
+
+class MockWordTTSService(WordTTSService):
+    # Works like websocket services: audio and word timestamps are received
+    # separately and TTSStoppedFrame is sent after the last word.
+    def __init__(self, **kwargs):
+        super().__init__(push_text_frames=False, **kwargs)
+        self.requests = []
+        self.pushed_frames = []
+
+    async def set_model(self, model: str):
+        pass
+
+    def set_voice(self, voice: str):
+        pass
+
+    async def flush_audio(self):
+        pass
+
+    async def run_tts(self, text: str) -> AsyncGenerator[Frame, None]:
+        self.requests.append(text)
+        yield TTSStartedFrame()
+        self.start_word_timestamps()
+        words = text.split()
+        for word in words:
+            await self.push_frame(TTSAudioRawFrame(word.encode() * 10, self.sample_rate, 1))
+        await self.add_word_timestamps([(word, i * 0.5) for i, word in enumerate(words)])
+        await self.add_word_timestamps([("TTSStoppedFrame", 0), ("LLMFullResponseEndFrame", 0)])
+
+    async def push_frame(self, frame: Frame, direction: FrameDirection = FrameDirection.DOWNSTREAM):
+        await super().push_frame(frame, direction)
+        self.pushed_frames.append(frame)
+
+
+def audio_frames(frames):
+    return [f.audio for f in frames if isinstance(f, TTSAudioRawFrame)]
+
+
+class TestTTSCache(unittest.IsolatedAsyncioTestCase):
+    async def speak(self, tts: TTSService, text: str):
+        await tts.process_frame(TTSSpeakFrame(text), FrameDirection.DOWNSTREAM)
+
+    async def test_replay(self):
+        cache = TTSCache()
+        tts = MockTTSService(cache=cache)
+        await tts.process_frame(StartFrame(clock=SystemClock()), FrameDirection.DOWNSTREAM)
+
+        await self.speak(tts, "One moment please.")
+        first = list(tts.pushed_frames)
+        tts.pushed_frames.clear()
+
+        await self.speak(tts, " One  moment please. ")
+        self.assertEqual(tts.requests, ["One moment please."])
+        self.assertEqual(audio_frames(tts.pushed_frames), audio_frames(first))
+        self.assertIsInstance(tts.pushed_frames[0], TTSStartedFrame)
+        self.assertIsInstance(tts.pushed_frames[-1], TTSStoppedFrame)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        # A different voice needs a different entry.
+        tts.set_voice("other")
+        await self.speak(tts, "One moment please.")
+        self.assertEqual(len(tts.requests), 2)
+        self.assertEqual(len(cache), 2)
+
+    async def test_max_bytes(self):
+        cache = TTSCache(max_bytes=100)
+        entry = TTSCacheEntry(audio=b"\x00" * 60, sample_rate=16000, num_channels=1)
+        cache.put("a", entry)
+        cache.put("b", entry)
+        self.assertEqual(len(cache), 1)
+        self.assertIsNone(await cache.get("a"))
+        self.assertIsNotNone(await cache.get("b"))
+        self.assertLessEqual(cache.size, 100)
+
+    async def test_disk(self):
+        with tempfile.TemporaryDirectory() as path:
+            entry = TTSCacheEntry(
+                audio=b"\x01\x02" * 100,
+                sample_rate=24000,
+                num_channels=1,
+                frame_sizes=[120, 80],
+                words=[("hello", 0.0), ("there", 0.5)],
+            )
+            TTSCache(disk_path=path).put("key", entry)
+            # Written in a thread.
+            for _ in range(100):
+                cached = await TTSCache(disk_path=path).get("key")
+                if cached:
+                    break
+                await asyncio.sleep(0.01)
+            self.assertEqual(cached, entry)
+            # The audio is not copied out of the file map.
+            self.assertIsInstance(cached.audio, memoryview)
+            self.assertEqual(cached.frames(), [entry.audio[:120], entry.audio[120:]])
+
+    async def test_word_timestamps(self):
+        cache = TTSCache()
+        tts = MockWordTTSService(cache=cache)
+        await tts.process_frame(StartFrame(clock=SystemClock()), FrameDirection.DOWNSTREAM)
+
+        async def say():
+            tts.pushed_frames.clear()
+            await self.speak(tts, "Hello there.")
+            await tts._words_queue.join()
+            return [
+                f.text if isinstance(f, TextFrame) else type(f)
+                for f in tts.pushed_frames
+                if not isinstance(f, TTSAudioRawFrame)
+            ]
+
+        first = await say()
+        second = await say()
+        self.assertEqual(tts.requests, ["Hello there."])
+        self.assertEqual(
+            first,
+            [TTSStartedFrame, "Hello", "there.", TTSStoppedFrame, LLMFullResponseEndFrame],
+        )
+        # Frame markers are not replayed, a cached phrase might be the first
+        # sentence of a longer response.
+        self.assertEqual(second, [TTSStartedFrame, "Hello", "there.", TTSStoppedFrame])
+        (entry,) = cache._entries.values()
+        self.assertEqual(entry.words, [("Hello", 0.0), ("there.", 0.5)])
+
+        await tts._stop_words_task()
+
+    async def test_multiple_sentences_not_cached(self):
+        # With websocket services a whole response is sent in the same
+        # context, so audio of each sentence can't be told apart.
+        cache = TTSCache()
+        tts = MockWordTTSService(cache=cache)
+        await tts.process_frame(StartFrame(clock=SystemClock()), FrameDirection.DOWNSTREAM)
+
+        await tts.process_frame(TextFrame("Hello there. "), FrameDirection.DOWNSTREAM)
+        await tts.process_frame(TextFrame("How are you?"), FrameDirection.DOWNSTREAM)
+        await tts._words_queue.join()
+        self.assertEqual(len(cache), 0)
+
+        await tts._stop_words_task()
+
+
+if __name__ == "__main__":
+    unittest.main()
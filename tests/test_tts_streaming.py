@@ -0,0 +1,150 @@
+import asyncio
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import boto3
+from deepgram import DeepgramClient, DeepgramClientOptions
+
+from pipecat.frames.frames import TTSAudioRawFrame, TTSStartedFrame, TTSStoppedFrame
+from pipecat.services.aws import AWSTTSService
+from pipecat.services.azure import AzureTTSService
+from pipecat.services.deepgram import DeepgramTTSService
+from pipecat.utils.threads import iterate_in_thread
+
+CHUNK_DELAY = 0.2
+CHUNKS = [b"\x01" * 4096, b"\x02" * 4096, b"\x03" * 4096]
+# Chunks that split 16-bit samples.
+ODD_CHUNKS = [b"\x01" * 4095, b"\x02" * 4097, b"\x03", b"\x04" * 3]
+
+
+class StubTTSHandler(BaseHTTPRequestHandler):
+    """Streams a few audio chunks slowly, like a TTS API would."""
+
+    chunks = CHUNKS
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(200)
+        self.send_header("Content-Type", "audio/pcm")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for chunk in self.chunks:
+            time.sleep(CHUNK_DELAY)
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestIterateInThread(unittest.IsolatedAsyncioTestCase):
+    async def test_items_and_errors(self):
+        def numbers():
+            yield 1
+            yield 2
+            raise ValueError("boom")
+
+        items = []
+        with self.assertRaises(ValueError):
+            async for item in iterate_in_thread(numbers()):
+                items.append(item)
+        self.assertEqual(items, [1, 2])
+
+    async def test_stop(self):
+        closed = threading.Event()
+
+        def numbers():
+            try:
+                for i in range(100):
+                    time.sleep(0.01)
+                    yield i
+            finally:
+                closed.set()
+
+        async for item in iterate_in_thread(numbers()):
+            break
+        # The thread stops and closes the generator.
+        self.assertTrue(await asyncio.to_thread(closed.wait, 1))
+
+
+class TestTTSStreaming(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.start_server(StubTTSHandler)
+
+    def start_server(self, handler):
+        self.server = ThreadingHTTPServer(("localhost", 0), handler)
+        self.url = f"http://localhost:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    async def assert_streams(self, tts):
+        ticks = []
+
+        async def ticker():
+            while True:
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.01)
+
+        ticker_task = asyncio.create_task(ticker())
+        start = time.monotonic()
+        frames = []
+        async for frame in tts.run_tts("Hello there!"):
+            frames.append((time.monotonic() - start, frame))
+        ticker_task.cancel()
+
+        self.assertIsInstance(frames[0][1], TTSStartedFrame)
+        self.assertIsInstance(frames[-1][1], TTSStoppedFrame)
+        audio = [(t, f) for t, f in frames if isinstance(f, TTSAudioRawFrame)]
+        self.assertEqual(b"".join(f.audio for _, f in audio), b"".join(CHUNKS))
+        # The first audio is pushed before the whole response arrives.
+        self.assertLess(audio[0][0], CHUNK_DELAY * 2)
+        # The loop kept running while waiting for audio.
+        gaps = [b - a for a, b in zip(ticks, ticks[1:])]
+        self.assertLess(max(gaps), CHUNK_DELAY / 2)
+
+    async def test_aws(self):
+        tts = AWSTTSService(api_key="test", aws_access_key_id="test", region="us-east-1")
+        tts._polly_client = boto3.client(
+            "polly",
+            endpoint_url=self.url,
+            aws_access_key_id="test",
+            aws_secret_access_key="test",
+            region_name="us-east-1",
+        )
+        await self.assert_streams(tts)
+
+    async def test_azure_sample_rates(self):
+        AzureTTSService(api_key="test", region="eastus", sample_rate=24000)
+        # Azure would send audio with a different sample rate.
+        with self.assertRaises(ValueError):
+            AzureTTSService(api_key="test", region="eastus", sample_rate=32000)
+
+    async def test_deepgram(self):
+        tts = DeepgramTTSService(api_key="test")
+        tts._deepgram_client = DeepgramClient("test", DeepgramClientOptions(url=self.url))
+        await self.assert_streams(tts)
+
+    async def test_deepgram_odd_chunks(self):
+        class OddChunksHandler(StubTTSHandler):
+            chunks = ODD_CHUNKS
+
+        self.tearDown()
+        self.start_server(OddChunksHandler)
+        tts = DeepgramTTSService(api_key="test")
+        tts._deepgram_client = DeepgramClient("test", DeepgramClientOptions(url=self.url))
+        audio = [
+            f.audio async for f in tts.run_tts("Hello there!") if isinstance(f, TTSAudioRawFrame)
+        ]
+        # Only whole samples are pushed.
+        self.assertTrue(all(len(a) % 2 == 0 for a in audio))
+        self.assertEqual(b"".join(audio), b"".join(ODD_CHUNKS))
+
+
+if __name__ == "__main__":
+    unittest.main()
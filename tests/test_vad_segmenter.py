@@ -0,0 +1,136 @@
+import io
+import unittest
+import wave
+
+from typing import AsyncGenerator, List
+
+import numpy as np
+
+from pipecat.audio.vad.vad_analyzer import VADAnalyzer, VADParams
+from pipecat.audio.vad.vad_segmenter import VADSegmenter, VADSegmenterParams
+from pipecat.frames.frames import AudioRawFrame, EndFrame, Frame
+from pipecat.services.ai_services import SegmentedSTTService
+
+SAMPLE_RATE = 16000
+FRAME_SAMPLES = 320  # 20ms
+
+
+class EnergyVADAnalyzer(VADAnalyzer):
+    def __init__(self):
+        super().__init__(
+            sample_rate=SAMPLE_RATE,
+            num_channels=1,
+            params=VADParams(start_secs=0.1, stop_secs=0.3, min_volume=0),
+        )
+
+    def num_frames_required(self) -> int:
+        return FRAME_SAMPLES
+
+    def voice_confidence(self, buffer) -> float:
+        samples = np.frombuffer(buffer, dtype=np.int16)
+        return 1.0 if np.abs(samples).max() > 1000 else 0.0
+
+
+def tone(secs: float) -> np.ndarray:
+    t = np.arange(int(secs * SAMPLE_RATE)) / SAMPLE_RATE
+    return (8000 * np.sin(2 * np.pi * 440 * t)).astype(np.int16)
+
+
+def silence(secs: float) -> np.ndarray:
+    return np.zeros(int(secs * SAMPLE_RATE), dtype=np.int16)
+
+
+def frames(audio: np.ndarray) -> List[bytes]:
+    return [audio[i : i + FRAME_SAMPLES].tobytes() for i in range(0, len(audio), FRAME_SAMPLES)]
+
+
+class TestVADSegmenter(unittest.TestCase):
+    def segment(self, audio: np.ndarray, params=VADSegmenterParams()) -> List[np.ndarray]:
+        segmenter = VADSegmenter(vad_analyzer=EnergyVADAnalyzer(), params=params)
+        segments = []
+        for frame in frames(audio):
+            segments.extend(segmenter.append(frame))
+        return segments
+
+    def test_pre_roll(self):
+        speech = tone(1.0)
+        segments = self.segment(np.concatenate([silence(1.0), speech, silence(1.0)]))
+        self.assertEqual(len(segments), 1)
+        segment = segments[0]
+        self.assertEqual(segment.dtype, np.float32)
+        # No speech has been clipped.
+        self.assertEqual(np.count_nonzero(segment), np.count_nonzero(speech))
+        # And we have some audio from before the speech started.
+        self.assertGreaterEqual(np.flatnonzero(segment)[0], int(0.3 * SAMPLE_RATE))
+
+    def test_no_speech(self):
+        self.assertEqual(self.segment(silence(2.0)), [])
+
+    def test_split_at_quiet_point(self):
+        params = VADSegmenterParams(pre_roll_secs=0, max_segment_secs=2.0, split_search_secs=1.5)
+        audio = np.concatenate([silence(0.5), tone(1.2), silence(0.1), tone(1.5), silence(1.0)])
+        segments = self.segment(audio, params)
+        self.assertEqual(len(segments), 2)
+        # The first segment is split in the gap between the two tones.
+        self.assertLess(len(segments[0]), 2.0 * SAMPLE_RATE)
+        self.assertEqual(np.count_nonzero(segments[0][-80:]), 0)
+        self.assertEqual(np.count_nonzero(segments[1][:80]), 0)
+        # Nothing is lost.
+        self.assertEqual(
+            sum(np.count_nonzero(s) for s in segments),
+            np.count_nonzero(tone(1.2)) + np.count_nonzero(tone(1.5)),
+        )
+
+
+class MockSegmentedSTTService(SegmentedSTTService):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.wavs = []
+
+    async def set_model(self, model: str):
+        pass
+
+    async def set_language(self, language):
+        pass
+
+    async def run_stt(self, audio: bytes) -> AsyncGenerator[Frame, None]:
+        self.wavs.append(audio)
+        yield None
+
+
+class TestSegmentedSTTService(unittest.IsolatedAsyncioTestCase):
+    async def test_vad_segments_as_wav(self):
+        stt = MockSegmentedSTTService(vad_analyzer=EnergyVADAnalyzer())
+        audio = np.concatenate([silence(0.5), tone(0.5), silence(0.5), tone(0.5)])
+        for frame in frames(audio):
+            await stt.process_audio_frame(AudioRawFrame(frame, SAMPLE_RATE, 1))
+        self.assertEqual(len(stt.wavs), 1)
+        self.assertTrue(stt.wavs[0].startswith(b"RIFF"))
+
+        # The second segment is transcribed when the pipeline ends.
+        await stt.stop(EndFrame())
+        self.assertEqual(len(stt.wavs), 2)
+
+    async def test_volume_audio_as_wav(self):
+        stt = MockSegmentedSTTService(min_volume=0.0, max_buffer_secs=0.0)
+        audio = np.array([0, 1, -1, 32767, -32768, 1234], dtype=np.int16)
+        await stt.process_audio_frame(AudioRawFrame(audio.tobytes(), SAMPLE_RATE, 1))
+        # The buffered audio is written as it is.
+        with wave.open(io.BytesIO(stt.wavs[0]), "rb") as ww:
+            self.assertEqual(ww.readframes(ww.getnframes()), audio.tobytes())
+
+    async def test_segment_to_wav_is_lossless(self):
+        stt = MockSegmentedSTTService()
+        audio = np.array([0, 1, -1, 32767, -32768, 1234], dtype=np.int16)
+        async for _ in stt.run_stt_segment(audio.astype(np.float32) / 32768.0):
+            pass
+        with wave.open(io.BytesIO(stt.wavs[0]), "rb") as ww:
+            self.assertEqual(ww.readframes(ww.getnframes()), audio.tobytes())
+
+    async def test_sample_rate_mismatch(self):
+        with self.assertRaises(ValueError):
+            MockSegmentedSTTService(sample_rate=24000, vad_analyzer=EnergyVADAnalyzer())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,203 @@
+import asyncio
+import base64
+import json
+import unittest
+
+import websockets
+
+from pipecat.clocks.system_clock import SystemClock
+from pipecat.frames.frames import EndFrame, StartFrame, TTSAudioRawFrame
+from pipecat.processors.frame_processor import FrameDirection
+from pipecat.services.elevenlabs import ElevenLabsTTSService
+from pipecat.services.websocket_service import WebsocketPool
+
+HOST = "localhost"
+PORT = 8767
+
+
+class ElevenLabsServer:
+    """Stand-in for the ElevenLabs websocket API. Answers every text message
+    with some audio.
+
+    """
+
+    def __init__(self):
+        self.connections = []
+        self.messages = []
+        self._server = None
+
+    async def start(self):
+        self._server = await websockets.serve(self._handler, HOST, PORT)
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def close_connections(self):
+        for websocket in self.connections:
+            await websocket.close()
+
+    async def _handler(self, websocket):
+        self.connections.append(websocket)
+        async for message in websocket:
+            msg = json.loads(message)
+            msg["connection"] = self.connections.index(websocket)
+            self.messages.append(msg)
+            if msg["text"].strip():
+                audio = base64.b64encode(b"\x00\x01" * 160).decode("utf-8")
+                await websocket.send(json.dumps({"audio": audio}))
+
+
+async def wait_for(condition, timeout: float = 2.0):
+    for _ in range(int(timeout / 0.01)):
+        if condition():
+            return True
+        await asyncio.sleep(0.01)
+    return condition()
+
+
+class MockElevenLabsTTSService(ElevenLabsTTSService):
+    def __init__(self, api_key: str = "key", **kwargs):
+        super().__init__(api_key=api_key, voice_id="voice", url=f"ws://{HOST}:{PORT}", **kwargs)
+        self._reconnect_initial_delay_secs = 0.05
+        self._reconnect_max_delay_secs = 0.2
+        self.audio_frames = []
+
+    async def push_frame(self, frame, direction=FrameDirection.DOWNSTREAM):
+        await super().push_frame(frame, direction)
+        if isinstance(frame, TTSAudioRawFrame):
+            self.audio_frames.append(frame)
+
+
+class TestWebsocketService(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = ElevenLabsServer()
+        await self.server.start()
+
+    async def asyncTearDown(self):
+        await self.server.stop()
+
+    async def start_service(self, tts: ElevenLabsTTSService):
+        await tts.process_frame(StartFrame(clock=SystemClock()), FrameDirection.DOWNSTREAM)
+
+    async def say(self, tts: ElevenLabsTTSService, text: str):
+        await tts.process_generator(tts.run_tts(text))
+
+    async def test_connect_on_start(self):
+        tts = MockElevenLabsTTSService()
+        await self.start_service(tts)
+
+        # Connected and authenticated before saying anything.
+        self.assertEqual(len(self.server.connections), 1)
+        self.assertTrue(await wait_for(lambda: len(self.server.messages) == 1))
+        self.assertEqual(self.server.messages[0]["xi_api_key"], "key")
+
+        await self.say(tts, "Hello")
+        self.assertTrue(await wait_for(lambda: tts.audio_frames))
+
+        await tts.stop(EndFrame())
+        self.assertIsNone(tts._websocket)
+
+    async def test_reconnect(self):
+        tts = MockElevenLabsTTSService()
+        await self.start_service(tts)
+
+        await self.server.close_connections()
+        self.assertTrue(await wait_for(lambda: len(self.server.connections) == 2))
+
+        await self.say(tts, "Hello again")
+        self.assertTrue(await wait_for(lambda: tts.audio_frames))
+
+        await tts.stop(EndFrame())
+
+    async def test_reconnect_backoff(self):
+        await self.server.stop()
+
+        # The server is down, we keep trying in the background.
+        tts = MockElevenLabsTTSService()
+        await self.start_service(tts)
+        self.assertIsNone(tts._websocket)
+        await asyncio.sleep(0.3)
+
+        await self.server.start()
+        self.assertTrue(await wait_for(lambda: tts._websocket is not None))
+        self.assertEqual(len(self.server.connections), 1)
+
+        await tts.stop(EndFrame())
+
+    async def test_pool(self):
+        pool = WebsocketPool(size=1)
+
+        tts1 = MockElevenLabsTTSService(websocket_pool=pool)
+        await self.start_service(tts1)
+        # A connection is opened in the background for the next session.
+        self.assertTrue(await wait_for(lambda: len(self.server.connections) == 2))
+        key = tts1._websocket_pool_key()
+        self.assertTrue(await wait_for(lambda: pool.idle_count(key) == 1))
+
+        tts2 = MockElevenLabsTTSService(websocket_pool=pool)
+        await self.start_service(tts2)
+        await self.say(tts2, "Hello")
+        self.assertTrue(await wait_for(lambda: tts2.audio_frames))
+        # The second session used the pre-warmed connection, and another one
+        # has been opened.
+        hello = [m for m in self.server.messages if m["text"] == "Hello "]
+        self.assertEqual(hello[0]["connection"], 1)
+        self.assertTrue(await wait_for(lambda: len(self.server.connections) == 3))
+
+        await tts1.stop(EndFrame())
+        await tts2.stop(EndFrame())
+        await pool.close()
+
+    async def test_pool_credentials(self):
+        pool = WebsocketPool(size=1)
+
+        tts1 = MockElevenLabsTTSService(websocket_pool=pool)
+        await self.start_service(tts1)
+        self.assertTrue(await wait_for(lambda: pool.idle_count(tts1._websocket_pool_key()) == 1))
+
+        # Connections authenticated with another API key are not used.
+        tts2 = MockElevenLabsTTSService(api_key="other", websocket_pool=pool)
+        self.assertNotEqual(tts1._websocket_pool_key(), tts2._websocket_pool_key())
+        await self.start_service(tts2)
+        await self.say(tts2, "Hello")
+        self.assertTrue(await wait_for(lambda: tts2.audio_frames))
+        hello = [m for m in self.server.messages if m["text"] == "Hello "]
+        connection = hello[0]["connection"]
+        api_keys = [
+            m["xi_api_key"]
+            for m in self.server.messages
+            if m["connection"] == connection and "xi_api_key" in m
+        ]
+        self.assertEqual(api_keys, ["other"])
+        # The first service's connection is still ready in the pool.
+        self.assertEqual(pool.idle_count(tts1._websocket_pool_key()), 1)
+
+        await tts1.stop(EndFrame())
+        await tts2.stop(EndFrame())
+        await pool.close()
+
+    async def test_pool_max_idle(self):
+        pool = WebsocketPool(size=1, max_idle_secs=60)
+        opened = []
+        closed = []
+
+        async def connect():
+            opened.append(len(opened))
+            return opened[-1]
+
+        async def close(websocket):
+            closed.append(websocket)
+
+        self.assertEqual(await pool.acquire("key", connect, close, max_idle_secs=0.05), 0)
+        self.assertTrue(await wait_for(lambda: pool.idle_count("key") == 1))
+        await asyncio.sleep(0.1)
+        # The idle connection has expired (e.g. the server closed it), so it's
+        # closed and a new one is opened.
+        self.assertEqual(await pool.acquire("key", connect, close, max_idle_secs=0.05), 2)
+        self.assertEqual(closed, [1])
+        await pool.close()
+
+
+if __name__ == "__main__":
+    unittest.main()